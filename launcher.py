@@ -1,35 +1,99 @@
 from __future__ import annotations
-import argparse, asyncio, json
+import argparse, asyncio, json, time
+from datetime import datetime
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 from src.io.jsonio import load_plan
+from src.io.plancache import load_plan_cached
+from src.models.plandiff import PlanDiff, diff_plans
 from src.util.logging import setup_logging, log
-from src.util.config import load_config
+from src.util.config import load_config, parse_config
 from src.util.planhash import sha256_file
+from src.util import history
+from src.util import report as report_mod
+from src.util import profiling
+from src.util.state import State, load_artifacts
+from src.util.telemetry import Telemetry
+from src.util import watch as watch_mod
+from src.exec.context import build_context
+from src.core import keystore
+from src.core.keys import load_seed_from_file
 from src.exec.orchestrator import execute_async, RunConfig
 from src.util import preflight as preflight_mod
+from scripts import verify as verify_mod
 from scripts.verify import verify as verify_script
 from src.core.solana import Rpc, RpcConfig
+from src.exec.batch import run_batch, discover_plans, progress_table
 
 console = Console()
 
+def _add_exec_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--seed-keypair", required=False, help="Seed keypair JSON file (ed25519)")
+    p.add_argument("--rpc", required=True, help="RPC URL for cluster")
+    p.add_argument("--priority-fee", type=int, default=None, help="Compute unit price (micro-lamports)")
+    p.add_argument("--cu-limit", type=int, default=1_000_000, help="Compute unit limit per tx")
+    p.add_argument("--simulate", action="store_true", help="Simulate each tx before send")
+    p.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
+    p.add_argument("--only", choices=["fund","mint","metadata","prewarm","lp","lp_init","buys","all"], default="all")
+    p.add_argument("--config", default="configs/defaults.yaml", help="Path to config YAML")
+    p.add_argument("--max-buys", type=int, default=None, help="Optional cap on number of buys to execute")
+    p.add_argument("--fuse-metadata", action="store_true", help="Create metadata in the mint transaction")
+    p.add_argument("--state-db", default=None, help="Keep state in this SQLite launch-history database instead of JSON files")
+    p.add_argument("--derive-wallets", action="store_true", help="Derive subwallets from the seed, plan_id and wallet_id instead of storing random keys")
+
+def _at_time(v: str) -> float:
+    """Unix seconds or an ISO-8601 timestamp (naive = local time)."""
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(v).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not unix seconds or ISO-8601: {v!r}")
+
+def _run_config(args: argparse.Namespace, out_dir: Path, plan_hash: str) -> RunConfig:
+    return RunConfig(
+        out_dir=out_dir,
+        resume=args.resume,
+        only=("lp_init" if args.only in ("lp", "lp_init") else args.only),
+        plan_hash=plan_hash,
+        rpc_url=args.rpc,
+        cu_limit=args.cu_limit,
+        cu_price_micro=args.priority_fee,
+        simulate=args.simulate,
+        max_buys=args.max_buys,
+        fuse_metadata=args.fuse_metadata,
+        at_slot=getattr(args, "at_slot", None),
+        at_time=getattr(args, "at_time", None),
+        state_db=Path(args.state_db) if args.state_db else None,
+        derive_wallets=args.derive_wallets,
+    )
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Sol Atomic Launcher (plan-first, prod-safe).")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     run = sub.add_parser("run", help="Execute a plan")
     run.add_argument("--plan", required=True, help="Path to plan JSON")
-    run.add_argument("--seed-keypair", required=False, help="Seed keypair JSON file (ed25519)")
-    run.add_argument("--rpc", required=True, help="RPC URL for cluster")
-    run.add_argument("--priority-fee", type=int, default=None, help="Compute unit price (micro-lamports)")
-    run.add_argument("--cu-limit", type=int, default=1_000_000, help="Compute unit limit per tx")
-    run.add_argument("--simulate", action="store_true", help="Simulate each tx before send")
-    run.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
-    run.add_argument("--only", choices=["fund","mint","metadata","lp","lp_init","buys","all"], default="all")
+    _add_exec_args(run)
     run.add_argument("--out", default="state", help="Output state dir")
-    run.add_argument("--config", default="configs/defaults.yaml", help="Path to config YAML")
-    run.add_argument("--max-buys", type=int, default=None, help="Optional cap on number of buys to execute")
+    run.add_argument("--profile", action="store_true", help="Sample CPU per step and event-loop lag; writes profile-run.* to --out")
+    run.add_argument("--apply-delta", action="store_true", help="Only fund and buy what changed since the plan in --out/plan.json, after checking the unchanged work on chain")
+    at = run.add_mutually_exclusive_group()
+    at.add_argument("--at-slot", type=int, default=None, help="Prepare everything, then land lp_init + buys at this slot")
+    at.add_argument("--at-time", type=_at_time, default=None, help="Like --at-slot, for a wall-clock time (unix seconds or ISO-8601)")
+
+    bat = sub.add_parser("run-batch", help="Execute several plans concurrently on one shared RPC client")
+    bat.add_argument("--plans", nargs="+", required=True, help="Plan JSON files and/or directories of plans")
+    _add_exec_args(bat)
+    bat.add_argument("--out", default="state", help="Root dir; each plan gets <out>/<plan file stem>")
+    bat.add_argument("--max-concurrent", type=int, default=4, help="Launches in flight at once")
+    bat.add_argument("--max-rps", type=float, default=None, help="Shared RPC request rate cap")
+    bat.add_argument("--max-in-flight", type=int, default=None, help="Shared cap on concurrent RPC requests")
+    bat.add_argument("--blockhash-ttl", type=float, default=2.0, help="Seconds a fetched blockhash is shared across launches")
 
     pre = sub.add_parser("preflight", help="Dry-run planners and verify configuration")
     pre.add_argument("--plan", required=True, help="Path to plan JSON")
@@ -37,14 +101,209 @@ def build_parser() -> argparse.ArgumentParser:
     pre.add_argument("--config", default="configs/defaults.yaml", help="Path to config YAML")
     pre.add_argument("--out", default="state", help="Output state dir")
     pre.add_argument("--strict", action="store_true", help="Exit non-zero if any check fails")
+    pre.add_argument("--seed-keypair", default=None, help="Seed keypair JSON file; its pubkey pays the simulated transactions (else a preview key)")
+    pre.add_argument("--concurrency", type=int, default=preflight_mod.SIM_CONCURRENCY, help="Simulations in flight at once")
+    pre.add_argument("--fuse-metadata", action="store_true", help="Simulate the mint with the metadata instruction fused in")
+    pre.add_argument("--profile", action="store_true", help="Sample CPU and event-loop lag; writes profile-preflight.* to --out")
 
     ver = sub.add_parser("verify", help="Verify on-chain state against artifacts")
     ver.add_argument("--out", default="state", help="State directory with artifacts")
     ver.add_argument("--rpc", required=True, help="RPC URL for cluster")
     ver.add_argument("--config", default="configs/defaults.yaml", help="Path to config YAML")
+    ver.add_argument("--tolerance-bps", type=float, default=verify_mod.DEFAULT_TOLERANCE_BPS, help="Allowed drift of buyer balances and pool reserves from the replayed quotes")
+    ver.add_argument("--profile", action="store_true", help="Sample CPU and event-loop lag; writes profile-verify.* to --out")
+
+    his = sub.add_parser("history", help="SQLite launch-history database")
+    his_sub = his.add_subparsers(dest="history_cmd", required=True)
+    imp = his_sub.add_parser("import", help="Import existing JSON state directories")
+    imp.add_argument("--db", required=True, help="History database path")
+    imp.add_argument("dirs", nargs="+", help="State dirs (a dir without state files is scanned one level down)")
+    unb = his_sub.add_parser("unbought", help="Buyer wallets without a confirmed buy")
+    unb.add_argument("--db", required=True, help="History database path")
+    unb.add_argument("--days", type=float, default=None, help="Only launches created in the last N days")
+
+    pln = sub.add_parser("plan", help="Plan tools")
+    pln_sub = pln.add_subparsers(dest="plan_cmd", required=True)
+    pdf = pln_sub.add_parser("diff", help="Per-section and per-wallet changes between the executed plan and a new one")
+    pdf.add_argument("plan", help="New plan JSON")
+    pdf.add_argument("--out", default="state", help="State dir whose plan.json is the executed plan")
+    pdf.add_argument("--old", default=None, help="Compare against this plan instead of --out/plan.json")
+    pdf.add_argument("--json", action="store_true", help="Print JSON instead of tables")
+
+    kst = sub.add_parser("keys", help="Wallet keystore maintenance")
+    kst_sub = kst.add_subparsers(dest="keys_cmd", required=True)
+    mig = kst_sub.add_parser("migrate", help="Move per-wallet .enc files into the single-file keystore")
+    mig.add_argument("--out", default="state", help="State dir (its wallets/ dir is migrated and artifacts repointed)")
+
+    wat = sub.add_parser("watch", help="Stream pool reserves, price and market cap over a websocket")
+    wat.add_argument("--out", default="state", help="State dir of the launch (mint from artifacts; telemetry appended there)")
+    wat.add_argument("--rpc", required=True, help="RPC URL for cluster")
+    wat.add_argument("--ws", default=None, help="Websocket URL (default: derived from --rpc)")
+    wat.add_argument("--config", default="configs/defaults.yaml", help="Path to config YAML (watch: section for commitment and actions)")
+    wat.add_argument("--mint", default=None, help="Watch this mint's pool instead of the one in --out")
+    wat.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    wat.add_argument("--max-ticks", type=int, default=None, help="Stop after this many ticks")
+
+    rep = sub.add_parser("report", help="Latency and landing report from telemetry files")
+    rep.add_argument("paths", nargs="*", help="telemetry.ndjson files or dirs (searched recursively); combined into one report")
+    rep.add_argument("--compare", nargs=2, metavar=("A", "B"), default=None, help="Two runs (files or dirs) side by side")
+    rep.add_argument("--json", action="store_true", help="Print JSON instead of a table")
 
     return p
 
+def _fmt_summary(s: dict | None) -> list[str]:
+    if s is None:
+        return ["-"] * 5
+    return [str(s["count"]), f"{s['p50_ms']:.1f}", f"{s['p90_ms']:.1f}", f"{s['p99_ms']:.1f}", f"{s['max_ms']:.1f}"]
+
+def print_report(args: argparse.Namespace) -> None:
+    if args.compare:
+        a, b = (report_mod.analyze([Path(p)]) for p in args.compare)
+        rows = report_mod.compare(a, b)
+        if args.json:
+            print(json.dumps({"a": a.to_dict(), "b": b.to_dict()}, indent=2))
+            return
+        t = Table(title=f"A: {args.compare[0]}  vs  B: {args.compare[1]} (ms)")
+        for col in ("section", "metric", "A n", "A p50", "A p90", "A p99", "A max", "B n", "B p50", "B p90", "B p99", "B max", "Δ p50"):
+            t.add_column(col)
+        for section, key, sa, sb in rows:
+            delta = f"{sb['p50_ms'] - sa['p50_ms']:+.1f}" if sa and sb else "-"
+            t.add_row(section, key, *_fmt_summary(sa), *_fmt_summary(sb), delta)
+        console.print(t)
+        return
+    if not args.paths:
+        raise SystemExit("report: give telemetry paths or --compare A B")
+    r = report_mod.analyze([Path(p) for p in args.paths])
+    if args.json:
+        print(json.dumps(r.to_dict(), indent=2))
+        return
+    t = Table(title=f"Telemetry: {r.files} file(s), {r.runs} run(s), {r.events} events (ms)")
+    for col in ("section", "metric", "n", "p50", "p90", "p99", "max"):
+        t.add_column(col)
+    for section, key, s in r.rows():
+        t.add_row(section, key, *_fmt_summary(s))
+    console.print(t)
+    if r.bad_lines:
+        console.print(f"[yellow]skipped {r.bad_lines} unparseable line(s)[/yellow]")
+
+def print_profile(summary: dict) -> None:
+    lag = summary["loop_lag"]
+    console.print(
+        f"[bold]Profile ({summary['command']}):[/bold] wall {summary['wall_ms']:.0f} ms = busy {summary['busy_ms']:.0f} ms"
+        f" + awaiting I/O {summary['io_wait_ms']:.0f} ms | loop lag p99 {lag['p99_ms']:.1f} ms, max {lag['max_ms']:.1f} ms"
+    )
+    t = Table(title="Busy time by step")
+    t.add_column("step"); t.add_column("busy ms")
+    for step, ms in summary["steps_busy_ms"].items():
+        t.add_row(step, f"{ms:.1f}")
+    console.print(t)
+    t = Table(title="Top self time")
+    t.add_column("function"); t.add_column("self ms"); t.add_column("% busy")
+    for row in summary["top_self"]:
+        t.add_row(row["function"], f"{row['self_ms']:.1f}", f"{row['pct_busy']:.1f}")
+    console.print(t)
+
+def _run_async(aw, args: argparse.Namespace, command: str):
+    """``asyncio.run(aw)``, under the sampling profiler when ``--profile`` is set."""
+    if not getattr(args, "profile", False):
+        return asyncio.run(aw)
+    result, summary = asyncio.run(profiling.profiled(aw, Path(args.out), command))
+    print_profile(summary)
+    console.print(f"Collapsed stacks: {args.out}/profile-{command}.collapsed")
+    return result
+
+def run_watch(args: argparse.Namespace) -> dict:
+    out = Path(args.out)
+    config, _ = load_inputs(Path(args.config), None, out)
+    mint = args.mint or load_artifacts(out).get("mint", {}).get("mint")
+    if not mint:
+        raise SystemExit(f"watch: no mint in {out}/artifacts.json; pass --mint")
+    ctx = build_context(config, mint)
+    tc = config.telemetry
+    telem = Telemetry(out / "telemetry.ndjson", capacity=tc.buffer_events, overflow=tc.overflow,
+                      flush_events=tc.flush_events, flush_interval_sec=tc.flush_interval_ms / 1000)
+    console.print(f"Watching pool {ctx.pool.pool} (vaults {ctx.pool.vault_base}, {ctx.pool.vault_quote})")
+
+    def on_tick(t: watch_mod.Tick) -> None:
+        price = f"{t.price_sol_per_token:.9g}" if t.price_sol_per_token is not None else "-"
+        mcap = f"{t.market_cap_sol:,.2f}" if t.market_cap_sol is not None else "-"
+        change = f"{t.change_bps:+.1f}" if t.change_bps is not None else "-"
+        console.print(f"slot {t.slot}  base {t.base}  quote {t.quote}  price {price} SOL  mcap {mcap} SOL  {change} bps")
+
+    async def _go() -> dict:
+        rpc = Rpc(RpcConfig(url=args.rpc, timeout_sec=config.execution.timeout_sec))
+        updates = watch_mod.account_updates(args.ws or watch_mod.ws_url(args.rpc), [ctx.pool.vault_base, ctx.pool.vault_quote], config.watch.commitment)
+        try:
+            return await watch_mod.watch(rpc, mint, ctx.pool, config.watch, updates, on_tick, telem.emit, args.duration, args.max_ticks)
+        finally:
+            await updates.aclose()
+            await rpc.close()
+
+    try:
+        res = asyncio.run(_go())
+    finally:
+        telem.close()
+    for a in res["actions"]:
+        console.print(f"action {a['do']} at slot {a['slot']}: {a['when']}")
+    console.print(f"{res['ticks']} tick(s) from {res['updates']} vault update(s)")
+    return res
+
+def load_inputs(config_path: Path | None, plan_path: Path | None, out_dir: Path, plan_hash: str | None = None):
+    """Validate config and plan before anything touches the network.
+
+    Reports every config and plan error together and exits with status 2.
+    """
+    problems, config, plan = [], None, None
+    if config_path is not None:
+        try:
+            config = parse_config(load_config(config_path))
+        except ValueError as e:
+            problems.append(f"{config_path}:\n{e}")
+    if plan_path is not None:
+        try:
+            plan = load_plan_cached(plan_path, out_dir, plan_hash)
+        except ValueError as e:
+            problems.append(f"{plan_path}:\n{e}")
+    if problems:
+        console.print("[bold red]Invalid input, nothing was sent.[/bold red]")
+        for p in problems:
+            console.print(p, markup=False)
+        raise SystemExit(2)
+    return config, plan
+
+def print_plan_diff(diff: PlanDiff, max_rows: int = 50) -> None:
+    t = Table(title="Plan diff: sections")
+    t.add_column("field"); t.add_column("old"); t.add_column("new")
+    for sec, changes in diff.sections.items():
+        for k, (a, b) in changes.items():
+            t.add_row(f"{sec}.{k}", repr(a), repr(b))
+    console.print(t)
+    console.print(f"wallets: +{len(diff.added)} added, -{len(diff.removed)} removed, ~{len(diff.changed)} changed; "
+                  f"schedule: +{len(diff.schedule_added)} -{len(diff.schedule_removed)}{' (reordered)' if diff.schedule_reordered else ''}")
+    t = Table(title="Plan diff: wallets")
+    t.add_column("wallet"); t.add_column("change"); t.add_column("old"); t.add_column("new")
+    rows = [(wid, "added", "", "") for wid in diff.added] + [(wid, "removed", "", "") for wid in diff.removed]
+    rows += [(wid, k, repr(a), repr(b)) for wid, ch in diff.changed.items() for k, (a, b) in ch.items()]
+    for r in rows[:max_rows]:
+        t.add_row(*r)
+    console.print(t)
+    if len(rows) > max_rows:
+        console.print(f"... {len(rows) - max_rows} more (use --json)")
+    for line in diff.blocking():
+        console.print(f"[bold red]not applicable as a delta:[/bold red] {line}")
+
+def _executed_plan(out_dir: Path, old: str | None = None):
+    path = Path(old) if old else out_dir / "plan.json"
+    if not path.exists():
+        console.print(f"[bold red]No executed plan at {path}[/bold red]")
+        raise SystemExit(2)
+    try:
+        return path, load_plan_cached(path, out_dir)
+    except ValueError as e:
+        console.print(f"[bold red]Executed plan {path} does not validate:[/bold red]")
+        console.print(str(e), markup=False)
+        raise SystemExit(2)
+
 def print_plan_summary(plan_path: Path, cfg: dict) -> None:
     plan = load_plan(plan_path)
     t = Table(title="Plan & Config Summary", show_header=True, header_style="bold")
@@ -68,10 +327,10 @@ def main() -> None:
 
     if args.cmd == "preflight":
         plan_path = Path(args.plan)
-        cfg = load_config(Path(args.config))
-        plan = load_plan(plan_path)
-        rpc = Rpc(RpcConfig(url=args.rpc))
-        res = asyncio.run(preflight_mod.preflight(rpc, plan_path, cfg, plan))
+        config, plan = load_inputs(Path(args.config), plan_path, Path(args.out))
+        rpc = Rpc(RpcConfig(url=args.rpc, timeout_sec=config.execution.timeout_sec))
+        seed_pub = str(load_seed_from_file(args.seed_keypair).kp.pubkey()) if args.seed_keypair else None
+        res = _run_async(preflight_mod.preflight(rpc, plan_path, config, plan, out_dir=Path(args.out), seed_pub=seed_pub, concurrency=args.concurrency, fuse_metadata=args.fuse_metadata), args, "preflight")
         out = Path(args.out) / "preflight.json"
         out.parent.mkdir(parents=True, exist_ok=True)
         out.write_text(json.dumps(res, indent=2))
@@ -84,45 +343,154 @@ def main() -> None:
         t.add_row("simulate_init_ok", str(res["simulate_init_ok"]))
         t.add_row("ok", str(res["ok"]))
         console.print(t)
-        if args.strict and not res["ok"]:
+        st = Table(title=f"Simulated transactions ({res['elapsed_ms']:.0f} ms)")
+        for col in ("Kind", "Count", "Failed", "Max CU", "Max size", "Fees (lamports)"):
+            st.add_column(col)
+        for kind, s in res["summary"].items():
+            st.add_row(kind, str(s["count"]), str(s["failed"]), str(s["units_max"]), str(s["size_max"]), str(s["fee_lamports"]))
+        st.add_row("total", str(len(res["transactions"])), "", "", "", str(res["fees_total_lamports"]))
+        console.print(st)
+        reh = res["rehearsal"]
+        rt = Table(title=f"Rehearsal on a local fork ({reh['elapsed_ms']:.0f} ms)")
+        for col in ("Step", "Txs", "Failed", "Seed lamports", "Pool base", "Pool quote", "Price (SOL)"):
+            rt.add_column(col)
+        for step in reh["steps"]:
+            r = step["reserves"] or {}
+            price = r.get("price_sol_per_token")
+            rt.add_row(step["step"], str(step["txs"]), str(len(step["failed"])), str(step["seed_lamports"]), str(r.get("base", "-")), str(r.get("quote", "-")), f"{price:.9g}" if price else "-")
+        console.print(rt)
+        for step in reh["steps"]:
+            for f in step["failed"][:5]:
+                console.print(f"[red]rehearsal {step['step']} {f['key']}[/red]: {f['err']}")
+        if res["preview_keys"]:
+            console.print(f"preview keys (not from {args.out}): {', '.join(res['preview_keys'])}")
+        failed = [r for r in res["transactions"] if not r["ok"]]
+        for r in failed[:20]:
+            console.print(f"[red]{r['kind']} {r['key']}[/red]: {r['err']}" + "".join(f"\n  {line}" for line in r["log_errors"]))
+        if len(failed) > 20:
+            console.print(f"... {len(failed) - 20} more failures in {out}")
+        if args.strict and not (res["ok"] and res["rehearsal_ok"]):
             raise SystemExit(1)
         return
 
     if args.cmd == "verify":
-        results, ok = asyncio.run(verify_script(Path(args.out), args.rpc, Path(args.config)))
+        results, ok = _run_async(verify_script(Path(args.out), args.rpc, Path(args.config), tolerance_bps=args.tolerance_bps), args, "verify")
         if not ok:
             raise SystemExit(1)
         return
 
+    if args.cmd == "keys":
+        out = Path(args.out)
+        ks = keystore.migrate_enc_dir(out / "wallets")
+        st = State(out)
+        st.merge_artifacts(keystore.artifacts_patch(st.artifacts, ks))
+        st.close()
+        console.print(f"Keystore {ks.path}: {len(ks)} keypair(s). The .enc files are no longer read and can be deleted once a --resume run succeeds.")
+        ks.close()
+        return
+
+    if args.cmd == "plan":
+        _, old = _executed_plan(Path(args.out), args.old)
+        _, new = load_inputs(None, Path(args.plan), Path(args.out))
+        diff = diff_plans(old, new)
+        if args.json:
+            print(json.dumps(diff.to_dict(), indent=2, default=str))
+        elif diff.empty:
+            console.print("No changes.")
+        else:
+            print_plan_diff(diff)
+        return
+
+    if args.cmd == "report":
+        print_report(args)
+        return
+
+    if args.cmd == "watch":
+        try:
+            run_watch(args)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.cmd == "history":
+        db = Path(args.db)
+        if args.history_cmd == "import":
+            ids = history.import_dirs(db, [Path(d) for d in args.dirs])
+            console.print(f"Imported {len(ids)} launch(es) into {db}")
+            return
+        since = int((time.time() - args.days * 86400) * 1000) if args.days is not None else None
+        rows = history.unbought_wallets(db, since)
+        t = Table(title="Buyer wallets without a confirmed buy")
+        for col in ("launch", "plan_hash", "wallet_id", "pubkey"):
+            t.add_column(col)
+        for r in rows:
+            t.add_row(r["out_dir"], str(r["plan_hash"]), r["wallet_id"], r["pubkey"])
+        console.print(t)
+        return
+
+    if args.cmd == "run-batch":
+        cfg_yaml = Path(args.config)
+        config, _ = load_inputs(cfg_yaml, None, Path(args.out))
+        plans = discover_plans(args.plans)
+        log.info("batch_start", plans=len(plans), max_concurrent=args.max_concurrent)
+        rpc_cfg = RpcConfig(
+            url=args.rpc,
+            timeout_sec=config.execution.timeout_sec,
+            blockhash_ttl_sec=args.blockhash_ttl,
+            max_rps=args.max_rps,
+            max_in_flight=args.max_in_flight,
+        )
+        with Live(progress_table([]), console=console, refresh_per_second=4) as live:
+            progress = asyncio.run(run_batch(
+                plans,
+                _run_config(args, Path(args.out), ""),
+                Path(args.out),
+                args.seed_keypair or "",
+                cfg_yaml,
+                config,
+                max_concurrent=args.max_concurrent,
+                rpc_config=rpc_cfg,
+                on_update=lambda rows: live.update(progress_table(rows.values())),
+            ))
+            live.update(progress_table(progress.values()))
+        if any(r.status != "done" for r in progress.values()):
+            raise SystemExit(1)
+        return
+
     # run subcommand
     plan_path = Path(args.plan)
     cfg_yaml = Path(args.config)
     cfg_yaml.parent.mkdir(parents=True, exist_ok=True)
-    cfg = load_config(cfg_yaml)
     plan_hash = sha256_file(plan_path)
 
     log.info("load_plan_start", path=str(plan_path), plan_hash=plan_hash)
-    plan = load_plan(plan_path)
+    config, plan = load_inputs(cfg_yaml, plan_path, Path(args.out), plan_hash)
     log.info("load_plan_ok", symbol=plan.token.symbol, schedule_len=len(plan.schedule), wallets=len(plan.wallets))
 
-    rc = RunConfig(
-        out_dir=Path(args.out),
-        resume=args.resume,
-        only=("lp_init" if args.only in ("lp", "lp_init") else args.only),
-        plan_hash=plan_hash,
-        rpc_url=args.rpc,
-        cu_limit=args.cu_limit,
-        cu_price_micro=args.priority_fee,
-        simulate=args.simulate,
-        max_buys=args.max_buys,
-    )
+    rc = _run_config(args, Path(args.out), plan_hash)
+    out_plan = Path(args.out) / "plan.json"
+
+    if args.apply_delta:
+        old_path, old = _executed_plan(Path(args.out))
+        rc.delta = diff_plans(old, plan)
+        if rc.delta.empty:
+            console.print("No changes against the executed plan; nothing to do.")
+            return
+        print_plan_diff(rc.delta)
+        if rc.delta.blocking():
+            raise SystemExit(2)
+        _run_async(execute_async(plan, rc, seed_keypair_path=args.seed_keypair or "", config_yaml=cfg_yaml, config=config), args, "run")
+        # the new plan is now the executed one; keep the previous revision for audit
+        old_path.replace(old_path.with_name(f"plan-{sha256_file(old_path)[:12]}.json"))
+        out_plan.write_bytes(plan_path.read_bytes())
+        console.print(f"[bold green]Delta applied.[/bold green] Details: {args.out}/artifacts.json (deltas)")
+        return
 
     # Persist executed plan for audit
-    out_plan = Path(args.out) / "plan.json"
     out_plan.parent.mkdir(parents=True, exist_ok=True)
     out_plan.write_bytes(plan_path.read_bytes())
 
-    asyncio.run(execute_async(plan, rc, seed_keypair_path=args.seed_keypair or "", config_yaml=cfg_yaml))
+    _run_async(execute_async(plan, rc, seed_keypair_path=args.seed_keypair or "", config_yaml=cfg_yaml, config=config), args, "run")
     console.print(f"[bold green]Done.[/bold green] Receipts: {args.out}/receipts  |  Artifacts: {args.out}/artifacts.json")
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""Benchmark plan validation for large generated plans.
+
+    python -m scripts.bench_plan --wallets 50000
+
+Builds an N-wallet plan from plans/sample_plan.json and times the schema
+validation on its own, the full streaming load (parse + schema + columnar
+table + cross-field checks) and a compiled-plan cache hit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from src.io.jsonio import load_plan
+from src.io.plancache import load_plan_cached
+from src.models import schema
+
+SAMPLE = Path("plans/sample_plan.json")
+
+
+def make_plan(n: int) -> Dict[str, Any]:
+    raw = json.loads(SAMPLE.read_text())
+    buyer = next(w for w in raw["wallets"] if w["role"] == "FOLLOWUP_BUY")
+    extra = [
+        dict(buyer, wallet_id=f"x{i}", funding={"total_lamports": 1_000 + i % 7, "base_lamports": 1_000, "buffer_lamports": i % 7})
+        for i in range(n - len(raw["wallets"]))
+    ]
+    raw["wallets"] += extra
+    raw["schedule"] += [w["wallet_id"] for w in extra]
+    added = sum(w["funding"]["total_lamports"] for w in extra)
+    raw["invariants"]["sum_non_seed_lamports"] += added
+    raw["invariants"]["seed_lamports"] += added
+    return raw
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wallets", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+
+    raw = make_plan(a.wallets)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "plan.json"
+        path.write_text(json.dumps(raw))
+        size = path.stat().st_size
+        header = {k: v for k, v in raw.items() if k != "wallets"}
+        rows = {
+            "schema only": best_of(lambda: schema.WALLETS.validate_python(raw["wallets"]) and schema.HEADER.validate_python(header), a.repeat),
+            "load_plan (stream + validate)": best_of(lambda: load_plan(path), a.repeat),
+        }
+        load_plan_cached(path, Path(tmp))
+        rows["load_plan_cached (hit)"] = best_of(lambda: load_plan_cached(path, Path(tmp)), a.repeat)
+    print(f"{a.wallets} wallets, {size} bytes, best of {a.repeat}")
+    for name, sec in rows.items():
+        print(f"  {name:32s} {sec * 1000:8.1f} ms  {sec / a.wallets * 1e6:6.2f} us/wallet")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,73 +1,306 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
 from pathlib import Path
 from typing import Tuple, Dict, Any, List
 
 from rich.console import Console
 
+from src.core.ata import ata
+from src.core.ledger import key
+from src.core.metaplex import MetadataView
 from src.core.solana import Rpc, RpcConfig
-from src.core.metaplex import find_metadata_pda
-from src.dex.raydium_v4 import derive_pool_accounts, probe_pool_exists
-from src.util.config import load_config
+from src.core.spl_token import MintView, TokenAccountView
+from src.dex.raydium_v4 import SWAP_FEE_BPS, AmmInfoView, quote_exact_in
+from src.exec.swaps import BUY_ACTIONS, buy_lamports
+from src.io.jsonio import load_plan
+from src.util.config import load_config, parse_config
+from src.exec.context import build_context
 from src.util.planhash import sha256_file
+from src.util.state import load_artifacts
 
 
 console = Console()
 
+DEFAULT_TOLERANCE_BPS = 100  # allowed drift of balances and reserves from the replayed quotes
+LANDED = ("finalized", "confirmed")
 
-async def verify(out_dir: Path, rpc_url: str, cfg_path: Path) -> Tuple[Dict[str, Any], bool]:
+
+async def _none() -> List[Any]:
+    return []
+
+
+def _log_errors(logs: List[str] | None) -> List[str]:
+    return [line for line in logs or [] if "failed" in line or "Error" in line or "error:" in line]
+
+
+async def check_signatures(rpc: Rpc, sigs: List[str], statuses: List[Any]) -> List[Dict[str, Any]]:
+    """One row per signature from its batched status; only the missing or failed
+    ones are looked up with ``getTransaction`` (concurrently) for details."""
+    rows: List[Dict[str, Any]] = []
+    lookup: List[int] = []
+    for sig, st in zip(sigs, statuses):
+        row: Dict[str, Any] = {"sig": sig, "tx_present": st is not None, "status": "missing", "slot": None, "err": None}
+        if st is not None:
+            row["slot"] = getattr(st, "slot", None)
+            err = getattr(st, "err", None)
+            row["status"] = "failed" if err is not None else str(getattr(st, "confirmation_status", None) or "confirmed").lower().rsplit(".", 1)[-1]
+            row["err"] = None if err is None else str(err)
+        if row["status"] in ("missing", "failed"):
+            lookup.append(len(rows))
+        rows.append(row)
+
+    async def _detail(i: int) -> None:
+        row = rows[i]
+        try:
+            tx = await rpc.get_transaction(row["sig"])
+        except Exception as e:
+            row["lookup_error"] = f"{type(e).__name__}: {e}"
+            return
+        if tx is None:
+            return
+        row["tx_present"] = True
+        meta = getattr(getattr(tx, "transaction", tx), "meta", None) or getattr(tx, "meta", None)
+        if meta is not None:
+            err = getattr(meta, "err", None)
+            if row["status"] == "missing":  # outside the status cache, but on chain
+                row["status"] = "failed" if err is not None else "confirmed"
+                row["slot"] = getattr(tx, "slot", None)
+            row["err"] = None if err is None else str(err)
+            row["log_errors"] = _log_errors(getattr(meta, "log_messages", None))
+
+    await asyncio.gather(*(_detail(i) for i in lookup))
+    return rows
+
+
+def _deviation_bps(actual: int | None, expected: int) -> float | None:
+    if actual is None:
+        return None
+    if expected == 0:
+        return 0.0 if actual == 0 else None
+    return round(abs(actual - expected) * 10_000 / expected, 1)
+
+
+def _check(actual: Dict[str, Any], exact: Dict[str, Any], approx: Dict[str, int] | None = None, tolerance_bps: float = 0) -> Dict[str, Any]:
+    """``actual`` plus ``pass`` and the fields that differ from ``exact`` or
+    deviate from ``approx`` by more than ``tolerance_bps``."""
+    mismatches: List[Dict[str, Any]] = [{"field": k, "expected": v, "actual": actual.get(k)} for k, v in exact.items() if actual.get(k) != v]
+    for k, v in (approx or {}).items():
+        dev = _deviation_bps(actual.get(k), v)
+        if dev is None or dev > tolerance_bps:
+            mismatches.append({"field": k, "expected": v, "actual": actual.get(k), "deviation_bps": dev})
+    return {**actual, "pass": not mismatches, "mismatches": mismatches}
+
+
+def _str(pub) -> str | None:
+    return None if pub is None else str(pub)
+
+
+def recorded_buys(artifacts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every sent buy: the launch's ``buys`` then each ``--apply-delta`` run's, once per signature."""
+    runs = [artifacts.get("buys") or {}] + [(d or {}).get("buys") or {} for d in (artifacts.get("deltas") or {}).values()]
+    out: List[Dict[str, Any]] = []
+    seen = set()
+    for run in runs:
+        for s in run.get("swaps", []):
+            if s.get("sig") and s["sig"] not in seen:
+                seen.add(s["sig"])
+                out.append(s)
+    return out
+
+
+def expected_fills(plan, rows: List[Dict[str, Any]], fee_bps: int = SWAP_FEE_BPS) -> Tuple[Dict[str, int], int, int]:
+    """Replay the landed buys in ``rows`` (in slot, then send order) on the
+    pool the plan opens; returns ``(tokens per wallet, base reserve, quote reserve)``."""
+    base, quote = int(plan.token.lp_tokens), int(plan.inputs.q_atomic)
+    fills: Dict[str, int] = {}
+    for r in sorted(rows, key=lambda r: (r["slot"] is None, r["slot"] or 0, r["order"])):
+        if r["status"] not in LANDED:
+            continue
+        out = quote_exact_in(r["buy_lamports"], quote, base, fee_bps)
+        fills[r["wallet_id"]] = fills.get(r["wallet_id"], 0) + out
+        base, quote = base - out, quote + r["buy_lamports"]
+    return fills, base, quote
+
+
+def check_state(
+    plan,
+    artifacts: Dict[str, Any],
+    ctx,
+    infos: List[Any],
+    ata_infos: Dict[str, Any],
+    swaps: List[Dict[str, Any]],
+    tolerance_bps: float,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Decode mint, metadata, pool and vaults (``infos``, in ``deep_accounts``
+    order) and the buyers' base ATAs and compare them with the plan and the
+    replayed quotes; returns ``(state checks, one row per buyer wallet)``."""
+    wallets = artifacts.get("wallets", {})
+    mint_v, md_v, pool_v = MintView.of(infos[0]), MetadataView.of(infos[1]), AmmInfoView.of(infos[2])
+    vault_base, vault_quote = TokenAccountView.of(infos[3]), TokenAccountView.of(infos[4])
+    state: Dict[str, Any] = {}
+
+    lp = plan.lp_creator
+    lp_pub = wallets.get(lp.wallet_id, {}).get("pub") if lp else None
+    if mint_v is None:
+        state["mint"] = {"pass": False, "mismatches": [{"field": "data", "expected": "SPL mint", "actual": None}]}
+    else:
+        state["mint"] = _check(
+            {"supply": mint_v.supply, "decimals": mint_v.decimals, "mint_authority": _str(mint_v.mint_authority), "freeze_authority": _str(mint_v.freeze_authority)},
+            {"supply": int(plan.token.lp_tokens), "decimals": plan.token.decimals, "freeze_authority": None, **({"mint_authority": key(lp_pub)} if lp_pub else {})},
+        )
+
+    if md_v is None:
+        state["metadata"] = {"pass": False, "mismatches": [{"field": "data", "expected": "Metaplex metadata", "actual": None}]}
+    else:
+        try:
+            actual = {"mint": str(md_v.mint), "name": md_v.name, "symbol": md_v.symbol, "uri": md_v.uri, "update_authority": str(md_v.update_authority)}
+        except ValueError as e:
+            actual = {"mint": str(md_v.mint), "error": str(e)}
+        state["metadata"] = _check(actual, {"mint": key(ctx.mint), "name": plan.token.name[:32], "symbol": plan.token.symbol[:10], "uri": (plan.token.uri or "")[:200]})
+
+    buyers = {w.wallet_id: w for w in plan.wallets if w.action and w.action.type in BUY_ACTIONS}
+    by_wallet: Dict[str, Dict[str, Any]] = {}
+    for s in swaps:
+        # a wallet retried by a delta is judged by its landed buy
+        if by_wallet.get(s["wallet_id"], {}).get("status") not in LANDED:
+            by_wallet[s["wallet_id"]] = s
+    rows: List[Dict[str, Any]] = []
+    for wid, w in buyers.items():
+        s = by_wallet.get(wid, {})
+        rows.append({
+            "wallet_id": wid,
+            "pub": wallets.get(wid, {}).get("pub"),
+            "sig": s.get("sig"),
+            "status": s.get("status", "not_sent"),
+            "slot": s.get("slot"),
+            "buy_lamports": buy_lamports(w.action),
+            "min_out_tokens": int(w.action.min_out_tokens or 0),
+        })
+    fee_bps = pool_v.swap_fee_bps if pool_v is not None else SWAP_FEE_BPS
+    landed = [
+        {"wallet_id": s["wallet_id"], "status": s["status"], "slot": s.get("slot"), "order": i, "buy_lamports": buy_lamports(buyers[s["wallet_id"]].action)}
+        for i, s in enumerate(swaps)
+        if s["wallet_id"] in buyers
+    ]
+    fills, exp_base, exp_quote = expected_fills(plan, landed, fee_bps)
+
+    if pool_v is None:
+        state["pool"] = {"pass": False, "mismatches": [{"field": "data", "expected": "Raydium v4 AmmInfo", "actual": None}]}
+    else:
+        amounts = (vault_base.amount if vault_base else 0, vault_quote.amount if vault_quote else 0)
+        r_base, r_quote = pool_v.reserves(*amounts)
+        actual = {
+            "base_mint": str(pool_v.base_mint), "quote_mint": str(pool_v.quote_mint),
+            "vault_base": str(pool_v.vault_base), "vault_quote": str(pool_v.vault_quote),
+            "status": pool_v.status, "swap_fee_bps": fee_bps,
+            "vault_base_amount": amounts[0], "vault_quote_amount": amounts[1],
+            "reserve_base": r_base, "reserve_quote": r_quote,
+            "price_sol_per_token": (r_quote / 1e9) / (r_base / 10 ** plan.token.decimals) if r_base > 0 else None,
+        }
+        exact = {"base_mint": key(ctx.mint), "quote_mint": key(ctx.pool.quote_mint), "vault_base": key(ctx.pool.vault_base), "vault_quote": key(ctx.pool.vault_quote)}
+        state["pool"] = _check(actual, exact, {"reserve_base": exp_base, "reserve_quote": exp_quote}, tolerance_bps)
+
+    for row in rows:
+        view = TokenAccountView.of(ata_infos.get(row["wallet_id"]))
+        got = view.amount if view is not None else 0
+        want = fills.get(row["wallet_id"], 0)
+        dev = _deviation_bps(got, want)
+        reasons = []
+        if row["status"] not in LANDED:
+            reasons.append(f"buy {row['status']}")
+        else:
+            if got < row["min_out_tokens"]:
+                reasons.append(f"balance {got} below min_out {row['min_out_tokens']}")
+            if dev is None or dev > tolerance_bps:
+                reasons.append(f"balance {got} deviates from the expected {want}")
+        row.update({"ata_exists": view is not None, "expected_tokens": want, "actual_tokens": got, "deviation_bps": dev, "pass": not reasons, "reasons": reasons})
+    return state, rows
+
+
+def deep_accounts(plan, artifacts: Dict[str, Any], ctx) -> Tuple[List[str], Dict[str, str]]:
+    """Mint, metadata, pool and the two vaults, plus ``{wallet_id: base ATA}``
+    for the buyers whose pubkey the artifacts record."""
+    wallets = artifacts.get("wallets", {})
+    atas = {
+        w.wallet_id: ata(ctx.mint, wallets[w.wallet_id]["pub"])
+        for w in plan.wallets
+        if w.action and w.action.type in BUY_ACTIONS and wallets.get(w.wallet_id, {}).get("pub")
+    }
+    return [ctx.mint, ctx.metadata_pda, ctx.pool.pool, ctx.pool.vault_base, ctx.pool.vault_quote], atas
+
+
+async def verify(
+    out_dir: Path,
+    rpc_url: str,
+    cfg_path: Path,
+    rpc: Rpc | None = None,
+    tolerance_bps: float = DEFAULT_TOLERANCE_BPS,
+) -> Tuple[Dict[str, Any], bool]:
     """Verify on-chain state for the current deployment.
 
     The function is intentionally read-only and cross references the persisted
-    ``artifacts.json`` with on-chain data.  Missing artifacts or network errors
+    artifacts (snapshot plus journal) with on-chain data.  Missing artifacts or network errors
     simply result in ``False`` checks allowing tests to exercise the happy and
     unhappy paths deterministically.
+
+    Mint, metadata and pool are read with one batched ``getMultipleAccounts``
+    and every swap signature (the launch's and each ``--apply-delta`` run's) with batched ``getSignatureStatuses``, all issued
+    concurrently; ``getTransaction`` is only used for the missing or failed ones.
+
+    When the state dir has its ``plan.json`` the same account read also takes
+    the pool vaults and every buyer's base ATA.  The decoded mint, metadata
+    and pool are compared with the plan, and each buyer's balance with the
+    replayed quote (``expected_fills``) within ``tolerance_bps``; all of them
+    must pass for the result to be ok.
     """
 
-    art_path = out_dir / "artifacts.json"
-    artifacts = json.loads(art_path.read_text()) if art_path.exists() else {}
-    cfg = load_config(cfg_path)
-    rpc = Rpc(RpcConfig(url=rpc_url))
+    t0 = time.perf_counter()
+    artifacts = load_artifacts(out_dir)
+    config = parse_config(load_config(cfg_path))
+    own_rpc = rpc is None
+    if rpc is None:
+        rpc = Rpc(RpcConfig(url=rpc_url, timeout_sec=config.execution.timeout_sec))
 
+    plan_path = out_dir / "plan.json"
+    plan = load_plan(plan_path) if plan_path.exists() else None
     mint: str = artifacts.get("mint", {}).get("mint", "")
     metadata_pda = ""
     pool_addr = ""
+    accounts: List[str] = []
+    atas: Dict[str, str] = {}
+    ctx = None
     if mint:
-        mint_exists = await rpc.account_exists(mint)
-        md_prog = cfg["program_ids"]["metaplex_token_metadata"]
-        metadata_pda = find_metadata_pda(mint, md_prog)
-        metadata_exists = await rpc.account_exists(metadata_pda)
+        ctx = build_context(config, mint)
+        metadata_pda = ctx.metadata_pda
+        pool_addr = ctx.pool.pool
+        accounts = [mint, metadata_pda, pool_addr]
+        if plan is not None:
+            accounts, atas = deep_accounts(plan, artifacts, ctx)
 
-        accs = derive_pool_accounts(
-            mint, cfg["mints"]["wrapped_sol"], cfg["program_ids"]["raydium_v4_amm"]
-        )
-        pool_addr = accs.pool
-        pool_exists = await probe_pool_exists(rpc, accs)
-    else:
-        mint_exists = metadata_exists = pool_exists = False
+    buys = recorded_buys(artifacts)
+    sigs = [s["sig"] for s in buys]
+    infos, statuses = await asyncio.gather(
+        rpc.get_multiple_accounts(accounts + list(atas.values())) if accounts else _none(),
+        rpc.get_signature_statuses(sigs) if sigs else _none(),
+    )
+    mint_exists, metadata_exists, pool_exists = (info is not None for info in infos[:3]) if infos else (False, False, False)
+    swaps = [
+        {"wallet_id": s.get("wallet_id", ""), "order": s.get("order", 0), **row}
+        for s, row in zip(buys, await check_signatures(rpc, sigs, statuses))
+    ]
 
-    swaps: List[Dict[str, Any]] = []
-    for s in artifacts.get("buys", {}).get("swaps", []):
-        sig = s.get("sig")
-        if not sig:
-            continue
-        wid = s.get("wallet_id", "")
-        present = False
-        try:
-            from solders.signature import Signature
+    state: Dict[str, Any] | None = None
+    wallet_rows: List[Dict[str, Any]] = []
+    if plan is not None and ctx is not None:
+        state, wallet_rows = check_state(plan, artifacts, ctx, infos[:5], dict(zip(atas, infos[5:])), swaps, tolerance_bps)
 
-            tx = await rpc.client.get_transaction(Signature.from_string(sig))
-            present = tx.value is not None
-        except Exception:
-            present = False
-        swaps.append({"wallet_id": wid, "sig": sig, "tx_present": present})
-
-    plan_path = out_dir / "plan.json"
     plan_hash = sha256_file(plan_path) if plan_path.exists() else ""
 
     result: Dict[str, Any] = {
-        "schema_version": "1.0.0",
+        "schema_version": "1.2.0",
         "plan_hash": plan_hash,
         "mint": mint,
         "metadata_pda": metadata_pda,
@@ -77,30 +310,50 @@ async def verify(out_dir: Path, rpc_url: str, cfg_path: Path) -> Tuple[Dict[str,
             "metadata_exists": metadata_exists,
             "pool_exists": pool_exists,
         },
+        "tolerance_bps": tolerance_bps,
+        "state": state,
+        "wallets": wallet_rows,
         "swaps": swaps,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
     }
 
     (out_dir / "verify.json").write_text(json.dumps(result, indent=2))
 
     present = sum(1 for s in swaps if s["tx_present"])
+    failed = [s for s in swaps if s["status"] == "failed"]
     console.print("VERIFY RESULT")
     console.print(f"- mint_exists: {'OK' if mint_exists else 'FAIL'}")
     console.print(f"- metadata_exists: {'OK' if metadata_exists else 'FAIL'}")
     console.print(f"- pool_exists: {'OK' if pool_exists else 'FAIL'}")
-    console.print(f"- swaps (present/total): {present}/{len(swaps)}")
+    console.print(f"- swaps (present/total): {present}/{len(swaps)}, failed: {len(failed)}")
+    for s in failed[:10]:
+        console.print(f"  {s['wallet_id']} {s['sig']}: {s['err']}")
+    for name, check in (state or {}).items():
+        console.print(f"- {name} state: {'OK' if check['pass'] else 'FAIL'}")
+        for m in check["mismatches"]:
+            console.print(f"  {m['field']}: expected {m['expected']!r}, got {m['actual']!r}")
+    if wallet_rows:
+        bad = [r for r in wallet_rows if not r["pass"]]
+        console.print(f"- wallets (pass/total, tolerance {tolerance_bps} bps): {len(wallet_rows) - len(bad)}/{len(wallet_rows)}")
+        for r in bad[:10]:
+            console.print(f"  {r['wallet_id']}: {'; '.join(r['reasons'])}")
 
     ok = mint_exists and metadata_exists and pool_exists
-    await rpc.close()
+    if state is not None:
+        ok = ok and all(c["pass"] for c in state.values()) and all(r["pass"] for r in wallet_rows)
+    if own_rpc:
+        await rpc.close()
     return result, ok
 
 
 if __name__ == "__main__":  # pragma: no cover
-    import asyncio, argparse
+    import argparse
 
     ap = argparse.ArgumentParser()
     ap.add_argument("--out", default="state")
     ap.add_argument("--rpc", required=True)
     ap.add_argument("--config", default="configs/defaults.yaml")
+    ap.add_argument("--tolerance-bps", type=float, default=DEFAULT_TOLERANCE_BPS)
     a = ap.parse_args()
-    asyncio.run(verify(Path(a.out), a.rpc, Path(a.config)))
+    asyncio.run(verify(Path(a.out), a.rpc, Path(a.config), tolerance_bps=a.tolerance_bps))
 
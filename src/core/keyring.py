@@ -0,0 +1,131 @@
+"""Lazy access to a run's wallet secrets.
+
+``Keyring`` is the run's ``wallet_map``: ``keyring[wid]["pub"]`` comes
+straight from the artifacts, while ``keyring[wid]["kp"]`` decrypts that one
+keypair on first use (opening the keystore, and paying its KDF, only then)
+and caches it for the rest of the run.  A resume that signs for one wallet
+decrypts one wallet.  Wallets recorded as ``derived`` have no stored secret
+at all: they are re-derived from the seed (``derive``) and checked against
+the recorded pubkey.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping
+
+from solders.keypair import Keypair
+
+from src.core.keys import DERIVATION_VERSION, load_encrypted, pubkey_str
+from src.core.keystore import Keystore, KEYSTORE_FILE
+
+
+class _Entry(Mapping[str, Any]):
+    """``{"pub", "kp"}`` view of one wallet; ``"kp"`` is present only if a secret is stored."""
+
+    __slots__ = ("_ring", "_wid")
+
+    def __init__(self, ring: "Keyring", wid: str):
+        self._ring = ring
+        self._wid = wid
+
+    def _keys(self) -> tuple[str, ...]:
+        return ("pub", "kp") if self._ring.has_secret(self._wid) else ("pub",)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "pub":
+            return self._ring.pub(self._wid)
+        if key == "kp" and self._ring.has_secret(self._wid):
+            return self._ring.keypair(self._wid)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+class Keyring(Mapping[str, Mapping[str, Any]]):
+    def __init__(self, wallet_dir: Path, wallets: Dict[str, Dict[str, Any]] | None = None, derive: Callable[[str], Keypair] | None = None):
+        self.wallet_dir = wallet_dir
+        self._derive = derive  # wallet_id -> Keypair, for "derived" wallets
+        self._info: Dict[str, Dict[str, Any]] = dict(wallets or {})  # artifacts["wallets"]
+        self._cache: Dict[str, Keypair] = {}
+        self._store: Keystore | None = None
+
+    @property
+    def keystore(self) -> Keystore:
+        if self._store is None:
+            self._store = Keystore.open_or_create(self.wallet_dir / KEYSTORE_FILE)
+        return self._store
+
+    def __getitem__(self, wid: str) -> Mapping[str, Any]:
+        if wid not in self._info:
+            raise KeyError(wid)
+        return _Entry(self, wid)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._info)
+
+    def __len__(self) -> int:
+        return len(self._info)
+
+    def pub(self, wid: str) -> str:
+        pub = self._info[wid].get("pub")
+        return pub if pub else pubkey_str(self.keypair(wid))
+
+    def has_secret(self, wid: str, info: Dict[str, Any] | None = None) -> bool:
+        info = self._info.get(wid, {}) if info is None else info
+        if info.get("derived"):
+            return self._derive is not None
+        return wid in self._cache or bool(info.get("keystore")) or str(info.get("path", "")).endswith(".enc")
+
+    def keypair(self, wid: str, info: Dict[str, Any] | None = None) -> Keypair:
+        """Decrypt (once per run) the keypair of ``wid``; ``info`` overrides its artifacts entry."""
+        kp = self._cache.get(wid)
+        if kp is not None:
+            return kp
+        info = self._info.get(wid, {}) if info is None else info
+        if info.get("derived") and self._derive is not None:
+            if info["derived"] != DERIVATION_VERSION:
+                raise ValueError(f"wallet {wid!r} was derived with scheme {info['derived']!r}, this build derives {DERIVATION_VERSION!r}")
+            kp = self._derive(wid)
+            if info.get("pub") and pubkey_str(kp) != info["pub"]:
+                raise ValueError(f"derived key for wallet {wid!r} does not match its recorded pubkey (wrong seed?)")
+        elif info.get("keystore"):
+            kp = self.keystore.get(wid)
+        elif str(info.get("path", "")).endswith(".enc"):
+            kp = load_encrypted(info["path"])
+        else:
+            raise KeyError(f"no stored secret for wallet {wid!r}")
+        self._cache[wid] = kp
+        return kp
+
+    def generate(self, wallet_ids: list[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh keypairs for ``wallet_ids``, persisted; returns their artifacts entries."""
+        kps = self.keystore.generate(wallet_ids)
+        return {wid: self._remember(wid, kp) for wid, kp in kps.items()}
+
+    def remember_derived(self, kps: Dict[str, Keypair]) -> Dict[str, Dict[str, Any]]:
+        """Record already-derived keypairs; returns their artifacts entries (no secret stored)."""
+        out = {}
+        for wid, kp in kps.items():
+            self._cache[wid] = kp
+            out[wid] = self._info[wid] = {"pub": pubkey_str(kp), "derived": DERIVATION_VERSION}
+        return out
+
+    def add(self, wid: str, kp: Keypair) -> Dict[str, Any]:
+        """Persist one keypair (e.g. the mint); returns its artifacts entry."""
+        self.keystore.add({wid: kp})
+        self._cache[wid] = kp
+        return {"pub": pubkey_str(kp), "keystore": str(self.keystore.path)}
+
+    def _remember(self, wid: str, kp: Keypair) -> Dict[str, Any]:
+        self._cache[wid] = kp
+        self._info[wid] = {"pub": pubkey_str(kp), "keystore": str(self.keystore.path)}
+        return self._info[wid]
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
@@ -1,8 +1,9 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from pathlib import Path
-import json, os, base64
+import json, os, base64, hashlib, hmac
 from cryptography.fernet import Fernet
 from solders.keypair import Keypair
 
@@ -13,6 +14,8 @@ class SignerInfo:
 
 
 def _fernet() -> Fernet:
+    # legacy .enc format: the passphrase itself, zero-padded, is the key.
+    # New wallets go to src.core.keystore; this stays to read and migrate.
     pw = os.environ.get("LAUNCHER_WALLET_PASS", "")
     key = base64.urlsafe_b64encode(pw.encode().ljust(32, b"\0")[:32])
     return Fernet(key)
@@ -27,6 +30,44 @@ def gen_subwallets(ids: List[str]) -> Dict[str, Keypair]:
     return {wid: Keypair() for wid in ids}
 
 
+# Deterministic subwallets: seed -> plan node -> wallet, each step an
+# HMAC-SHA512 keyed by the parent (first 32 bytes are the child's secret).
+# Changing DERIVATION_VERSION changes every derived address.
+DERIVATION_VERSION = "v1"
+DERIVE_PARALLEL_MIN = 4096
+_DERIVE_CHUNK = 1024
+
+
+def _child(parent: bytes, label: str) -> bytes:
+    return hmac.new(parent, label.encode(), hashlib.sha512).digest()[:32]
+
+
+def plan_node(seed_kp: Keypair, plan_id: str) -> bytes:
+    """Per-plan derivation key; wallets are derived from this, never from the seed directly."""
+    return _child(bytes(seed_kp)[:32], f"raydium-init-bot/{DERIVATION_VERSION}/plan/{plan_id}")
+
+
+def _derive_chunk(node: bytes, ids: List[str]) -> List[Tuple[str, bytes]]:
+    return [(wid, bytes(Keypair.from_seed(_child(node, f"wallet/{wid}")))) for wid in ids]
+
+
+def derive_subwallet(seed_kp: Keypair, plan_id: str, wallet_id: str) -> Keypair:
+    return Keypair.from_bytes(_derive_chunk(plan_node(seed_kp, plan_id), [wallet_id])[0][1])
+
+
+def derive_subwallets(seed_kp: Keypair, plan_id: str, ids: List[str], workers: int | None = None) -> Dict[str, Keypair]:
+    """``derive_subwallet`` for every id; large batches fan out over a process pool
+    (workers receive only the plan node, not the seed)."""
+    node = plan_node(seed_kp, plan_id)
+    if len(ids) < DERIVE_PARALLEL_MIN or workers == 1:
+        rows = _derive_chunk(node, ids)
+    else:
+        chunks = [ids[i:i + _DERIVE_CHUNK] for i in range(0, len(ids), _DERIVE_CHUNK)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = [r for part in pool.map(_derive_chunk, [node] * len(chunks), chunks) for r in part]
+    return {wid: Keypair.from_bytes(raw) for wid, raw in rows}
+
+
 def save_encrypted(dirpath: Path, name: str, kp: Keypair) -> str:
     dirpath.mkdir(parents=True, exist_ok=True)
     token = _fernet().encrypt(bytes(kp))
@@ -39,10 +80,7 @@ def load_encrypted(path: str) -> Keypair:
     """Decrypt a previously ``save_encrypted`` keypair file."""
 
     token = Path(path).read_bytes()
-    pw = os.environ.get("LAUNCHER_WALLET_PASS", "")
-    key = base64.urlsafe_b64encode(pw.encode().ljust(32, b"\0")[:32])
-    kp_bytes = Fernet(key).decrypt(token)
-    return Keypair.from_bytes(kp_bytes)
+    return Keypair.from_bytes(_fernet().decrypt(token))
 
 
 def pubkey_str(kp: Keypair) -> str:
@@ -0,0 +1,222 @@
+"""Single-file wallet keystore.
+
+All of a run's keypairs live in one file, encrypted under a key derived
+once per open with scrypt from ``LAUNCHER_WALLET_PASS``:
+
+    b"RKS1" | u32 header len | u32 index len | header JSON | index JSON | tokens
+
+The header holds the scrypt parameters, salt and a check token (so a wrong
+passphrase fails on open, not on first signature); the index maps each
+wallet id to its public key and the offset/length of its Fernet token.
+The file is memory-mapped, so opening it reads only the header and index
+and a keypair is decrypted only when asked for.  Writes replace the whole
+file atomically.  Bulk generation fans out over a process pool.  Legacy
+per-wallet ``.enc`` files (``src.core.keys``) are read for migration only.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+from cryptography.fernet import Fernet
+from solders.keypair import Keypair
+
+from src.core import keys
+
+KEYSTORE_FILE = "wallets.keystore"
+MAGIC = b"RKS1"
+_PREFIX = struct.Struct("<4sII")
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+_CHECK = b"raydium-init-bot keystore"
+PARALLEL_MIN = 2048  # below this a process pool costs more than it saves
+CHUNK = 512
+
+
+def _passphrase() -> bytes:
+    return os.environ.get("LAUNCHER_WALLET_PASS", "").encode()
+
+
+def derive_key(passphrase: bytes, salt: bytes, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> bytes:
+    """Fernet key (urlsafe base64) for ``passphrase``; deliberately slow, so do it once."""
+    raw = hashlib.scrypt(passphrase, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + (1 << 20), dklen=32)
+    return base64.urlsafe_b64encode(raw)
+
+
+def _encrypt_chunk(key: bytes, items: List[Tuple[str, bytes | None]]) -> List[Tuple[str, bytes, bytes]]:
+    """``(wallet_id, keypair bytes, token)``; ``None`` keypair bytes means generate one."""
+    f = Fernet(key)
+    out = []
+    for wid, raw in items:
+        kp = Keypair() if raw is None else Keypair.from_bytes(raw)
+        raw = bytes(kp)
+        out.append((wid, raw, f.encrypt(raw)))
+    return out
+
+
+def _encrypt_all(key: bytes, items: List[Tuple[str, bytes | None]], workers: int | None) -> List[Tuple[str, bytes, bytes]]:
+    if len(items) < PARALLEL_MIN or workers == 1:
+        return _encrypt_chunk(key, items)
+    chunks = [items[i:i + CHUNK] for i in range(0, len(items), CHUNK)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for part in pool.map(_encrypt_chunk, [key] * len(chunks), chunks) for row in part]
+
+
+class Keystore:
+    def __init__(self, path: Path, key: bytes, header: Dict, index: Dict[str, List], data_offset: int, mm: mmap.mmap | None):
+        self.path = path
+        self._key = key
+        self._fernet = Fernet(key)
+        self._header = header
+        self._index = index  # wallet_id -> [offset, length, pubkey]
+        self._data_offset = data_offset
+        self._mm = mm
+
+    # -- creation ------------------------------------------------------
+
+    @classmethod
+    def _new(cls, path: Path, passphrase: bytes | None) -> "Keystore":
+        salt = os.urandom(16)
+        header = {"kdf": "scrypt", "n": SCRYPT_N, "r": SCRYPT_R, "p": SCRYPT_P, "salt": base64.b64encode(salt).decode()}
+        key = derive_key(_passphrase() if passphrase is None else passphrase, salt)
+        header["check"] = Fernet(key).encrypt(_CHECK).decode()
+        return cls(path, key, header, {}, 0, None)
+
+    @classmethod
+    def create(cls, path: Path, keypairs: Dict[str, Keypair] | None = None, passphrase: bytes | None = None) -> "Keystore":
+        """New keystore at ``path`` holding ``keypairs`` (replaces any existing file)."""
+        ks = cls._new(path, passphrase)
+        ks._write(_encrypt_chunk(ks._key, [(wid, bytes(kp)) for wid, kp in (keypairs or {}).items()]))
+        return ks
+
+    @classmethod
+    def open_or_create(cls, path: Path, passphrase: bytes | None = None) -> "Keystore":
+        return cls.open(path, passphrase) if path.exists() else cls.create(path, passphrase=passphrase)
+
+    def generate(self, wallet_ids: Iterable[str], workers: int | None = None) -> Dict[str, Keypair]:
+        """Add a fresh keypair per id, generated and encrypted across processes for large batches."""
+        rows = _encrypt_all(self._key, [(wid, None) for wid in wallet_ids], workers)
+        self._write(rows)
+        return {wid: Keypair.from_bytes(raw) for wid, raw, _ in rows}
+
+    # -- reading -------------------------------------------------------
+
+    @classmethod
+    def open(cls, path: Path, passphrase: bytes | None = None) -> "Keystore":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, hlen, ilen = _PREFIX.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a wallet keystore")
+        start = _PREFIX.size
+        header = orjson.loads(mm[start:start + hlen])
+        index = orjson.loads(mm[start + hlen:start + hlen + ilen])
+        key = derive_key(_passphrase() if passphrase is None else passphrase, base64.b64decode(header["salt"]), header["n"], header["r"], header["p"])
+        try:
+            ok = Fernet(key).decrypt(header["check"].encode()) == _CHECK
+        except Exception:
+            ok = False
+        if not ok:
+            mm.close()
+            raise ValueError(f"wrong wallet passphrase for {path} (LAUNCHER_WALLET_PASS)")
+        return cls(path, key, header, index, start + hlen + ilen, mm)
+
+    def __contains__(self, wallet_id: str) -> bool:
+        return wallet_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def ids(self) -> List[str]:
+        return list(self._index)
+
+    def pub(self, wallet_id: str) -> str:
+        return self._index[wallet_id][2]
+
+    def _token(self, wallet_id: str) -> bytes:
+        off, length, _pub = self._index[wallet_id]
+        start = self._data_offset + off
+        return self._mm[start:start + length]
+
+    def get(self, wallet_id: str) -> Keypair:
+        """Decrypt one keypair (``KeyError`` if the id is not stored)."""
+        return Keypair.from_bytes(self._fernet.decrypt(self._token(wallet_id)))
+
+    # -- writing -------------------------------------------------------
+
+    def add(self, keypairs: Dict[str, Keypair]) -> None:
+        """Store (or replace) ``keypairs``; existing entries are copied over still encrypted."""
+        self._write(_encrypt_chunk(self._key, [(wid, bytes(kp)) for wid, kp in keypairs.items()]))
+
+    def _write(self, rows: List[Tuple[str, bytes, bytes]]) -> None:
+        new = {wid: token for wid, _raw, token in rows}
+        pubs = {wid: keys.pubkey_str(Keypair.from_bytes(raw)) for wid, raw, _token in rows}
+        tokens: List[bytes] = []
+        index: Dict[str, List] = {}
+        off = 0
+        for wid in [*(w for w in self._index if w not in new), *new]:
+            token = new[wid] if wid in new else self._token(wid)
+            index[wid] = [off, len(token), pubs[wid] if wid in new else self.pub(wid)]
+            tokens.append(token)
+            off += len(token)
+        hdr = orjson.dumps(self._header)
+        idx = orjson.dumps(index)
+        data = b"".join([_PREFIX.pack(MAGIC, len(hdr), len(idx)), hdr, idx, *tokens])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.close()
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = index
+        self._data_offset = _PREFIX.size + len(hdr) + len(idx)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def migrate_enc_dir(wallet_dir: Path, passphrase: bytes | None = None) -> Keystore:
+    """Fold the legacy per-wallet ``<id>.enc`` files of ``wallet_dir`` into its keystore.
+
+    The ``.enc`` files are left in place; delete them once the keystore is
+    verified.  Ids already in the keystore are not overwritten.
+    """
+    ks = Keystore.open_or_create(wallet_dir / KEYSTORE_FILE, passphrase)
+    legacy = {p.stem: keys.load_encrypted(str(p)) for p in sorted(wallet_dir.glob("*.enc")) if p.stem not in ks}
+    if legacy:
+        ks.add(legacy)
+    return ks
+
+
+def artifacts_patch(artifacts: Dict, ks: Keystore) -> Dict:
+    """``merge_artifacts`` patch pointing ``wallets``/``mint_keypair`` entries at ``ks``
+    instead of ``.enc`` files (entries whose id is not in ``ks`` are kept)."""
+    store = str(ks.path)
+
+    def moved(wid: str, info: Dict) -> Dict:
+        if wid in ks and str(info.get("path", "")).endswith(".enc"):
+            return {k: v for k, v in info.items() if k != "path"} | {"keystore": store}
+        return info
+
+    patch: Dict = {}
+    if artifacts.get("wallets"):
+        patch["wallets"] = {wid: moved(wid, info) for wid, info in artifacts["wallets"].items()}
+    if artifacts.get("mint_keypair"):
+        patch["mint_keypair"] = moved("mint", artifacts["mint_keypair"])
+    return patch
@@ -0,0 +1,81 @@
+"""Zero-copy readers for packed on-chain account data.
+
+An ``AccountView`` wraps the raw bytes of an account in a ``memoryview`` and
+decodes a field only when it is read (``struct.unpack_from`` at a fixed
+offset), so checking a handful of fields of many accounts never copies or
+parses the rest.  Subclasses name the fields of one layout; see
+``spl_token.MintView``, ``spl_token.TokenAccountView``,
+``metaplex.MetadataView`` and ``raydium_v4.AmmInfoView``.
+
+Key fields are returned as ``Pubkey``.  ``AccountView.of`` takes an entry of a
+``getMultipleAccounts`` result and gives ``None`` for missing or short data.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Optional
+
+from solders.pubkey import Pubkey
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+
+class AccountView:
+    """Read-only view over one account's data; ``SIZE`` is the minimum length."""
+
+    SIZE = 0
+    __slots__ = ("_buf",)
+
+    def __init__(self, data: Any):
+        buf = memoryview(data).cast("B")
+        if len(buf) < self.SIZE:
+            raise ValueError(f"{type(self).__name__} needs {self.SIZE} bytes, got {len(buf)}")
+        self._buf = buf
+
+    @classmethod
+    def of(cls, info: Any):
+        """View over an ``getMultipleAccounts`` entry; ``None`` if missing or too short."""
+        if info is None:
+            return None
+        try:
+            return cls(getattr(info, "data", info) or b"")
+        except (TypeError, ValueError):
+            return None
+
+    def _u8(self, at: int) -> int:
+        return _U8.unpack_from(self._buf, at)[0]
+
+    def _u16(self, at: int) -> int:
+        return _U16.unpack_from(self._buf, at)[0]
+
+    def _u32(self, at: int) -> int:
+        return _U32.unpack_from(self._buf, at)[0]
+
+    def _u64(self, at: int) -> int:
+        return _U64.unpack_from(self._buf, at)[0]
+
+    def _u128(self, at: int) -> int:
+        lo, hi = _U64.unpack_from(self._buf, at)[0], _U64.unpack_from(self._buf, at + 8)[0]
+        return lo | hi << 64
+
+    def _pubkey(self, at: int) -> Pubkey:
+        return Pubkey(bytes(self._buf[at:at + 32]))
+
+    def _coption_pubkey(self, at: int) -> Optional[Pubkey]:
+        """SPL ``COption<Pubkey>``: a u32 tag, then the key."""
+        return self._pubkey(at + 4) if self._u32(at) else None
+
+    def _str_end(self, at: int) -> int:
+        """Offset just past the borsh ``String`` (u32 length, utf-8) at ``at``."""
+        end = at + 4 + self._u32(at)
+        if end > len(self._buf):
+            raise ValueError(f"string at {at} runs past the account data")
+        return end
+
+    def _borsh_str(self, at: int) -> str:
+        """Borsh ``String`` at ``at`` with its trailing NUL padding stripped."""
+        return bytes(self._buf[at + 4:self._str_end(at)]).decode("utf-8", "replace").rstrip("\x00")
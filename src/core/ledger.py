@@ -0,0 +1,458 @@
+"""Local account-state fork for rehearsing a launch offline.
+
+``Ledger`` holds the accounts a launch touches (lamports, owning program,
+decoded SPL mint / token-account state, Raydium pool vaults) and applies
+transactions to them the way the on-chain programs would for the
+instructions this launcher builds:
+
+* System ``CreateAccount`` and ``Transfer``;
+* SPL Token ``InitializeMint2``, ``MintTo`` and ``SyncNative``, and the
+  associated-token program's ``CreateIdempotent``;
+* Metaplex ``CreateMetadataAccountV3`` (account creation and the mint
+  authority check only);
+* Raydium v4 ``initialize2`` and swap as a constant-product pool over the
+  two vault token accounts.
+
+Instructions of other programs (compute budget, tips) have no effect.  Each
+transaction is all-or-nothing: a failing instruction raises ``LedgerError``
+and every account it touched is restored, but the fee payer keeps paying the
+fee, as on chain.  Signatures are not checked.
+
+``Ledger.load`` seeds the fork from one bulk account read.  ``LedgerRpc``
+serves the fork through the part of the ``Rpc`` interface the steps use, so
+a whole launch can run against it in tests.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+from solders.pubkey import Pubkey
+
+from src.core.spl_token import (
+    ASSOCIATED_TOKEN_PROGRAM,
+    MINT_ACCOUNT_SIZE,
+    SYSTEM_PROGRAM,
+    TOKEN_ACCOUNT_SIZE,
+    TOKEN_PROGRAM,
+    WRAPPED_SOL_MINT,
+    MintView,
+    TokenAccountView,
+    rent_exempt_lamports,
+)
+from src.core.tx import estimate_fee
+from src.dex.raydium_v4 import POOL_STATE_SIZE, SWAP_FEE_BPS, quote_exact_in
+
+METADATA_ACCOUNT_SIZE = 679  # max size of a Metaplex metadata account
+
+
+class LedgerError(RuntimeError):
+    """A transaction the programs would reject."""
+
+
+def key(pub: str) -> str:
+    """Canonical account key, the form instruction metas carry."""
+    return str(Pubkey.from_string(pub))
+
+
+@dataclass
+class MintState:
+    decimals: int
+    authority: Optional[str]
+    supply: int = 0
+
+
+@dataclass
+class TokenState:
+    mint: str
+    owner: str
+    amount: int = 0
+
+
+@dataclass
+class PoolState:
+    base_mint: str
+    quote_mint: str
+    vault_base: str
+    vault_quote: str
+
+
+@dataclass
+class Account:
+    lamports: int = 0
+    owner: str = ""  # owning program
+    space: int = 0
+    mint: Optional[MintState] = None
+    token: Optional[TokenState] = None
+    pool: Optional[PoolState] = None
+
+
+def _u64(data: bytes, at: int) -> int:
+    return int.from_bytes(data[at:at + 8], "little")
+
+
+def _pub(raw: bytes) -> str:
+    return str(Pubkey(bytes(raw)))
+
+
+class Ledger:
+    def __init__(
+        self,
+        amm_program: str,
+        metadata_program: str,
+        native_mint: str = WRAPPED_SOL_MINT,
+        init_quote_lamports: int = 0,
+        fee_bps: int = SWAP_FEE_BPS,
+    ):
+        """``init_quote_lamports`` is the SOL side ``initialize2`` deposits from
+        the LP creator (its instruction data carries only the token amount)."""
+        self.accounts: Dict[str, Account] = {}
+        self.init_quote_lamports = init_quote_lamports
+        self.fee_bps = fee_bps
+        self.system, self.token_program = key(SYSTEM_PROGRAM), key(TOKEN_PROGRAM)
+        self.native_mint = key(native_mint)
+        self.accounts[self.native_mint] = Account(owner=self.token_program, space=MINT_ACCOUNT_SIZE, mint=MintState(9, None))
+        self._programs = {
+            self.system: self._system_ix,
+            self.token_program: self._token_ix,
+            key(ASSOCIATED_TOKEN_PROGRAM): self._ata_ix,
+            key(metadata_program): self._metadata_ix,
+            key(amm_program): self._amm_ix,
+        }
+        self._amm = key(amm_program)
+        self._metadata = key(metadata_program)
+        self._undo: Optional[Dict[str, Optional[Account]]] = None
+
+    # -- state ------------------------------------------------------------
+
+    async def load(self, rpc: Any, pubkeys: Iterable[str]) -> None:
+        """Snapshot ``pubkeys`` from chain with one bulk read (missing accounts stay absent)."""
+        pubkeys = list(dict.fromkeys(pubkeys))
+        infos = await rpc.get_multiple_accounts(pubkeys) if pubkeys else []
+        for pub, info in zip(pubkeys, infos):
+            if info is not None:
+                self.accounts[key(pub)] = self._decode(info)
+
+    def _decode(self, info: Any) -> Account:
+        data = bytes(getattr(info, "data", b"") or b"")
+        acct = Account(lamports=int(getattr(info, "lamports", 0) or 0), owner=str(getattr(info, "owner", "")), space=len(data))
+        if acct.owner == self.token_program and len(data) == MINT_ACCOUNT_SIZE:
+            m = MintView(data)
+            auth = m.mint_authority
+            acct.mint = MintState(decimals=m.decimals, authority=None if auth is None else str(auth), supply=m.supply)
+        elif acct.owner == self.token_program and len(data) == TOKEN_ACCOUNT_SIZE:
+            t = TokenAccountView(data)
+            acct.token = TokenState(mint=str(t.mint), owner=str(t.owner), amount=t.amount)
+        return acct
+
+    def link_pool(self, pool: str, base_mint: str, quote_mint: str, vault_base: str, vault_quote: str) -> None:
+        """Attach vault addresses to a pool loaded from chain (its state is not decoded)."""
+        acct = self.accounts.get(key(pool))
+        if acct is not None and acct.pool is None:
+            acct.pool = PoolState(key(base_mint), key(quote_mint), key(vault_base), key(vault_quote))
+
+    def fund(self, pub: str, lamports: int) -> None:
+        acct = self.accounts.setdefault(key(pub), Account(owner=self.system))
+        acct.lamports += lamports
+
+    def get(self, pub: str) -> Optional[Account]:
+        return self.accounts.get(key(pub))
+
+    def lamports(self, pub: str) -> int:
+        acct = self.get(pub)
+        return acct.lamports if acct else 0
+
+    def token_amount(self, token_account: str) -> int:
+        acct = self.get(token_account)
+        return acct.token.amount if acct and acct.token else 0
+
+    def reserves(self, pool: str) -> Optional[Dict[str, int]]:
+        acct = self.get(pool)
+        if acct is None or acct.pool is None:
+            return None
+        p = acct.pool
+        return {"base": self._amount(p.vault_base), "quote": self._amount(p.vault_quote)}
+
+    def _amount(self, k: str) -> int:
+        acct = self.accounts.get(k)
+        return acct.token.amount if acct and acct.token else 0
+
+    # -- transactions -----------------------------------------------------
+
+    def apply(self, tx: Any, fee_payer: str | None, cu_limit: int | None = None, cu_price_micro: int | None = None) -> int:
+        """Apply ``tx`` paid by ``fee_payer`` (default: its first signing account); returns the fee charged.
+
+        Raises ``LedgerError`` (with every account but the payer's fee restored)
+        if any instruction would fail.
+        """
+        fee = estimate_fee(tx, fee_payer, cu_limit, cu_price_micro)
+        payer_key = key(fee_payer) if fee_payer else next(str(m.pubkey) for ix in tx.instructions for m in ix.accounts if m.is_signer)
+        payer = self.accounts.get(payer_key)
+        if payer is None or payer.lamports < fee:
+            raise LedgerError(f"fee payer {payer_key} cannot pay the {fee} lamport fee")
+        payer.lamports -= fee
+        self._undo = {}
+        try:
+            for i, ix in enumerate(tx.instructions):
+                handler = self._programs.get(str(ix.program_id))
+                if handler is None:
+                    continue
+                try:
+                    handler([str(m.pubkey) for m in ix.accounts], bytes(ix.data))
+                except LedgerError as e:
+                    raise LedgerError(f"instruction {i}: {e}") from None
+        except LedgerError:
+            for k, old in self._undo.items():
+                if old is None:
+                    self.accounts.pop(k, None)
+                else:
+                    self.accounts[k] = old
+            raise
+        finally:
+            self._undo = None
+        return fee
+
+    def _w(self, k: str) -> Account:
+        """Account ``k`` for writing (journaled for rollback); must exist."""
+        acct = self.accounts.get(k)
+        if acct is None:
+            raise LedgerError(f"account {k} not found")
+        if k not in self._undo:
+            self._undo[k] = copy.deepcopy(acct)
+        return acct
+
+    def _create(self, k: str, acct: Account) -> None:
+        if k not in self._undo:
+            self._undo[k] = copy.deepcopy(self.accounts.get(k))
+        self.accounts[k] = acct
+
+    def _in_use(self, k: str) -> bool:
+        acct = self.accounts.get(k)
+        return acct is not None and (acct.space > 0 or acct.owner not in ("", self.system))
+
+    def _debit(self, k: str, lamports: int) -> None:
+        acct = self._w(k)
+        if acct.lamports < lamports:
+            raise LedgerError(f"insufficient lamports in {k}: {acct.lamports} < {lamports}")
+        acct.lamports -= lamports
+
+    def _credit(self, k: str, lamports: int) -> None:
+        if k not in self.accounts:
+            self._create(k, Account(owner=self.system))
+        self._w(k).lamports += lamports
+
+    def _token(self, k: str, mint: str | None = None) -> Account:
+        acct = self._w(k)
+        if acct.token is None:
+            raise LedgerError(f"{k} is not a token account")
+        if mint is not None and acct.token.mint != mint:
+            raise LedgerError(f"token account {k} holds another mint")
+        return acct
+
+    def _move_tokens(self, src: str, dst: str, amount: int) -> None:
+        a, b = self._token(src), self._token(dst)
+        if a.token.mint != b.token.mint:
+            raise LedgerError(f"mint mismatch between {src} and {dst}")
+        if a.token.amount < amount:
+            raise LedgerError(f"insufficient funds in {src}: {a.token.amount} < {amount}")
+        a.token.amount -= amount
+        b.token.amount += amount
+        if a.token.mint == self.native_mint:
+            a.lamports -= amount
+            b.lamports += amount
+
+    def _new_token_account(self, k: str, payer: str, mint: str, owner: str, amount: int = 0) -> None:
+        rent = rent_exempt_lamports(TOKEN_ACCOUNT_SIZE)
+        self._debit(payer, rent + (amount if mint == self.native_mint else 0))
+        self._create(k, Account(lamports=rent + (amount if mint == self.native_mint else 0), owner=self.token_program, space=TOKEN_ACCOUNT_SIZE, token=TokenState(mint, owner, amount)))
+
+    # -- programs ---------------------------------------------------------
+
+    def _system_ix(self, metas: List[str], data: bytes) -> None:
+        tag = int.from_bytes(data[0:4], "little")
+        if tag == 0:  # CreateAccount
+            payer, new = metas[0], metas[1]
+            lamports, space, owner = _u64(data, 4), _u64(data, 12), _pub(data[20:52])
+            if self._in_use(new):
+                raise LedgerError(f"account {new} already in use")
+            if lamports < rent_exempt_lamports(space):
+                raise LedgerError(f"{lamports} lamports is below rent exemption for {space} bytes")
+            self._debit(payer, lamports)
+            self._create(new, Account(lamports=lamports, owner=owner, space=space))
+        elif tag == 2:  # Transfer
+            lamports = _u64(data, 4)
+            self._debit(metas[0], lamports)
+            self._credit(metas[1], lamports)
+        else:
+            raise LedgerError(f"unsupported system instruction {tag}")
+
+    def _token_ix(self, metas: List[str], data: bytes) -> None:
+        tag = data[0]
+        if tag == 20:  # InitializeMint2
+            acct = self._w(metas[0])
+            if acct.owner != self.token_program or acct.space != MINT_ACCOUNT_SIZE:
+                raise LedgerError(f"{metas[0]} is not a mint-sized token program account")
+            if acct.mint is not None:
+                raise LedgerError(f"mint {metas[0]} already initialized")
+            acct.mint = MintState(decimals=data[1], authority=_pub(data[2:34]))
+        elif tag == 7:  # MintTo
+            mint, dest, authority = metas[0], metas[1], metas[2]
+            m = self._w(mint).mint
+            if m is None:
+                raise LedgerError(f"{mint} is not a mint")
+            if m.authority != authority:
+                raise LedgerError(f"{authority} is not the mint authority of {mint}")
+            self._token(dest, mint).token.amount += _u64(data, 1)
+            m.supply += _u64(data, 1)
+        elif tag == 17:  # SyncNative
+            acct = self._token(metas[0], self.native_mint)
+            acct.token.amount = acct.lamports - rent_exempt_lamports(TOKEN_ACCOUNT_SIZE)
+        else:
+            raise LedgerError(f"unsupported token instruction {tag}")
+
+    def _ata_ix(self, metas: List[str], data: bytes) -> None:
+        payer, account, owner, mint = metas[0], metas[1], metas[2], metas[3]
+        existing = self.accounts.get(account)
+        if existing is not None and existing.token is not None:
+            if existing.token.mint != mint or existing.token.owner != owner:
+                raise LedgerError(f"{account} exists for another mint or owner")
+            return  # idempotent
+        m = self.accounts.get(mint)
+        if m is None or m.mint is None:
+            raise LedgerError(f"mint {mint} not found")
+        self._new_token_account(account, payer, mint, owner)
+
+    def _metadata_ix(self, metas: List[str], data: bytes) -> None:
+        pda, mint, authority, payer = metas[0], metas[1], metas[2], metas[3]
+        if self._in_use(pda):
+            raise LedgerError(f"metadata account {pda} already in use")
+        m = self.accounts.get(mint)
+        if m is None or m.mint is None:
+            raise LedgerError(f"mint {mint} not found")
+        if m.mint.authority != authority:
+            raise LedgerError(f"{authority} is not the mint authority of {mint}")
+        rent = rent_exempt_lamports(METADATA_ACCOUNT_SIZE)
+        self._debit(payer, rent)
+        self._create(pda, Account(lamports=rent, owner=self._metadata, space=METADATA_ACCOUNT_SIZE))
+
+    def _amm_ix(self, metas: List[str], data: bytes) -> None:
+        tag = data[0]
+        if tag == 0:  # initialize2
+            pool, vault_base, vault_quote, base_mint, quote_mint, creator = metas[0], metas[3], metas[4], metas[5], metas[6], metas[10]
+            if self._in_use(pool):
+                raise LedgerError(f"pool {pool} already initialized")
+            tokens = _u64(data, 1)
+            src = next((k for k, a in self.accounts.items() if a.token and a.token.owner == creator and a.token.mint == base_mint), None)
+            if src is None:
+                raise LedgerError(f"LP creator {creator} has no {base_mint} token account")
+            rent = rent_exempt_lamports(POOL_STATE_SIZE)
+            self._debit(creator, rent)
+            self._create(pool, Account(lamports=rent, owner=self._amm, space=POOL_STATE_SIZE, pool=PoolState(base_mint, quote_mint, vault_base, vault_quote)))
+            self._new_token_account(vault_base, creator, base_mint, metas[1])
+            self._move_tokens(src, vault_base, tokens)
+            self._new_token_account(vault_quote, creator, quote_mint, metas[1], amount=self.init_quote_lamports)
+        elif tag == 1:  # swap, quote -> base, exact in
+            pool, user_quote, user_base = metas[0], metas[6], metas[7]
+            acct = self.accounts.get(pool)
+            if acct is None or acct.pool is None:
+                raise LedgerError(f"pool {pool} not initialized")
+            p = acct.pool
+            amount_in, min_out = _u64(data, 1), _u64(data, 9)
+            self._token(user_quote, p.quote_mint)
+            self._token(user_base, p.base_mint)
+            out = quote_exact_in(amount_in, self._amount(p.vault_quote), self._amount(p.vault_base), self.fee_bps)
+            if out < min_out:
+                raise LedgerError(f"slippage: {out} out < {min_out} minimum")
+            if out == 0:
+                raise LedgerError("swap output is zero")
+            self._move_tokens(user_quote, p.vault_quote, amount_in)
+            self._move_tokens(p.vault_base, user_base, out)
+        else:
+            raise LedgerError(f"unsupported amm instruction {tag}")
+
+
+def _key_bytes(k: str) -> bytes:
+    try:
+        return Pubkey.from_string(k).to_bytes()
+    except Exception:
+        return bytes(32)
+
+
+class LedgerRpc:
+    """The ``Rpc`` methods the launch steps call, served from a ``Ledger``.
+
+    Sends apply the transaction (the first signer pays); failed ones raise
+    ``LedgerError``.  ``simulate`` applies to a throwaway copy.
+    """
+
+    def __init__(self, ledger: Ledger, cu_limit: int | None = None, cu_price_micro: int | None = None):
+        self.ledger = ledger
+        self.cu_limit, self.cu_price_micro = cu_limit, cu_price_micro
+        self.slot = 1
+        self.statuses: Dict[str, Any] = {}
+        self.sent: List[Any] = []
+
+    def _payer(self, tx: Any, signers: tuple) -> str | None:
+        """First signer, else the signed tx's fee payer (``None``: its first signing account)."""
+        if signers:
+            return str(signers[0].pubkey())
+        if getattr(tx, "fee_payer", None) is not None:
+            return str(tx.fee_payer)
+        return None
+
+    async def recent_blockhash(self) -> str:
+        return f"LEDGER{self.slot}"
+
+    async def simulate(self, tx: Any, *signers: Any) -> dict:
+        fork = copy.deepcopy(self.ledger)
+        try:
+            fork.apply(tx, self._payer(tx, signers), self.cu_limit, self.cu_price_micro)
+        except LedgerError as e:
+            return {"err": str(e), "logs": [f"Program log: Error: {e}"], "units_consumed": None}
+        return {"err": None, "logs": [], "units_consumed": None}
+
+    async def send(self, tx: Any, *signers: Any, skip_preflight: bool = False) -> str:
+        sig = f"LSIG{len(self.sent)}"
+        self.sent.append(tx)
+        self.slot += 1
+        self.ledger.apply(tx, self._payer(tx, signers), self.cu_limit, self.cu_price_micro)
+        self.statuses[sig] = SimpleNamespace(slot=self.slot, err=None, confirmation_status="finalized")
+        return sig
+
+    async def send_and_confirm(self, tx: Any, *signers: Any) -> str:
+        return await self.send(tx, *signers)
+
+    async def confirm(self, sig: str) -> None:
+        return None
+
+    async def get_slot(self) -> int:
+        return self.slot
+
+    async def get_signature_statuses(self, sigs: List[str]) -> List[Any]:
+        return [self.statuses.get(s) for s in sigs]
+
+    async def account_exists(self, pubkey: str) -> bool:
+        return self.ledger.get(pubkey) is not None
+
+    async def get_balance(self, pubkey: str) -> int:
+        return self.ledger.lamports(pubkey)
+
+    async def get_multiple_accounts(self, pubkeys: List[str]) -> List[Any]:
+        out = []
+        for pub in pubkeys:
+            acct = self.ledger.get(pub)
+            if acct is None:
+                out.append(None)
+                continue
+            data = bytes(acct.space)
+            if acct.token is not None:
+                t = acct.token
+                data = _key_bytes(t.mint) + _key_bytes(t.owner) + t.amount.to_bytes(8, "little") + bytes(TOKEN_ACCOUNT_SIZE - 72)
+            out.append(SimpleNamespace(lamports=acct.lamports, owner=acct.owner, data=data))
+        return out
+
+    async def close(self) -> None:
+        return None
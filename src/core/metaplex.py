@@ -5,11 +5,13 @@ from __future__ import annotations
 from solders.pubkey import Pubkey
 from solders.instruction import Instruction, AccountMeta
 
+from .layout import AccountView
 from .mpl_builders import encode_create_metadata_v3
 
 SYSTEM_PROGRAM = "11111111111111111111111111111111"
 TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
 SYSVAR_RENT = "SysvarRent111111111111111111111111111111111"
+METADATA_KEY_V1 = 4  # ``Key::MetadataV1``, the first byte of a metadata account
 
 
 def find_metadata_pda(mint: str, metadata_program: str) -> str:
@@ -34,21 +36,23 @@ def build_create_metadata_v3(
     name: str,
     symbol: str,
     uri: str,
+    metadata_pda: str | None = None,
 ) -> Instruction:
     """Return a ``CreateMetadataAccountV3`` instruction for the given ``mint``.
 
     The instruction uses a minimal ``DataV2`` layout without creators, collection
     or uses and sets ``seller_fee_basis_points`` to ``0``.  ``is_mutable`` is
-    always ``True`` for newly minted tokens in this launcher.
+    always ``True`` for newly minted tokens in this launcher.  ``metadata_pda``
+    may be passed to skip re-deriving it.
     """
     # Guard string fields to the on‑chain limits enforced by Metaplex
     name = (name or "")[:32]
     symbol = (symbol or "")[:10]
     uri = (uri or "")[:200]
 
-    metadata_pda = Pubkey.from_string(find_metadata_pda(mint, metadata_program))
+    pda = Pubkey.from_string(metadata_pda or find_metadata_pda(mint, metadata_program))
     keys = [
-        AccountMeta(pubkey=metadata_pda, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=pda, is_signer=False, is_writable=True),
         AccountMeta(pubkey=Pubkey.from_string(mint), is_signer=False, is_writable=False),
         AccountMeta(pubkey=Pubkey.from_string(mint_authority), is_signer=True, is_writable=False),
         AccountMeta(pubkey=Pubkey.from_string(payer), is_signer=True, is_writable=True),
@@ -65,3 +69,39 @@ def build_create_metadata_v3(
         is_mutable=True,
     )
     return Instruction(program_id=Pubkey.from_string(metadata_program), accounts=keys, data=data)
+
+
+class MetadataView(AccountView):
+    """Metaplex ``Metadata`` account: key, update authority, mint, then the
+    borsh ``Data`` strings (stored NUL-padded to 32 / 10 / 200 bytes)."""
+
+    SIZE = 1 + 32 + 32 + 3 * 4
+    __slots__ = ()
+
+    @property
+    def key(self) -> int:
+        return self._u8(0)
+
+    @property
+    def update_authority(self) -> Pubkey:
+        return self._pubkey(1)
+
+    @property
+    def mint(self) -> Pubkey:
+        return self._pubkey(33)
+
+    @property
+    def name(self) -> str:
+        return self._borsh_str(65)
+
+    @property
+    def symbol(self) -> str:
+        return self._borsh_str(self._str_end(65))
+
+    @property
+    def uri(self) -> str:
+        return self._borsh_str(self._str_end(self._str_end(65)))
+
+    @property
+    def seller_fee_basis_points(self) -> int:
+        return self._u16(self._str_end(self._str_end(self._str_end(65))))
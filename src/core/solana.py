@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Iterable, Any
+from typing import Optional, Iterable, Any, List, Deque, Tuple
+from collections import deque
 from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TxOpts
@@ -9,50 +10,174 @@ from solders.signature import Signature
 from solders.commitment_config import CommitmentLevel
 from solders.hash import Hash
 import asyncio
+import time
+from src.util.tracing import span
 
 COMMIT_FINALIZED = CommitmentLevel.Finalized
+MAX_MULTIPLE_ACCOUNTS = 100  # getMultipleAccounts per-request cap
+MAX_SIGNATURE_STATUSES = 256  # getSignatureStatuses per-request cap
+RECENT_SENDS = 64
+CONFIRM_POLL_SEC = 0.5
+_COMMITMENT_RANK = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+
+def _rank(level: Any) -> int:
+    """Rank of a commitment or confirmation status (``CommitmentLevel.Finalized``, ``"confirmed"``, ...)."""
+    return _COMMITMENT_RANK.get(str(level).rsplit(".", 1)[-1].lower(), -1)
+
 
 @dataclass
 class RpcConfig:
     url: str
     commitment: CommitmentLevel = COMMIT_FINALIZED
     timeout_sec: int = 60
+    blockhash_ttl_sec: float = 0.0  # >0: callers share one blockhash for this long
+    max_rps: float | None = None  # client-side request rate cap
+    max_in_flight: int | None = None  # concurrent request cap
+
+
+class _Limiter:
+    """Caps concurrent requests and spaces request starts to ``max_rps``."""
+
+    def __init__(self, max_rps: float | None, max_in_flight: int | None):
+        self.interval = 1.0 / max_rps if max_rps else 0.0
+        self.sem = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self.next_at = 0.0
+
+    async def __aenter__(self) -> None:
+        if self.sem is not None:
+            await self.sem.acquire()
+        if self.interval:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+            if start > now:
+                await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        if self.sem is not None:
+            self.sem.release()
+
 
 class Rpc:
     def __init__(self, cfg: RpcConfig):
         self.cfg = cfg
         self.client = AsyncClient(cfg.url, timeout=cfg.timeout_sec, commitment=cfg.commitment)
+        self._limit = _Limiter(cfg.max_rps, cfg.max_in_flight)
+        self._blockhash: tuple[float, Hash] | None = None
+        self._blockhash_lock = asyncio.Lock()
+        # (monotonic send time, signature) of recent sends, for landing-latency estimates
+        self.recent_sends: Deque[Tuple[float, str]] = deque(maxlen=RECENT_SENDS)
 
     async def close(self):
         await self.client.close()
 
     async def recent_blockhash(self) -> Hash:
-        resp = await self.client.get_latest_blockhash()
+        if self.cfg.blockhash_ttl_sec <= 0:
+            return await self._fetch_blockhash()
+        async with self._blockhash_lock:
+            now = time.monotonic()
+            if self._blockhash is None or now - self._blockhash[0] >= self.cfg.blockhash_ttl_sec:
+                self._blockhash = (now, await self._fetch_blockhash())
+            return self._blockhash[1]
+
+    async def _call(self, method: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run one client request under the rate limiter, traced as ``rpc.<method>``."""
+        async with self._limit:
+            with span(f"rpc.{method}"):
+                return await fn(*args, **kwargs)
+
+    async def _fetch_blockhash(self) -> Hash:
+        resp = await self._call("getLatestBlockhash", self.client.get_latest_blockhash)
         return resp.value.blockhash
 
     async def simulate(self, tx: Transaction, *signers: Any) -> dict:
         # NOTE: preflight simulate; signers used to sign the tx first
         if signers:
-            tx.sign(*signers)
-        sim = await self.client.simulate_transaction(tx)
+            with span("tx.sign"):
+                tx.sign(*signers)
+        sim = await self._call("simulateTransaction", self.client.simulate_transaction, tx)
         return sim.value.__dict__ if hasattr(sim, "value") else {}
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential_jitter(min=0.2, max=2.0))
     async def send_and_confirm(self, tx: Transaction, *signers: Any) -> str:
+        with span("tx.land"):
+            sig = await self.send(tx, *signers)
+            await self.confirm(sig)
+        return sig
+
+    async def send(self, tx: Transaction, *signers: Any, skip_preflight: bool = False) -> str:
+        """Submit ``tx`` (signing it first if ``signers`` are given) without waiting for confirmation."""
         if signers:
-            tx.sign(*signers)
-        resp = await self.client.send_transaction(tx, *signers, opts=TxOpts(skip_preflight=False))
+            with span("tx.sign"):
+                tx.sign(*signers)
+        sent_at = time.monotonic()
+        resp = await self._call("sendTransaction", self.client.send_transaction, tx, *signers, opts=TxOpts(skip_preflight=skip_preflight))
         sig = str(resp.value)
-        await self.client.confirm_transaction(Signature.from_string(sig), commitment=self.cfg.commitment)
+        self.recent_sends.append((sent_at, sig))
         return sig
 
+    async def confirm(self, sig: str) -> None:
+        """Wait until ``sig`` reaches the configured commitment.
+
+        Polls ``getSignatureStatuses`` one request at a time: only the polls
+        take a ``max_in_flight`` slot, never the wait between them, so pending
+        confirmations cannot starve other requests.
+        """
+        want = _rank(self.cfg.commitment)
+        deadline = time.monotonic() + self.cfg.timeout_sec
+        signature = Signature.from_string(sig)
+        while True:
+            r = await self._call("getSignatureStatuses", self.client.get_signature_statuses, [signature])
+            st = r.value[0]
+            if st is not None and _rank(getattr(st, "confirmation_status", None)) >= want:
+                return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"transaction {sig} not {str(self.cfg.commitment).rsplit('.', 1)[-1].lower()} after {self.cfg.timeout_sec}s")
+            await asyncio.sleep(CONFIRM_POLL_SEC)
+
+    async def get_slot(self) -> int:
+        r = await self._call("getSlot", self.client.get_slot)
+        return r.value
+
+    async def get_signature_statuses(self, sigs: List[str]) -> List[Any]:
+        """Statuses (with ``slot``/``err``/``confirmation_status``) for ``sigs``; ``None`` if unknown.
+
+        Chunks of ``MAX_SIGNATURE_STATUSES`` are requested concurrently.
+        """
+        async def _chunk(chunk: List[str]) -> List[Any]:
+            r = await self._call("getSignatureStatuses", self.client.get_signature_statuses, [Signature.from_string(s) for s in chunk], search_transaction_history=True)
+            return r.value
+
+        parts = await asyncio.gather(*(_chunk(sigs[i:i + MAX_SIGNATURE_STATUSES]) for i in range(0, len(sigs), MAX_SIGNATURE_STATUSES)))
+        return [st for part in parts for st in part]
+
+    async def get_transaction(self, sig: str) -> Any:
+        """The confirmed transaction with its ``meta`` (``err``, log messages), or ``None``."""
+        r = await self._call("getTransaction", self.client.get_transaction, Signature.from_string(sig), max_supported_transaction_version=0)
+        return r.value
+
     # Minimal helpers for idempotency checks
     async def account_exists(self, pubkey: str) -> bool:
         from solders.pubkey import Pubkey
-        info = await self.client.get_account_info(Pubkey.from_string(pubkey))
+        info = await self._call("getAccountInfo", self.client.get_account_info, Pubkey.from_string(pubkey))
         return info.value is not None
 
     async def get_balance(self, pubkey: str) -> int:
         from solders.pubkey import Pubkey
-        r = await self.client.get_balance(Pubkey.from_string(pubkey))
+        r = await self._call("getBalance", self.client.get_balance, Pubkey.from_string(pubkey))
         return r.value
+
+    async def get_multiple_accounts(self, pubkeys: List[str]) -> List[Any]:
+        """Fetch many accounts in as few requests as possible; ``None`` marks missing ones.
+
+        Chunks of ``MAX_MULTIPLE_ACCOUNTS`` are requested concurrently.
+        """
+        from solders.pubkey import Pubkey
+
+        async def _chunk(chunk: List[str]) -> List[Any]:
+            r = await self._call("getMultipleAccounts", self.client.get_multiple_accounts, [Pubkey.from_string(p) for p in chunk])
+            return r.value
+
+        parts = await asyncio.gather(*(_chunk(pubkeys[i:i + MAX_MULTIPLE_ACCOUNTS]) for i in range(0, len(pubkeys), MAX_MULTIPLE_ACCOUNTS)))
+        return [info for part in parts for info in part]
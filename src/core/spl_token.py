@@ -1,98 +1,219 @@
 """Helpers for interacting with the SPL Token program.
 
-The functions here perform common mint / ATA operations.  They are thin
-wrappers over the ``spl.token`` helpers but are written in an asynchronous
-style to match the rest of the launcher.  As with other modules in this patch
-the imports are optional so that unit tests can execute without pulling in the
-entire Solana python stack.
+The launcher builds its mint / ATA instructions explicitly rather than going
+through ``spl.token.client.Token``, whose helpers each send and confirm their
+own transaction.  Packing the instructions by hand (in the same way as
+``src.dex.raydium_v4``) lets callers place mint creation, ATA creation and
+``mintTo`` into a single transaction.
 """
 
 from __future__ import annotations
 
-from typing import Tuple
+from typing import List, Optional, Tuple
 
-try:  # pragma: no cover - exercised only when solana dependencies are available
-    from solders.pubkey import Pubkey
-    from spl.token.client import Token
-    from spl.token.constants import (
-        TOKEN_PROGRAM_ID,
-        ASSOCIATED_TOKEN_ACCOUNT_PROGRAM_ID,
-    )
-    from solana.rpc.async_api import AsyncClient
-    from solana.transaction import Transaction
-    from spl.token.instructions import (
-        create_associated_token_account,
-        mint_to,
-        initialize_mint,
-    )
-except Exception:  # pragma: no cover - fallback stubs for test environment
-    Pubkey = object  # type: ignore
-    Token = object  # type: ignore
-    TOKEN_PROGRAM_ID = ASSOCIATED_TOKEN_ACCOUNT_PROGRAM_ID = object  # type: ignore
-    AsyncClient = Transaction = object  # type: ignore
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+
+from .ata import ata
+from .layout import AccountView
+
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+ASSOCIATED_TOKEN_PROGRAM = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+SYSTEM_PROGRAM = "11111111111111111111111111111111"
+WRAPPED_SOL_MINT = "So11111111111111111111111111111111111111112"
+
+MINT_ACCOUNT_SIZE = 82
+TOKEN_ACCOUNT_SIZE = 165
 
-    def create_associated_token_account(*_a, **_k):  # type: ignore
-        raise RuntimeError("spl.token library not available")
+# Rent parameters of the Solana runtime (bytes of account overhead, lamports
+# per byte-year and the two year exemption threshold).
+_ACCOUNT_STORAGE_OVERHEAD = 128
+_LAMPORTS_PER_BYTE_YEAR = 3480
+_EXEMPTION_THRESHOLD_YEARS = 2
 
-    def mint_to(*_a, **_k):  # type: ignore
-        raise RuntimeError("spl.token library not available")
 
-    def initialize_mint(*_a, **_k):  # type: ignore
-        raise RuntimeError("spl.token library not available")
+def rent_exempt_lamports(size: int) -> int:
+    """Return the rent exempt minimum balance for an account of ``size`` bytes."""
 
+    return (_ACCOUNT_STORAGE_OVERHEAD + size) * _LAMPORTS_PER_BYTE_YEAR * _EXEMPTION_THRESHOLD_YEARS
 
-async def create_mint_and_mint_to(
-    client: AsyncClient,
-    payer_kp,
+
+def build_create_account(payer: str, new_account: str, lamports: int, space: int, owner: str) -> Instruction:
+    """System program ``CreateAccount`` (both ``payer`` and ``new_account`` sign)."""
+
+    data = (
+        (0).to_bytes(4, "little")
+        + int(lamports).to_bytes(8, "little")
+        + int(space).to_bytes(8, "little")
+        + Pubkey.from_string(owner).to_bytes()
+    )
+    metas = [
+        AccountMeta(Pubkey.from_string(payer), True, True),
+        AccountMeta(Pubkey.from_string(new_account), True, True),
+    ]
+    return Instruction(Pubkey.from_string(SYSTEM_PROGRAM), metas, data)
+
+
+def build_transfer(from_pub: str, to_pub: str, lamports: int) -> Instruction:
+    """System program ``Transfer`` of ``lamports`` (``from_pub`` signs)."""
+
+    data = (2).to_bytes(4, "little") + int(lamports).to_bytes(8, "little")
+    metas = [
+        AccountMeta(Pubkey.from_string(from_pub), True, True),
+        AccountMeta(Pubkey.from_string(to_pub), False, True),
+    ]
+    return Instruction(Pubkey.from_string(SYSTEM_PROGRAM), metas, data)
+
+
+def build_initialize_mint2(mint: str, decimals: int, mint_authority: str, freeze_authority: Optional[str] = None) -> Instruction:
+    """SPL Token ``InitializeMint2``; unlike ``InitializeMint`` it needs no rent sysvar."""
+
+    data = bytearray([20, int(decimals)])
+    data += Pubkey.from_string(mint_authority).to_bytes()
+    if freeze_authority:
+        data.append(1)
+        data += Pubkey.from_string(freeze_authority).to_bytes()
+    else:
+        data.append(0)
+    metas = [AccountMeta(Pubkey.from_string(mint), False, True)]
+    return Instruction(Pubkey.from_string(TOKEN_PROGRAM), metas, bytes(data))
+
+
+def build_create_idempotent_ata(payer: str, owner: str, mint: str) -> Instruction:
+    """Associated token program ``CreateIdempotent``; a no-op if the ATA exists."""
+
+    metas = [
+        AccountMeta(Pubkey.from_string(payer), True, True),
+        AccountMeta(Pubkey.from_string(ata(mint, owner)), False, True),
+        AccountMeta(Pubkey.from_string(owner), False, False),
+        AccountMeta(Pubkey.from_string(mint), False, False),
+        AccountMeta(Pubkey.from_string(SYSTEM_PROGRAM), False, False),
+        AccountMeta(Pubkey.from_string(TOKEN_PROGRAM), False, False),
+    ]
+    return Instruction(Pubkey.from_string(ASSOCIATED_TOKEN_PROGRAM), metas, b"\x01")
+
+
+def build_mint_to(mint: str, dest: str, mint_authority: str, amount: int) -> Instruction:
+    """SPL Token ``MintTo`` of ``amount`` base units into ``dest``."""
+
+    metas = [
+        AccountMeta(Pubkey.from_string(mint), False, True),
+        AccountMeta(Pubkey.from_string(dest), False, True),
+        AccountMeta(Pubkey.from_string(mint_authority), True, False),
+    ]
+    data = b"\x07" + int(amount).to_bytes(8, "little")
+    return Instruction(Pubkey.from_string(TOKEN_PROGRAM), metas, data)
+
+
+def build_create_mint_and_mint_to(
+    payer: str,
+    mint: str,
     decimals: int,
     mint_authority: str,
     dest_owner: str,
     amount: int,
-) -> Tuple[str, str, Transaction]:
-    """Create a new SPL mint and mint ``amount`` tokens to ``dest_owner``.
+) -> Tuple[str, List[Instruction]]:
+    """Return ``(dest_ata, instructions)`` creating ``mint`` and minting ``amount``.
 
-    Returns a tuple ``(mint_pub, ata, tx)`` where ``tx`` contains the minting
-    instruction so that callers can inspect or modify the transaction if
-    necessary.
+    The sequence is ``createAccount`` + ``initializeMint2`` + idempotent ATA
+    creation for ``dest_owner`` + ``mintTo``.  ``payer``, the ``mint`` keypair
+    and ``mint_authority`` must all sign the enclosing transaction.
     """
 
-    token = await Token.create_mint(
-        client,
-        payer_kp,
-        Pubkey.from_string(mint_authority),
-        None,
-        decimals,
-        TOKEN_PROGRAM_ID,
-    )
-    mint_pub = token.pubkey
-    ata = await token.create_associated_token_account(Pubkey.from_string(dest_owner))
-    tx = Transaction()
-    await token.mint_to(ata, Pubkey.from_string(mint_authority), payer_kp, amount)
-    return str(mint_pub), str(ata), tx
+    dest_ata = ata(mint, dest_owner)
+    ixs = [
+        build_create_account(payer, mint, rent_exempt_lamports(MINT_ACCOUNT_SIZE), MINT_ACCOUNT_SIZE, TOKEN_PROGRAM),
+        build_initialize_mint2(mint, decimals, mint_authority),
+        build_create_idempotent_ata(payer, dest_owner, mint),
+        build_mint_to(mint, dest_ata, mint_authority, amount),
+    ]
+    return dest_ata, ixs
 
 
-async def wrap_sol(
-    client: AsyncClient, payer_kp, owner: str, amount: int
-) -> Tuple[str, Transaction]:
-    """Wrap lamports into a temporary WSOL account owned by ``owner``."""
+def build_sync_native(account: str) -> Instruction:
+    """SPL Token ``SyncNative``: refresh a WSOL account's amount from its lamports."""
 
-    from solana.transaction import Transaction
-    from solana.system_program import transfer, TransferParams
+    metas = [AccountMeta(Pubkey.from_string(account), False, True)]
+    return Instruction(Pubkey.from_string(TOKEN_PROGRAM), metas, b"\x11")
 
-    wsol_account = Pubkey.create_with_seed(
-        Pubkey.from_string(owner),
-        "wsol",
-        TOKEN_PROGRAM_ID,
-    )
-    tx = Transaction()
-    tx.add(
-        transfer(
-            TransferParams(
-                from_pubkey=payer_kp.pubkey(),
-                to_pubkey=wsol_account,
-                lamports=amount,
-            )
-        )
-    )
-    return str(wsol_account), tx
 
+def build_wrap_sol(
+    owner: str,
+    lamports: int,
+    payer: Optional[str] = None,
+    wsol_mint: str = WRAPPED_SOL_MINT,
+    create: bool = True,
+) -> Tuple[str, List[Instruction]]:
+    """Return ``(wsol_ata, instructions)`` wrapping ``lamports`` of ``owner``'s SOL.
+
+    The WSOL lands in ``owner``'s associated token account (the account the
+    Raydium swap builder references).  Unless ``create`` is false the ATA is
+    created idempotently, paid for by ``payer`` (defaults to ``owner``).
+    ``owner`` signs the transfer.
+    """
+
+    wsol_ata = ata(wsol_mint, owner)
+    ixs = [build_create_idempotent_ata(payer or owner, owner, wsol_mint)] if create else []
+    ixs += [build_transfer(owner, wsol_ata, lamports), build_sync_native(wsol_ata)]
+    return wsol_ata, ixs
+
+
+def token_account_amount(data: bytes) -> int:
+    """Read the ``amount`` field of a packed SPL token account."""
+
+    return int.from_bytes(bytes(data[64:72]), "little")
+
+
+class MintView(AccountView):
+    """SPL Token ``Mint`` (82 bytes)."""
+
+    SIZE = MINT_ACCOUNT_SIZE
+    __slots__ = ()
+
+    @property
+    def mint_authority(self) -> Optional[Pubkey]:
+        return self._coption_pubkey(0)
+
+    @property
+    def supply(self) -> int:
+        return self._u64(36)
+
+    @property
+    def decimals(self) -> int:
+        return self._u8(44)
+
+    @property
+    def is_initialized(self) -> bool:
+        return bool(self._u8(45))
+
+    @property
+    def freeze_authority(self) -> Optional[Pubkey]:
+        return self._coption_pubkey(46)
+
+
+class TokenAccountView(AccountView):
+    """SPL Token ``Account`` (165 bytes)."""
+
+    SIZE = TOKEN_ACCOUNT_SIZE
+    __slots__ = ()
+
+    @property
+    def mint(self) -> Pubkey:
+        return self._pubkey(0)
+
+    @property
+    def owner(self) -> Pubkey:
+        return self._pubkey(32)
+
+    @property
+    def amount(self) -> int:
+        return self._u64(64)
+
+    @property
+    def delegate(self) -> Optional[Pubkey]:
+        return self._coption_pubkey(72)
+
+    @property
+    def state(self) -> int:
+        """0 uninitialized, 1 initialized, 2 frozen."""
+        return self._u8(108)
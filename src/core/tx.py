@@ -22,3 +22,60 @@ def with_tip(tx: Transaction, tip_to: str | None, lamports: int | None, payer_pu
             lamports=lamports
         )))
     return tx
+
+
+def tx_signature(tx: Transaction) -> str | None:
+    """First (fee payer) signature of a signed transaction, i.e. its id on chain."""
+    sig = tx.signature() if hasattr(tx, "signature") else None
+    return str(sig) if sig is not None else None
+
+
+PACKET_DATA_SIZE = 1232  # max serialized transaction size (IPv6 MTU minus headers)
+LAMPORTS_PER_SIGNATURE = 5000
+DEFAULT_IX_CU = 200_000  # runtime default per instruction without a compute unit limit
+MAX_TX_CU = 1_400_000
+
+
+def _compact_len(n: int) -> int:
+    """Bytes of a compact-u16 length prefix."""
+    return 1 if n < 0x80 else 2 if n < 0x4000 else 3
+
+
+def _signers(tx: Transaction, fee_payer: str | None) -> list:
+    keys = [str(Pubkey.from_string(fee_payer))] if fee_payer else []
+    for ix in tx.instructions:
+        keys += [str(m.pubkey) for m in ix.accounts if m.is_signer]
+    return list(dict.fromkeys(keys))
+
+
+def num_signatures(tx: Transaction, fee_payer: str | None) -> int:
+    return len(_signers(tx, fee_payer))
+
+
+def legacy_tx_size(tx: Transaction, fee_payer: str) -> int:
+    """Serialized size of ``tx`` as a signed legacy transaction, computed from
+    its instructions (no signing or message compilation needed)."""
+    keys = {str(Pubkey.from_string(fee_payer))}
+    ix_bytes = 0
+    for ix in tx.instructions:
+        keys.add(str(ix.program_id))
+        keys.update(str(m.pubkey) for m in ix.accounts)
+        n, d = len(ix.accounts), len(ix.data)
+        ix_bytes += 1 + _compact_len(n) + n + _compact_len(d) + d
+    sigs = num_signatures(tx, fee_payer)
+    return (
+        _compact_len(sigs) + 64 * sigs
+        + 3  # message header
+        + _compact_len(len(keys)) + 32 * len(keys)
+        + 32  # recent blockhash
+        + _compact_len(len(tx.instructions)) + ix_bytes
+    )
+
+
+def estimate_fee(tx: Transaction, fee_payer: str | None, cu_limit: int | None, cu_price_micro: int | None) -> int:
+    """Base fee per signature plus the priority fee (price x requested CU limit)."""
+    fee = LAMPORTS_PER_SIGNATURE * num_signatures(tx, fee_payer)
+    if cu_price_micro:
+        units = cu_limit or min(DEFAULT_IX_CU * len(tx.instructions), MAX_TX_CU)
+        fee += -(-units * cu_price_micro // 1_000_000)
+    return fee
@@ -11,14 +11,17 @@ connection.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple
 
 from solders.instruction import AccountMeta, Instruction
 from solders.pubkey import Pubkey
 from src.core.ata import ata
+from src.core.layout import AccountView
 
 TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
 SYSTEM_PROGRAM = "11111111111111111111111111111111"
+SWAP_FEE_BPS = 25  # Raydium v4 trade fee (0.25%), taken from the input amount
+POOL_STATE_SIZE = 752  # Raydium v4 ``AmmInfo``
 
 
 @dataclass
@@ -74,8 +77,8 @@ def derive_pool_accounts(base_mint: str, quote_mint: str, program_id: str) -> Po
         open_orders=str(open_orders),
         target_orders=str(target_orders),
         amm_config=str(amm_config),
-        base_mint=str(base),
-        quote_mint=str(quote),
+        base_mint=base_mint,
+        quote_mint=quote_mint,
     )
 
 
@@ -85,15 +88,17 @@ def build_initialize2(
     quote_mint: str,
     lp_creator_pub: str,
     tokens_to_lp: int,
+    accounts: PoolAccounts | None = None,
 ) -> List[Instruction]:
     """Construct the ``initialize2`` instruction sequence.
 
     The Raydium program packs its instruction data using Borsh.  The first byte
     identifies the variant (``0`` for ``initialize2``) followed by the amount of
     tokens to deposit into the pool expressed as a little‑endian ``u64``.
+    Pass ``accounts`` to reuse an existing derivation.
     """
 
-    acc = derive_pool_accounts(base_mint, quote_mint, program_id)
+    acc = accounts or derive_pool_accounts(base_mint, quote_mint, program_id)
     pid = Pubkey.from_string(program_id)
     metas = [
         AccountMeta(Pubkey.from_string(acc.pool), False, True),
@@ -155,6 +160,111 @@ def build_swap_SOL_to_base(
     return [Instruction(pid, metas, data)]
 
 
+def quote_exact_in(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = SWAP_FEE_BPS) -> int:
+    """Constant-product output for ``amount_in`` after the trade fee (rounded down)."""
+
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    net = amount_in * (10_000 - fee_bps) // 10_000
+    return reserve_out * net // (reserve_in + net)
+
+
+class AmmInfoView(AccountView):
+    """Raydium v4 ``AmmInfo`` pool state (752 bytes).
+
+    Sixteen u64 parameters, the ``Fees`` block (eight u64), the ``StateData``
+    block (pnl and swap counters, 144 bytes) and then the account keys.  The
+    tradable reserves are the vault balances minus the pnl still owed to the
+    protocol (``need_take_pnl_*``); see ``reserves``.
+    """
+
+    SIZE = POOL_STATE_SIZE
+    __slots__ = ()
+
+    @property
+    def status(self) -> int:
+        return self._u64(0)
+
+    @property
+    def base_decimals(self) -> int:
+        return self._u64(32)
+
+    @property
+    def quote_decimals(self) -> int:
+        return self._u64(40)
+
+    @property
+    def trade_fee(self) -> Tuple[int, int]:
+        """``(numerator, denominator)``."""
+        return self._u64(144), self._u64(152)
+
+    @property
+    def swap_fee(self) -> Tuple[int, int]:
+        """``(numerator, denominator)`` charged on the swap input."""
+        return self._u64(176), self._u64(184)
+
+    @property
+    def swap_fee_bps(self) -> int:
+        num, den = self.swap_fee
+        return num * 10_000 // den if den else SWAP_FEE_BPS
+
+    @property
+    def need_take_pnl_base(self) -> int:
+        return self._u64(192)
+
+    @property
+    def need_take_pnl_quote(self) -> int:
+        return self._u64(200)
+
+    @property
+    def pool_open_time(self) -> int:
+        return self._u64(224)
+
+    @property
+    def swap_base_in_amount(self) -> int:
+        return self._u128(256)
+
+    @property
+    def swap_quote_in_amount(self) -> int:
+        return self._u128(296)
+
+    @property
+    def vault_base(self) -> Pubkey:
+        return self._pubkey(336)
+
+    @property
+    def vault_quote(self) -> Pubkey:
+        return self._pubkey(368)
+
+    @property
+    def base_mint(self) -> Pubkey:
+        return self._pubkey(400)
+
+    @property
+    def quote_mint(self) -> Pubkey:
+        return self._pubkey(432)
+
+    @property
+    def lp_mint(self) -> Pubkey:
+        return self._pubkey(464)
+
+    @property
+    def open_orders(self) -> Pubkey:
+        return self._pubkey(496)
+
+    @property
+    def target_orders(self) -> Pubkey:
+        return self._pubkey(592)
+
+    @property
+    def lp_amount(self) -> int:
+        return self._u64(720)
+
+    def reserves(self, vault_base_amount: int, vault_quote_amount: int) -> Tuple[int, int]:
+        """``(base, quote)`` the pool trades against, given its vault balances."""
+        return vault_base_amount - self.need_take_pnl_base, vault_quote_amount - self.need_take_pnl_quote
+
+
 async def probe_pool_exists(rpc, accounts: PoolAccounts) -> bool:
     """Check whether the pool account already exists on chain."""
 
@@ -0,0 +1,143 @@
+"""Run many plans concurrently in one event loop.
+
+All launches share a single ``Rpc`` (so one HTTP connection pool, one
+blockhash cache and one client-side rate limit) while each keeps its own
+``State`` directory under the batch root.  A semaphore caps how many launches
+are in flight at once.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+import asyncio
+import json
+
+from rich.table import Table
+
+from src.io.plancache import load_plan_cached
+from src.util.config import LauncherConfig
+from src.util.planhash import sha256_file
+from src.core.solana import Rpc, RpcConfig
+from src.exec.orchestrator import RunConfig, execute_async, selected_steps
+
+
+@dataclass
+class LaunchProgress:
+    plan: str
+    out_dir: str
+    status: str = "queued"  # queued | running | done | failed
+    running: List[str] = field(default_factory=list)
+    done: List[str] = field(default_factory=list)
+    total_steps: int = 0
+    started: float | None = None
+    finished: float | None = None
+    error: str | None = None
+
+    def on_step(self, step: str, phase: str) -> None:
+        if phase == "start":
+            self.running.append(step)
+        else:
+            self.running.remove(step)
+            self.done.append(step)
+
+    @property
+    def elapsed_sec(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+def discover_plans(paths: Iterable[str]) -> List[Path]:
+    """Expand files and directories (``*.json``, sorted) into a de-duplicated plan list."""
+    out: List[Path] = []
+    for p in map(Path, paths):
+        for f in (sorted(p.glob("*.json")) if p.is_dir() else [p]):
+            if f not in out:
+                out.append(f)
+    return out
+
+
+def progress_table(rows: Iterable[LaunchProgress]) -> Table:
+    t = Table(title="Batch progress", show_header=True, header_style="bold")
+    for col in ("launch", "status", "steps", "running", "elapsed_s", "error"):
+        t.add_column(col)
+    for r in rows:
+        t.add_row(r.plan, r.status, f"{len(r.done)}/{r.total_steps}", ",".join(r.running), f"{r.elapsed_sec:.1f}", r.error or "")
+    return t
+
+
+async def run_batch(
+    plan_paths: List[Path],
+    base: RunConfig,
+    out_root: Path,
+    seed_keypair_path: str,
+    config_yaml: Path,
+    config: LauncherConfig,
+    max_concurrent: int = 4,
+    rpc_config: Optional[RpcConfig] = None,
+    on_update: Optional[Any] = None,
+) -> Dict[str, LaunchProgress]:
+    """Execute every plan with the flags of ``base``; one launch failing does not stop the others.
+
+    Each launch writes to ``out_root/<plan stem>``.  ``on_update`` (if given)
+    is called with the progress map after every step transition.
+    """
+    sem = asyncio.Semaphore(max_concurrent)
+    n_steps = len(selected_steps(base.only, timed=base.target is not None))
+    progress = {p.stem: LaunchProgress(plan=p.stem, out_dir=str(out_root / p.stem), total_steps=n_steps) for p in plan_paths}
+    if len(progress) != len(plan_paths):
+        raise ValueError("plan file names must be unique within a batch")
+    # validate every plan before the first RPC call; a bad plan fails its row only
+    plans: Dict[str, Tuple[Any, str]] = {}
+    for path in plan_paths:
+        row = progress[path.stem]
+        try:
+            plan_hash = sha256_file(path)
+            plans[path.stem] = (load_plan_cached(path, out_root / path.stem, plan_hash), plan_hash)
+        except Exception as e:
+            row.status, row.error = "failed", f"{type(e).__name__}: {e}"
+    rpc = Rpc(rpc_config or RpcConfig(url=base.rpc_url, timeout_sec=config.execution.timeout_sec))
+
+    def _notify() -> None:
+        if on_update:
+            on_update(progress)
+
+    async def _one(path: Path) -> None:
+        row = progress[path.stem]
+        if path.stem not in plans:
+            return
+        plan, plan_hash = plans[path.stem]
+        async with sem:
+            row.status, row.started = "running", time.monotonic()
+            _notify()
+            try:
+                out_dir = out_root / path.stem
+                out_dir.mkdir(parents=True, exist_ok=True)
+                (out_dir / "plan.json").write_bytes(path.read_bytes())
+                rc = replace(base, out_dir=out_dir, plan_hash=plan_hash)
+
+                def _on_step(step: str, phase: str) -> None:
+                    row.on_step(step, phase)
+                    _notify()
+
+                await execute_async(plan, rc, seed_keypair_path, config_yaml, config=config, rpc=rpc, progress=_on_step)
+                row.status = "done"
+            except Exception as e:
+                row.status, row.error = "failed", f"{type(e).__name__}: {e}"
+            finally:
+                row.finished = time.monotonic()
+                _notify()
+
+    try:
+        await asyncio.gather(*(_one(p) for p in plan_paths))
+    finally:
+        await rpc.close()
+    out_root.mkdir(parents=True, exist_ok=True)
+    (out_root / "batch.json").write_text(json.dumps(
+        {name: {"status": r.status, "out_dir": r.out_dir, "steps_done": r.done, "elapsed_sec": round(r.elapsed_sec, 3), "error": r.error} for name, r in progress.items()},
+        indent=2,
+    ))
+    return progress
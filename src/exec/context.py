@@ -0,0 +1,55 @@
+"""Immutable per-run context.
+
+Everything a launch derives from the config and the mint address is computed
+once here, before any step runs: program IDs, fee settings, the Raydium pool
+accounts and the metadata PDA.  Steps, preflight and verify read these fields
+instead of re-loading YAML or re-deriving PDAs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from src.util.config import LauncherConfig
+from src.core.metaplex import find_metadata_pda
+from src.dex.raydium_v4 import PoolAccounts, derive_pool_accounts
+
+
+@dataclass(frozen=True)
+class RunContext:
+    config: LauncherConfig
+    mint: str | None  # None only for a funding-only run before any mint exists
+    metadata_pda: str | None
+    pool: PoolAccounts | None
+    cu_limit: int | None
+    cu_price_micro: int | None
+
+    @property
+    def metadata_program(self) -> str:
+        return self.config.program_ids.metaplex_token_metadata
+
+    @property
+    def amm_program(self) -> str:
+        return self.config.program_ids.raydium_v4_amm
+
+    @property
+    def wsol(self) -> str:
+        return self.config.wrapped_sol
+
+
+def build_context(
+    config: LauncherConfig,
+    mint: str | None,
+    cu_limit: int | None = None,
+    cu_price_micro: int | None = None,
+) -> RunContext:
+    """Derive the run's PDAs for ``mint``; explicit fee values override the config."""
+
+    return RunContext(
+        config=config,
+        mint=mint,
+        metadata_pda=None if mint is None else find_metadata_pda(mint, config.program_ids.metaplex_token_metadata),
+        pool=None if mint is None else derive_pool_accounts(mint, config.wrapped_sol, config.program_ids.raydium_v4_amm),
+        cu_limit=config.fees.compute_unit_limit if cu_limit is None else cu_limit,
+        cu_price_micro=config.fees.compute_unit_price_micro_lamports if cu_price_micro is None else cu_price_micro,
+    )
@@ -0,0 +1,101 @@
+"""Apply a plan revision to the state of an earlier run (``run --apply-delta``).
+
+``plan_work`` turns a ``PlanDiff`` into the funding and buy work the new
+plan adds: new wallets are funded and (if they buy) prewarmed and bought;
+wallets whose funding grew get exactly the difference; buyers whose action
+changed are rebought only if they have not bought yet.  Everything else is
+left alone, and what cannot be applied (a wallet that already bought, less
+funding than before, a removed wallet) is reported in ``notes``.
+
+Before any of that is sent, ``verify_unchanged`` checks in bulk that the
+signatures journaled for the unchanged wallets' funding and buys are on chain.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from src.core.solana import Rpc
+from src.exec.swaps import BUY_ACTIONS
+from src.exec.txlog import CONFIRMED
+from src.models.plan import Plan
+from src.models.plandiff import PlanDiff
+
+
+@dataclass
+class DeltaWork:
+    tag: str  # journal-key suffix for top-ups, so a retried delta does not pay twice
+    fund: List[str] = field(default_factory=list)  # new wallets, funded to their planned lamports
+    top_up: Dict[str, int] = field(default_factory=dict)  # wallet id -> extra lamports
+    buys: List[str] = field(default_factory=list)  # buyers to prewarm and buy
+    notes: Dict[str, str] = field(default_factory=dict)  # wallet id -> why its change is not executed
+
+    @property
+    def empty(self) -> bool:
+        return not (self.fund or self.top_up or self.buys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tag": self.tag, "fund": self.fund, "top_up": self.top_up, "buys": self.buys, "notes": self.notes}
+
+
+def _is_buyer(plan: Plan, wid: str, scheduled: set) -> bool:
+    w = plan.wallet(wid)
+    return w is not None and wid in scheduled and bool(w.action) and w.action.type in BUY_ACTIONS
+
+
+def plan_work(diff: PlanDiff, new: Plan, buys_done: Dict[str, bool], tag: str) -> DeltaWork:
+    work = DeltaWork(tag=tag)
+    scheduled = set(new.schedule)
+    buys = set()
+    for wid in diff.added:
+        if new.wallet(wid).role == "SEED":
+            continue
+        work.fund.append(wid)
+        if _is_buyer(new, wid, scheduled):
+            buys.add(wid)
+    for wid, ch in diff.changed.items():
+        bought = bool(buys_done.get(wid))
+        if "funding.total_lamports" in ch:
+            old, now = ch["funding.total_lamports"]
+            if now < old:
+                work.notes[wid] = f"funding lowered {old} -> {now}; lamports already sent are not reclaimed"
+            elif bought:
+                work.notes[wid] = "already bought; funding change ignored"
+            elif new.wallet(wid).role != "SEED":
+                work.top_up[wid] = now - old
+        if any(k == "action" or k.startswith("action.") for k in ch):
+            if bought:
+                work.notes[wid] = "already bought; action change ignored"
+            elif _is_buyer(new, wid, scheduled):
+                buys.add(wid)
+    for wid in diff.schedule_added:
+        if not buys_done.get(wid) and _is_buyer(new, wid, scheduled):
+            buys.add(wid)
+    for wid in diff.removed:
+        work.notes[wid] = "removed from the plan; its funding and buy are not undone"
+    for wid in diff.schedule_removed:
+        if buys_done.get(wid):
+            work.notes[wid] = "unscheduled but already bought"
+    work.buys = [wid for wid in dict.fromkeys(new.schedule) if wid in buys]
+    return work
+
+
+async def verify_unchanged(rpc: Rpc, txs: Dict[str, Dict[str, Dict[str, Any]]], skip: set) -> List[Tuple[str, str, str]]:
+    """``(step, wallet_id, problem)`` for every journaled funding/buy of a wallet
+    outside ``skip`` whose signature is missing or failed on chain (one batched
+    ``getSignatureStatuses`` for all of them)."""
+    items = [
+        (step, wid, e["sig"])
+        for step in ("funding", "buys")
+        for wid, e in txs.get(step, {}).items()
+        if wid not in skip and e.get("status") == CONFIRMED and e.get("sig")
+    ]
+    statuses = await rpc.get_signature_statuses([sig for _, _, sig in items]) if items else []
+    bad = []
+    for (step, wid, sig), st in zip(items, statuses):
+        if st is None:
+            bad.append((step, wid, f"signature {sig} not found"))
+        elif getattr(st, "err", None) is not None:
+            bad.append((step, wid, f"signature {sig} failed: {st.err}"))
+    return bad
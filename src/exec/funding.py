@@ -1,34 +1,79 @@
 from __future__ import annotations
-from typing import Dict, Any
-from solders.pubkey import Pubkey
-from solana.system_program import TransferParams, transfer
+from typing import Collection, Dict, Any
 from solana.transaction import Transaction
 from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 from src.models.plan import Plan
 from src.core.solana import Rpc
+from src.core.spl_token import build_transfer
 from src.core.tx import with_compute_budget
+from src.exec.txlog import TxLog, send_journaled
+from src.util.tracing import span
+
+
+def build_transfer_tx(from_pub: str, to_pub: str, lamports: int, cu_limit: int | None, cu_price_micro: int | None) -> Transaction:
+    """Unsigned funding transfer (no blockhash yet)."""
+    with span("tx.build", kind="transfer"):
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        tx.add(build_transfer(from_pub, to_pub, lamports))
+    return tx
 
 
 @retry(stop=stop_after_attempt(5), wait=wait_exponential_jitter(min=0.2, max=2.0))
-async def _transfer(rpc: Rpc, from_kp, to_pub: str, lamports: int, cu_limit: int | None, cu_price_micro: int | None) -> str:
-    tx = Transaction()
-    with_compute_budget(tx, cu_limit, cu_price_micro)
-    tx.add(transfer(TransferParams(from_pubkey=from_kp.pubkey(), to_pubkey=Pubkey.from_string(to_pub), lamports=lamports)))
+async def _land(rpc: Rpc, tx: Transaction) -> str:
+    """Send and confirm the signed transfer; a retry resends the same signature."""
+    sig = await rpc.send(tx)
+    await rpc.confirm(sig)
+    return sig
+
+
+async def _transfer(rpc: Rpc, from_kp, to_pub: str, lamports: int, cu_limit: int | None, cu_price_micro: int | None, log: TxLog | None = None, key: str = "") -> str:
+    tx = build_transfer_tx(str(from_kp.pubkey()), to_pub, lamports, cu_limit, cu_price_micro)
     tx.recent_blockhash = await rpc.recent_blockhash()
-    return await rpc.send_and_confirm(tx, from_kp)
+    return await send_journaled(rpc, log, key, tx, from_kp, land=_land)
+
 
+async def run(rpc: Rpc, seed_kp, wallet_map: Dict[str, Any], plan: Plan, cu_limit: int | None, cu_price_micro: int | None, log: TxLog | None = None, only: Collection[str] | None = None) -> Dict[str, Any]:
+    """Top up every non-seed wallet (or just those in ``only``) to its planned lamports.
 
-async def run(rpc: Rpc, seed_kp, wallet_map: Dict[str, Any], plan: Plan, cu_limit: int | None, cu_price_micro: int | None) -> Dict[str, Any]:
+    With a ``log``, transfers journaled as confirmed by an earlier run are
+    skipped without a balance probe, and in-flight ones are reconciled first.
+    """
     funded = []
+    if log is not None:
+        await log.reconcile(rpc)
     for w in plan.wallets:
-        if w.role == "SEED":
+        if w.role == "SEED" or (only is not None and w.wallet_id not in only):
             continue
         pub = wallet_map[w.wallet_id]["pub"]
+        if log is not None and log.confirmed(w.wallet_id):
+            funded.append({"wallet_id": w.wallet_id, "skipped": True, "reason": "journaled", "sig": log.entries[w.wallet_id].get("sig")})
+            continue
         # Idempotent: if already funded >= target, skip
         bal = await rpc.get_balance(pub)
         if bal >= w.funding.total_lamports:
             funded.append({"wallet_id": w.wallet_id, "skipped": True, "reason": "already_funded"})
             continue
-        sig = await _transfer(rpc, seed_kp, pub, w.funding.total_lamports - bal, cu_limit, cu_price_micro)
+        sig = await _transfer(rpc, seed_kp, pub, w.funding.total_lamports - bal, cu_limit, cu_price_micro, log, w.wallet_id)
         funded.append({"wallet_id": w.wallet_id, "lamports": w.funding.total_lamports, "sig": sig})
     return {"funded": funded}
+
+
+async def top_up(rpc: Rpc, seed_kp, wallet_map: Dict[str, Any], amounts: Dict[str, int], tag: str, cu_limit: int | None, cu_price_micro: int | None, log: TxLog | None = None) -> Dict[str, Any]:
+    """Send exactly ``amounts[wallet_id]`` extra lamports to each wallet.
+
+    Used when a plan revision raises a wallet's funding: the balance may
+    already be spent on wrapping or buys, so the planned difference is sent
+    rather than topping up to a balance.  Journaled as ``<wallet_id>@<tag>``.
+    """
+    funded = []
+    if log is not None:
+        await log.reconcile(rpc)
+    for wid, lamports in amounts.items():
+        key = f"{wid}@{tag}"
+        if log is not None and log.confirmed(key):
+            funded.append({"wallet_id": wid, "skipped": True, "reason": "journaled", "sig": log.entries[key].get("sig")})
+            continue
+        sig = await _transfer(rpc, seed_kp, wallet_map[wid]["pub"], lamports, cu_limit, cu_price_micro, log, key)
+        funded.append({"wallet_id": wid, "lamports": lamports, "sig": sig, "top_up": True})
+    return {"funded": funded}
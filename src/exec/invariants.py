@@ -13,11 +13,10 @@ def assert_runtime_bounds(plan: Plan) -> None:
     if plan.token.lp_tokens <= 0:
         raise ValueError("token.lp_tokens must be > 0")
     # slippage bounds and effective_base_sol non-negative
-    for w in plan.wallets:
-        a = w.action
-        if not a:
-            continue
-        if a.slippage_bps < 0 or a.slippage_bps > 5000:
-            raise ValueError(f"slippage_bps out of bounds in wallet {w.wallet_id}")
-        if a.effective_base_sol < 0:
-            raise ValueError(f"effective_base_sol must be >= 0 in wallet {w.wallet_id}")
+    # (scanned column-wise; rows without an action hold zeros)
+    t = plan.wallets
+    for i, (bps, sol) in enumerate(zip(t.slippage_bps, t.effective_base_sol)):
+        if bps < 0 or bps > 5000:
+            raise ValueError(f"slippage_bps out of bounds in wallet {t.ids[i]}")
+        if sol < 0:
+            raise ValueError(f"effective_base_sol must be >= 0 in wallet {t.ids[i]}")
@@ -4,13 +4,21 @@ from solana.transaction import Transaction
 from src.core.metaplex import build_create_metadata_v3
 from src.core.tx import with_compute_budget
 from src.core.solana import Rpc
+from src.util.tracing import span
 
 
-async def run(rpc: Rpc, metadata_program: str, mint: str, mint_authority_kp, payer_kp, update_authority: str, name: str, symbol: str, uri: str | None, cu_limit: int | None, cu_price_micro: int | None, simulate: bool = False) -> Dict[str, Any]:
-    ix = build_create_metadata_v3(metadata_program=metadata_program, mint=mint, mint_authority=str(mint_authority_kp.pubkey()), payer=str(payer_kp.pubkey()), update_authority=update_authority, name=name, symbol=symbol, uri=uri or "")
-    tx = Transaction()
-    with_compute_budget(tx, cu_limit, cu_price_micro)
-    tx.add(ix)
+def build_tx(metadata_program: str, mint: str, mint_authority: str, payer: str, update_authority: str, name: str, symbol: str, uri: str | None, cu_limit: int | None, cu_price_micro: int | None, metadata_pda: str | None = None) -> Transaction:
+    """Unsigned CreateMetadataAccountV3 transaction (no blockhash yet)."""
+    with span("tx.build", kind="metadata"):
+        ix = build_create_metadata_v3(metadata_program=metadata_program, mint=mint, mint_authority=mint_authority, payer=payer, update_authority=update_authority, name=name, symbol=symbol, uri=uri or "", metadata_pda=metadata_pda)
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        tx.add(ix)
+    return tx
+
+
+async def run(rpc: Rpc, metadata_program: str, mint: str, mint_authority_kp, payer_kp, update_authority: str, name: str, symbol: str, uri: str | None, cu_limit: int | None, cu_price_micro: int | None, simulate: bool = False, metadata_pda: str | None = None) -> Dict[str, Any]:
+    tx = build_tx(metadata_program, mint, str(mint_authority_kp.pubkey()), str(payer_kp.pubkey()), update_authority, name, symbol, uri, cu_limit, cu_price_micro, metadata_pda)
     tx.recent_blockhash = await rpc.recent_blockhash()
     if simulate:
         sim = await rpc.simulate(tx, payer_kp, mint_authority_kp)
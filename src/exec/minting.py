@@ -1,18 +1,73 @@
 from __future__ import annotations
-from typing import Dict, Any
-from src.models.plan import Plan
+from typing import Dict, Any, List, Tuple
+from solana.transaction import Transaction
+from solders.instruction import Instruction
 from src.core.solana import Rpc
-from src.core.ata import ata
-from spl.token.client import Token
-from solders.pubkey import Pubkey
-from spl.token.constants import TOKEN_PROGRAM_ID
+from src.core.tx import with_compute_budget
+from src.util.tracing import span
+from src.core.spl_token import build_create_mint_and_mint_to
 
 
-async def run(rpc: Rpc, payer_kp, lp_creator_pub: str, decimals: int, amount: int) -> Dict[str, Any]:
-    # If artifacts already contain a mint, caller should pass it and skip
-    client = rpc.client
-    token = await Token.create_mint(client, payer_kp, Pubkey.from_string(lp_creator_pub), None, decimals, TOKEN_PROGRAM_ID)
-    mint_pub = token.pubkey
-    ata_addr = await token.create_associated_token_account(Pubkey.from_string(lp_creator_pub))
-    await token.mint_to(ata_addr, Pubkey.from_string(lp_creator_pub), payer_kp, amount)
-    return {"mint": str(mint_pub), "lp_creator_ata": str(ata_addr), "minted_tokens": amount}
+def _unique_signers(*kps: Any) -> List[Any]:
+    seen, out = set(), []
+    for kp in kps:
+        pub = str(kp.pubkey())
+        if pub not in seen:
+            seen.add(pub)
+            out.append(kp)
+    return out
+
+
+def build_tx(
+    payer: str,
+    mint: str,
+    authority: str,
+    decimals: int,
+    amount: int,
+    cu_limit: int | None = None,
+    cu_price_micro: int | None = None,
+    metadata_ix: Instruction | None = None,
+) -> Tuple[str, Transaction]:
+    """``(authority's ATA, unsigned create-mint + mint-to transaction)``."""
+    with span("tx.build", kind="mint"):
+        dest_ata, ixs = build_create_mint_and_mint_to(payer, mint, decimals, authority, authority, amount)
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        for ix in ixs:
+            tx.add(ix)
+        if metadata_ix is not None:
+            tx.add(metadata_ix)
+    return dest_ata, tx
+
+
+async def run(
+    rpc: Rpc,
+    payer_kp,
+    mint_kp,
+    mint_authority_kp,
+    decimals: int,
+    amount: int,
+    cu_limit: int | None = None,
+    cu_price_micro: int | None = None,
+    metadata_ix: Instruction | None = None,
+    simulate: bool = False,
+) -> Dict[str, Any]:
+    """Create the mint, the authority's ATA and mint ``amount`` in one transaction.
+
+    When ``metadata_ix`` is given it is appended to the same transaction so that
+    mint and metadata land together behind a single confirmation.
+    """
+    mint = str(mint_kp.pubkey())
+    authority = str(mint_authority_kp.pubkey())
+    dest_ata, tx = build_tx(str(payer_kp.pubkey()), mint, authority, decimals, amount, cu_limit, cu_price_micro, metadata_ix)
+    tx.recent_blockhash = await rpc.recent_blockhash()
+    signers = _unique_signers(payer_kp, mint_kp, mint_authority_kp)
+    res: Dict[str, Any] = {"mint": mint, "lp_creator_ata": dest_ata, "minted_tokens": amount, "metadata_fused": metadata_ix is not None}
+    if simulate:
+        sim = await rpc.simulate(tx, *signers)
+        res["simulated"] = True
+        if sim.get("logs"):
+            res["logs"] = sim["logs"]
+    else:
+        res["tx_sig"] = await rpc.send_and_confirm(tx, *signers)
+    return res
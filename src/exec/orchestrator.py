@@ -1,27 +1,50 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, Set, Callable, Optional
 import asyncio
+import contextlib
+import functools
 from solders.keypair import Keypair
 from src.models.plan import Plan
+from src.models.plandiff import PlanDiff
 from src.util.state import State, StepReceipt
 from src.util.telemetry import Telemetry
-from src.util.config import load_config
+from src.util.history import SqliteState
+from src.util.config import load_config, parse_config, LauncherConfig
 from src.core.solana import Rpc, RpcConfig
-from src.core.keys import (
-    load_seed_from_file,
-    gen_subwallets,
-    save_encrypted,
-    pubkey_str,
-    load_encrypted,
-)
-from src.exec import funding, minting, metadata, pool_init, swaps
-from src.core.metaplex import find_metadata_pda
-from src.dex.raydium_v4 import derive_pool_accounts, probe_pool_exists
+from src.core.keys import load_seed_from_file, pubkey_str, derive_subwallet, derive_subwallets
+from src.core.keyring import Keyring
+from src.exec import delta, funding, minting, metadata, prewarm, pool_init, swaps, trigger
+from src.core.metaplex import build_create_metadata_v3
+from src.dex.raydium_v4 import probe_pool_exists
+from src.exec.context import RunContext, build_context
 from src.exec.invariants import assert_plan_invariants, assert_runtime_bounds
+from src.exec.scheduler import run_graph, critical_path
+from src.exec.txlog import TxLog
+from src.util.slotclock import SlotClock
+from src.util.tracing import Tracer, activate, deactivate, span
+from src.util.profiling import step_frame
 
-STEPS_ORDER = ["funding","mint","metadata","lp_init","buys"]
+# step -> prerequisite steps.  Buyer funding does not need the mint, and
+# metadata gates nothing downstream, so those run alongside the main chain.
+STEP_GRAPH: Dict[str, Tuple[str, ...]] = {
+    "funding": (),
+    "mint": (),
+    "metadata": ("mint",),
+    "prewarm": ("funding", "mint"),
+    "lp_init": ("funding", "mint"),
+    "buys": ("prewarm", "lp_init"),
+}
+# --at-slot/--at-time: every preparatory step first, then one timed "fire"
+# node sends the pre-built pool and buy transactions together.
+TRIGGER_GRAPH: Dict[str, Tuple[str, ...]] = {
+    **{k: v for k, v in STEP_GRAPH.items() if k not in ("lp_init", "buys")},
+    "fire": ("funding", "mint", "metadata", "prewarm"),
+}
+# steps that run without knowing the mint address
+MINTLESS_STEPS = ("funding",)
+_ONLY_ALIASES = {"fund": "funding", "lp": "lp_init"}
 
 @dataclass
 class RunConfig:
@@ -36,181 +59,440 @@ class RunConfig:
     tip_lamports: int | None = None
     simulate: bool = False
     max_buys: int | None = None
+    fuse_metadata: bool = False
+    at_slot: int | None = None
+    at_time: float | None = None  # unix seconds
+    state_db: Path | None = None  # SQLite history database instead of JSON state files
+    derive_wallets: bool = False  # subwallets derived from seed + plan_id + wallet_id, no key files
+    delta: PlanDiff | None = None  # --apply-delta: changes from the plan this state dir executed
 
-async def execute_async(plan: Plan, cfg: RunConfig, seed_keypair_path: str, config_yaml: Path) -> None:
-    assert_plan_invariants(plan)
-    assert_runtime_bounds(plan)
-    state = State(cfg.out_dir)
-    telem = Telemetry(cfg.out_dir / "telemetry.ndjson")
-    rpc = Rpc(RpcConfig(url=cfg.rpc_url))
-
-    # Subwallet keypairs (fresh) persisted if not present
-    wallet_ids = [w.wallet_id for w in plan.wallets if w.role != "SEED"]
-    wallet_dir = cfg.out_dir / "wallets"
-    if "wallets" not in state.artifacts:
-        sub = gen_subwallets(wallet_ids)
-        pubmap = {wid: {"kp": kp, "pub": pubkey_str(kp), "path": save_encrypted(wallet_dir, wid, kp)} for wid, kp in sub.items()}
-        state.merge_artifacts({"wallets": {wid: {"pub": v["pub"], "path": v["path"]} for wid, v in pubmap.items()}})
-        # keep Keypair objects in memory map for this run
-        wallet_map: Dict[str, Any] = {wid: {"kp": sub[wid], "pub": pubmap[wid]["pub"]} for wid in wallet_ids}
-    else:
-        wallet_map = {}
-        for wid, info in state.artifacts.get("wallets", {}).items():
-            p = info.get("path")
-            if p and p.endswith(".enc"):
-                kp = load_encrypted(p)
-                wallet_map[wid] = {"kp": kp, "pub": pubkey_str(kp)}
-            elif info.get("pub"):
-                wallet_map[wid] = {"pub": info.get("pub")}
-
-    # Load seed
-    seed = load_seed_from_file(seed_keypair_path).kp
-
-    # FUNDING
-    if cfg.only in ("all","funding") and not (cfg.resume and state.done("funding")):
-        fout = await funding.run(rpc, seed, wallet_map or state.artifacts.get("wallets", {}), plan, cfg.cu_limit, cfg.cu_price_micro)
-        state.mark("funding", StepReceipt(step="funding", ok=True, inputs={"wallets": len(plan.wallets)}, outputs=fout, plan_hash=cfg.plan_hash))
-        state.merge_artifacts({"funding": fout})
-        telem.emit({"event":"funding_complete","wallets":len(plan.wallets)})
-
-    # MINT
+    @property
+    def target(self) -> trigger.Target | None:
+        if self.at_slot is None and self.at_time is None:
+            return None
+        return trigger.Target(slot=self.at_slot, unix_time=self.at_time)
+
+
+def _mint_keypair(state: State, keyring: Keyring) -> Keypair:
+    """Return the mint keypair, persisting a fresh one before first use so a
+    crash between send and checkpoint cannot orphan the mint."""
+    info = state.artifacts.get("mint_keypair") or {}
+    if keyring.has_secret("mint", info):
+        return keyring.keypair("mint", info)
+    kp = Keypair()
+    state.merge_artifacts({"mint_keypair": keyring.add("mint", kp)})
+    return kp
+
+
+def _resolve_mint(state: State, keyring: Keyring, steps: Set[str]) -> str | None:
+    """The run's mint address: the recorded mint, else the (pre-generated) mint keypair.
+
+    A mint keypair is only generated when the mint step is scheduled; a
+    funding-only run without one gets ``None``, any other step raises.
+    """
+    mint_art = state.artifacts.get("mint") or {}
+    if mint_art.get("mint"):
+        return mint_art["mint"]
+    mint_kp = state.artifacts.get("mint_keypair") or {}
+    if mint_kp.get("pub"):
+        return mint_kp["pub"]
+    if "mint" in steps:
+        return pubkey_str(_mint_keypair(state, keyring))
+    if steps <= set(MINTLESS_STEPS):
+        return None
+    raise RuntimeError(f"no mint recorded in {state.dir}; run the mint step first (--only mint, or the full launch)")
+
+
+@dataclass
+class _Launch:
+    """Per-run handles shared by the step coroutines."""
+    plan: Plan
+    cfg: RunConfig
+    ctx: RunContext
+    state: State | SqliteState
+    telem: Telemetry
+    rpc: Rpc
+    seed: Any
+    wallet_map: Keyring
+    clock: SlotClock | None = None
+    delta: delta.DeltaWork | None = None
+
+    @property
+    def wallets(self) -> Dict[str, Any]:
+        return self.wallet_map or self.state.artifacts.get("wallets", {})
+
+    def lp_creator_kp(self) -> Any:
+        return (self.wallet_map.get(self.plan.lp_creator.wallet_id) or {}).get("kp", self.seed)
+
+    def mark(self, step: str, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> None:
+        self.state.mark(step, StepReceipt(step=step, ok=True, inputs=inputs, outputs=outputs, plan_hash=self.cfg.plan_hash))
+
+    def record_delta(self, step: str, outputs: Dict[str, Any]) -> None:
+        """Outputs of a delta step, kept under ``artifacts["deltas"][tag]``; the original receipts stay as they were."""
+        assert self.delta is not None
+        deltas = dict(self.state.artifacts.get("deltas") or {})
+        deltas[self.delta.tag] = {**deltas.get(self.delta.tag, {"work": self.delta.to_dict()}), step: outputs}
+        self.state.merge_artifacts({"deltas": deltas})
+        self.telem.emit({"event": f"delta_{step}_complete", "tag": self.delta.tag})
+
+
+async def _funding(run: _Launch) -> None:
+    plan, cfg, state = run.plan, run.cfg, run.state
+    if run.delta is not None:
+        work, log = run.delta, TxLog(state, "funding")
+        fout = await funding.run(run.rpc, run.seed, run.wallets, plan, run.ctx.cu_limit, run.ctx.cu_price_micro, log=log, only=set(work.fund)) if work.fund else {"funded": []}
+        if work.top_up:
+            fout["funded"] += (await funding.top_up(run.rpc, run.seed, run.wallets, work.top_up, work.tag, run.ctx.cu_limit, run.ctx.cu_price_micro, log=log))["funded"]
+        run.record_delta("funding", fout)
+        return
+    if cfg.resume and state.done("funding"):
+        return
+    fout = await funding.run(run.rpc, run.seed, run.wallets, plan, run.ctx.cu_limit, run.ctx.cu_price_micro, log=TxLog(state, "funding"))
+    run.mark("funding", {"wallets": len(plan.wallets)}, fout)
+    state.merge_artifacts({"funding": fout})
+    run.telem.emit({"event":"funding_complete","wallets":len(plan.wallets)})
+
+
+async def _mint(run: _Launch) -> None:
+    plan, cfg, ctx, state, seed = run.plan, run.cfg, run.ctx, run.state, run.seed
     mint_art = state.artifacts.get("mint")
-    if cfg.only in ("all", "mint"):
-        if mint_art and await rpc.account_exists(mint_art.get("mint")):
-            state.mark(
-                "mint",
-                StepReceipt(
-                    step="mint",
-                    ok=True,
-                    inputs={},
-                    outputs={"skipped": True, "reason": "mint_exists"},
-                    plan_hash=cfg.plan_hash,
-                ),
-            )
-        elif not (cfg.resume and state.done("mint") and mint_art):
-            lp_creator = next(w for w in plan.wallets if w.role == "LP_CREATOR")
-            lp_pub = (wallet_map.get(lp_creator.wallet_id) or state.artifacts["wallets"][lp_creator.wallet_id])["pub"]
-            mout = await minting.run(rpc, seed, lp_pub, plan.token.decimals, plan.token.lp_tokens)
-            state.mark("mint", StepReceipt(step="mint", ok=True, inputs={"lp_tokens": plan.token.lp_tokens}, outputs=mout, plan_hash=cfg.plan_hash))
-            state.merge_artifacts({"mint": mout})
-            telem.emit({"event": "mint_complete", "mint": mout["mint"]})
-        mint_art = state.artifacts.get("mint")
-
-    # METADATA
-    if cfg.only in ("all", "metadata"):
-        mp = load_config(config_yaml).get("program_ids", {}).get("metaplex_token_metadata")
-        md_pda = find_metadata_pda(mint_art["mint"], mp)
-        if await rpc.account_exists(md_pda):
-            state.mark(
-                "metadata",
-                StepReceipt(
-                    step="metadata",
-                    ok=True,
-                    inputs={"mint": mint_art["mint"]},
-                    outputs={"skipped": True, "reason": "metadata_exists"},
-                    plan_hash=cfg.plan_hash,
-                ),
-            )
-        elif not (cfg.resume and state.done("metadata")):
-            md = await metadata.run(
-                rpc,
-                mp,
-                mint_art["mint"],
-                seed,
-                seed,
-                update_authority=str(seed.pubkey()),
-                name=plan.token.name,
-                symbol=plan.token.symbol,
-                uri=plan.token.uri,
-                cu_limit=cfg.cu_limit,
-                cu_price_micro=cfg.cu_price_micro,
-                simulate=cfg.simulate,
-            )
-            state.mark(
-                "metadata",
-                StepReceipt(step="metadata", ok=True, inputs={"mint": mint_art["mint"]}, outputs=md, plan_hash=cfg.plan_hash),
-            )
-            state.merge_artifacts({"metadata": md})
-            telem.emit({"event": "metadata_complete", "mint": mint_art["mint"]})
-
-    # LP INIT
-    if cfg.only in ("all", "lp_init", "lp"):
-        rpid = load_config(config_yaml).get("program_ids", {}).get("raydium_v4_amm")
-        wsol = load_config(config_yaml).get("mints", {}).get("wrapped_sol")
-        accounts = derive_pool_accounts(mint_art["mint"], wsol, rpid)
-        if await probe_pool_exists(rpc, accounts):
-            state.mark(
-                "lp_init",
-                StepReceipt(
-                    step="lp_init",
-                    ok=True,
-                    inputs={"mint": mint_art["mint"]},
-                    outputs={"skipped": True, "reason": "pool_exists", "pool": accounts.pool},
-                    plan_hash=cfg.plan_hash,
-                ),
-            )
-            state.merge_artifacts({"lp_init": {"pool": accounts.pool}})
-        elif not (cfg.resume and state.done("lp_init") and state.artifacts.get("lp_init")):
-            lp_creator = next(w for w in plan.wallets if w.role == "LP_CREATOR")
-            lp_kp = (wallet_map.get(lp_creator.wallet_id) or {}).get("kp", seed)
-            lp = await pool_init.run(
-                rpc,
-                rpid,
-                base_mint=mint_art["mint"],
-                quote_mint=wsol,
-                tokens_to_lp=plan.token.lp_tokens,
-                lp_creator_kp=lp_kp,
-                cu_limit=cfg.cu_limit,
-                cu_price_micro=cfg.cu_price_micro,
-                simulate=cfg.simulate,
-            )
-            state.mark(
-                "lp_init",
-                StepReceipt(
-                    step="lp_init",
-                    ok=True,
-                    inputs={"mint": mint_art["mint"]},
-                    outputs=lp,
-                    plan_hash=cfg.plan_hash,
-                ),
-            )
-            state.merge_artifacts({"lp_init": lp})
-            telem.emit({"event": "lp_init_complete", "pool": lp.get("pool")})
-
-    # BUYS
-    if cfg.only in ("all", "buys"):
-        wsol = load_config(config_yaml).get("mints", {}).get("wrapped_sol")
-        rpid = load_config(config_yaml).get("program_ids", {}).get("raydium_v4_amm")
-        buys_done = state.artifacts.get("buys_done", {})
-        b = await swaps.run(
-            rpc,
-            plan,
-            wallet_map or state.artifacts.get("wallets", {}),
-            base_mint=mint_art["mint"],
-            quote_mint=wsol,
-            program_id=rpid,
-            cu_limit=cfg.cu_limit,
-            cu_price_micro=cfg.cu_price_micro,
-            simulate=cfg.simulate,
-            buys_done=buys_done,
-            max_buys=cfg.max_buys,
+    if mint_art and await run.rpc.account_exists(ctx.mint):
+        run.mark("mint", {}, {"skipped": True, "reason": "mint_exists"})
+        return
+    if cfg.resume and state.done("mint") and mint_art:
+        return
+    mint_auth_kp = run.lp_creator_kp()
+    mint_kp = _mint_keypair(state, run.wallet_map)
+    if pubkey_str(mint_kp) != ctx.mint:
+        raise RuntimeError(f"mint {ctx.mint} is recorded in artifacts but not on chain and its keypair is unknown; drop artifacts['mint'] to create a new mint")
+    md_ix = None
+    if cfg.fuse_metadata:
+        md_ix = build_create_metadata_v3(
+            metadata_program=ctx.metadata_program,
+            metadata_pda=ctx.metadata_pda,
+            mint=pubkey_str(mint_kp),
+            mint_authority=pubkey_str(mint_auth_kp),
+            payer=pubkey_str(seed),
+            update_authority=pubkey_str(seed),
+            name=plan.token.name,
+            symbol=plan.token.symbol,
+            uri=plan.token.uri or "",
         )
-        state.mark(
-            "buys",
-            StepReceipt(
-                step="buys",
-                ok=True,
-                inputs={"schedule_len": len(plan.schedule)},
-                outputs=b,
-                plan_hash=cfg.plan_hash,
-            ),
+    mout = await minting.run(
+        run.rpc,
+        seed,
+        mint_kp,
+        mint_auth_kp,
+        plan.token.decimals,
+        plan.token.lp_tokens,
+        cu_limit=ctx.cu_limit,
+        cu_price_micro=ctx.cu_price_micro,
+        metadata_ix=md_ix,
+        simulate=cfg.simulate,
+    )
+    run.mark("mint", {"lp_tokens": plan.token.lp_tokens}, mout)
+    state.merge_artifacts({"mint": mout})
+    run.telem.emit({"event": "mint_complete", "mint": mout["mint"]})
+    if md_ix is not None:
+        md = {"fused_with_mint": mout["mint"], "tx_sig": mout.get("tx_sig")}
+        run.mark("metadata", {"mint": mout["mint"]}, md)
+        state.merge_artifacts({"metadata": md})
+        run.telem.emit({"event": "metadata_complete", "mint": mout["mint"], "fused": True})
+
+
+async def _metadata(run: _Launch) -> None:
+    plan, cfg, ctx, state, seed = run.plan, run.cfg, run.ctx, run.state, run.seed
+    mint = ctx.mint
+    if (state.artifacts.get("metadata") or {}).get("fused_with_mint") == mint:
+        return  # created in the mint transaction
+    if await run.rpc.account_exists(ctx.metadata_pda):
+        run.mark("metadata", {"mint": mint}, {"skipped": True, "reason": "metadata_exists"})
+        return
+    if cfg.resume and state.done("metadata"):
+        return
+    md = await metadata.run(
+        run.rpc,
+        ctx.metadata_program,
+        mint,
+        run.lp_creator_kp(),  # the mint authority (see _mint)
+        seed,
+        update_authority=str(seed.pubkey()),
+        name=plan.token.name,
+        symbol=plan.token.symbol,
+        uri=plan.token.uri,
+        cu_limit=ctx.cu_limit,
+        cu_price_micro=ctx.cu_price_micro,
+        simulate=cfg.simulate,
+        metadata_pda=ctx.metadata_pda,
+    )
+    run.mark("metadata", {"mint": mint}, md)
+    state.merge_artifacts({"metadata": md})
+    run.telem.emit({"event": "metadata_complete", "mint": mint})
+
+
+async def _prewarm(run: _Launch) -> None:
+    cfg, ctx, state = run.cfg, run.ctx, run.state
+    if cfg.resume and state.done("prewarm") and run.delta is None:
+        return
+    pw = await prewarm.run(
+        run.rpc,
+        run.seed,
+        run.plan,
+        run.wallets,
+        base_mint=ctx.mint,
+        quote_mint=ctx.wsol,
+        cu_limit=ctx.cu_limit,
+        cu_price_micro=ctx.cu_price_micro,
+        simulate=cfg.simulate,
+        only=run.delta.buys if run.delta is not None else None,
+    )
+    if run.delta is not None:
+        run.record_delta("prewarm", pw)
+        return
+    run.mark("prewarm", {"buyers": len(pw["wallets"])}, pw)
+    state.merge_artifacts({"prewarm": pw})
+    run.telem.emit({"event": "prewarm_complete", "buyers": len(pw["wallets"]), "sent": len([r for r in pw["wallets"] if not r.get("skipped")])})
+
+
+async def _lp_init(run: _Launch) -> None:
+    plan, cfg, ctx, state = run.plan, run.cfg, run.ctx, run.state
+    mint, accounts = ctx.mint, ctx.pool
+    if await probe_pool_exists(run.rpc, accounts):
+        run.mark("lp_init", {"mint": mint}, {"skipped": True, "reason": "pool_exists", "pool": accounts.pool})
+        state.merge_artifacts({"lp_init": {"pool": accounts.pool}})
+        return
+    if cfg.resume and state.done("lp_init") and state.artifacts.get("lp_init"):
+        return
+    lp = await pool_init.run(
+        run.rpc,
+        ctx.amm_program,
+        base_mint=mint,
+        quote_mint=ctx.wsol,
+        tokens_to_lp=plan.token.lp_tokens,
+        lp_creator_kp=run.lp_creator_kp(),
+        cu_limit=ctx.cu_limit,
+        cu_price_micro=ctx.cu_price_micro,
+        simulate=cfg.simulate,
+        accounts=accounts,
+    )
+    run.mark("lp_init", {"mint": mint}, lp)
+    state.merge_artifacts({"lp_init": lp})
+    run.telem.emit({"event": "lp_init_complete", "pool": lp.get("pool")})
+
+
+async def _buys(run: _Launch) -> None:
+    plan, cfg, ctx, state = run.plan, run.cfg, run.ctx, run.state
+    buys_done = state.artifacts.get("buys_done", {})
+    b = await swaps.run(
+        run.rpc,
+        plan,
+        run.wallets,
+        base_mint=ctx.mint,
+        quote_mint=ctx.wsol,
+        program_id=ctx.amm_program,
+        cu_limit=ctx.cu_limit,
+        cu_price_micro=ctx.cu_price_micro,
+        simulate=cfg.simulate,
+        buys_done=buys_done,
+        max_buys=cfg.max_buys,
+        accounts=ctx.pool,
+        log=TxLog(state, "buys"),
+        only=run.delta.buys if run.delta is not None else None,
+    )
+    if run.delta is not None:
+        state.merge_artifacts({"buys_done": buys_done})
+        run.record_delta("buys", b)
+        return
+    run.mark("buys", {"schedule_len": len(plan.schedule)}, b)
+    state.merge_artifacts({"buys": b, "buys_done": buys_done})
+    run.telem.emit({"event": "buys_complete", "count": len([s for s in b.get("swaps", []) if not s.get("skipped")])})
+
+
+async def _fire(run: _Launch) -> None:
+    plan, cfg, ctx, state = run.plan, run.cfg, run.ctx, run.state
+    if cfg.simulate or await probe_pool_exists(run.rpc, ctx.pool):
+        # nothing to time: simulating, or the pool is already live (resume)
+        await _lp_init(run)
+        await _buys(run)
+        return
+    assert run.clock is not None and cfg.target is not None
+    lp_kp = run.lp_creator_kp()
+    pool_tx = pool_init.build_tx(ctx.amm_program, ctx.mint, ctx.wsol, plan.token.lp_tokens, pubkey_str(lp_kp), ctx.cu_limit, ctx.cu_price_micro, ctx.pool)
+    buys_done = state.artifacts.get("buys_done", {})
+    pending = swaps.pending_buys(plan, buys_done, cfg.max_buys)
+    buy_txs = []
+    for _order, w in pending:
+        info = run.wallets[w.wallet_id]
+        buy_txs.append((w.wallet_id, swaps.build_buy_tx(ctx.amm_program, ctx.pool, info["pub"], w.action, ctx.cu_limit, ctx.cu_price_micro), info["kp"]))
+    run.telem.emit({"event": "trigger_armed", "target_slot": cfg.at_slot, "target_time": cfg.at_time, "buys": len(buy_txs)})
+    out = await trigger.run(run.rpc, run.clock, cfg.target, pool_tx, lp_kp, buy_txs, log=TxLog(state, "buys"))
+    lp = {**pool_init.pool_outputs(ctx.pool), "tx_sig": out["pool_sig"]}
+    run.mark("lp_init", {"mint": ctx.mint}, lp)
+    orders = {w.wallet_id: order for order, w in pending}
+    b = {"swaps": [{"order": orders[r["wallet_id"]], **r} for r in out["swaps"]]}
+    for r in out["swaps"]:
+        if "error" not in r:
+            buys_done[r["wallet_id"]] = True
+    run.mark("buys", {"schedule_len": len(plan.schedule)}, b)
+    timing = {k: v for k, v in out.items() if k != "swaps"}
+    state.merge_artifacts({"lp_init": lp, "buys": b, "buys_done": buys_done, "trigger": timing})
+    run.telem.emit({"event": "trigger_fired", **timing})
+
+
+# --apply-delta: the mint and pool already exist; only wallet work is redone
+DELTA_STEPS = ("funding", "prewarm", "buys")
+
+
+async def _prepare_delta(run: _Launch, diff: PlanDiff) -> delta.DeltaWork:
+    """Work for ``diff``, after checking the unchanged work is on chain."""
+    state = run.state
+    if not (state.done("mint") and state.done("lp_init") and state.artifacts.get("mint")):
+        raise ValueError(f"--apply-delta needs a launch whose mint and pool exist; {run.cfg.out_dir} has not finished lp_init (use --resume)")
+    work = delta.plan_work(diff, run.plan, state.artifacts.get("buys_done", {}), run.cfg.plan_hash[:16] or "delta")
+    touched = set(work.fund) | set(work.top_up) | set(work.buys)
+    bad = await delta.verify_unchanged(run.rpc, state.txs, touched)
+    run.telem.emit({"event": "delta_verified", "checked_unchanged": True, "problems": len(bad), **work.to_dict()})
+    if bad:
+        lines = [f"{step} {wid}: {why}" for step, wid, why in bad[:20]]
+        raise RuntimeError(f"{len(bad)} journaled transaction(s) of unchanged wallets are not on chain; run verify / --resume first:\n" + "\n".join(lines))
+    return work
+
+
+_STEP_RUNNERS = {
+    "funding": _funding,
+    "mint": _mint,
+    "metadata": _metadata,
+    "prewarm": _prewarm,
+    "lp_init": _lp_init,
+    "buys": _buys,
+    "fire": _fire,
+}
+
+
+def selected_steps(only: str, timed: bool = False) -> Set[str]:
+    """Map an ``--only`` value to the set of graph nodes to execute."""
+    if timed:
+        if only != "all":
+            raise ValueError("--at-slot/--at-time require --only all")
+        return set(TRIGGER_GRAPH)
+    if only == "all":
+        return set(STEP_GRAPH)
+    step = _ONLY_ALIASES.get(only, only)
+    if step not in STEP_GRAPH:
+        raise ValueError(f"unknown step {only!r}")
+    return {step}
+
+@step_frame
+async def _traced(name: str, fn: Callable[[_Launch], Any], run: _Launch) -> Any:
+    with span(f"step.{name}"):
+        return await fn(run)
+
+
+async def execute_async(
+    plan: Plan,
+    cfg: RunConfig,
+    seed_keypair_path: str,
+    config_yaml: Path,
+    config: LauncherConfig | None = None,
+    rpc: Rpc | None = None,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> None:
+    """Run the selected steps of ``plan``.
+
+    ``rpc`` may be a client shared with other launches (it is then left open);
+    ``progress`` receives ``(step, "start" | "done")`` notifications.
+    """
+    assert_plan_invariants(plan)
+    assert_runtime_bounds(plan)
+    target = cfg.target
+    steps = selected_steps(cfg.only, timed=target is not None)
+    if cfg.delta is not None:
+        blocking = cfg.delta.blocking()
+        if blocking:
+            raise ValueError("plan changes cannot be applied as a delta:\n" + "\n".join(blocking))
+        if target is not None or cfg.only != "all":
+            raise ValueError("--apply-delta runs funding, prewarm and buys itself; drop --only/--at-slot/--at-time")
+        steps = set(DELTA_STEPS)
+    graph = TRIGGER_GRAPH if target is not None else STEP_GRAPH
+    if config is None:
+        config = parse_config(load_config(config_yaml))
+    async with contextlib.AsyncExitStack() as stack:
+        # every handle is released as soon as it exists, so a failure while
+        # setting up later ones (delta, context, keyring) cannot leak it
+        if cfg.state_db is not None:
+            buyers = [w.wallet_id for w in plan.wallets if w.action and w.action.type in swaps.BUY_ACTIONS]
+            state = SqliteState(cfg.state_db, cfg.out_dir, plan_hash=cfg.plan_hash or None, plan_id=plan.plan_id, buyers=buyers)
+            mirror = state.record_events
+        else:
+            state = State(cfg.out_dir)
+            mirror = None
+        stack.callback(state.close)
+        tc = config.telemetry
+        telem = Telemetry(
+            cfg.out_dir / "telemetry.ndjson",
+            mirror=mirror,
+            capacity=tc.buffer_events,
+            overflow=tc.overflow,
+            flush_events=tc.flush_events,
+            flush_interval_sec=tc.flush_interval_ms / 1000,
         )
-        state.merge_artifacts({"buys": b, "buys_done": buys_done})
-        telem.emit({"event": "buys_complete", "count": len([s for s in b.get("swaps", []) if not s.get("skipped")])})
+        stack.callback(telem.close)
+        tracer = Tracer(emit=telem.emit)
+        # per-span latency histograms, also on failure: they explain slow runs
+        stack.callback(_write_trace_summary, tracer, telem, cfg.out_dir)
+        stack.callback(deactivate, activate(tracer))
+        if rpc is None:
+            rpc = Rpc(RpcConfig(url=cfg.rpc_url, timeout_sec=config.execution.timeout_sec))
+            stack.push_async_callback(rpc.close)
+
+        # Subwallet keypairs (fresh) persisted if not present; on resume secrets
+        # are decrypted only when a step signs for that wallet
+        seed = load_seed_from_file(seed_keypair_path).kp
+        wallet_ids = [w.wallet_id for w in plan.wallets if w.role != "SEED"]
+        wallet_map = Keyring(cfg.out_dir / "wallets", state.artifacts.get("wallets"), derive=functools.partial(derive_subwallet, seed, plan.plan_id))
+        stack.callback(wallet_map.close)
+        known = state.artifacts.get("wallets")
+        if known is None or cfg.delta is not None:
+            # a delta keeps the existing keys and adds the new wallets in the same mode
+            missing = [wid for wid in wallet_ids if wid not in (known or {})]
+            derived = cfg.derive_wallets if known is None else any(e.get("derived") for e in known.values())
+            if missing or known is None:
+                if derived:
+                    entries = wallet_map.remember_derived(derive_subwallets(seed, plan.plan_id, missing))
+                else:
+                    entries = wallet_map.generate(missing)
+                state.merge_artifacts({"wallets": {**(known or {}), **entries}})
+
+        ctx = build_context(config, _resolve_mint(state, wallet_map, steps), cfg.cu_limit, cfg.cu_price_micro)
+        run = _Launch(plan=plan, cfg=cfg, ctx=ctx, state=state, telem=telem, rpc=rpc, seed=seed, wallet_map=wallet_map)
+        if cfg.delta is not None:
+            run.delta = await _prepare_delta(run, cfg.delta)
+        if target is not None:
+            run.clock = SlotClock()
+            await run.clock.sample(rpc)
+            tracker = asyncio.ensure_future(run.clock.track(rpc))
+            stack.push_async_callback(_cancel, tracker)
+        timings = await run_graph(graph, {n: (lambda n=n, f=f: _traced(n, f, run)) for n, f in _STEP_RUNNERS.items() if n in graph}, steps, on_step=progress)
+        if timings:
+            path = critical_path(timings, target="fire" if target is not None else "buys")
+            telem.emit({
+                "event": "step_timings",
+                "steps": {n: {"start_ms": round(t.start_ms, 3), "duration_ms": round(t.duration_ms, 3), "gated_by": t.gated_by} for n, t in timings.items()},
+                "critical_path": path,
+                "critical_path_ms": round(timings[path[-1]].end_ms, 3),
+            })
+
+
+async def _cancel(task: asyncio.Future) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
 
-    await rpc.close()
+def _write_trace_summary(tracer: Tracer, telem: Telemetry, out_dir: Path) -> None:
+    telem.emit(tracer.summary_event())
+    tracer.write_prometheus(out_dir / "metrics.prom")
 
 
-def execute(plan: Plan, cfg: RunConfig, seed_keypair_path: str = "", config_yaml: Path | None = None, **_unused: Any) -> None:
+def execute(plan: Plan, cfg: RunConfig, seed_keypair_path: str = "", config_yaml: Path | None = None, config: LauncherConfig | None = None, **_unused: Any) -> None:
     """Synchronous helper used by tests and CLI wrappers."""
-    asyncio.run(execute_async(plan, cfg, seed_keypair_path, config_yaml or Path("configs/defaults.yaml")))
+    asyncio.run(execute_async(plan, cfg, seed_keypair_path, config_yaml or Path("configs/defaults.yaml"), config))
@@ -3,12 +3,42 @@ from typing import Dict, Any
 from solana.transaction import Transaction
 from src.core.solana import Rpc
 from src.core.tx import with_compute_budget
+from src.util.tracing import span
 from src.dex.raydium_v4 import (
+    PoolAccounts,
     derive_pool_accounts,
     build_initialize2,
 )
 
 
+def build_tx(
+    program_id: str,
+    base_mint: str,
+    quote_mint: str,
+    tokens_to_lp: int,
+    lp_creator: str,
+    cu_limit: int | None,
+    cu_price_micro: int | None,
+    accounts: PoolAccounts,
+) -> Transaction:
+    """Unsigned initialize2 transaction (no blockhash yet)."""
+    with span("tx.build", kind="initialize2"):
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        for ix in build_initialize2(program_id, base_mint, quote_mint, lp_creator, tokens_to_lp, accounts=accounts):
+            tx.add(ix)
+    return tx
+
+
+def pool_outputs(accounts: PoolAccounts) -> Dict[str, Any]:
+    return {
+        "pool": accounts.pool,
+        "vault_base": accounts.vault_base,
+        "vault_quote": accounts.vault_quote,
+        "lp_mint": accounts.lp_mint,
+    }
+
+
 async def run(
     rpc: Rpc,
     program_id: str,
@@ -19,19 +49,13 @@ async def run(
     cu_limit: int | None,
     cu_price_micro: int | None,
     simulate: bool = False,
+    accounts: PoolAccounts | None = None,
 ) -> Dict[str, Any]:
-    accounts = derive_pool_accounts(base_mint, quote_mint, program_id)
-    tx = Transaction()
-    with_compute_budget(tx, cu_limit, cu_price_micro)
-    for ix in build_initialize2(program_id, base_mint, quote_mint, str(lp_creator_kp.pubkey()), tokens_to_lp):
-        tx.add(ix)
+    if accounts is None:
+        accounts = derive_pool_accounts(base_mint, quote_mint, program_id)
+    tx = build_tx(program_id, base_mint, quote_mint, tokens_to_lp, str(lp_creator_kp.pubkey()), cu_limit, cu_price_micro, accounts)
     tx.recent_blockhash = await rpc.recent_blockhash()
-    res = {
-        "pool": accounts.pool,
-        "vault_base": accounts.vault_base,
-        "vault_quote": accounts.vault_quote,
-        "lp_mint": accounts.lp_mint,
-    }
+    res = pool_outputs(accounts)
     if simulate:
         sim = await rpc.simulate(tx, lp_creator_kp)
         res["simulated"] = True
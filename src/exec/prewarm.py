@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Collection, Dict, Any, List
+
+from solana.transaction import Transaction
+
+from src.models.plan import Plan
+from src.core.solana import Rpc
+from src.core.tx import with_compute_budget
+from src.util.tracing import span
+from src.core.ata import ata
+from src.core.spl_token import build_create_idempotent_ata, build_wrap_sol, token_account_amount
+from src.exec.swaps import BUY_ACTIONS, buy_lamports
+
+BUYERS_PER_TX = 3  # keeps a batch of create+wrap instructions under the packet limit
+MAX_IN_FLIGHT = 8
+
+
+def buyer_instructions(payer: str, pub: str, base_mint: str, quote_mint: str, need: int, have: int = 0, base_exists: bool = False, wsol_exists: bool = False) -> List[Any]:
+    """Instructions that leave ``pub`` with a base ATA and ``need`` wrapped lamports."""
+    ixs = []
+    if not base_exists:
+        ixs.append(build_create_idempotent_ata(payer, pub, base_mint))
+    if need > have:
+        ixs += build_wrap_sol(pub, need - have, payer=payer, wsol_mint=quote_mint, create=not wsol_exists)[1]
+    elif not wsol_exists:
+        ixs.append(build_create_idempotent_ata(payer, pub, quote_mint))
+    return ixs
+
+
+def build_batch_tx(ix_lists: List[List[Any]], cu_limit: int | None, cu_price_micro: int | None) -> Transaction:
+    """Unsigned prewarm transaction for up to ``BUYERS_PER_TX`` buyers (no blockhash yet)."""
+    with span("tx.build", kind="prewarm"):
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        for ixs in ix_lists:
+            for ix in ixs:
+                tx.add(ix)
+    return tx
+
+
+async def run(
+    rpc: Rpc,
+    payer_kp,
+    plan: Plan,
+    wallet_map: Dict[str, Any],
+    base_mint: str,
+    quote_mint: str,
+    cu_limit: int | None,
+    cu_price_micro: int | None,
+    simulate: bool = False,
+    only: Collection[str] | None = None,
+) -> Dict[str, Any]:
+    """Create buyer base/WSOL ATAs and wrap each buyer's buy amount ahead of the pool.
+
+    Existing accounts are detected with one bulk account read, so a resumed
+    run only sends instructions for what is still missing.  ``payer_kp`` funds
+    ATA rent and fees; each buyer signs the transfer of its own lamports.
+    """
+
+    buyers = []
+    for wid in dict.fromkeys(plan.schedule):
+        w = plan.wallet(wid)
+        if w.action and w.action.type in BUY_ACTIONS and (only is None or wid in only):
+            pub = wallet_map[wid]["pub"]
+            buyers.append((wid, pub, ata(base_mint, pub), ata(quote_mint, pub), buy_lamports(w.action)))
+
+    infos = await rpc.get_multiple_accounts([a for b in buyers for a in (b[2], b[3])]) if buyers else []
+    payer = str(payer_kp.pubkey())
+    rows: List[Dict[str, Any]] = []
+    pending = []
+    for i, (wid, pub, base_ata, wsol_ata, need) in enumerate(buyers):
+        base_info, wsol_info = infos[2 * i], infos[2 * i + 1]
+        have = token_account_amount(wsol_info.data) if wsol_info is not None else 0
+        ixs = buyer_instructions(payer, pub, base_mint, quote_mint, need, have, base_exists=base_info is not None, wsol_exists=wsol_info is not None)
+        row = {"wallet_id": wid, "base_ata": base_ata, "wsol_ata": wsol_ata, "wrapped_lamports": max(need, have)}
+        if not ixs:
+            row.update(skipped=True, reason="already_prewarmed")
+        else:
+            pending.append((row, ixs, wallet_map[wid]["kp"] if need > have else None))
+        rows.append(row)
+
+    sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+    async def _send(batch) -> None:
+        tx = build_batch_tx([ixs for _row, ixs, _kp in batch], cu_limit, cu_price_micro)
+        signers = [payer_kp] + [kp for _row, _ixs, kp in batch if kp is not None]
+        async with sem:
+            tx.recent_blockhash = await rpc.recent_blockhash()
+            if simulate:
+                await rpc.simulate(tx, *signers)
+                result = {"simulated": True}
+            else:
+                result = {"sig": await rpc.send_and_confirm(tx, *signers)}
+        for row, _ixs, _kp in batch:
+            row.update(result)
+
+    await asyncio.gather(*(_send(pending[i:i + BUYERS_PER_TX]) for i in range(0, len(pending), BUYERS_PER_TX)))
+    return {"wallets": rows}
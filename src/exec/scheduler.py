@@ -0,0 +1,114 @@
+"""Dependency-graph step scheduler.
+
+Each launch step is a node with a tuple of prerequisite steps.  A node starts
+as soon as all of its prerequisites have finished, so independent steps (e.g.
+buyer funding and mint creation) overlap on the event loop instead of running
+back to back.  Nodes outside the selected set count as already finished, which
+keeps ``--only <step>`` semantics: the step runs alone against whatever the
+earlier runs left in the artifacts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class StepTiming:
+    step: str
+    start_ms: float
+    end_ms: float
+    gated_by: str | None = None  # prerequisite that finished last before the start
+
+    @property
+    def duration_ms(self) -> float:
+        return self.end_ms - self.start_ms
+
+
+def topo_order(graph: Dict[str, Tuple[str, ...]]) -> List[str]:
+    """Return the nodes of ``graph`` in a dependency-respecting order."""
+
+    order: List[str] = []
+    seen: Dict[str, bool] = {}
+
+    def visit(n: str) -> None:
+        if seen.get(n):
+            return
+        if n in seen:
+            raise ValueError(f"dependency cycle through step {n!r}")
+        seen[n] = False
+        for d in graph[n]:
+            if d not in graph:
+                raise ValueError(f"step {n!r} depends on unknown step {d!r}")
+            visit(d)
+        seen[n] = True
+        order.append(n)
+
+    for n in graph:
+        visit(n)
+    return order
+
+
+async def run_graph(
+    graph: Dict[str, Tuple[str, ...]],
+    runners: Dict[str, Callable[[], Awaitable[None]]],
+    selected: Iterable[str],
+    on_step: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, StepTiming]:
+    """Run the ``selected`` nodes of ``graph`` as their prerequisites complete.
+
+    Returns a timing record per executed node.  If a step raises, the steps
+    still pending are cancelled and the first error propagates.  ``on_step``
+    is called with ``(step, "start" | "done")`` for progress reporting.
+    """
+
+    selected = set(selected)
+    t0 = time.perf_counter()
+    done_at: Dict[str, float] = {}
+    timings: Dict[str, StepTiming] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    def _ms() -> float:
+        return (time.perf_counter() - t0) * 1000.0
+
+    async def _node(name: str) -> None:
+        deps = [d for d in graph[name] if d in tasks]
+        if deps:
+            await asyncio.gather(*(tasks[d] for d in deps))
+        start = _ms()
+        gated_by = max(deps, key=lambda d: done_at[d]) if deps else None
+        if on_step:
+            on_step(name, "start")
+        await runners[name]()
+        done_at[name] = _ms()
+        if on_step:
+            on_step(name, "done")
+        timings[name] = StepTiming(step=name, start_ms=start, end_ms=done_at[name], gated_by=gated_by)
+
+    for name in topo_order(graph):
+        if name in selected:
+            tasks[name] = asyncio.ensure_future(_node(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for t in tasks.values():
+            t.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return timings
+
+
+def critical_path(timings: Dict[str, StepTiming], target: str | None = None) -> List[str]:
+    """Walk back from ``target`` (default: the last step to finish) via gating steps."""
+
+    if not timings:
+        return []
+    node = target if target in timings else max(timings.values(), key=lambda t: t.end_ms).step
+    path = [node]
+    while timings[node].gated_by:
+        node = timings[node].gated_by  # type: ignore[assignment]
+        path.append(node)
+    return path[::-1]
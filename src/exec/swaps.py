@@ -1,13 +1,64 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from typing import Collection, Dict, Any, List, Tuple
 from solana.transaction import Transaction
 
 from src.models.plan import Plan
 from src.core.solana import Rpc
 from src.core.tx import with_compute_budget
-from src.dex.raydium_v4 import derive_pool_accounts, build_swap_SOL_to_base
-from src.core.ata import ata
+from src.exec.txlog import TxLog, send_journaled
+from src.util.tracing import span
+from src.dex.raydium_v4 import PoolAccounts, derive_pool_accounts, build_swap_SOL_to_base
+
+BUY_ACTIONS = ("SWAP_BUY", "SWAP_BUY_SOL")
+
+
+def buy_lamports(action) -> int:
+    """Lamports swapped by a buy action (also the amount pre-wrapped as WSOL)."""
+    return int(action.effective_base_sol * 1_000_000_000)
+
+
+def pending_buys(plan: Plan, buys_done: Dict[str, bool], max_buys: int | None = None) -> List[Tuple[int, Any]]:
+    """``(order, wallet)`` for the scheduled buys not yet done, capped at ``max_buys``."""
+    out: List[Tuple[int, Any]] = []
+    order = 0
+    for wid in plan.schedule:
+        w = plan.wallet(wid)
+        if not w.action or w.action.type not in BUY_ACTIONS:
+            continue
+        order += 1
+        if buys_done.get(wid):
+            continue
+        if max_buys is not None and len(out) >= max_buys:
+            break
+        out.append((order, w))
+    return out
+
+
+def build_buy_tx(
+    program_id: str,
+    accounts: PoolAccounts,
+    user_pub: str,
+    action,
+    cu_limit: int | None,
+    cu_price_micro: int | None,
+) -> Transaction:
+    """Unsigned swap transaction (no blockhash yet) for one buy action."""
+    with span("tx.build", kind="swap"):
+        tx = Transaction()
+        with_compute_budget(tx, cu_limit, cu_price_micro)
+        # User WSOL/base ATAs are created and funded by the prewarm step, so the
+        # buy carries only the swap instruction.
+        for ix in build_swap_SOL_to_base(
+            program_id,
+            accounts,
+            user_pub,
+            in_lamports=buy_lamports(action),
+            min_out=action.min_out_tokens,
+            slippage_bps=action.slippage_bps,
+        ):
+            tx.add(ix)
+    return tx
 
 
 async def run(
@@ -22,26 +73,38 @@ async def run(
     simulate: bool = False,
     buys_done: Dict[str, bool] | None = None,
     max_buys: int | None = None,
+    accounts: PoolAccounts | None = None,
+    log: TxLog | None = None,
+    only: Collection[str] | None = None,
 ) -> Dict[str, Any]:
     """Execute the buy schedule using Raydium swap instructions.
 
     ``buys_done`` holds a persistent map of wallet IDs that have already
     completed their swap.  This allows the function to be re‑run idempotently on
-    resume without duplicating on‑chain state.
+    resume without duplicating on‑chain state.  With a ``log`` each swap is
+    journaled around its send, so buys confirmed (or left in flight) by an
+    interrupted run are recovered from the journal rather than re-bought.
+    ``only`` restricts the buys to those wallets (``--apply-delta``).
     """
 
     if buys_done is None:
         buys_done = {}
+    if log is not None and not simulate:
+        await log.reconcile(rpc)
+        for wid in log.entries:
+            if log.confirmed(wid):
+                buys_done[wid] = True
     results: List[Dict[str, Any]] = []
     order = 0
     emitted = 0
-    accounts = derive_pool_accounts(base_mint, quote_mint, program_id)
+    if accounts is None:
+        accounts = derive_pool_accounts(base_mint, quote_mint, program_id)
     sched = list(enumerate(plan.schedule))
     idx = 0
     while idx < len(sched):
         _, wid = sched[idx]
-        w = next(w for w in plan.wallets if w.wallet_id == wid)
-        if not w.action or w.action.type not in ("SWAP_BUY", "SWAP_BUY_SOL"):
+        w = plan.wallet(wid)
+        if not w.action or w.action.type not in BUY_ACTIONS:
             idx += 1
             continue
         order += 1
@@ -49,38 +112,28 @@ async def run(
             results.append({"order": order, "wallet_id": wid, "skipped": True, "reason": "already_swapped"})
             idx += 1
             continue
+        if only is not None and wid not in only:
+            results.append({"order": order, "wallet_id": wid, "skipped": True, "reason": "not_in_delta"})
+            idx += 1
+            continue
         if max_buys is not None and emitted >= max_buys:
             results.append({"order": order, "wallet_id": wid, "skipped": True, "reason": "max_buys_reached"})
             for j in range(idx + 1, len(sched)):
                 wid2 = sched[j][1]
-                w2 = next(w for w in plan.wallets if w.wallet_id == wid2)
-                if not w2.action or w2.action.type not in ("SWAP_BUY", "SWAP_BUY_SOL"):
+                w2 = plan.wallet(wid2)
+                if not w2.action or w2.action.type not in BUY_ACTIONS:
                     continue
                 order += 1
                 results.append({"order": order, "wallet_id": wid2, "skipped": True, "reason": "max_buys_reached"})
             break
         kp = wallet_map[wid]["kp"]
-        tx = Transaction()
-        with_compute_budget(tx, cu_limit, cu_price_micro)
-        user_pub = wallet_map[wid]["pub"]
-        # Derive user source/destination ATAs; builder references these implicitly
-        _user_wsol = ata(quote_mint, user_pub)
-        _user_base = ata(base_mint, user_pub)
-        for ix in build_swap_SOL_to_base(
-            program_id,
-            accounts,
-            user_pub,
-            in_lamports=int(w.action.effective_base_sol * 1_000_000_000),
-            min_out=w.action.min_out_tokens,
-            slippage_bps=w.action.slippage_bps,
-        ):
-            tx.add(ix)
+        tx = build_buy_tx(program_id, accounts, wallet_map[wid]["pub"], w.action, cu_limit, cu_price_micro)
         tx.recent_blockhash = await rpc.recent_blockhash()
         if simulate:
             await rpc.simulate(tx, kp)
             results.append({"order": order, "wallet_id": wid, "simulated": True})
         else:
-            sig = await rpc.send_and_confirm(tx, kp)
+            sig = await send_journaled(rpc, log, wid, tx, kp)
             results.append({"order": order, "wallet_id": wid, "sig": sig})
         buys_done[wid] = True
         emitted += 1
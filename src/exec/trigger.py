@@ -0,0 +1,133 @@
+"""Fire pre-built pool and buy transactions at a target slot or wall-clock time.
+
+The transactions are built while the preparatory steps run; shortly before
+the target they get one fresh blockhash and their signatures, and at
+``target - learned landing latency`` the pool init is sent followed at once
+by every buy.  Sends skip preflight because the buys reference a pool that
+does not exist until the first transaction lands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from src.core.solana import Rpc
+from src.core.tx import tx_signature
+from src.exec.txlog import TxLog
+from src.util.tracing import span
+from src.util.slotclock import LandingLatency, SlotClock
+
+SIGN_LEAD_SEC = 2.0  # blockhash fetch + signing happen this long before firing
+
+
+@dataclass(frozen=True)
+class Target:
+    slot: int | None = None
+    unix_time: float | None = None
+
+    def __post_init__(self) -> None:
+        if (self.slot is None) == (self.unix_time is None):
+            raise ValueError("exactly one of --at-slot / --at-time is required")
+
+    def monotonic(self, clock: SlotClock) -> float:
+        if self.slot is not None:
+            return clock.time_of(self.slot)
+        return time.monotonic() + (self.unix_time - time.time())  # type: ignore[operator]
+
+
+async def _sleep_until(t: float) -> None:
+    delay = t - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+async def learn_latency(rpc: Rpc, clock: SlotClock) -> LandingLatency:
+    """Landing latency from the sends this ``rpc`` made during the preparatory steps."""
+    sends = list(rpc.recent_sends)
+    if not sends:
+        return LandingLatency()
+    statuses = await rpc.get_signature_statuses([sig for _, sig in sends])
+    return LandingLatency.from_sends(sends, statuses, clock)
+
+
+async def run(
+    rpc: Rpc,
+    clock: SlotClock,
+    target: Target,
+    pool_tx: Any,
+    pool_signer: Any,
+    buys: List[Tuple[str, Any, Any]],
+    sign_lead_sec: float = SIGN_LEAD_SEC,
+    log: TxLog | None = None,
+) -> Dict[str, Any]:
+    """Sign and fire ``pool_tx`` then ``buys`` (``(wallet_id, tx, keypair)``) at ``target``.
+
+    The fire time is recomputed from the slot clock and landing latency on
+    waking ``sign_lead_sec`` before it.  Raises if the pool transaction does
+    not confirm; buy failures are reported per wallet.  With a ``log`` the
+    signed buys are journaled before the wait for the target ends, and each
+    confirmation after it.
+    """
+    lat = await learn_latency(rpc, clock)
+    await _sleep_until(target.monotonic(clock) - lat.value - sign_lead_sec)
+    # the clock kept sampling through a possibly long wait: re-read the
+    # target and the latency from it so the final short sleep ends on time
+    lat, blockhash = await asyncio.gather(learn_latency(rpc, clock), rpc.recent_blockhash())
+    target_at = target.monotonic(clock)
+    fire_at = target_at - lat.value
+    with span("tx.sign", count=len(buys) + 1):
+        for tx, kp in [(pool_tx, pool_signer)] + [(tx, kp) for _, tx, kp in buys]:
+            tx.recent_blockhash = blockhash
+            tx.sign(kp)
+    if log is not None:
+        await log.before_send([(wid, tx_signature(tx)) for wid, tx, _kp in buys])
+    pool: Dict[str, str] = {}
+    pool_sent = asyncio.Event()
+
+    async def _land_pool() -> None:
+        with span("tx.land", step="lp_init", key="pool"):
+            try:
+                pool["sig"] = await rpc.send(pool_tx, skip_preflight=True)
+            finally:
+                pool_sent.set()
+            await rpc.confirm(pool["sig"])
+
+    async def _land_buy(row: Dict[str, Any], tx: Any) -> None:
+        # buys go out only once the pool transaction has been submitted
+        await pool_sent.wait()
+        if "sig" not in pool:
+            raise RuntimeError("pool transaction was not sent")
+        with span("tx.land", step="buys", key=row["wallet_id"]):
+            row["sig"] = await rpc.send(tx, skip_preflight=True)
+            await rpc.confirm(row["sig"])
+
+    await _sleep_until(fire_at)
+    fired_at = time.monotonic()
+    swaps: List[Dict[str, Any]] = [{"wallet_id": wid} for wid, _tx, _kp in buys]
+    results = await asyncio.gather(_land_pool(), *(_land_buy(row, tx) for row, (_wid, tx, _kp) in zip(swaps, buys)), return_exceptions=True)
+    if isinstance(results[0], BaseException):
+        raise results[0]
+    pool_sig = pool["sig"]
+    for row, err in zip(swaps, results[1:]):
+        if isinstance(err, BaseException):
+            row["error"] = f"{type(err).__name__}: {err}"
+    if log is not None:
+        # errored buys stay "sent": a timed-out confirm may still land
+        await log.settle_many([(r["wallet_id"], r["sig"]) for r in swaps if "error" not in r])
+    (status,) = await rpc.get_signature_statuses([pool_sig])
+    landed = getattr(status, "slot", None)
+    target_slot = target.slot if target.slot is not None else round(clock.slot_at(target_at))
+    return {
+        "target_slot": target_slot,
+        "target_time": target.unix_time,
+        "latency_comp_ms": round(lat.value * 1000, 3),
+        "latency_samples": lat.n,
+        "fire_late_ms": round((fired_at - fire_at) * 1000, 3),
+        "pool_sig": pool_sig,
+        "pool_landed_slot": landed,
+        "slot_error": None if landed is None else landed - target_slot,
+        "swaps": swaps,
+    }
@@ -0,0 +1,145 @@
+"""Durable per-transaction progress for steps that send many transactions.
+
+Every transaction is journaled through ``State`` twice: as ``sent`` (with
+its signature, which is fixed once the transaction is signed) before it
+goes out, and as ``confirmed``/``failed`` afterwards.  After a crash only
+the ``sent`` entries are uncertain; ``reconcile`` settles all of them with
+one batched ``getSignatureStatuses`` call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from src.core.solana import Rpc
+from src.core.tx import tx_signature
+from src.util.tracing import span
+from src.util.state import State
+
+BLOCKHASH_LIFETIME_SEC = 90.0  # ~150 slots; an unseen tx older than this can no longer land
+
+SENT, CONFIRMED, FAILED, EXPIRED = "sent", "confirmed", "failed", "expired"
+
+
+class TxLog:
+    def __init__(self, state: State, step: str):
+        self.state = state
+        self.step = step
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        return self.state.txs.get(self.step, {})
+
+    def confirmed(self, key: str) -> bool:
+        return self.entries.get(key, {}).get("status") == CONFIRMED
+
+    async def _durable(self) -> None:
+        await asyncio.to_thread(self.state.flush)
+
+    async def before_send(self, items: List[Tuple[str, str | None]]) -> None:
+        """Journal ``(key, sig)`` pairs as in flight and wait until that is on disk."""
+        now = int(time.time() * 1000)
+        for key, sig in items:
+            self.state.record_tx(self.step, key, status=SENT, sig=sig, sent_ms=now)
+        await self._durable()
+
+    async def settle(self, key: str, sig: str | None) -> None:
+        await self.settle_many([(key, sig)])
+
+    async def settle_many(self, items: List[Tuple[str, str | None]]) -> None:
+        """Journal ``(key, sig)`` pairs as confirmed (one flush for all of them)."""
+        for key, sig in items:
+            self.state.record_tx(self.step, key, status=CONFIRMED, sig=sig)
+        await self._durable()
+
+    async def reconcile(self, rpc: Rpc) -> Dict[str, str]:
+        """Resolve entries left ``sent`` by an interrupted run; returns ``{key: new status}``.
+
+        A signature the cluster has not seen is re-checked once its blockhash
+        could no longer be valid, so it is never re-sent while it might land.
+        """
+        pending = {k: e for k, e in self.entries.items() if e.get("status") == SENT}
+        out: Dict[str, str] = {}
+        for final in (False, True):
+            if not pending:
+                break
+            unsigned = [k for k, e in pending.items() if not e.get("sig")]
+            for k in unsigned:
+                # sent without a known signature: leave it to the step's own probe
+                out[k] = EXPIRED
+                self.state.record_tx(self.step, k, status=EXPIRED)
+                pending.pop(k)
+            keys = list(pending)
+            statuses = await rpc.get_signature_statuses([pending[k]["sig"] for k in keys]) if keys else []
+            unseen = {}
+            for k, st in zip(keys, statuses):
+                if st is None:
+                    unseen[k] = pending[k]
+                elif getattr(st, "err", None) is not None:
+                    out[k] = FAILED
+                    self.state.record_tx(self.step, k, status=FAILED, error=str(st.err))
+                else:
+                    out[k] = CONFIRMED
+                    self.state.record_tx(self.step, k, status=CONFIRMED)
+            pending = unseen
+            if pending and not final:
+                newest = max(e.get("sent_ms", 0) for e in pending.values()) / 1000
+                wait = newest + BLOCKHASH_LIFETIME_SEC - time.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+        for k in pending:
+            out[k] = EXPIRED
+            self.state.record_tx(self.step, k, status=EXPIRED)
+        if out:
+            await self._durable()
+        return out
+
+
+async def _unresolved(rpc: Rpc, prior: Dict[str, Any]) -> Any:
+    """Status of an earlier attempt's signature; if the cluster has not seen it,
+    wait until its blockhash has expired and ask once more."""
+    (st,) = await rpc.get_signature_statuses([prior["sig"]])
+    if st is None:
+        wait = prior.get("sent_ms", 0) / 1000 + BLOCKHASH_LIFETIME_SEC - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        (st,) = await rpc.get_signature_statuses([prior["sig"]])
+    return st
+
+
+async def _land(rpc: Rpc, tx: Any) -> str:
+    sig = await rpc.send(tx)
+    await rpc.confirm(sig)
+    return sig
+
+
+async def send_journaled(rpc: Rpc, log: TxLog | None, key: str, tx: Any, *signers: Any, land: Callable[[Rpc, Any], Awaitable[str]] | None = None) -> str:
+    """Sign, journal, send and confirm ``tx``; with no ``log`` and no ``land`` this is ``send_and_confirm``.
+
+    ``tx`` is signed once; ``land`` (send + confirm by default) only ever gets
+    the signed transaction, so a retrying ``land`` resends the same signature.
+    If ``key`` is still ``sent`` from an earlier attempt, that signature is
+    returned if it landed, and a new one is only sent once the old blockhash
+    has expired.  On errors the entry stays ``sent``: the transaction may
+    still land, so ``reconcile`` decides.
+    """
+    if log is None and land is None:
+        return await rpc.send_and_confirm(tx, *signers)
+    land = land or _land
+    prior = log.entries.get(key, {}) if log is not None else {}
+    if prior.get("status") == SENT and prior.get("sig"):
+        st = await _unresolved(rpc, prior)
+        if st is not None and getattr(st, "err", None) is None:
+            await log.settle(key, prior["sig"])
+            return prior["sig"]
+    with span("tx.sign"):
+        tx.sign(*signers)
+    if log is not None:
+        await log.before_send([(key, tx_signature(tx))])
+    with span("tx.land", key=key):
+        sig = await land(rpc, tx)
+    if log is not None:
+        await log.settle(key, sig)
+    return sig
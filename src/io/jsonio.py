@@ -1,8 +1,10 @@
 from __future__ import annotations
+import json
+import re
 from pathlib import Path
 import orjson
-from typing import Any, Dict
-from src.models.plan import Plan
+from typing import Any, Dict, Tuple
+from src.models.plan import Plan, PlanError, WalletTable, WALLET_CHUNK
 
 def read_json(path: Path) -> Dict[str, Any]:
     return orjson.loads(path.read_bytes())
@@ -11,6 +13,78 @@ def write_json(path: Path, obj: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
 
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def _skip(doc: str, pos: int) -> int:
+    return _WS.match(doc, pos).end()
+
+
+def _expect(doc: str, pos: int, chars: str, path: str) -> Tuple[str, int]:
+    pos = _skip(doc, pos)
+    ch = doc[pos:pos + 1]
+    if not ch or ch not in chars:
+        raise _syntax(doc, pos, path, f"expected {' or '.join(repr(c) for c in chars)}")
+    return ch, pos + 1
+
+
+def _syntax(doc: str, pos: int, path: str, msg: str) -> PlanError:
+    line = doc.count("\n", 0, pos) + 1
+    col = pos - doc.rfind("\n", 0, pos)
+    return PlanError(path, f"invalid JSON: {msg} (line {line} column {col})")
+
+
+def _value(doc: str, pos: int, path: str) -> Tuple[Any, int]:
+    try:
+        return _DECODER.raw_decode(doc, _skip(doc, pos))
+    except json.JSONDecodeError as e:
+        raise _syntax(doc, e.pos, path, e.msg) from None
+
+
 def load_plan(path: Path) -> Plan:
-    raw = read_json(path)
-    return Plan.from_dict(raw)
+    """Parse and validate a plan in one pass.
+
+    The top-level object is walked key by key and ``wallets`` element by
+    element, each wallet going straight into the columnar ``WalletTable``, so
+    the full list of wallet dicts never exists at once.  Schema errors are
+    collected across the whole file and raised together; each carries the
+    JSON path (and line/column for syntax errors) of the offending value.
+    """
+    doc = path.read_bytes().decode("utf-8-sig")
+    top: Dict[str, Any] = {}
+    table, errors = WalletTable(), []
+    _, pos = _expect(doc, 0, "{", "$")
+    ch, pos = _expect(doc, pos, '"}', "$")
+    while ch != "}":
+        key, pos = _value(doc, pos - 1, "$")
+        _, pos = _expect(doc, pos, ":", f"$.{key}")
+        if key == "wallets":
+            _, pos = _expect(doc, pos, "[", "$.wallets")
+            pos = _skip(doc, pos)
+            if doc.startswith("]", pos):
+                pos += 1
+            else:
+                i, chunk = 0, []
+                while True:
+                    w, pos = _value(doc, pos, f"$.wallets[{i}]")
+                    chunk.append(w)
+                    i += 1
+                    if len(chunk) == WALLET_CHUNK:
+                        errors += table.extend_raw(chunk, i - len(chunk))
+                        chunk = []
+                    sep, pos = _expect(doc, pos, ",]", f"$.wallets[{i}]")
+                    if sep == "]":
+                        break
+                errors += table.extend_raw(chunk, i - len(chunk))
+            top[key] = None
+        else:
+            top[key], pos = _value(doc, pos, f"$.{key}")
+        ch, pos = _expect(doc, pos, ",}", "$")
+        if ch == ",":
+            ch, pos = _expect(doc, pos, '"', "$")
+    if _skip(doc, pos) != len(doc):
+        raise _syntax(doc, _skip(doc, pos), "$", "extra data after the plan object")
+    if "wallets" not in top:
+        raise PlanError("$.wallets", "missing")
+    return Plan.from_parts(top, table, errors)
@@ -0,0 +1,152 @@
+"""Compiled-plan cache.
+
+Parsing and validating a large plan costs seconds; the result only depends
+on the plan bytes and on the code that builds the model.  ``load_plan_cached``
+keeps the validated ``Plan`` (header dataclasses plus the columnar
+``WalletTable``) under ``<state dir>/cache/``, keyed by the plan's sha256 and
+``CODE_VERSION``, so repeated ``run`` / ``preflight`` invocations on the same
+plan skip the JSON entirely.  A stale or unreadable entry is simply rebuilt.
+
+The entry is plain data, never code: anyone able to write a state dir must
+not be able to run anything in the process that holds the wallet keys.
+
+File layout: ``MAGIC | header length (4 bytes BE) | header JSON | body length
+(4 bytes BE) | body JSON | numeric columns``.  The body holds the plan's
+header fields and the table's ids, roles, action types and sparse per-row
+dicts; the numeric columns follow as raw ``array.tobytes()`` in
+``_ARRAYS`` order, their byte lengths listed in the header.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.io import jsonio
+from src.models import plan as plan_mod, schema
+from src.models.plan import Action, Dex, Inputs, Invariants, Plan, Token, WalletTable
+from src.util.planhash import sha256_file
+
+MAGIC = b"RPC2"
+CACHE_DIR = "cache"
+
+_ARRAYS = ("total_lamports", "base_lamports", "buffer_lamports", "effective_base_sol", "min_out_tokens", "slippage_bps")
+_TYPECODES = {k: getattr(WalletTable(), k).typecode for k in _ARRAYS}
+_SECTIONS = {"token": Token, "inputs": Inputs, "dex": Dex, "invariants": Invariants}
+
+
+def _code_version() -> str:
+    # raw column bytes are only valid for the same byte order and item sizes
+    layout = ",".join(f"{tc}{array(tc).itemsize}" for tc in _TYPECODES.values())
+    h = hashlib.sha256(f"{sys.version_info[:2]}|{sys.byteorder}|{layout}".encode())
+    for mod in (plan_mod, schema, jsonio, sys.modules[__name__]):
+        h.update(Path(mod.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def cache_path(state_dir: Path, plan_hash: str) -> Path:
+    return Path(state_dir) / CACHE_DIR / f"plan-{plan_hash[:32]}.bin"
+
+
+def _rows(d: Dict[str, Any]) -> Dict[int, Any]:
+    return {int(i): v for i, v in d.items()}
+
+
+def _body(plan: Plan) -> Dict[str, Any]:
+    t = plan.wallets
+    header = {k: getattr(plan, k) for k in plan_mod._HEADER}
+    return {
+        "plan": {k: asdict(v) if k in _SECTIONS else v for k, v in header.items()},
+        "ids": t.ids,
+        "roles": t.roles,
+        "action_type": t.action_type,
+        "action_extra": t.action_extra,
+        "actions": {i: [asdict(a) for a in acts] for i, acts in t.actions.items()},
+        "meta": t.meta,
+    }
+
+
+def _from_body(body: Dict[str, Any], columns: Dict[str, array]) -> Plan:
+    t = WalletTable()
+    t.ids = list(body["ids"])
+    t.roles = [sys.intern(r) for r in body["roles"]]
+    t.action_type = [None if a is None else sys.intern(a) for a in body["action_type"]]
+    t.action_extra = _rows(body["action_extra"])
+    t.actions = {i: [Action(**a) for a in acts] for i, acts in _rows(body["actions"]).items()}
+    t.meta = _rows(body["meta"])
+    for k, col in columns.items():
+        setattr(t, k, col)
+    t._pos = {wid: i for i, wid in enumerate(t.ids)}
+    n = len(t.ids)
+    if len(t._pos) != n or any(len(c) != n for c in (t.roles, t.action_type, *columns.values())):
+        raise ValueError("cached wallet columns disagree in length")
+    h = body["plan"]
+    return Plan(**{k: _SECTIONS[k](**v) if k in _SECTIONS else v for k, v in h.items()}, wallets=t)
+
+
+def read(path: Path, plan_hash: str) -> Optional[Plan]:
+    """The cached plan at ``path`` if it was compiled from ``plan_hash`` by this code, else None."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(4) != MAGIC:
+                return None
+            (n,) = struct.unpack(">I", f.read(4))
+            header = json.loads(f.read(n))
+            if header.get("plan_hash") != plan_hash or header.get("code_version") != CODE_VERSION:
+                return None
+            (n,) = struct.unpack(">I", f.read(4))
+            body = json.loads(f.read(n))
+            if len(header["column_bytes"]) != len(_ARRAYS):
+                return None
+            columns: Dict[str, array] = {}
+            for k, size in zip(_ARRAYS, header["column_bytes"]):
+                col = array(_TYPECODES[k])
+                raw = f.read(size)
+                if len(raw) != size:
+                    return None
+                col.frombytes(raw)
+                columns[k] = col
+            return _from_body(body, columns)
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+
+
+def write(path: Path, plan_hash: str, plan: Plan) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = [getattr(plan.wallets, k).tobytes() for k in _ARRAYS]
+    header = json.dumps({
+        "plan_hash": plan_hash, "code_version": CODE_VERSION, "plan_id": plan.plan_id,
+        "wallets": len(plan.wallets), "column_bytes": [len(c) for c in columns],
+    }).encode()
+    body = json.dumps(_body(plan), separators=(",", ":")).encode()
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack(">I", len(header)) + header)
+        f.write(struct.pack(">I", len(body)) + body)
+        for c in columns:
+            f.write(c)
+    os.replace(tmp, path)
+
+
+def load_plan_cached(plan_path: Path, state_dir: Path, plan_hash: str | None = None) -> Plan:
+    """``load_plan(plan_path)``, served from / stored in ``state_dir``'s plan cache."""
+    plan_hash = plan_hash or sha256_file(plan_path)
+    path = cache_path(state_dir, plan_hash)
+    plan = read(path, plan_hash)
+    if plan is None:
+        plan = jsonio.load_plan(plan_path)
+        try:
+            write(path, plan_hash, plan)
+        except OSError:
+            pass  # a read-only state dir just means no cache
+    return plan
@@ -1,10 +1,43 @@
 from __future__ import annotations
-from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Any
+import sys
+from array import array
+from dataclasses import dataclass, field, fields, asdict
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from src.models import schema
 
 LAMPORTS_PER_SOL = 1_000_000_000
 
-@dataclass
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+MAX_ERRORS = 100
+WALLET_CHUNK = 1024  # wallets per schema-validator call
+
+
+class PlanError(ValueError):
+    """Invalid plan.  ``errors`` lists every ``(json_path, message)`` found
+    (up to ``MAX_ERRORS``); ``path``/``msg`` are the first of them."""
+
+    def __init__(self, path: str, msg: str = "", errors: Optional[List[Tuple[str, str]]] = None):
+        self.errors = errors or [(path, msg)]
+        self.path, self.msg = self.errors[0]
+        super().__init__("\n".join(f"{p}: {m}" for p, m in self.errors))
+
+    @staticmethod
+    def of(errors: List[Tuple[str, str]]) -> "PlanError":
+        return PlanError("", errors=errors[:MAX_ERRORS])
+
+
+def _check(adapter: Any, raw: Any, prefix: str) -> Any:
+    try:
+        return adapter.validate_python(raw)
+    except ValidationError as e:
+        raise PlanError.of(schema.validation_errors(e, prefix)) from None
+
+@dataclass(**_SLOTS)
 class Token:
     total_mint: int
     lp_tokens: int
@@ -15,7 +48,7 @@ class Token:
     uri: Optional[str] = None
     mint_metadata: Optional[str] = None
 
-@dataclass
+@dataclass(**_SLOTS)
 class Inputs:
     B_total: float
     T0: float
@@ -27,7 +60,7 @@ class Inputs:
     buffer_pct: float
     snap_lamports: bool = False
 
-@dataclass
+@dataclass(**_SLOTS)
 class Dex:
     variant: str
     program_id: str
@@ -38,7 +71,7 @@ class Dex:
     deps: Dict[str, Any] = field(default_factory=dict)
     openbook_params: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(**_SLOTS)
 class Funding:
     total_lamports: int
     base_lamports: int
@@ -71,7 +104,7 @@ class Funding:
             tl = int(bl) + int(bufl)
         return Funding(total_lamports=int(tl), base_lamports=int(bl), buffer_lamports=int(bufl))
 
-@dataclass
+@dataclass(**_SLOTS)
 class Action:
     type: str
     effective_base_sol: float = 0.0
@@ -84,24 +117,216 @@ class Action:
     quote_mint: Optional[str] = None
     pool_init_slippage_bps: Optional[int] = None
 
-@dataclass
+
+# -- wallet table --------------------------------------------------------------
+#
+# Wallets are stored column-wise: ids/roles/action types as lists of
+# (interned) strings, lamports, amounts and slippage as typed arrays, and the
+# rarely-set fields in sparse per-row dicts.  ``plan.wallets[i]`` is a small
+# view whose attributes read and write those columns, so existing
+# ``w.funding.total_lamports`` / ``w.action.slippage_bps`` code works unchanged.
+
+_ACTION_COLUMNS = ("effective_base_sol", "min_out_tokens", "slippage_bps")
+_ACTION_SPARSE = {f.name: f.default for f in fields(Action) if f.name not in ("type", *_ACTION_COLUMNS)}
+
+
+def _column(name: str) -> property:
+    def get(self):
+        return getattr(self._t, name)[self._i]
+
+    def set(self, v):
+        getattr(self._t, name)[self._i] = v
+
+    return property(get, set)
+
+
+def _sparse(table_attr: str, name: str, default: Any) -> property:
+    def get(self):
+        return getattr(self._t, table_attr).get(self._i, {}).get(name, default)
+
+    def set(self, v):
+        getattr(self._t, table_attr).setdefault(self._i, {})[name] = v
+
+    return property(get, set)
+
+
+class FundingView:
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table: "WalletTable", i: int):
+        self._t, self._i = table, i
+
+    total_lamports = _column("total_lamports")
+    base_lamports = _column("base_lamports")
+    buffer_lamports = _column("buffer_lamports")
+
+
+class ActionView:
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table: "WalletTable", i: int):
+        self._t, self._i = table, i
+
+    type = _column("action_type")
+    effective_base_sol = _column("effective_base_sol")
+    min_out_tokens = _column("min_out_tokens")
+    slippage_bps = _column("slippage_bps")
+    def to_action(self) -> Action:
+        return Action(type=self.type, **{k: getattr(self, k) for k in (*_ACTION_COLUMNS, *_ACTION_SPARSE)})
+
+
+for _k, _d in _ACTION_SPARSE.items():
+    setattr(ActionView, _k, _sparse("action_extra", _k, _d))
+
+
 class Wallet:
-    wallet_id: str
-    role: str
-    funding: Funding
-    action: Optional[Action] = None
-    index: Optional[int] = None
-    name: Optional[str] = None
-    actions: List[Action] = field(default_factory=list)
-
-@dataclass
+    """One row of a ``WalletTable``."""
+
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table: "WalletTable", i: int):
+        self._t, self._i = table, i
+
+    wallet_id = _column("ids")
+    role = _column("roles")
+    index = _sparse("meta", "index", None)
+    name = _sparse("meta", "name", None)
+
+    @property
+    def funding(self) -> FundingView:
+        return FundingView(self._t, self._i)
+
+    @property
+    def action(self) -> Optional[ActionView]:
+        return ActionView(self._t, self._i) if self._t.action_type[self._i] is not None else None
+
+    @property
+    def actions(self) -> List[Action]:
+        return self._t.actions.setdefault(self._i, [])
+
+    def __repr__(self) -> str:
+        return f"Wallet({self.wallet_id!r}, {self.role!r})"
+
+
+class WalletTable(Sequence[Wallet]):
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.roles: List[str] = []
+        self.total_lamports = array("q")
+        self.base_lamports = array("q")
+        self.buffer_lamports = array("q")
+        self.action_type: List[Optional[str]] = []
+        self.effective_base_sol = array("d")
+        self.min_out_tokens = array("q")
+        self.slippage_bps = array("i")
+        self.action_extra: Dict[int, Dict[str, Any]] = {}
+        self.actions: Dict[int, List[Action]] = {}
+        self.meta: Dict[int, Dict[str, Any]] = {}
+        self._pos: Dict[str, int] = {}
+
+    def append(self, wallet_id: str, role: str, funding: Funding, action: Optional[Action] = None, actions: Optional[List[Action]] = None, index: Optional[int] = None, name: Optional[str] = None, path: str = "$.wallets[?]") -> int:
+        first = self._pos.get(wallet_id)
+        if first is not None:
+            raise PlanError(f"{path}.wallet_id", f"duplicate wallet_id in wallets: {wallet_id!r} (first at $.wallets[{first}])")
+        i = len(self.ids)
+        if action is not None:
+            kind = sys.intern(action.type)
+            row = (float(action.effective_base_sol), int(action.min_out_tokens), int(action.slippage_bps))
+        else:
+            kind, row = None, (0.0, 0, 0)
+        # every numeric column of the row is written, or none is
+        columns = (
+            ("funding", self.total_lamports, funding.total_lamports),
+            ("funding", self.base_lamports, funding.base_lamports),
+            ("funding", self.buffer_lamports, funding.buffer_lamports),
+            ("action.effective_base_sol", self.effective_base_sol, row[0]),
+            ("action.min_out_tokens", self.min_out_tokens, row[1]),
+            ("action.slippage_bps", self.slippage_bps, row[2]),
+        )
+        for at, col, value in columns:
+            try:
+                col.append(value)
+            except OverflowError:
+                for _, c, _ in columns:
+                    del c[i:]
+                raise PlanError(f"{path}.{at}", "lamports out of range" if at == "funding" else "out of range") from None
+        self.action_type.append(kind)
+        if action is not None:
+            extra = {k: getattr(action, k) for k, d in _ACTION_SPARSE.items() if getattr(action, k) != d}
+            if extra:
+                self.action_extra[i] = extra
+        if actions:
+            self.actions[i] = list(actions)
+        if index is not None or name is not None:
+            self.meta[i] = {"index": index, "name": name}
+        self.ids.append(wallet_id)
+        self.roles.append(sys.intern(role))
+        self._pos[wallet_id] = i
+        return i
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [Wallet(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return Wallet(self, i)
+
+    def __iter__(self) -> Iterator[Wallet]:
+        return (Wallet(self, i) for i in range(len(self.ids)))
+
+    def get(self, wallet_id: str) -> Optional[Wallet]:
+        i = self._pos.get(wallet_id)
+        return None if i is None else Wallet(self, i)
+
+    def __contains__(self, wallet_id: object) -> bool:  # type: ignore[override]
+        return wallet_id in self._pos
+
+    def add_raw(self, raw: Any, i: int) -> int:
+        """Validate one plan ``wallets[i]`` object and append it."""
+        path = f"$.wallets[{i}]"
+        return self._add(_check(schema.WALLET, raw, path), path)
+
+    def extend_raw(self, raws: List[Any], start: int) -> List[Tuple[str, str]]:
+        """Validate and append ``wallets[start:start + len(raws)]``; returns the
+        errors found (offending rows are skipped).  One validator call covers the
+        whole chunk; rows are re-checked one by one only when it fails."""
+        try:
+            rows = schema.WALLETS.validate_python(raws)
+        except ValidationError:
+            rows = None
+        errors: List[Tuple[str, str]] = []
+        for k, raw in enumerate(raws):
+            try:
+                if rows is None:
+                    self.add_raw(raw, start + k)
+                else:
+                    self._add(rows[k], f"$.wallets[{start + k}]")
+            except PlanError as e:
+                errors += e.errors
+        return errors
+
+    def _add(self, w: Dict[str, Any], path: str) -> int:
+        action = Action(**w["action"]) if w.get("action") else None
+        actions = [Action(**a) for a in w.get("actions", [])]
+        return self.append(w["wallet_id"], w["role"], Funding.from_dict(w["funding"]), action, actions, w.get("index"), w.get("name"), path=path)
+
+
+@dataclass(**_SLOTS)
 class Invariants:
     sum_non_seed_lamports: int
     seed_lamports: int
     expected_equalities: List[str] = field(default_factory=list)
     atomic_tokens: Optional[int] = None
 
-@dataclass
+_HEADER = ("version", "model", "network", "plan_id", "created_at", "token", "inputs", "dex", "schedule", "invariants", "tx_defaults")
+
+
+@dataclass(**_SLOTS)
 class Plan:
     version: str
     model: str
@@ -112,50 +337,92 @@ class Plan:
     inputs: Inputs
     dex: Dex
     schedule: List[str]
-    wallets: List[Wallet]
+    wallets: WalletTable
     invariants: Invariants
     tx_defaults: Dict[str, int]
 
     @staticmethod
     def from_dict(raw: Dict[str, Any]) -> "Plan":
-        tok = dict(raw["token"])
+        if not isinstance(raw, dict):
+            raise PlanError("$", "expected an object")
+        wallets = raw.get("wallets")
+        if not isinstance(wallets, list):
+            raise PlanError("$.wallets", "missing" if wallets is None else "expected an array")
+        table, errors = WalletTable(), []
+        for i in range(0, len(wallets), WALLET_CHUNK):
+            errors += table.extend_raw(wallets[i:i + WALLET_CHUNK], i)
+        return Plan.from_parts(raw, table, errors)
+
+    @staticmethod
+    def from_parts(raw: Dict[str, Any], table: WalletTable, errors: List[Tuple[str, str]] = ()) -> "Plan":
+        """Plan from the top-level fields of ``raw`` and a wallet table built
+        alongside; ``errors`` are the wallet errors found while building it,
+        reported together with any in the header."""
+        errors = list(errors)
+        try:
+            h = _check(schema.HEADER, {k: v for k, v in raw.items() if k != "wallets"}, "$")
+        except PlanError as e:
+            errors = e.errors + errors
+        if errors:
+            raise PlanError.of(errors)
+        tok = h["token"]
         if tok.get("mint_metadata") and not tok.get("uri"):
             tok["uri"] = tok["mint_metadata"]
-        token = Token(**tok)
-        inputs = Inputs(**raw["inputs"])
-        dex = Dex(**raw["dex"])
-        wallets: List[Wallet] = []
-        for w in raw["wallets"]:
-            funding = Funding.from_dict(w["funding"])
-            action = Action(**w["action"]) if w.get("action") else None
-            actions = [Action(**a) for a in w.get("actions", [])]
-            wallets.append(Wallet(wallet_id=w["wallet_id"], role=w["role"], funding=funding, action=action, actions=actions, index=w.get("index"), name=w.get("name")))
-        inv = Invariants(**raw["invariants"])
-        plan = Plan(version=raw["version"], model=raw["model"], network=raw["network"], plan_id=raw["plan_id"], created_at=raw["created_at"], token=token, inputs=inputs, dex=dex, schedule=raw["schedule"], wallets=wallets, invariants=inv, tx_defaults=raw["tx_defaults"])
+        plan = Plan(
+            version=h["version"], model=h["model"], network=h["network"], plan_id=h["plan_id"], created_at=h["created_at"],
+            token=Token(**tok), inputs=Inputs(**h["inputs"]), dex=Dex(**h["dex"]),
+            schedule=h["schedule"], wallets=table, invariants=Invariants(**h["invariants"]), tx_defaults=h["tx_defaults"],
+        )
         plan.validate()
         return plan
 
+    def wallet(self, wallet_id: str) -> Optional[Wallet]:
+        return self.wallets.get(wallet_id)
+
+    @property
+    def lp_creator(self) -> Optional[Wallet]:
+        t = self.wallets
+        try:
+            return t[t.roles.index("LP_CREATOR")]
+        except ValueError:
+            return None
+
     def validate(self) -> None:
-        non_seed = sum(w.funding.total_lamports for w in self.wallets if w.role != "SEED")
+        """Cross-field checks, in one pass over the columns; raises a PlanError listing all failures."""
+        t = self.wallets
+        errors: List[Tuple[str, str]] = []
+        non_seed = sum(v for v, role in zip(t.total_lamports, t.roles) if role != "SEED")
         if non_seed != self.invariants.sum_non_seed_lamports:
-            raise ValueError("sum_non_seed_lamports mismatch")
+            errors.append(("$.invariants.sum_non_seed_lamports", f"sum_non_seed_lamports mismatch: wallets sum to {non_seed}"))
         tol = 1 if self.inputs.snap_lamports else 0
         if abs(non_seed - self.invariants.seed_lamports) > tol:
-            raise ValueError("seed lamports invariant violated")
-        ids = [w.wallet_id for w in self.wallets]
-        if len(ids) != len(set(ids)):
-            raise ValueError("duplicate wallet_id in wallets")
-        missing = set(self.schedule) - set(ids)
-        if missing:
-            raise ValueError(f"schedule references unknown wallet ids: {missing}")
+            errors.append(("$.invariants.seed_lamports", "seed lamports invariant violated"))
+        for k, wid in enumerate(self.schedule):
+            if wid not in t:
+                errors.append((f"$.schedule[{k}]", f"schedule references unknown wallet ids: {wid!r}"))
         if self.token.lp_tokens != int(self.inputs.T0):
-            raise ValueError("token.lp_tokens must equal inputs.T0")
-        lpw = next((w for w in self.wallets if w.role == "LP_CREATOR"), None)
+            errors.append(("$.token.lp_tokens", "token.lp_tokens must equal inputs.T0"))
+        lpw = self.lp_creator
         if not lpw:
-            raise ValueError("missing LP_CREATOR wallet")
-        has_create_lp = (lpw.action and lpw.action.type == "CREATE_LP") or any(a.type == "CREATE_LP" for a in lpw.actions)
-        if not has_create_lp:
-            raise ValueError("LP_CREATOR must contain a CREATE_LP action")
+            errors.append(("$.wallets", "missing LP_CREATOR wallet"))
+        elif not ((lpw.action and lpw.action.type == "CREATE_LP") or any(a.type == "CREATE_LP" for a in lpw.actions)):
+            errors.append((f"$.wallets[{lpw._i}].action", "LP_CREATOR must contain a CREATE_LP action"))
+        if errors:
+            raise PlanError.of(errors)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        out = {k: getattr(self, k) for k in _HEADER}
+        out = {k: asdict(v) if hasattr(v, "__dataclass_fields__") else v for k, v in out.items()}
+        out["wallets"] = [
+            {
+                "wallet_id": w.wallet_id,
+                "role": w.role,
+                "funding": {"total_lamports": w.funding.total_lamports, "base_lamports": w.funding.base_lamports, "buffer_lamports": w.funding.buffer_lamports},
+                "action": asdict(w.action.to_action()) if w.action else None,
+                "actions": [asdict(a) for a in w.actions],
+                "index": w.index,
+                "name": w.name,
+            }
+            for w in self.wallets
+        ]
+        return out
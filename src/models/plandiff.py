@@ -0,0 +1,116 @@
+"""Differences between two revisions of a plan.
+
+``diff_plans(old, new)`` compares the header sections field by field and the
+wallets row by row (by ``wallet_id``), so an edited plan can be applied to the
+state dir of the run that executed ``old`` (``run --apply-delta``) instead of
+being rerun from scratch.  ``blocking()`` names the changes that cannot be
+applied that way (they would need a different mint or pool).
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from src.models.plan import Plan, Wallet
+
+Change = Tuple[Any, Any]  # (old, new)
+
+# header scalars grouped under the "plan" section
+_SCALARS = ("version", "model", "network", "plan_id", "created_at")
+_SECTIONS = ("token", "inputs", "dex", "invariants", "tx_defaults")
+# changes that need another mint or pool (or other derived wallets)
+_BLOCKING_SECTIONS = {"token": None, "dex": None, "plan": ("network", "plan_id")}
+
+
+@dataclass
+class PlanDiff:
+    sections: Dict[str, Dict[str, Change]] = field(default_factory=dict)  # section -> field -> change
+    added: List[str] = field(default_factory=list)  # wallet ids, in new-plan order
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, Dict[str, Change]] = field(default_factory=dict)  # wallet id -> "funding.total_lamports" -> change
+    schedule_added: List[str] = field(default_factory=list)
+    schedule_removed: List[str] = field(default_factory=list)
+    schedule_reordered: bool = False
+    lp_creator: Change = (None, None)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.sections or self.added or self.removed or self.changed or self.schedule_added or self.schedule_removed or self.schedule_reordered)
+
+    def blocking(self) -> List[str]:
+        """Changes ``--apply-delta`` refuses, as ``"<path>: <old> -> <new>"`` lines."""
+        out = []
+        for sec, fields_ in _BLOCKING_SECTIONS.items():
+            for k, (a, b) in self.sections.get(sec, {}).items():
+                if fields_ is None or k in fields_:
+                    out.append(f"{sec}.{k}: {a!r} -> {b!r}")
+        if self.lp_creator[0] != self.lp_creator[1]:
+            out.append(f"LP_CREATOR wallet: {self.lp_creator[0]!r} -> {self.lp_creator[1]!r}")
+        for wid, ch in self.changed.items():
+            if "role" in ch:
+                out.append(f"wallets.{wid}.role: {ch['role'][0]!r} -> {ch['role'][1]!r}")
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["blocking"] = self.blocking()
+        return d
+
+
+def _fields(obj: Any) -> Dict[str, Any]:
+    return asdict(obj) if hasattr(obj, "__dataclass_fields__") else dict(obj)
+
+
+def _dict_diff(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Change]:
+    return {k: (a.get(k), b.get(k)) for k in dict.fromkeys([*a, *b]) if a.get(k) != b.get(k)}
+
+
+def wallet_fields(w: Wallet) -> Dict[str, Any]:
+    """Flat ``{"role", "funding.*", "action.*", "actions", "index", "name"}`` view of one wallet row."""
+    f = w.funding
+    out: Dict[str, Any] = {
+        "role": w.role,
+        "funding.total_lamports": f.total_lamports,
+        "funding.base_lamports": f.base_lamports,
+        "funding.buffer_lamports": f.buffer_lamports,
+        "index": w.index,
+        "name": w.name,
+    }
+    a = w.action
+    if a is None:
+        out["action"] = None
+    else:
+        out.update({f"action.{k}": v for k, v in asdict(a.to_action()).items()})
+    if w.actions:
+        out["actions"] = [asdict(x) for x in w.actions]
+    return out
+
+
+def diff_plans(old: Plan, new: Plan) -> PlanDiff:
+    d = PlanDiff()
+    plan_ch = {k: (getattr(old, k), getattr(new, k)) for k in _SCALARS if getattr(old, k) != getattr(new, k)}
+    if plan_ch:
+        d.sections["plan"] = plan_ch
+    for sec in _SECTIONS:
+        ch = _dict_diff(_fields(getattr(old, sec)), _fields(getattr(new, sec)))
+        if ch:
+            d.sections[sec] = ch
+
+    ot, nt = old.wallets, new.wallets
+    for w in nt:
+        if w.wallet_id not in ot:
+            d.added.append(w.wallet_id)
+            continue
+        ch = _dict_diff(wallet_fields(ot.get(w.wallet_id)), wallet_fields(w))
+        if ch:
+            d.changed[w.wallet_id] = ch
+    d.removed = [wid for wid in ot.ids if wid not in nt]
+
+    old_sched, new_sched = set(old.schedule), set(new.schedule)
+    d.schedule_added = [wid for wid in new.schedule if wid not in old_sched]
+    d.schedule_removed = [wid for wid in old.schedule if wid not in new_sched]
+    d.schedule_reordered = [w for w in old.schedule if w in new_sched] != [w for w in new.schedule if w in old_sched]
+    lp_old, lp_new = old.lp_creator, new.lp_creator
+    d.lp_creator = (lp_old.wallet_id if lp_old else None, lp_new.wallet_id if lp_new else None)
+    return d
@@ -0,0 +1,132 @@
+"""Compiled pydantic-core validators for the plan JSON.
+
+The plan is validated against strict ``TypedDict`` schemas (no coercion,
+unknown keys rejected) through module-level ``TypeAdapter``s, which compile
+once at import.  Validation returns plain dicts rather than model instances,
+so a 50k-wallet plan pays for the core validator and nothing else, and the
+columnar ``WalletTable`` stays the only per-wallet storage.  Every error is
+reported (``validation_errors``) as ``(json_path, message)`` pairs.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+_STRICT = ConfigDict(strict=True, extra="forbid")
+
+
+class TokenSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    total_mint: int
+    lp_tokens: int
+    name: str
+    symbol: str
+    decimals: int
+    authorities: NotRequired[Dict[str, str]]
+    uri: NotRequired[Optional[str]]
+    mint_metadata: NotRequired[Optional[str]]
+
+
+class InputsSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    B_total: float
+    T0: float
+    q_atomic: float
+    n_buys: int
+    follow_ratio: float
+    fee: float
+    mm_pct: float
+    buffer_pct: float
+    snap_lamports: NotRequired[bool]
+
+
+class DexSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    variant: str
+    program_id: str
+    pool_type: str
+    quote_mint: str
+    quote_decimals: int
+    network: NotRequired[Optional[str]]
+    deps: NotRequired[Dict[str, Any]]
+    openbook_params: NotRequired[Dict[str, Any]]
+
+
+class InvariantsSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    sum_non_seed_lamports: int
+    seed_lamports: int
+    expected_equalities: NotRequired[List[str]]
+    atomic_tokens: NotRequired[Optional[int]]
+
+
+class FundingSchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    total_lamports: Optional[int]
+    base_lamports: Optional[int]
+    buffer_lamports: Optional[int]
+    total_sol: Optional[float]
+    base_sol: Optional[float]
+    buffer_sol: Optional[float]
+
+
+class ActionSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    type: str
+    effective_base_sol: NotRequired[float]
+    min_out_tokens: NotRequired[int]
+    slippage_bps: NotRequired[int]
+    atomic: NotRequired[bool]
+    gross_base_sol: NotRequired[Optional[float]]
+    tokens_to_lp: NotRequired[Optional[int]]
+    raydium_program_id: NotRequired[Optional[str]]
+    quote_mint: NotRequired[Optional[str]]
+    pool_init_slippage_bps: NotRequired[Optional[int]]
+
+
+class WalletSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    wallet_id: str
+    role: str
+    funding: FundingSchema
+    action: NotRequired[Optional[ActionSchema]]
+    actions: NotRequired[List[ActionSchema]]
+    index: NotRequired[Optional[int]]
+    name: NotRequired[Optional[str]]
+
+
+class PlanHeaderSchema(TypedDict):
+    """Everything but ``wallets``, which is validated element by element.  Unknown top-level keys are ignored."""
+    __pydantic_config__ = ConfigDict(strict=True, extra="ignore")  # type: ignore[misc]
+    version: str
+    model: str
+    network: str
+    plan_id: str
+    created_at: str
+    token: TokenSchema
+    inputs: InputsSchema
+    dex: DexSchema
+    schedule: List[str]
+    invariants: InvariantsSchema
+    tx_defaults: Dict[str, int]
+
+
+WALLET = TypeAdapter(WalletSchema)
+WALLETS = TypeAdapter(List[WalletSchema])
+HEADER = TypeAdapter(PlanHeaderSchema)
+
+
+def json_path(prefix: str, loc: Tuple[Any, ...]) -> str:
+    return prefix + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in loc)
+
+
+def validation_errors(e: ValidationError, prefix: str = "$") -> List[Tuple[str, str]]:
+    """``(json_path, message)`` for every error in ``e``."""
+    out = []
+    for err in e.errors(include_url=False):
+        msg = "unknown field" if err["type"] == "extra_forbidden" else err["msg"]
+        out.append((json_path(prefix, err["loc"]), msg))
+    return out
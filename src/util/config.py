@@ -1,7 +1,11 @@
 from __future__ import annotations
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal, Optional, Tuple
+import re
 import yaml
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
 
 
 def load_config(path: Path | None) -> Dict[str, Any]:
@@ -11,3 +15,216 @@ def load_config(path: Path | None) -> Dict[str, Any]:
         return {}
     data = yaml.safe_load(path.read_text())
     return data or {}
+
+
+@dataclass(frozen=True)
+class ProgramIds:
+    metaplex_token_metadata: str
+    raydium_v4_amm: str
+    spl_token: str = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+
+@dataclass(frozen=True)
+class Fees:
+    slippage_bps_default: int = 50
+    compute_unit_limit: int = 1_000_000
+    compute_unit_price_micro_lamports: int = 0
+    jito_tip_lamports: int = 0
+
+
+@dataclass(frozen=True)
+class Execution:
+    timeout_sec: int = 60
+    max_retries: int = 4
+    confirm_commitment: str = "finalized"
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    buffer_events: int = 10_000
+    overflow: str = "drop"  # drop | block when the buffer is full
+    flush_events: int = 256
+    flush_interval_ms: int = 200
+
+
+WATCH_FIELDS = ("slot", "base", "quote", "price_sol_per_token", "market_cap_sol", "change_bps")
+_WHEN = re.compile(r"^\s*(\w+)\s*(>=|<=|==|>|<)\s*(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class WatchAction:
+    """Follow-up run by ``launcher.py watch`` when a tick matches ``field op value``."""
+    field: str
+    op: str
+    value: float
+    do: str = "log"  # log | exit | command
+    command: str = ""
+    repeat: bool = False  # fire on every matching tick, not just the first
+
+    @property
+    def when(self) -> str:
+        return f"{self.field} {self.op} {self.value:g}"
+
+
+@dataclass(frozen=True)
+class WatchConfig:
+    commitment: str = "confirmed"
+    idle_ms: int = 400  # emit a slot's tick after this long without updates
+    actions: Tuple[WatchAction, ...] = ()
+
+
+def _watch_action(i: int, raw: Dict[str, Any]) -> WatchAction:
+    m = _WHEN.match(raw["when"])
+    where = f"config.watch.actions.{i}.when"
+    if m is None:
+        raise ValueError(f"{where}: expected '<field> <op> <number>', got {raw['when']!r}")
+    field, op, value = m.groups()
+    if field not in WATCH_FIELDS:
+        raise ValueError(f"{where}: unknown field {field!r} (one of {', '.join(WATCH_FIELDS)})")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{where}: {value!r} is not a number") from None
+    do = raw.get("do", "log")
+    if do == "command" and not raw.get("command"):
+        raise ValueError(f"config.watch.actions.{i}.command: required when do is 'command'")
+    return WatchAction(field, op, number, do, raw.get("command", ""), raw.get("repeat", False))
+
+
+@dataclass(frozen=True)
+class LauncherConfig:
+    """Typed view of the launcher YAML (see ``configs/defaults.yaml``)."""
+    program_ids: ProgramIds
+    wrapped_sol: str
+    fees: Fees
+    execution: Execution
+    cluster: str = "mainnet-beta"
+    encrypt_wallets: bool = True
+    wallet_pass_env: str = "LAUNCHER_WALLET_PASS"
+    telemetry: TelemetryConfig = TelemetryConfig()
+    watch: WatchConfig = WatchConfig()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the raw-dict layout that ``load_config`` produces."""
+        return {
+            "cluster": self.cluster,
+            "program_ids": dict(self.program_ids.__dict__),
+            "mints": {"wrapped_sol": self.wrapped_sol},
+            "fees": dict(self.fees.__dict__),
+            "security": {"encrypt_wallets": self.encrypt_wallets, "wallet_pass_env": self.wallet_pass_env},
+            "execution": dict(self.execution.__dict__),
+            "telemetry": dict(self.telemetry.__dict__),
+            "watch": {
+                "commitment": self.watch.commitment,
+                "idle_ms": self.watch.idle_ms,
+                "actions": [
+                    {"when": a.when, "do": a.do, **({"command": a.command} if a.command else {}), "repeat": a.repeat}
+                    for a in self.watch.actions
+                ],
+            },
+        }
+
+
+_STRICT = ConfigDict(strict=True, extra="forbid")
+
+
+class _ProgramIdsSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    metaplex_token_metadata: str
+    raydium_v4_amm: str
+    spl_token: NotRequired[str]
+
+
+class _MintsSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    wrapped_sol: str
+
+
+class _FeesSchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    slippage_bps_default: int
+    compute_unit_limit: int
+    compute_unit_price_micro_lamports: int
+    jito_tip_lamports: int
+
+
+class _ExecutionSchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    timeout_sec: int
+    max_retries: int
+    confirm_commitment: str
+
+
+class _SecuritySchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    encrypt_wallets: bool
+    wallet_pass_env: str
+
+
+class _TelemetrySchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    buffer_events: int
+    overflow: Literal["drop", "block"]
+    flush_events: int
+    flush_interval_ms: int
+
+
+class _WatchActionSchema(TypedDict):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    when: str
+    do: NotRequired[Literal["log", "exit", "command"]]
+    command: NotRequired[str]
+    repeat: NotRequired[bool]
+
+
+class _WatchSchema(TypedDict, total=False):
+    __pydantic_config__ = _STRICT  # type: ignore[misc]
+    commitment: Literal["processed", "confirmed", "finalized"]
+    idle_ms: int
+    actions: List[_WatchActionSchema]
+
+
+class _ConfigSchema(TypedDict):
+    # unknown top-level sections are ignored; the known ones are strict
+    __pydantic_config__ = ConfigDict(strict=True, extra="ignore")  # type: ignore[misc]
+    cluster: NotRequired[str]
+    program_ids: _ProgramIdsSchema
+    mints: _MintsSchema
+    fees: NotRequired[Optional[_FeesSchema]]
+    execution: NotRequired[Optional[_ExecutionSchema]]
+    security: NotRequired[Optional[_SecuritySchema]]
+    telemetry: NotRequired[Optional[_TelemetrySchema]]
+    watch: NotRequired[Optional[_WatchSchema]]
+
+
+_CONFIG = TypeAdapter(_ConfigSchema)
+
+
+def parse_config(raw: Dict[str, Any]) -> LauncherConfig:
+    """Validate the raw YAML dict once and return an immutable ``LauncherConfig``.
+
+    Raises ``ValueError`` listing every problem, one ``config.<path>: <message>`` per line.
+    """
+    try:
+        c = _CONFIG.validate_python(raw)
+    except ValidationError as e:
+        lines = [f"config.{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors(include_url=False)]
+        raise ValueError("\n".join(lines)) from None
+    sec = c.get("security") or {}
+    w = c.get("watch") or {}
+    watch = WatchConfig(
+        commitment=w.get("commitment", "confirmed"),
+        idle_ms=w.get("idle_ms", 400),
+        actions=tuple(_watch_action(i, a) for i, a in enumerate(w.get("actions") or [])),
+    )
+    return LauncherConfig(
+        program_ids=ProgramIds(**c["program_ids"]),
+        wrapped_sol=c["mints"]["wrapped_sol"],
+        fees=Fees(**(c.get("fees") or {})),
+        execution=Execution(**(c.get("execution") or {})),
+        cluster=c.get("cluster", "mainnet-beta"),
+        encrypt_wallets=sec.get("encrypt_wallets", True),
+        wallet_pass_env=sec.get("wallet_pass_env", "LAUNCHER_WALLET_PASS"),
+        telemetry=TelemetryConfig(**(c.get("telemetry") or {})),
+        watch=watch,
+    )
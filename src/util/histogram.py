@@ -0,0 +1,106 @@
+"""HDR-style latency histogram with constant memory.
+
+Values (integer microseconds) land in log-linear buckets: exact below
+``SUB_BUCKETS``, then ``SUB_BUCKETS`` equal-width buckets per power of two,
+so any recorded value is reproduced within ~3% regardless of magnitude and
+a histogram never holds more than a few hundred counters.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterator, Tuple
+
+SUB_BUCKETS = 32
+_SUB_BITS = SUB_BUCKETS.bit_length()  # 6: v >> shift lands in [SUB, 2*SUB)
+
+
+def bucket_index(v: int) -> int:
+    if v < SUB_BUCKETS:
+        return max(v, 0)
+    shift = v.bit_length() - _SUB_BITS
+    return shift * SUB_BUCKETS + (v >> shift)
+
+
+def bucket_bounds(idx: int) -> Tuple[int, int]:
+    """Inclusive ``(low, high)`` microsecond range of bucket ``idx``."""
+    if idx < SUB_BUCKETS:
+        return idx, idx
+    shift = idx // SUB_BUCKETS - 1
+    m = idx - shift * SUB_BUCKETS
+    return m << shift, ((m + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    def record(self, us: float) -> None:
+        v = int(us)
+        i = bucket_index(v)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.sum_us += v
+        self.min_us = v if self.min_us is None else min(self.min_us, v)
+        self.max_us = max(self.max_us, v)
+
+    def record_ms(self, ms: float) -> None:
+        self.record(ms * 1000.0)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.count += other.count
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """``(high_us, count)`` for non-empty buckets in ascending order."""
+        for i in sorted(self.counts):
+            yield bucket_bounds(i)[1], self.counts[i]
+
+    def percentile(self, p: float) -> int:
+        """Upper bound (µs) of the bucket holding the ``p``-th percentile, capped at the max seen."""
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for high, c in self.buckets():
+            seen += c
+            if seen >= target:
+                return min(high, self.max_us)
+        return self.max_us
+
+    def cumulative_at(self, bound_us: int) -> int:
+        """Number of values ``<= bound_us`` (bucket resolution)."""
+        return sum(c for high, c in self.buckets() if high <= bound_us)
+
+    def summary(self) -> Dict[str, float]:
+        ms = lambda us: round(us / 1000.0, 3)  # noqa: E731
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max_us),
+            "mean_ms": ms(self.sum_us / self.count) if self.count else 0.0,
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"count": self.count, "sum_us": self.sum_us, "min_us": self.min_us, "max_us": self.max_us, "buckets": {str(i): c for i, c in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, object]) -> "LatencyHistogram":
+        h = cls()
+        h.counts = {int(i): int(c) for i, c in (d.get("buckets") or {}).items()}  # type: ignore[union-attr]
+        h.count = int(d.get("count") or 0)  # type: ignore[arg-type]
+        h.sum_us = int(d.get("sum_us") or 0)  # type: ignore[arg-type]
+        h.min_us = d.get("min_us")  # type: ignore[assignment]
+        h.max_us = int(d.get("max_us") or 0)  # type: ignore[arg-type]
+        return h
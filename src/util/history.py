@@ -0,0 +1,275 @@
+"""SQLite launch-history store.
+
+One database holds any number of launches, so cross-launch questions
+("which wallets never got a confirmed buy last week?") are indexed queries
+instead of globbing state directories.  ``SqliteState`` implements the
+``State`` interface on top of it, and ``import_state_dir`` loads existing
+JSON state directories.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+import orjson
+
+from src.util.state import JOURNAL, StepReceipt, _replay, _write_atomic
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS launches (
+    id INTEGER PRIMARY KEY,
+    out_dir TEXT NOT NULL UNIQUE,
+    plan_hash TEXT,
+    plan_id TEXT,
+    created_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS launches_plan_hash ON launches(plan_hash);
+CREATE INDEX IF NOT EXISTS launches_created ON launches(created_ms);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (launch_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS steps (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    step TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    plan_hash TEXT,
+    created_ms INTEGER,
+    receipt TEXT NOT NULL,
+    PRIMARY KEY (launch_id, step)
+);
+CREATE INDEX IF NOT EXISTS steps_plan_hash ON steps(plan_hash);
+
+CREATE TABLE IF NOT EXISTS wallets (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    wallet_id TEXT NOT NULL,
+    pubkey TEXT NOT NULL,
+    is_buyer INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (launch_id, wallet_id)
+);
+CREATE INDEX IF NOT EXISTS wallets_pubkey ON wallets(pubkey);
+
+CREATE TABLE IF NOT EXISTS signatures (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    step TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sig TEXT,
+    status TEXT,
+    sent_ms INTEGER,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (launch_id, step, key)
+);
+CREATE INDEX IF NOT EXISTS signatures_sig ON signatures(sig);
+
+CREATE TABLE IF NOT EXISTS events (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    ts_ms INTEGER,
+    event TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_launch_event ON events(launch_id, event);
+"""
+
+
+def connect(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30.0, isolation_level=None, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")  # tx records must be durable before the send
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _dumps(v: Any) -> str:
+    return orjson.dumps(v).decode()
+
+
+class SqliteState:
+    """``State`` backed by a shared history database instead of per-run files.
+
+    The launch is keyed by its resolved ``out_dir``, so ``--resume`` against
+    the same directory and database picks up where it left off.  Every change
+    is a single-row upsert.  ``close()`` still writes ``artifacts.json`` into
+    ``out_dir`` for ``verify``/``preflight``.
+
+    Telemetry events arrive on the telemetry writer thread, so
+    ``record_events`` has its own connection: transactions on the two
+    connections never interleave, and WAL plus the busy timeout serialise
+    their writes.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        out_dir: Path,
+        plan_hash: str | None = None,
+        plan_id: str | None = None,
+        buyers: Iterable[str] = (),
+        export: bool = True,
+    ):
+        self.dir = out_dir
+        self.buyers = set(buyers)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.artifacts_path = self.dir / "artifacts.json"
+        self.export = export
+        self.conn = connect(db_path)
+        # only used under Telemetry's I/O lock, from whichever thread drains
+        self.events_conn = connect(db_path, check_same_thread=False)
+        key = str(out_dir.resolve())
+        self.conn.execute(
+            "INSERT INTO launches(out_dir, plan_hash, plan_id, created_ms) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(out_dir) DO UPDATE SET plan_hash=COALESCE(excluded.plan_hash, plan_hash), plan_id=COALESCE(excluded.plan_id, plan_id)",
+            (key, plan_hash, plan_id, int(time.time() * 1000)),
+        )
+        self.launch_id: int = self.conn.execute("SELECT id FROM launches WHERE out_dir = ?", (key,)).fetchone()[0]
+        q = lambda sql: self.conn.execute(sql, (self.launch_id,)).fetchall()  # noqa: E731
+        self.artifacts: Dict[str, Any] = {k: orjson.loads(v) for k, v in q("SELECT key, value FROM artifacts WHERE launch_id = ?")}
+        self.checkpoints: Dict[str, Any] = {"done": [s for (s,) in q("SELECT step FROM steps WHERE launch_id = ? ORDER BY rowid")], "txs": {}}
+        for step, k, fields in q("SELECT step, key, fields FROM signatures WHERE launch_id = ?"):
+            self.checkpoints["txs"].setdefault(step, {})[k] = orjson.loads(fields)
+
+    def done(self, step: str) -> bool:
+        return step in self.checkpoints["done"]
+
+    def mark(self, step: str, receipt: StepReceipt) -> None:
+        if step not in self.checkpoints["done"]:
+            self.checkpoints["done"].append(step)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO steps(launch_id, step, ok, plan_hash, created_ms, receipt) VALUES (?, ?, ?, ?, ?, ?)",
+            (self.launch_id, step, int(receipt.ok), receipt.plan_hash, receipt.created_ms, _dumps(asdict(receipt))),
+        )
+
+    def merge_artifacts(self, patch: Dict[str, Any]) -> None:
+        patch = patch or {}
+        self.artifacts.update(patch)
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO artifacts(launch_id, key, value) VALUES (?, ?, ?)",
+                [(self.launch_id, k, _dumps(v)) for k, v in patch.items()],
+            )
+            wallets = patch.get("wallets")
+            if isinstance(wallets, dict):
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO wallets(launch_id, wallet_id, pubkey, is_buyer) VALUES (?, ?, ?, ?)",
+                    [(self.launch_id, wid, info["pub"], int(wid in self.buyers)) for wid, info in wallets.items() if info.get("pub")],
+                )
+
+    def load_receipt(self, step: str) -> Dict[str, Any] | None:
+        row = self.conn.execute("SELECT receipt FROM steps WHERE launch_id = ? AND step = ?", (self.launch_id, step)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    @property
+    def txs(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return self.checkpoints["txs"]
+
+    def record_tx(self, step: str, key: str, **fields: Any) -> None:
+        entry = self.txs.setdefault(step, {}).setdefault(key, {})
+        entry.update(fields)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures(launch_id, step, key, sig, status, sent_ms, fields) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.launch_id, step, key, entry.get("sig"), entry.get("status"), entry.get("sent_ms"), _dumps(entry)),
+        )
+
+    def record_events(self, events: List[Dict[str, Any]]) -> None:
+        """Append telemetry events (called from the telemetry writer thread)."""
+        with self.events_conn:
+            self.events_conn.execute("BEGIN")
+            self.events_conn.executemany(
+                "INSERT INTO events(launch_id, ts_ms, event, data) VALUES (?, ?, ?, ?)",
+                [(self.launch_id, e.get("ts_ms"), e.get("event"), _dumps(e)) for e in events],
+            )
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return True  # every statement is committed as it runs
+
+    def close(self) -> None:
+        if self.export:
+            _write_atomic(self.artifacts_path, orjson.dumps(self.artifacts, option=orjson.OPT_INDENT_2))
+        self.events_conn.close()
+        self.conn.close()
+
+
+def import_state_dir(db_path: Path, out_dir: Path) -> int:
+    """Load a JSON state directory (snapshots, journal, receipts, telemetry) into the database.
+
+    Re-importing a directory replaces its earlier import.  Returns the launch id.
+    """
+    checkpoints, artifacts, journal_receipts, _seq, _ = _replay(out_dir)
+    receipts = {p.stem: orjson.loads(p.read_bytes()) for p in sorted((out_dir / "receipts").glob("*.json"))}
+    receipts.update(journal_receipts)
+    plan_hash = next((r.get("plan_hash") for r in receipts.values() if r.get("plan_hash")), None)
+    plan_id, buyers = None, set()
+    if (out_dir / "plan.json").exists():
+        plan = orjson.loads((out_dir / "plan.json").read_bytes())
+        plan_id = plan.get("plan_id")
+        buyers = {w["wallet_id"] for w in plan.get("wallets", []) if ((w.get("action") or {}).get("type") or "").startswith("SWAP_BUY")}
+    st = SqliteState(db_path, out_dir, plan_hash=plan_hash, plan_id=plan_id, buyers=buyers, export=False)
+    for table in ("artifacts", "steps", "wallets", "signatures", "events"):
+        st.conn.execute(f"DELETE FROM {table} WHERE launch_id = ?", (st.launch_id,))
+    if (out_dir / "verify.json").exists():
+        artifacts = {**artifacts, "verify": orjson.loads((out_dir / "verify.json").read_bytes())}
+    st.merge_artifacts(artifacts)
+    for step in checkpoints.get("done", []):
+        if step in receipts:
+            st.mark(step, StepReceipt(**receipts[step]))
+    txs = checkpoints.get("txs") or {}
+    # runs from before per-transaction journaling: their recorded sigs were confirmed
+    for step in ("funding", "buys"):
+        if step in txs:
+            continue
+        rows = (artifacts.get(step) or {}).get("funded" if step == "funding" else "swaps", [])
+        txs[step] = {r["wallet_id"]: {"status": "confirmed", "sig": r["sig"]} for r in rows if r.get("sig")}
+    with st.conn:
+        st.conn.execute("BEGIN")
+        for step, entries in txs.items():
+            for k, fields in entries.items():
+                st.record_tx(step, k, **fields)
+    tel = out_dir / "telemetry.ndjson"
+    if tel.exists():
+        st.record_events([orjson.loads(line) for line in tel.read_bytes().splitlines() if line.strip()])
+    launch_id = st.launch_id
+    st.close()
+    return launch_id
+
+
+def unbought_wallets(db_path: Path, since_ms: int | None = None) -> List[Dict[str, Any]]:
+    """Buyer wallets (any launch created since ``since_ms``) without a confirmed buy signature."""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT l.out_dir, l.plan_hash, w.wallet_id, w.pubkey
+            FROM wallets w JOIN launches l ON l.id = w.launch_id
+            WHERE l.created_ms >= ? AND w.is_buyer = 1
+              AND NOT EXISTS (SELECT 1 FROM signatures s WHERE s.launch_id = w.launch_id AND s.step = 'buys'
+                              AND s.key = w.wallet_id AND s.status = 'confirmed')
+            ORDER BY l.created_ms, w.wallet_id
+            """,
+            (since_ms or 0,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [{"out_dir": d, "plan_hash": h, "wallet_id": wid, "pubkey": pk} for d, h, wid, pk in rows]
+
+
+def _is_state_dir(d: Path) -> bool:
+    return any((d / n).exists() for n in ("artifacts.json", "checkpoints.json", JOURNAL))
+
+
+def import_dirs(db_path: Path, paths: Iterable[Path]) -> List[int]:
+    """Import each state directory in ``paths``; other directories are scanned one level down
+    (so a ``run-batch`` root imports every launch in it)."""
+    out = []
+    for p in paths:
+        for d in ([p] if _is_state_dir(p) else sorted(c for c in p.iterdir() if c.is_dir() and _is_state_dir(c))):
+            out.append(import_state_dir(db_path, d))
+    return out
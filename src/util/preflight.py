@@ -1,82 +1,203 @@
+"""Preflight: build every transaction a run would send and simulate them all.
+
+Funding transfers, the mint (optionally with fused metadata), metadata, the
+prewarm batches, ``initialize2`` and every scheduled buy are built with the
+same builders the steps use, then simulated concurrently under a semaphore
+against one recent blockhash.  Each transaction gets a row with its compute
+units, serialized size, log errors and fee estimate; program IDs are checked
+with one bulk account read.
+
+Simulations run against the current chain state, so on a fresh launch the
+transactions that use accounts created earlier in the run (the pool and the
+buys need the mint, the buys need the pool) fail with missing accounts.  The
+same transactions are therefore also rehearsed in order on a local ledger
+fork (``src.util.rehearsal``), reported under ``rehearsal``.
+"""
+
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any
-import json
+from typing import Dict, Any, List, Tuple
+import asyncio
+import time
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
 from solana.transaction import Transaction
 from src.util.planhash import sha256_file
+from src.util.config import LauncherConfig, parse_config
+from src.util.state import load_artifacts
 from src.core.solana import Rpc
-from src.core.tx import with_compute_budget
+from src.core.tx import PACKET_DATA_SIZE, estimate_fee, legacy_tx_size
+from src.core.keys import pubkey_str
 from src.core.metaplex import build_create_metadata_v3
-from src.dex.raydium_v4 import derive_pool_accounts, build_initialize2
+from src.exec import funding, metadata, minting, pool_init, prewarm, swaps
+from src.exec.context import RunContext, build_context
+from src.util import rehearsal
 
+SIM_CONCURRENCY = 16
 
-async def preflight(rpc: Rpc, plan_path: Path, cfg: Dict[str, Any], plan) -> Dict[str, Any]:
-    plan_hash = sha256_file(plan_path)
-    program_checks: Dict[str, Any] = {}
-
-    # Ensure referenced program IDs exist
-    for k, v in (cfg.get("program_ids") or {}).items():
-        if not v:
-            continue
-        program_checks[k] = bool(await rpc.account_exists(v))
-
-    # Determine base mint for simulation
-    base_mint = None
-    art_path = Path("state") / "artifacts.json"
-    if art_path.exists():
-        try:
-            art = json.loads(art_path.read_text())
-            base_mint = art.get("mint", {}).get("mint")
-        except Exception:
-            base_mint = None
-    if not base_mint:
-        base_mint = "PREVIEW_" + plan.plan_id
-
-    # Simulate creation of a metadata account using plan details
-    meta_prog = cfg["program_ids"]["metaplex_token_metadata"]
-    tx1 = Transaction()
-    tx1 = with_compute_budget(
-        tx1,
-        cfg["fees"]["compute_unit_limit"],
-        cfg["fees"]["compute_unit_price_micro_lamports"],
-    )
-    tx1.add(
-        build_create_metadata_v3(
-            metadata_program=meta_prog,
-            mint=base_mint,
-            mint_authority=str(plan.dex.program_id),
-            payer=str(plan.dex.program_id),
-            update_authority=str(plan.dex.program_id),
+
+def _log_errors(logs: List[str]) -> List[str]:
+    return [line for line in logs if "failed" in line or "Error" in line or "error:" in line]
+
+
+def build_transactions(
+    plan,
+    ctx: RunContext,
+    seed_pub: str,
+    wallets: Dict[str, str],
+    fuse_metadata: bool = False,
+) -> List[Tuple[str, str, str, Transaction]]:
+    """``(kind, key, fee payer, unsigned tx)`` for everything a full run sends, in run order.
+
+    ``wallets`` maps wallet id -> pubkey for every wallet in the plan.
+    """
+    out: List[Tuple[str, str, str, Transaction]] = []
+    cu, price = ctx.cu_limit, ctx.cu_price_micro
+    for w in plan.wallets:
+        if w.role != "SEED":
+            out.append(("funding", w.wallet_id, seed_pub, funding.build_transfer_tx(seed_pub, wallets[w.wallet_id], w.funding.total_lamports, cu, price)))
+
+    lp = plan.lp_creator
+    lp_pub = wallets[lp.wallet_id] if lp is not None else seed_pub
+    md_ix = None
+    if fuse_metadata:
+        md_ix = build_create_metadata_v3(
+            metadata_program=ctx.metadata_program,
+            metadata_pda=ctx.metadata_pda,
+            mint=ctx.mint,
+            mint_authority=lp_pub,
+            payer=seed_pub,
+            update_authority=seed_pub,
             name=plan.token.name,
             symbol=plan.token.symbol,
-            uri=plan.token.uri,
+            uri=plan.token.uri or "",
         )
-    )
-    sim_md = await rpc.simulate(tx1)
-
-    # Simulate Raydium pool initialisation
-    rpid = cfg["program_ids"]["raydium_v4_amm"]
-    wsol = cfg["mints"]["wrapped_sol"]
-    acc = derive_pool_accounts(base_mint, wsol, rpid)
-    tx2 = Transaction()
-    tx2 = with_compute_budget(
-        tx2,
-        cfg["fees"]["compute_unit_limit"],
-        cfg["fees"]["compute_unit_price_micro_lamports"],
-    )
-    for ix in build_initialize2(
-        rpid,
-        base_mint=base_mint,
-        quote_mint=wsol,
-        lp_creator_pub=str(plan.dex.program_id),
-        tokens_to_lp=plan.token.lp_tokens,
-    ):
-        tx2.add(ix)
-    sim_init = await rpc.simulate(tx2)
-
-    simulate_md_ok = sim_md.get("err") is None
-    simulate_init_ok = sim_init.get("err") is None
-    ok = all(program_checks.values()) and simulate_md_ok and simulate_init_ok
+    _ata, mint_tx = minting.build_tx(seed_pub, ctx.mint, lp_pub, plan.token.decimals, plan.token.lp_tokens, cu, price, md_ix)
+    out.append(("mint", ctx.mint, seed_pub, mint_tx))
+    if md_ix is None:
+        md_tx = metadata.build_tx(ctx.metadata_program, ctx.mint, lp_pub, seed_pub, seed_pub, plan.token.name, plan.token.symbol, plan.token.uri, cu, price, ctx.metadata_pda)
+        out.append(("metadata", ctx.metadata_pda, seed_pub, md_tx))
+
+    pending = swaps.pending_buys(plan, {})
+    buyers = list(dict.fromkeys(w.wallet_id for _order, w in pending))
+    for i in range(0, len(buyers), prewarm.BUYERS_PER_TX):
+        batch = buyers[i:i + prewarm.BUYERS_PER_TX]
+        ixs = [prewarm.buyer_instructions(seed_pub, wallets[wid], ctx.mint, ctx.wsol, swaps.buy_lamports(plan.wallet(wid).action)) for wid in batch]
+        out.append(("prewarm", ",".join(batch), seed_pub, prewarm.build_batch_tx(ixs, cu, price)))
+
+    out.append(("pool", ctx.pool.pool, lp_pub, pool_init.build_tx(ctx.amm_program, ctx.mint, ctx.wsol, plan.token.lp_tokens, lp_pub, cu, price, ctx.pool)))
+    for _order, w in pending:
+        pub = wallets[w.wallet_id]
+        out.append(("buy", w.wallet_id, pub, swaps.build_buy_tx(ctx.amm_program, ctx.pool, pub, w.action, cu, price)))
+    return out
+
+
+def _summary(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        s = out.setdefault(r["kind"], {"count": 0, "failed": 0, "units_max": 0, "size_max": 0, "fee_lamports": 0})
+        s["count"] += 1
+        s["failed"] += not r["ok"]
+        s["units_max"] = max(s["units_max"], r["units_consumed"] or 0)
+        s["size_max"] = max(s["size_max"], r["size_bytes"])
+        s["fee_lamports"] += r["fee_lamports"]
+    return out
+
+
+async def preflight(
+    rpc: Rpc,
+    plan_path: Path,
+    cfg: Dict[str, Any] | LauncherConfig,
+    plan,
+    ctx: RunContext | None = None,
+    out_dir: Path = Path("state"),
+    seed_pub: str | None = None,
+    concurrency: int = SIM_CONCURRENCY,
+    fuse_metadata: bool = False,
+) -> Dict[str, Any]:
+    """Check program IDs and simulate every transaction of the run.
+
+    Addresses come from the run's state in ``out_dir`` (snapshot plus
+    journal) when a run already created them (mint, wallets); the rest are fresh preview keys, listed under
+    ``preview_keys``.
+    """
+    t0 = time.perf_counter()
+    plan_hash = sha256_file(plan_path)
+    config = ctx.config if ctx else cfg if isinstance(cfg, LauncherConfig) else parse_config(cfg)
+    art = load_artifacts(out_dir)
+    preview: List[str] = []
+
+    if ctx is None:
+        base_mint = (art.get("mint") or {}).get("mint") or (art.get("mint_keypair") or {}).get("pub")
+        if not base_mint:
+            base_mint = pubkey_str(Keypair())
+            preview.append("mint")
+        ctx = build_context(config, base_mint)
+    if seed_pub is None:
+        seed_pub = pubkey_str(Keypair())
+        preview.append("seed")
+    recorded = art.get("wallets") or {}
+    wallets: Dict[str, str] = {}
+    previewed = 0
+    for w in plan.wallets:
+        pub = (recorded.get(w.wallet_id) or {}).get("pub")
+        if pub is None and w.role == "SEED":
+            pub = seed_pub
+        elif pub is None:
+            pub = pubkey_str(Keypair())
+            previewed += 1
+        wallets[w.wallet_id] = pub
+    if previewed:
+        preview.append(f"wallets ({previewed})")
+
+    # Ensure referenced program IDs exist (one bulk read)
+    programs = {k: v for k, v in vars(config.program_ids).items() if v}
+    infos = await rpc.get_multiple_accounts(list(programs.values())) if programs else []
+    program_checks: Dict[str, Any] = {k: info is not None for k, info in zip(programs, infos)}
+
+    txs = build_transactions(plan, ctx, seed_pub, wallets, fuse_metadata)
+    blockhash = await rpc.recent_blockhash()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _simulate(kind: str, key: str, payer: str, tx: Transaction) -> Dict[str, Any]:
+        size = legacy_tx_size(tx, payer)
+        row: Dict[str, Any] = {
+            "kind": kind,
+            "key": key,
+            "ok": False,
+            "err": None,
+            "units_consumed": None,
+            "size_bytes": size,
+            "too_large": size > PACKET_DATA_SIZE,
+            "fee_lamports": estimate_fee(tx, payer, ctx.cu_limit, ctx.cu_price_micro),
+            "log_errors": [],
+        }
+        if row["too_large"]:
+            row["err"] = f"transaction is {size} bytes, over the {PACKET_DATA_SIZE}-byte packet limit"
+            return row
+        tx.recent_blockhash = blockhash
+        tx.fee_payer = Pubkey.from_string(payer)
+        async with sem:
+            try:
+                sim = await rpc.simulate(tx)
+            except Exception as e:
+                row["err"] = f"{type(e).__name__}: {e}"
+                return row
+        err = sim.get("err")
+        row.update(
+            ok=err is None,
+            err=None if err is None else str(err),
+            units_consumed=sim.get("units_consumed"),
+            log_errors=_log_errors(sim.get("logs") or []),
+        )
+        return row
+
+    rows = list(await asyncio.gather(*(_simulate(*t) for t in txs)))
+    by_kind = {r["kind"]: r for r in rows if r["kind"] in ("mint", "metadata", "pool")}
+    simulate_md_ok = by_kind["mint" if fuse_metadata else "metadata"]["ok"]
+    simulate_init_ok = by_kind["pool"]["ok"]
+    ok = all(program_checks.values()) and all(r["ok"] for r in rows)
+    rehearsed = await rehearsal.rehearse(rpc, plan, ctx, seed_pub, wallets, txs)
 
     return {
         "plan_hash": plan_hash,
@@ -84,4 +205,11 @@ async def preflight(rpc: Rpc, plan_path: Path, cfg: Dict[str, Any], plan) -> Dic
         "simulate_metadata_ok": simulate_md_ok,
         "simulate_init_ok": simulate_init_ok,
         "ok": ok,
+        "preview_keys": preview,
+        "summary": _summary(rows),
+        "fees_total_lamports": sum(r["fee_lamports"] for r in rows),
+        "rehearsal_ok": rehearsed["ok"],
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "transactions": rows,
+        "rehearsal": rehearsed,
     }
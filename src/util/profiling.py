@@ -0,0 +1,167 @@
+"""Sampling profiler for ``--profile`` runs.
+
+A background thread samples the event-loop thread's Python stack every few
+milliseconds (``sys._current_frames``), so it costs the same whether the run
+is CPU-bound or waiting on RPC.  Each sample is one of:
+
+* busy in an orchestrator step: a function marked ``@step_frame`` is on the
+  stack, and its first argument names the step;
+* busy outside any step (planning, setup, ``preflight``/``verify`` work);
+* I/O wait: the loop is parked in ``selector.select`` with nothing runnable.
+
+A coroutine task measures event-loop lag (how late a timer fires), which
+shows CPU work blocking the loop even where samples are too coarse to.
+Output goes to ``profile-<command>.collapsed`` (one ``frame;frame;... count``
+line per stack, for flamegraph.pl / speedscope) and ``profile-<command>.json``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, TypeVar
+
+from src.util.histogram import LatencyHistogram
+
+T = TypeVar("T")
+
+SAMPLE_INTERVAL_SEC = 0.005
+LAG_INTERVAL_SEC = 0.05
+TOP_FUNCTIONS = 20
+IO_WAIT = "[io-wait]"
+NO_STEP = "[main]"
+
+_STEP_CODES: set[CodeType] = set()
+
+
+def step_frame(fn: Callable[..., T]) -> Callable[..., T]:
+    """Mark ``fn`` as a step boundary: samples under it are charged to its first argument."""
+    _STEP_CODES.add(fn.__code__)
+    return fn
+
+
+def _label(code: CodeType) -> str:
+    path = code.co_filename
+    try:
+        path = os.path.relpath(path)
+    except ValueError:
+        pass
+    if path.startswith(".."):
+        path = os.path.basename(path)
+    return f"{path}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _is_idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    return code.co_name == "select" and code.co_filename.endswith("selectors.py")
+
+
+class Profiler:
+    def __init__(self, thread_id: int, interval_sec: float = SAMPLE_INTERVAL_SEC):
+        self.thread_id = thread_id
+        self.interval_sec = interval_sec
+        self.stacks: Dict[str, int] = {}
+        self.self_counts: Dict[str, int] = {}
+        self.step_counts: Dict[str, int] = {}
+        self.idle = 0
+        self.samples = 0
+        self.loop_lag = LatencyHistogram()
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sampler, name="profiler", daemon=True)
+        self.t0 = self.t1 = 0.0
+
+    def start(self) -> None:
+        self.t0 = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.t1 = time.perf_counter()
+
+    def _sampler(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame: FrameType) -> None:
+        idle = _is_idle(frame)
+        step = None
+        codes: List[CodeType] = []
+        f: FrameType | None = frame
+        while f is not None:
+            code = f.f_code
+            codes.append(code)
+            if step is None and code in _STEP_CODES and code.co_varnames:
+                step = str(f.f_locals.get(code.co_varnames[0]))
+            f = f.f_back
+        labels = self._labels
+        names = [labels.get(c) or labels.setdefault(c, _label(c)) for c in reversed(codes)]
+        root = IO_WAIT if idle else f"[step:{step}]" if step else NO_STEP
+        key = ";".join([root, *names])
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+        self.samples += 1
+        if idle:
+            self.idle += 1
+            return
+        self.self_counts[names[-1]] = self.self_counts.get(names[-1], 0) + 1
+        s = step or NO_STEP
+        self.step_counts[s] = self.step_counts.get(s, 0) + 1
+
+    async def watch_loop(self, interval_sec: float = LAG_INTERVAL_SEC) -> None:
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(interval_sec)
+            self.loop_lag.record((time.perf_counter() - t - interval_sec) * 1_000_000)
+
+    def summary(self, command: str) -> Dict[str, Any]:
+        # samples are scaled to the measured wall time, not interval * n:
+        # the sampler thread runs late whenever the loop holds the GIL
+        wall_ms = (self.t1 - self.t0) * 1000.0
+        per = wall_ms / self.samples if self.samples else 0.0
+        busy = self.samples - self.idle
+        top = sorted(self.self_counts.items(), key=lambda kv: -kv[1])[:TOP_FUNCTIONS]
+        return {
+            "command": command,
+            "wall_ms": round(wall_ms, 3),
+            "samples": self.samples,
+            "busy_ms": round(busy * per, 3),
+            "io_wait_ms": round(self.idle * per, 3),
+            "steps_busy_ms": {s: round(c * per, 3) for s, c in sorted(self.step_counts.items(), key=lambda kv: -kv[1])},
+            "loop_lag": self.loop_lag.summary(),
+            "top_self": [{"function": fn, "self_ms": round(c * per, 3), "pct_busy": round(100.0 * c / busy, 1)} for fn, c in top],
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{k} {c}\n" for k, c in sorted(self.stacks.items()))
+
+    def write(self, out_dir: Path, command: str) -> Dict[str, Any]:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        summary = self.summary(command)
+        (out_dir / f"profile-{command}.collapsed").write_text(self.collapsed())
+        (out_dir / f"profile-{command}.json").write_text(json.dumps(summary, indent=2))
+        return summary
+
+
+async def profiled(aw: Awaitable[T], out_dir: Path, command: str, interval_sec: float = SAMPLE_INTERVAL_SEC) -> Tuple[T, Dict[str, Any]]:
+    """Await ``aw`` under the profiler; profile files are written even if it raises."""
+    prof = Profiler(threading.get_ident(), interval_sec)
+    lag = asyncio.ensure_future(prof.watch_loop())
+    await asyncio.sleep(0)  # arm the lag timer before ``aw`` can hold the loop
+    prof.start()
+    try:
+        result = await aw
+    finally:
+        prof.stop()
+        lag.cancel()
+        await asyncio.gather(lag, return_exceptions=True)
+        summary = prof.write(out_dir, command)
+    return result, summary
@@ -0,0 +1,106 @@
+"""Whole-launch dress rehearsal on a local ledger fork.
+
+Per-transaction simulation runs every transaction against today's chain, so
+it cannot see what earlier transactions of the same launch create (the pool
+the buys trade against, the mint the pool deposits).  ``rehearse`` snapshots
+the launch's accounts once (one bulk read), then applies the run's
+transactions in order to a ``Ledger`` and reports, after each step, the
+failures, fees, seed balance, pool reserves and the balances of the wallets
+the step touched.
+"""
+
+from __future__ import annotations
+
+import time
+from itertools import groupby
+from typing import Any, Dict, List, Tuple
+
+from src.core.ata import ata
+from src.core.ledger import Ledger, LedgerError
+from src.exec.context import RunContext
+
+Built = Tuple[str, str, str, Any]  # (kind, key, fee payer, tx) as from preflight.build_transactions
+
+
+def launch_accounts(plan, ctx: RunContext, seed_pub: str, wallets: Dict[str, str]) -> List[str]:
+    """Every account the launch reads or writes, for the snapshot."""
+    out = [seed_pub, ctx.mint, ctx.metadata_pda, ctx.pool.pool, ctx.pool.vault_base, ctx.pool.vault_quote]
+    for pub in wallets.values():
+        out += [pub, ata(ctx.mint, pub), ata(ctx.wsol, pub)]
+    return out
+
+
+def _balances(ledger: Ledger, ctx: RunContext, wallets: Dict[str, str], wids) -> Dict[str, Dict[str, int]]:
+    return {
+        wid: {
+            "lamports": ledger.lamports(wallets[wid]),
+            "base": ledger.token_amount(ata(ctx.mint, wallets[wid])),
+            "wsol": ledger.token_amount(ata(ctx.wsol, wallets[wid])),
+        }
+        for wid in wids
+    }
+
+
+def _reserves(ledger: Ledger, ctx: RunContext, decimals: int) -> Dict[str, Any] | None:
+    r = ledger.reserves(ctx.pool.pool)
+    if r is None:
+        return None
+    price = (r["quote"] / 1e9) / (r["base"] / 10 ** decimals) if r["base"] else None
+    return {**r, "price_sol_per_token": price}
+
+
+def run(ledger: Ledger, plan, ctx: RunContext, seed_pub: str, wallets: Dict[str, str], txs: List[Built]) -> Dict[str, Any]:
+    """Apply ``txs`` in order to ``ledger``; one report row per step (run of same-kind transactions)."""
+    t0 = time.perf_counter()
+    lp = plan.lp_creator
+    steps: List[Dict[str, Any]] = []
+    for kind, group in groupby(txs, key=lambda t: t[0]):
+        failed: List[Dict[str, str]] = []
+        fees = 0
+        touched: Dict[str, None] = {}
+        count = 0
+        for _kind, tx_key, payer, tx in group:
+            count += 1
+            try:
+                fees += ledger.apply(tx, payer, ctx.cu_limit, ctx.cu_price_micro)
+            except LedgerError as e:
+                failed.append({"key": tx_key, "err": str(e)})
+            if kind in ("funding", "prewarm", "buy"):
+                touched.update(dict.fromkeys(tx_key.split(",")))
+            elif lp is not None:
+                touched[lp.wallet_id] = None
+        steps.append({
+            "step": kind,
+            "txs": count,
+            "failed": failed,
+            "fees_lamports": fees,
+            "seed_lamports": ledger.lamports(seed_pub),
+            "reserves": _reserves(ledger, ctx, plan.token.decimals),
+            "balances": _balances(ledger, ctx, wallets, touched),
+        })
+    return {
+        "ok": not any(s["failed"] for s in steps),
+        "steps": steps,
+        "final": {
+            "reserves": _reserves(ledger, ctx, plan.token.decimals),
+            "balances": _balances(ledger, ctx, wallets, wallets),
+        },
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def new_ledger(plan, ctx: RunContext) -> Ledger:
+    """An empty fork for ``ctx``'s programs; the pool's SOL side is the plan's ``inputs.q_atomic``."""
+    return Ledger(ctx.amm_program, ctx.metadata_program, ctx.wsol, init_quote_lamports=int(plan.inputs.q_atomic))
+
+
+async def rehearse(rpc: Any, plan, ctx: RunContext, seed_pub: str, wallets: Dict[str, str], txs: List[Built]) -> Dict[str, Any]:
+    """Snapshot the launch's accounts from ``rpc`` and rehearse ``txs`` on the fork."""
+    ledger = new_ledger(plan, ctx)
+    t0 = time.perf_counter()
+    await ledger.load(rpc, launch_accounts(plan, ctx, seed_pub, wallets))
+    p = ctx.pool
+    ledger.link_pool(p.pool, p.base_mint, p.quote_mint, p.vault_base, p.vault_quote)
+    out = run(ledger, plan, ctx, seed_pub, wallets, txs)
+    out["snapshot_ms"] = round((time.perf_counter() - t0) * 1000 - out["elapsed_ms"], 1)
+    return out
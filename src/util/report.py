@@ -0,0 +1,164 @@
+"""Latency and landing report over ``telemetry.ndjson`` files.
+
+Files are read one line at a time and every statistic is folded into a
+``LatencyHistogram`` as it streams past, so memory stays flat no matter how
+large the telemetry from a batch run gets.  Reported metrics, all in ms:
+
+* ``rpc.<method>`` / ``step.<name>``: span durations.
+* ``send_to_confirm.<step>``: ``tx.land`` spans (submit until confirmed).
+* ``time_to_first_buy``: pool landing to the first landed buy, per run.
+* ``buy_interarrival``: gaps between consecutive landed buys, per run.
+
+A run ends at its ``latency_histograms`` event; a resumed launch appending to
+the same file starts a new one.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import orjson
+
+from src.util.histogram import LatencyHistogram
+
+TELEMETRY_FILE = "telemetry.ndjson"
+SECTIONS = ("rpc", "step", "send_to_confirm", "buys")
+
+
+def telemetry_files(paths: Iterable[Path]) -> List[Path]:
+    """Expand directories (searched recursively, e.g. a run-batch root) into telemetry files."""
+    out: List[Path] = []
+    for p in paths:
+        if p.is_dir():
+            out.extend(sorted(p.rglob(TELEMETRY_FILE)))
+        elif p.exists():
+            out.append(p)
+        else:
+            raise ValueError(f"no such telemetry file or directory: {p}")
+    return out
+
+
+def iter_events(path: Path) -> Iterator[dict | None]:
+    """Events in ``path``; ``None`` for a line that does not parse (e.g. a torn tail)."""
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                ev = orjson.loads(line)
+            except ValueError:
+                yield None
+                continue
+            yield ev if isinstance(ev, dict) else None
+
+
+class _Run:
+    """Landing times (ms since run start) for the run being streamed."""
+
+    def __init__(self) -> None:
+        self.seen = False
+        self.pool_end: float | None = None
+        self.first_buy: float | None = None
+        self.last_buy: float | None = None
+
+
+class Report:
+    def __init__(self) -> None:
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.files = 0
+        self.runs = 0
+        self.events = 0
+        self.bad_lines = 0
+        self._run = _Run()
+
+    def _record(self, key: str, ms: float) -> None:
+        self.histograms.setdefault(key, LatencyHistogram()).record_ms(max(ms, 0.0))
+
+    def add_file(self, path: Path) -> None:
+        self.files += 1
+        self._run = _Run()
+        for ev in iter_events(path):
+            if ev is None:
+                self.bad_lines += 1
+                continue
+            self.events += 1
+            self.add_event(ev)
+        self._end_run()
+
+    def add_event(self, ev: dict) -> None:
+        kind = ev.get("event")
+        if kind == "latency_histograms":
+            self._end_run()
+            return
+        self._run.seen = True
+        if kind != "span":
+            return
+        name = str(ev.get("name", ""))
+        dur = float(ev.get("dur_ms") or 0.0)
+        if name.startswith(("rpc.", "step.")):
+            self._record(name, dur)
+        elif name == "tx.land" and "error" not in ev:
+            step = ev.get("step") or "unknown"
+            self._record(f"send_to_confirm.{step}", dur)
+            self._landed(step, float(ev.get("start_ms") or 0.0) + dur)
+
+    def _landed(self, step: str, end_ms: float) -> None:
+        run = self._run
+        if step == "lp_init":
+            run.pool_end = end_ms
+        elif step == "buys":
+            if run.last_buy is not None:
+                # spans are emitted as they finish, so this is arrival order
+                self._record("buy_interarrival", end_ms - run.last_buy)
+            run.last_buy = end_ms
+            if run.first_buy is None:
+                run.first_buy = end_ms
+
+    def _end_run(self) -> None:
+        run = self._run
+        if run.seen:
+            self.runs += 1
+        if run.first_buy is not None:
+            self._record("time_to_first_buy", run.first_buy - (run.pool_end if run.pool_end is not None else 0.0))
+        self._run = _Run()
+
+    def rows(self) -> List[Tuple[str, str, Dict[str, float]]]:
+        """``(section, metric, summary)`` sorted by section then metric name."""
+        out = []
+        for key, h in self.histograms.items():
+            if key in ("time_to_first_buy", "buy_interarrival"):
+                section = "buys"
+            else:
+                section = key.split(".", 1)[0]
+            out.append((section, key, h.summary()))
+        order = {s: i for i, s in enumerate(SECTIONS)}
+        return sorted(out, key=lambda r: (order.get(r[0], len(order)), r[1]))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "files": self.files,
+            "runs": self.runs,
+            "events": self.events,
+            "bad_lines": self.bad_lines,
+            "metrics": {key: summary for _section, key, summary in self.rows()},
+        }
+
+
+def analyze(paths: Iterable[Path]) -> Report:
+    files = telemetry_files(paths)
+    if not files:
+        raise ValueError("no telemetry files found")
+    rep = Report()
+    for f in files:
+        rep.add_file(f)
+    return rep
+
+
+def compare(a: Report, b: Report) -> List[Tuple[str, str, Dict[str, float] | None, Dict[str, float] | None]]:
+    """``(section, metric, summary_a, summary_b)`` over the union of both reports' metrics."""
+    ra = {key: (section, s) for section, key, s in a.rows()}
+    rb = {key: (section, s) for section, key, s in b.rows()}
+    order = {s: i for i, s in enumerate(SECTIONS)}
+    keys = sorted(set(ra) | set(rb), key=lambda k: (order.get((ra.get(k) or rb[k])[0], len(order)), k))
+    return [((ra.get(k) or rb[k])[0], k, ra[k][1] if k in ra else None, rb[k][1] if k in rb else None) for k in keys]
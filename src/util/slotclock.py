@@ -0,0 +1,94 @@
+"""Local estimate of the cluster slot clock.
+
+``SlotClock`` fits ``slot = a + b * t`` (``t`` = ``time.monotonic()``) over a
+sliding window of ``getSlot`` samples, so the slot at any local instant, and
+the local instant of any slot, can be read without a round trip.
+``LandingLatency`` learns how long after ``send`` a transaction typically
+lands, from the slots that recent sends were confirmed in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Iterable, List, Tuple
+
+DEFAULT_SLOT_SEC = 0.4
+
+
+class SlotClock:
+    def __init__(self, window: int = 32, slot_sec: float = DEFAULT_SLOT_SEC):
+        self.samples: Deque[Tuple[float, int]] = deque(maxlen=window)
+        self.slot_sec = slot_sec  # fallback rate until two samples exist
+
+    def add(self, t: float, slot: int) -> None:
+        self.samples.append((t, slot))
+
+    def _fit(self) -> Tuple[float, float]:
+        """Return ``(intercept, slots_per_sec)`` of the fitted line."""
+        if not self.samples:
+            raise RuntimeError("slot clock has no samples")
+        n = len(self.samples)
+        rate = 1.0 / self.slot_sec
+        if n >= 2:
+            mt = sum(t for t, _ in self.samples) / n
+            ms = sum(s for _, s in self.samples) / n
+            var = sum((t - mt) ** 2 for t, _ in self.samples)
+            if var > 0:
+                fitted = sum((t - mt) * (s - ms) for t, s in self.samples) / var
+                if fitted > 0:
+                    rate = fitted
+            return ms - rate * mt, rate
+        t, s = self.samples[-1]
+        return s - rate * t, rate
+
+    def slot_at(self, t: float | None = None) -> float:
+        a, b = self._fit()
+        return a + b * (time.monotonic() if t is None else t)
+
+    def time_of(self, slot: float) -> float:
+        """Monotonic time at which ``slot`` is expected to start."""
+        a, b = self._fit()
+        return (slot - a) / b
+
+    async def sample(self, rpc: Any) -> int:
+        before = time.monotonic()
+        slot = await rpc.get_slot()
+        # attribute the reading to the middle of the round trip
+        self.add((before + time.monotonic()) / 2, slot)
+        return slot
+
+    async def track(self, rpc: Any, interval_sec: float = DEFAULT_SLOT_SEC) -> None:
+        """Sample ``getSlot`` every ``interval_sec`` until cancelled."""
+        while True:
+            try:
+                await self.sample(rpc)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # a missed sample only widens the estimate
+            await asyncio.sleep(interval_sec)
+
+
+class LandingLatency:
+    """Exponentially weighted send-to-land delay in seconds."""
+
+    def __init__(self, alpha: float = 0.3, default_sec: float = DEFAULT_SLOT_SEC):
+        self.alpha = alpha
+        self.value = default_sec
+        self.n = 0
+
+    def add(self, delay_sec: float) -> None:
+        delay_sec = max(0.0, delay_sec)
+        self.value = delay_sec if self.n == 0 else self.alpha * delay_sec + (1 - self.alpha) * self.value
+        self.n += 1
+
+    @classmethod
+    def from_sends(cls, sends: Iterable[Tuple[float, str]], statuses: List[Any], clock: SlotClock) -> "LandingLatency":
+        """Learn from ``(send_time, sig)`` pairs and their ``getSignatureStatuses`` results."""
+        lat = cls()
+        for (sent_at, _sig), st in sorted(zip(sends, statuses), key=lambda p: p[0][0]):
+            if st is not None and getattr(st, "err", None) is None and getattr(st, "slot", None) is not None:
+                lat.add(clock.time_of(st.slot) - sent_at)
+        return lat
@@ -1,11 +1,17 @@
 from __future__ import annotations
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Dict, Any
-import json
+from typing import Dict, Any, List, Tuple
+import os
+import threading
+import orjson
 from time import time
 
 RECEIPT_SCHEMA_VERSION = "1.0.0"
+JOURNAL = "journal.ndjson"
+COMPACTING = "journal.ndjson.1"  # journal segment being folded into the snapshots
+COMPACT_BYTES = 1 << 20
+FSYNC_INTERVAL_SEC = 0.05
 
 
 @dataclass
@@ -19,16 +25,99 @@ class StepReceipt:
     plan_hash: str | None = None
 
 
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Any:
+    return orjson.loads(path.read_bytes()) if path.exists() else None
+
+
+def _replay(out_dir: Path) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Dict[str, Any]], int, bool]:
+    """Snapshots plus any journal records newer than them.
+
+    Returns ``(checkpoints, artifacts, receipts_from_journal, last_seq, had_journal)``.
+    A torn final line (crash mid-append) ends the replay of that segment.
+    """
+    checkpoints = _read_json(out_dir / "checkpoints.json") or {"done": []}
+    artifacts = _read_json(out_dir / "artifacts.json") or {}
+    receipts: Dict[str, Dict[str, Any]] = {}
+    seq = checkpoints.get("journal_seq", 0)
+    had_journal = False
+    for name in (COMPACTING, JOURNAL):
+        p = out_dir / name
+        if not p.exists():
+            continue
+        had_journal = True
+        for line in p.read_bytes().splitlines():
+            try:
+                rec = orjson.loads(line)
+            except ValueError:
+                break
+            if rec["seq"] <= seq:
+                continue
+            seq = rec["seq"]
+            if rec["op"] == "mark":
+                if rec["step"] not in checkpoints.setdefault("done", []):
+                    checkpoints["done"].append(rec["step"])
+                receipts[rec["step"]] = rec["receipt"]
+            elif rec["op"] == "merge":
+                artifacts.update(rec["patch"])
+            elif rec["op"] == "tx":
+                checkpoints.setdefault("txs", {}).setdefault(rec["step"], {}).setdefault(rec["key"], {}).update(rec["fields"])
+    return checkpoints, artifacts, receipts, seq, had_journal
+
+
+def load_artifacts(out_dir: Path) -> Dict[str, Any]:
+    """Read-only view of a run's artifacts, including journal records not yet compacted."""
+    return _replay(out_dir)[1]
+
+
 class State:
-    def __init__(self, out_dir: Path):
+    """Checkpoints, receipts and artifacts of one run directory.
+
+    ``mark``/``merge_artifacts`` append a single compact record to
+    ``journal.ndjson``, so a state change costs O(change).  A background
+    thread fsyncs the journal every ``fsync_interval_sec`` and, once it grows
+    past ``compact_bytes``, writes the ``artifacts.json``/``checkpoints.json``/
+    ``receipts/*.json`` snapshots atomically and drops the folded segment.
+    Opening a directory replays what an unclean exit left in the journal;
+    ``close()`` compacts so the snapshot files are current.
+    """
+
+    def __init__(self, out_dir: Path, fsync_interval_sec: float = FSYNC_INTERVAL_SEC, compact_bytes: int = COMPACT_BYTES):
         self.dir = out_dir
         self.dir.mkdir(parents=True, exist_ok=True)
         self.receipts_dir = self.dir / "receipts"
         self.receipts_dir.mkdir(exist_ok=True)
         self.chk = self.dir / "checkpoints.json"
         self.artifacts_path = self.dir / "artifacts.json"
-        self.checkpoints = json.loads(self.chk.read_text()) if self.chk.exists() else {"done": []}
-        self.artifacts = json.loads(self.artifacts_path.read_text()) if self.artifacts_path.exists() else {}
+        self.journal_path = self.dir / JOURNAL
+        self.fsync_interval_sec = fsync_interval_sec
+        self.compact_bytes = compact_bytes
+        self.checkpoints, self.artifacts, self._receipts, self.seq, had_journal = _replay(self.dir)
+        self._dirty_receipts = set(self._receipts)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._fd: int | None = None
+        self._journal_bytes = 0
+        self._unsynced = False
+        self._synced_seq = self.seq
+        self._waiters = 0
+        self._job: Tuple[int | None, List[Tuple[Path, bytes]]] | None = None
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        if had_journal:
+            # recovery: fold the replayed records in before appending new ones
+            # so a torn tail is never followed by valid records
+            self._write_snapshot(self._snapshot())
+            for name in (COMPACTING, JOURNAL):
+                (self.dir / name).unlink(missing_ok=True)
 
     def done(self, step: str) -> bool:
         return step in self.checkpoints.get("done", [])
@@ -36,14 +125,130 @@ class State:
     def mark(self, step: str, receipt: StepReceipt) -> None:
         if step not in self.checkpoints.setdefault("done", []):
             self.checkpoints["done"].append(step)
-        (self.receipts_dir / f"{step}.json").write_text(json.dumps(asdict(receipt), indent=2))
-        self.chk.write_text(json.dumps(self.checkpoints, indent=2))
+        rec = asdict(receipt)
+        self._receipts[step] = rec
+        self._dirty_receipts.add(step)
+        self._append({"op": "mark", "step": step, "receipt": rec})
 
     def merge_artifacts(self, patch: Dict[str, Any]) -> None:
         self.artifacts.update(patch or {})
-        self.artifacts_path.write_text(json.dumps(self.artifacts, indent=2))
+        self._append({"op": "merge", "patch": patch or {}})
+
+    @property
+    def txs(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-transaction progress: ``{step: {key: {"status", "sig", ...}}}``."""
+        return self.checkpoints.setdefault("txs", {})
+
+    def record_tx(self, step: str, key: str, **fields: Any) -> None:
+        """Journal progress of one transaction of ``step`` (``flush()`` to make it durable)."""
+        self.txs.setdefault(step, {}).setdefault(key, {}).update(fields)
+        self._append({"op": "tx", "step": step, "key": key, "fields": fields})
 
     def load_receipt(self, step: str) -> Dict[str, Any] | None:
-        p = self.receipts_dir / f"{step}.json"
-        return json.loads(p.read_text()) if p.exists() else None
+        if step in self._receipts:
+            return self._receipts[step]
+        return _read_json(self.receipts_dir / f"{step}.json")
+
+    # -- journal -----------------------------------------------------------
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        if self._closed:
+            raise RuntimeError("state is closed")
+        with self._lock:
+            self.seq += 1
+            line = orjson.dumps({"seq": self.seq, **rec}) + b"\n"
+            if self._fd is None:
+                self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+                self._start_thread()
+            os.write(self._fd, line)
+            self._journal_bytes += len(line)
+            self._unsynced = True
+            if self._journal_bytes >= self.compact_bytes and self._job is None:
+                self._rotate()
+            self._wake.notify_all()
+
+    def _rotate(self) -> None:
+        """Start a new journal segment and queue the old one for compaction (lock held)."""
+        old = self._fd
+        os.replace(self.journal_path, self.dir / COMPACTING)
+        self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._journal_bytes = 0
+        # serialise now, on the mutating thread; the writer thread only does I/O
+        self._job = (old, self._snapshot())
+
+    def _snapshot(self) -> List[Tuple[Path, bytes]]:
+        files = [(self.receipts_dir / f"{s}.json", orjson.dumps(self._receipts[s], option=orjson.OPT_INDENT_2)) for s in sorted(self._dirty_receipts)]
+        self._dirty_receipts.clear()
+        files.append((self.artifacts_path, orjson.dumps(self.artifacts, option=orjson.OPT_INDENT_2)))
+        # checkpoints carry the journal position, so they are written last
+        files.append((self.chk, orjson.dumps({**self.checkpoints, "journal_seq": self.seq}, option=orjson.OPT_INDENT_2)))
+        return files
+
+    @staticmethod
+    def _write_snapshot(files: List[Tuple[Path, bytes]]) -> None:
+        for path, data in files:
+            _write_atomic(path, data)
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(target=self._writer, name=f"state-journal:{self.dir}", daemon=True)
+        self._thread.start()
+
+    def _writer(self) -> None:
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._closed or self._job is not None or self._unsynced)
+                fd, unsynced, job, closed, seq = self._fd, self._unsynced, self._job, self._closed, self.seq
+                self._unsynced = False
+            if job is not None and job[0] is not None:
+                os.fsync(job[0])
+                os.close(job[0])
+            if unsynced and fd is not None:
+                os.fsync(fd)
+            with self._lock:
+                self._synced_seq = max(self._synced_seq, seq)
+                self._wake.notify_all()
+            if job is not None:
+                self._write_snapshot(job[1])
+                (self.dir / COMPACTING).unlink(missing_ok=True)
+                with self._lock:
+                    self._job = None
+            if closed:
+                return
+            # records appended during this window share the next fsync, unless
+            # someone is blocked in flush()
+            with self._lock:
+                self._wake.wait_for(lambda: self._closed or self._waiters > 0, self.fsync_interval_sec)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every record appended so far is on disk (group commit).
+
+        Returns ``False`` on timeout.  Async callers should use
+        ``await asyncio.to_thread(state.flush)``.
+        """
+        with self._lock:
+            if self._fd is None or self._closed:
+                return True
+            target = self.seq
+            self._waiters += 1
+            self._wake.notify_all()
+            try:
+                return self._wake.wait_for(lambda: self._synced_seq >= target or self._closed, timeout)
+            finally:
+                self._waiters -= 1
 
+    def close(self) -> None:
+        """Flush the journal and fold it into the snapshot files."""
+        if self._closed:
+            return
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self._fd is None:
+            return
+        os.fsync(self._fd)
+        self._write_snapshot(self._snapshot())
+        os.close(self._fd)
+        self._fd = None
+        self.journal_path.unlink(missing_ok=True)
@@ -1,15 +1,114 @@
 from __future__ import annotations
+from collections import deque
 from pathlib import Path
-import orjson, time
+from typing import Callable, Deque, List
+import logging, orjson, threading, time
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+_log = logging.getLogger("launcher.telemetry")
 
 
 class Telemetry:
-    def __init__(self, path: Path):
+    """NDJSON event log written by a background thread.
+
+    ``emit`` serialises the event and appends it to an in-memory ring of
+    ``capacity`` lines; it never touches the file.  The writer thread drains
+    the ring in one write per batch once ``flush_events`` lines are queued or
+    ``flush_interval_sec`` has passed.  When the ring is full, ``overflow``
+    decides: ``"drop"`` discards the new event (counted in ``dropped``) and
+    ``"block"`` waits for the writer.  ``close()`` drains everything.
+    A failing ``mirror`` is logged and counted (``mirror_errors``, reported
+    as a ``telemetry_mirror_failed`` event at close); the file keeps every
+    event and the writer keeps running.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mirror: Callable[[List[dict]], None] | None = None,
+        capacity: int = 10_000,
+        overflow: str = "drop",
+        flush_events: int = 256,
+        flush_interval_sec: float = 0.2,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"telemetry overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mirror = mirror  # e.g. SqliteState.record_events; called from the writer thread
+        self.capacity = capacity
+        self.overflow = overflow
+        self.flush_events = flush_events
+        self.flush_interval_sec = flush_interval_sec
+        self.dropped = 0
+        self.mirror_errors = 0
+        self.mirror_error: str | None = None  # last mirror failure
+        self._ring: Deque[tuple[bytes, dict]] = deque()
+        self._cond = threading.Condition()
+        self._io = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name=f"telemetry:{path}", daemon=True)
+        self._thread.start()
 
     def emit(self, event: dict) -> None:
         event = {**event, "ts_ms": int(time.time()*1000)}
-        with self.path.open("ab") as f:
-            f.write(orjson.dumps(event))
-            f.write(b"\n")
+        line = orjson.dumps(event) + b"\n"
+        with self._cond:
+            if not self._closed and len(self._ring) >= self.capacity:
+                if self.overflow == "drop":
+                    self.dropped += 1
+                    return
+                self._cond.wait_for(lambda: len(self._ring) < self.capacity or self._closed)
+            self._ring.append((line, event))
+            if len(self._ring) >= self.flush_events:
+                self._cond.notify_all()
+            closed = self._closed
+        if closed:
+            self.flush()  # late event after close(): write it through
+
+    def _drain(self) -> None:
+        with self._cond:
+            batch = list(self._ring)
+            self._ring.clear()
+            self._cond.notify_all()  # wake emitters blocked on a full ring
+            # taken while holding the ring lock, so batches hit the file in order
+            self._io.acquire()
+        try:
+            if batch:
+                with self.path.open("ab") as f:
+                    f.write(b"".join(line for line, _ in batch))
+                if self.mirror is not None:
+                    try:
+                        self.mirror([e for _, e in batch])
+                    except Exception as e:  # the file already has the batch; keep the writer alive
+                        self.mirror_errors += 1
+                        self.mirror_error = f"{type(e).__name__}: {e}"
+                        _log.warning("telemetry mirror failed for %d event(s): %s", len(batch), self.mirror_error)
+        finally:
+            self._io.release()
+
+    def _writer(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._ring) >= self.flush_events, self.flush_interval_sec)
+                closed = self._closed
+            self._drain()
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Write everything queued so far, on the caller's thread."""
+        self._drain()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self.dropped:
+            self.emit({"event": "telemetry_dropped", "count": self.dropped})
+        if self.mirror_errors:
+            self.emit({"event": "telemetry_mirror_failed", "count": self.mirror_errors, "error": self.mirror_error})
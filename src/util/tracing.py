@@ -0,0 +1,107 @@
+"""Lightweight span tracing.
+
+``with span("rpc.getSlot"):`` times a block and, when a ``Tracer`` is active
+in the current context, records it with its parent span id and folds the
+duration into a per-name ``LatencyHistogram``.  Both the tracer and the
+current span live in context variables, so spans opened by tasks spawned
+inside a step nest under that step, and concurrent launches sharing one
+``Rpc`` each trace into their own tracer.  Every span event also carries
+``step``, the orchestrator step (``step.<name>`` span) it ran under, unless
+the caller passes one.  With no active tracer ``span`` costs one
+context-variable lookup.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.util.histogram import LatencyHistogram
+
+_TRACER: ContextVar[Optional["Tracer"]] = ContextVar("tracer", default=None)
+_SPAN: ContextVar[Optional[int]] = ContextVar("span", default=None)
+_STEP: ContextVar[Optional[str]] = ContextVar("step", default=None)
+
+# Prometheus bucket bounds (seconds) exported from the fine-grained histograms
+PROM_BOUNDS_SEC = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Tracer:
+    def __init__(self, emit: Callable[[dict], None] | None = None):
+        self.emit = emit  # receives one "span" event per finished span
+        self.t0 = time.perf_counter()
+        self.ids = itertools.count(1)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def finish(self, name: str, span_id: int, parent_id: int | None, start: float, end: float, attrs: Dict[str, Any]) -> None:
+        dur_ms = (end - start) * 1000.0
+        self.histograms.setdefault(name, LatencyHistogram()).record_ms(dur_ms)
+        if self.emit is not None:
+            self.emit({
+                "event": "span",
+                "name": name,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "start_ms": round((start - self.t0) * 1000.0, 3),
+                "dur_ms": round(dur_ms, 3),
+                **attrs,
+            })
+
+    def summary_event(self) -> dict:
+        return {
+            "event": "latency_histograms",
+            "spans": {n: {**h.summary(), "hist": h.to_dict()} for n, h in sorted(self.histograms.items())},
+        }
+
+    def prometheus_text(self, metric: str = "launcher_span_seconds") -> str:
+        lines = [f"# HELP {metric} Span latency by span name.", f"# TYPE {metric} histogram"]
+        for name, h in sorted(self.histograms.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for b in PROM_BOUNDS_SEC:
+                lines.append(f'{metric}_bucket{{span="{label}",le="{b}"}} {h.cumulative_at(int(b * 1_000_000))}')
+            lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {h.count}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {h.sum_us / 1_000_000:.6f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus_text())
+        tmp.replace(path)
+
+
+def activate(tracer: Tracer) -> Token:
+    return _TRACER.set(tracer)
+
+
+def deactivate(token: Token) -> None:
+    _TRACER.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    tracer = _TRACER.get()
+    if tracer is None:
+        yield
+        return
+    parent = _SPAN.get()
+    sid = next(tracer.ids)
+    token = _SPAN.set(sid)
+    step_token = _STEP.set(name[5:]) if name.startswith("step.") else None
+    attrs = {"step": _STEP.get(), **attrs}
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        attrs = {**attrs, "error": type(e).__name__}
+        raise
+    finally:
+        end = time.perf_counter()
+        _SPAN.reset(token)
+        if step_token is not None:
+            _STEP.reset(step_token)
+        tracer.finish(name, sid, parent, start, end, attrs)
@@ -0,0 +1,253 @@
+"""Stream a launched pool's reserves, price and market cap.
+
+``watch`` reads the mint, pool state and both vaults once (one bulk read),
+then follows the two vault token accounts with websocket
+``accountSubscribe``.  Each notification decodes only the ``amount`` of the
+vault that changed.  A swap moves both vaults in one slot, so the updates are
+coalesced per slot: a ``Tick`` is emitted when a later slot's update arrives,
+or after ``idle_ms`` without updates.  Every tick goes to the ``on_tick``
+callback and to telemetry (``pool_tick``), and is checked against the
+configured ``WatchAction`` rules (``watch_action`` events).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import operator
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from src.core.spl_token import MintView, TokenAccountView
+from src.dex.raydium_v4 import AmmInfoView, PoolAccounts
+from src.util.config import WatchAction, WatchConfig
+
+BASE, QUOTE = 0, 1
+LAMPORTS_PER_SOL = 1_000_000_000
+RECONNECT_DELAYS_SEC = (0.5, 1, 2, 5, 10)
+
+_OPS = {">=": operator.ge, "<=": operator.le, "==": operator.eq, ">": operator.gt, "<": operator.lt}
+
+Update = Tuple[int, int, bytes]  # (BASE | QUOTE, slot, raw token-account data)
+
+
+@dataclass
+class Tick:
+    slot: int
+    base: int
+    quote: int
+    price_sol_per_token: Optional[float]
+    market_cap_sol: Optional[float]
+    change_bps: Optional[float]  # price change since the first tick
+
+
+class Reserves:
+    """Pool reserves kept up to date from vault balances, one tick per slot."""
+
+    def __init__(self, decimals: int, supply: int, pnl_base: int = 0, pnl_quote: int = 0):
+        self.scale = 10 ** decimals
+        self.supply = supply
+        self.pnl = (pnl_base, pnl_quote)
+        self.vaults = [0, 0]
+        self.slot: Optional[int] = None  # slot of the updates not yet emitted
+        self.first_price: Optional[float] = None
+        self._last: Optional[Tuple[int, int]] = None
+
+    def set(self, side: int, amount: int, slot: int) -> Optional[Tick]:
+        """Record a vault balance; returns the previous slot's tick once ``slot`` moves past it."""
+        tick = self.flush() if self.slot is not None and slot > self.slot else None
+        self.vaults[side] = amount
+        self.slot = slot if self.slot is None else max(self.slot, slot)
+        return tick
+
+    def flush(self) -> Optional[Tick]:
+        """Tick for the pending slot, unless the reserves did not change."""
+        if self.slot is None:
+            return None
+        slot, self.slot = self.slot, None
+        base, quote = self.vaults[BASE] - self.pnl[BASE], self.vaults[QUOTE] - self.pnl[QUOTE]
+        if (base, quote) == self._last:
+            return None
+        self._last = (base, quote)
+        price = (quote / LAMPORTS_PER_SOL) / (base / self.scale) if base > 0 else None
+        if self.first_price is None:
+            self.first_price = price
+        change = round((price / self.first_price - 1) * 10_000, 1) if price and self.first_price else None
+        mcap = price * self.supply / self.scale if price is not None else None
+        return Tick(slot, base, quote, price, mcap, change)
+
+
+def ws_url(rpc_url: str) -> str:
+    """The websocket endpoint that pairs with an HTTP RPC URL."""
+    if rpc_url.startswith("https://"):
+        return "wss://" + rpc_url[len("https://"):]
+    if rpc_url.startswith("http://"):
+        return "ws://" + rpc_url[len("http://"):]
+    return rpc_url
+
+
+async def account_updates(url: str, pubkeys: Sequence[str], commitment: str = "confirmed") -> AsyncIterator[Update]:
+    """``(index in pubkeys, slot, data)`` for every change of ``pubkeys``, over one
+    websocket; reconnects (and resubscribes) with backoff when the socket drops."""
+    import websockets
+
+    failures = 0
+    while True:
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                for i, pub in enumerate(pubkeys):
+                    params = [pub, {"encoding": "base64", "commitment": commitment}]
+                    await ws.send(orjson.dumps({"jsonrpc": "2.0", "id": i, "method": "accountSubscribe", "params": params}).decode())
+                subs: Dict[int, int] = {}
+                async for raw in ws:
+                    msg = orjson.loads(raw)
+                    if "id" in msg:
+                        if "error" in msg:
+                            raise RuntimeError(f"accountSubscribe {pubkeys[msg['id']]} failed: {msg['error']}")
+                        subs[msg["result"]] = msg["id"]
+                        failures = 0
+                        continue
+                    params = msg.get("params") or {}
+                    index = subs.get(params.get("subscription"))
+                    if msg.get("method") != "accountNotification" or index is None:
+                        continue
+                    result = params["result"]
+                    yield index, result["context"]["slot"], base64.b64decode(result["value"]["data"][0])
+        except (OSError, websockets.ConnectionClosed):
+            if failures >= len(RECONNECT_DELAYS_SEC):
+                raise
+            await asyncio.sleep(RECONNECT_DELAYS_SEC[failures])
+            failures += 1
+
+
+class Actions:
+    """Runs the configured follow-up actions for matching ticks."""
+
+    def __init__(self, rules: Sequence[WatchAction], emit: Callable[[dict], None]):
+        self.rules = list(rules)
+        self.emit = emit
+        self.fired: List[Dict[str, Any]] = []
+        self.procs: List[Any] = []
+        self._done: set = set()
+
+    async def check(self, tick: Tick) -> bool:
+        """Fire the rules ``tick`` matches; ``True`` if one of them is ``exit``."""
+        stop = False
+        values = asdict(tick)
+        for i, rule in enumerate(self.rules):
+            value = values[rule.field]
+            if value is None or i in self._done or not _OPS[rule.op](value, rule.value):
+                continue
+            if not rule.repeat:
+                self._done.add(i)
+            event = {"event": "watch_action", "when": rule.when, "do": rule.do, "slot": tick.slot}
+            if rule.do == "command":
+                env = {**os.environ, **{f"WATCH_{k.upper()}": "" if v is None else str(v) for k, v in values.items()}}
+                proc = await asyncio.create_subprocess_shell(rule.command, env=env)
+                self.procs.append(proc)
+                event["pid"] = proc.pid
+            stop = stop or rule.do == "exit"
+            self.fired.append(event)
+            self.emit(event)
+        return stop
+
+    async def wait(self, timeout_sec: float = 10) -> None:
+        """Give the commands started so far ``timeout_sec`` to finish."""
+        if self.procs:
+            await asyncio.wait([asyncio.ensure_future(p.wait()) for p in self.procs], timeout=timeout_sec)
+
+
+async def snapshot(rpc: Any, mint: str, pool: PoolAccounts) -> Tuple[Reserves, Optional[Tick]]:
+    """Reserves seeded from one bulk read of mint, pool state and vaults."""
+    infos = await rpc.get_multiple_accounts([mint, pool.pool, pool.vault_base, pool.vault_quote])
+    m, state = MintView.of(infos[0]), AmmInfoView.of(infos[1])
+    if m is None:
+        raise RuntimeError(f"mint {mint} not found")
+    if state is None:
+        raise RuntimeError(f"pool {pool.pool} not found")
+    r = Reserves(m.decimals, m.supply, state.need_take_pnl_base, state.need_take_pnl_quote)
+    slot = await rpc.get_slot()
+    for side, info in ((BASE, infos[2]), (QUOTE, infos[3])):
+        vault = TokenAccountView.of(info)
+        r.set(side, vault.amount if vault else 0, slot)
+    return r, r.flush()
+
+
+async def watch(
+    rpc: Any,
+    mint: str,
+    pool: PoolAccounts,
+    config: WatchConfig,
+    updates: AsyncIterator[Update],
+    on_tick: Callable[[Tick], None] = lambda t: None,
+    emit: Callable[[dict], None] = lambda e: None,
+    duration_sec: float | None = None,
+    max_ticks: int | None = None,
+) -> Dict[str, Any]:
+    """Follow ``updates`` of the pool's (base, quote) vaults until ``duration_sec``,
+    ``max_ticks``, an ``exit`` action or the end of the stream."""
+    t0 = time.perf_counter()
+    reserves, first = await snapshot(rpc, mint, pool)
+    actions = Actions(config.actions, emit)
+    queue: asyncio.Queue = asyncio.Queue()
+    ticks = 0
+    last: Optional[Tick] = None
+    updates_seen = 0
+
+    async def pump() -> None:
+        try:
+            async for u in updates:
+                queue.put_nowait(u)
+        finally:
+            queue.put_nowait(None)
+
+    async def publish(tick: Optional[Tick]) -> bool:
+        nonlocal ticks, last
+        if tick is None:
+            return False
+        ticks += 1
+        last = tick
+        on_tick(tick)
+        emit({"event": "pool_tick", **asdict(tick)})
+        return await actions.check(tick) or (max_ticks is not None and ticks >= max_ticks)
+
+    pumper = asyncio.create_task(pump())
+    deadline = None if duration_sec is None else time.monotonic() + duration_sec
+    try:
+        stop = await publish(first)
+        while not stop:
+            timeout = config.idle_ms / 1000
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    await publish(reserves.flush())
+                    break
+            try:
+                u = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                stop = await publish(reserves.flush())
+                continue
+            if u is None:
+                await publish(reserves.flush())
+                break
+            side, slot, data = u
+            updates_seen += 1
+            stop = await publish(reserves.set(side, TokenAccountView(data).amount, slot))
+    finally:
+        pumper.cancel()
+        await asyncio.gather(pumper, return_exceptions=True)
+        await actions.wait()
+    if not pumper.cancelled() and pumper.exception() is not None:
+        raise pumper.exception()
+    return {
+        "ticks": ticks,
+        "updates": updates_seen,
+        "first": None if first is None else asdict(first),
+        "last": None if last is None else asdict(last),
+        "actions": actions.fired,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
@@ -1,3 +1,15 @@
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import orjson
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def single_line_orjson(monkeypatch):
+    """The orjson test shim indents a plain ``dumps()`` (its ``OPT_INDENT_2`` is 0);
+    give it real orjson's non-zero flag so journal and telemetry records stay
+    on one line."""
+    if orjson.OPT_INDENT_2 == 0:
+        monkeypatch.setattr(orjson, "OPT_INDENT_2", 1)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+
+from src.core import solana
+from src.core.solana import Rpc, RpcConfig
+from src.exec import batch, orchestrator
+from src.exec.orchestrator import RunConfig
+from src.util.config import load_config, parse_config
+
+
+class SharedRpc:
+    def __init__(self):
+        self.sends = 0
+        self.closed = 0
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def send_and_confirm(self, tx, *signers):
+        self.sends += 1
+        return "SIG"
+
+    async def send(self, tx, *signers, skip_preflight=False):
+        self.sends += 1
+        return "SIG"
+
+    async def confirm(self, sig):
+        return None
+
+    async def get_signature_statuses(self, sigs):
+        return [None] * len(sigs)
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def get_balance(self, pubkey):
+        return 0
+
+    async def get_multiple_accounts(self, pubkeys):
+        return [None] * len(pubkeys)
+
+    async def close(self):
+        self.closed += 1
+
+
+def test_run_batch_shares_one_rpc(tmp_path, monkeypatch):
+    plans_dir = tmp_path / "plans"
+    plans_dir.mkdir()
+    for name in ("a", "b", "c"):
+        shutil.copy("plans/sample_plan.json", plans_dir / f"{name}.json")
+    (plans_dir / "bad.json").write_text("{}")
+    rpc = SharedRpc()
+    monkeypatch.setattr(batch, "Rpc", lambda cfg: rpc)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=Keypair()))
+
+    base = RunConfig(out_dir=tmp_path, resume=False, only="all", plan_hash="", rpc_url="http://", cu_limit=None, cu_price_micro=None)
+    config = parse_config(load_config(Path("configs/defaults.yaml")))
+    updates = []
+    out_root = tmp_path / "state"
+    progress = asyncio.run(batch.run_batch(
+        batch.discover_plans([str(plans_dir)]), base, out_root, "", Path("configs/defaults.yaml"), config,
+        max_concurrent=2, on_update=lambda rows: updates.append(sum(r.status == "running" for r in rows.values())),
+    ))
+
+    assert {k: v.status for k, v in progress.items()} == {"a": "done", "b": "done", "bad": "failed", "c": "done"}
+    assert max(updates) <= 2
+    assert rpc.closed == 1 and rpc.sends > 0
+    for name in ("a", "b", "c"):
+        assert (out_root / name / "receipts" / "buys.json").exists()
+        assert sorted(progress[name].done) == sorted(orchestrator.STEP_GRAPH)
+    assert json.loads((out_root / "batch.json").read_text())["bad"]["status"] == "failed"
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_latest_blockhash(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(value=SimpleNamespace(blockhash=f"H{self.calls}"))
+
+
+def test_blockhash_cache_coalesces_concurrent_callers():
+    async def go():
+        rpc = Rpc(RpcConfig(url="http://", blockhash_ttl_sec=60))
+        rpc.client = CountingClient()
+        hashes = await asyncio.gather(*(rpc.recent_blockhash() for _ in range(10)))
+        return rpc.client.calls, set(hashes)
+
+    calls, hashes = asyncio.run(go())
+    assert calls == 1 and hashes == {"H1"}
+
+
+class PendingClient:
+    """Signatures stay unseen until ``landed`` is set; sends return at once."""
+
+    def __init__(self):
+        self.landed = False
+        self.polls = 0
+
+    async def get_signature_statuses(self, sigs, search_transaction_history=False):
+        self.polls += 1
+        st = SimpleNamespace(slot=1, err=None, confirmation_status="finalized") if self.landed else None
+        return SimpleNamespace(value=[st for _ in sigs])
+
+    async def send_transaction(self, tx, *signers, opts=None):
+        return SimpleNamespace(value="SENT")
+
+
+def test_pending_confirms_do_not_hold_the_in_flight_cap(monkeypatch):
+    monkeypatch.setattr(solana, "CONFIRM_POLL_SEC", 0.01)
+
+    async def go():
+        rpc = Rpc(RpcConfig(url="http://", max_in_flight=2))
+        rpc.client = client = PendingClient()
+        confirms = [asyncio.ensure_future(rpc.confirm(f"S{i}")) for i in range(4)]
+        await asyncio.sleep(0.05)
+        sig = await asyncio.wait_for(rpc.send(object()), 1)
+        pending = not any(c.done() for c in confirms)
+        client.landed = True
+        await asyncio.wait_for(asyncio.gather(*confirms), 1)
+        return sig, pending, client.polls
+
+    sig, pending, polls = asyncio.run(go())
+    assert sig == "SENT" and pending and polls > 4
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core import keys
+from src.exec import orchestrator
+from src.exec.orchestrator import RunConfig
+from src.io.jsonio import load_plan
+
+PLAN = "plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"
+
+
+@pytest.fixture(autouse=True)
+def keypair_from_seed(monkeypatch):
+    """Builds of solders without ``Keypair.from_seed`` get a deterministic
+    stand-in (seed || sha256(seed)), enough to check the derivation chain."""
+    if hasattr(Keypair, "from_seed"):
+        return
+
+    def from_seed(seed):
+        seed = bytes(seed)
+        if len(seed) != 32:
+            raise ValueError("seed must be 32 bytes")
+        return Keypair.from_bytes(seed + hashlib.sha256(seed).digest())
+
+    monkeypatch.setattr(Keypair, "from_seed", staticmethod(from_seed), raising=False)
+
+
+def test_derivation_is_deterministic_and_scoped():
+    seed = Keypair()
+    a = keys.derive_subwallet(seed, "plan-1", "w1")
+    assert bytes(a) == bytes(keys.derive_subwallet(seed, "plan-1", "w1"))
+    others = [keys.derive_subwallet(seed, "plan-2", "w1"), keys.derive_subwallet(seed, "plan-1", "w2"), keys.derive_subwallet(Keypair(), "plan-1", "w1")]
+    assert all(bytes(o) != bytes(a) for o in others)
+
+
+def test_parallel_bulk_derivation_matches_serial(monkeypatch):
+    monkeypatch.setattr(keys, "DERIVE_PARALLEL_MIN", 10)
+    monkeypatch.setattr(keys, "_DERIVE_CHUNK", 7)
+    seed = Keypair()
+    ids = [f"w{i}" for i in range(30)]
+    par = keys.derive_subwallets(seed, "plan-1", ids, workers=2)
+    assert list(par) == ids
+    assert all(bytes(par[w]) == bytes(keys.derive_subwallet(seed, "plan-1", w)) for w in ids)
+
+
+class FakeRpc:
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def close(self):
+        return None
+
+
+def _run(outdir, seed, monkeypatch, captured, resume=False):
+    async def fake_run(rpc, plan, wallet_map, **kwargs):
+        captured.clear()
+        captured.update({wid: (e["pub"], bytes(e["kp"])) for wid, e in wallet_map.items()})
+        return {"swaps": []}
+
+    monkeypatch.setattr(orchestrator.swaps, "run", fake_run)
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: FakeRpc())
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=seed))
+    cfg = RunConfig(out_dir=outdir, resume=resume, only="buys", plan_hash="H", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True, derive_wallets=True)
+    orchestrator.execute(load_plan(Path(PLAN)), cfg)
+
+
+def test_resume_elsewhere_needs_only_the_seed(tmp_path, monkeypatch):
+    seed = Keypair()
+    first = tmp_path / "first"
+    first.mkdir()
+    (first / "artifacts.json").write_text(json.dumps({"mint": {"mint": "So11111111111111111111111111111111111111112"}}))
+    fresh, resumed = {}, {}
+    _run(first, seed, monkeypatch, fresh)
+    wallets = json.loads((first / "artifacts.json").read_text())["wallets"]
+    assert all(info == {"pub": fresh[w][0], "derived": keys.DERIVATION_VERSION} for w, info in wallets.items())
+    assert not (first / "wallets").exists()
+
+    # "another machine": only the state files, no key files, same seed
+    second = tmp_path / "second"
+    shutil.copytree(first, second)
+    _run(second, seed, monkeypatch, resumed, resume=True)
+    assert resumed == fresh
+
+    with pytest.raises(ValueError, match="wrong seed"):
+        _run(second, Keypair(), monkeypatch, {}, resume=True)
@@ -0,0 +1,95 @@
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.io.jsonio import load_plan
+from src.exec import orchestrator
+from src.exec.orchestrator import execute, RunConfig
+from src.util import history
+from src.util.state import State, StepReceipt
+
+PLAN = "plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"
+WSOL = "So11111111111111111111111111111111111111112"
+
+
+class FakeRpc:
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def close(self):
+        return None
+
+
+def test_run_with_state_db_records_launch(tmp_path, monkeypatch):
+    plan = load_plan(Path(PLAN))
+    db = tmp_path / "history.sqlite"
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: FakeRpc())
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=orchestrator.Keypair()))
+    pre = history.SqliteState(db, tmp_path / "state")
+    pre.merge_artifacts({"mint": {"mint": WSOL}})
+    pre.close()
+    cfg = RunConfig(out_dir=tmp_path / "state", resume=False, only="buys", plan_hash="PH", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True, state_db=db)
+    execute(plan, cfg)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT plan_hash, plan_id FROM launches").fetchall() == [("PH", plan.plan_id)]
+    assert conn.execute("SELECT step FROM steps").fetchall() == [("buys",)]
+    assert conn.execute("SELECT count(*) FROM wallets WHERE is_buyer = 1").fetchone()[0] == 3
+    assert conn.execute("SELECT count(*) FROM events WHERE event = 'buys_complete'").fetchone()[0] == 1
+    assert not (tmp_path / "state" / "receipts" / "buys.json").exists()
+    assert "buys" in json.loads((tmp_path / "state" / "artifacts.json").read_text())
+    st = history.SqliteState(db, tmp_path / "state")
+    assert st.done("buys") and st.load_receipt("buys")["plan_hash"] == "PH"
+    st.close()
+
+
+def test_import_json_state_dir_and_query_unbought(tmp_path):
+    run = tmp_path / "runs" / "launch1"
+    st = State(run)
+    shutil.copy("plans/sample_plan.json", run / "plan.json")
+    st.merge_artifacts({"wallets": {"w1": {"pub": "PUB1"}, "w2": {"pub": "PUB2"}, "lp": {"pub": "PUBLP"}}})
+    st.merge_artifacts({"buys": {"swaps": [{"order": 1, "wallet_id": "w1", "sig": "S1"}]}})
+    st.mark("buys", StepReceipt(step="buys", ok=True, inputs={}, outputs={}, plan_hash="PH1"))
+    st.close()
+    (run / "telemetry.ndjson").write_text('{"event": "buys_complete", "ts_ms": 1}\n')
+    db = tmp_path / "h.sqlite"
+    assert len(history.import_dirs(db, [tmp_path / "runs"])) == 1
+    # re-import replaces rather than duplicates
+    history.import_dirs(db, [run])
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM events").fetchone()[0] == 1
+    assert conn.execute("SELECT key FROM signatures WHERE sig = 'S1'").fetchall() == [("w1",)]
+    assert [r["wallet_id"] for r in history.unbought_wallets(db)] == ["w2"]
+
+
+def test_events_from_another_thread_do_not_share_the_state_transaction(tmp_path):
+    import threading
+
+    st = history.SqliteState(tmp_path / "h.sqlite", tmp_path / "state", buyers={"w1"})
+    errors = []
+
+    def writer():
+        try:
+            for i in range(200):
+                st.record_events([{"event": "x", "i": i, "ts_ms": i}])
+        except Exception as e:
+            errors.append(e)
+
+    th = threading.Thread(target=writer)
+    th.start()
+    for i in range(200):
+        st.merge_artifacts({f"k{i}": i, "wallets": {"w1": {"pub": f"P{i}"}}})
+        st.record_tx("buys", f"w{i}", sig=f"S{i}", status="SENT")
+    th.join()
+    assert errors == []
+    conn = sqlite3.connect(tmp_path / "h.sqlite")
+    assert conn.execute("SELECT count(*) FROM events").fetchone()[0] == 200
+    assert conn.execute("SELECT count(*) FROM artifacts").fetchone()[0] == 201
+    st.close()
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core import keys, keystore
+from src.core.keyring import Keyring
+from src.core.keystore import Keystore, KEYSTORE_FILE
+from src.exec import orchestrator
+from src.exec.orchestrator import RunConfig
+from src.io.jsonio import load_plan
+
+PLAN = "plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    monkeypatch.setattr(keystore, "SCRYPT_N", 2 ** 10)
+    calls = {"kdf": 0, "get": 0}
+    derive, get = keystore.derive_key, Keystore.get
+
+    def counting_derive(*a, **kw):
+        calls["kdf"] += 1
+        return derive(*a, **kw)
+
+    def counting_get(self, wid):
+        calls["get"] += 1
+        return get(self, wid)
+
+    monkeypatch.setattr(keystore, "derive_key", counting_derive)
+    monkeypatch.setattr(Keystore, "get", counting_get)
+    return calls
+
+
+def _stored(wallet_dir, ids):
+    kps = {wid: Keypair() for wid in ids}
+    Keystore.create(wallet_dir / KEYSTORE_FILE, kps).close()
+    return kps, {wid: {"pub": keys.pubkey_str(kp), "keystore": str(wallet_dir / KEYSTORE_FILE)} for wid, kp in kps.items()}
+
+
+def test_pubkeys_without_decrypting_and_cached_secrets(tmp_path, counted):
+    kps, art = _stored(tmp_path, ["w1", "w2"])
+    art["w3"] = {"pub": "PUB3"}
+    counted["kdf"] = 0
+    ring = Keyring(tmp_path, art)
+    assert [ring[w]["pub"] for w in ring] == [art["w1"]["pub"], art["w2"]["pub"], "PUB3"]
+    assert counted == {"kdf": 0, "get": 0}
+    assert bytes(ring["w2"]["kp"]) == bytes(kps["w2"])
+    assert bytes(ring["w2"]["kp"]) == bytes(kps["w2"])
+    assert counted == {"kdf": 1, "get": 1}
+    # a wallet with no stored secret has no "kp"
+    assert "kp" not in ring["w3"] and ring["w3"].get("kp", "seed") == "seed"
+
+
+def test_targeted_resume_decrypts_only_signing_wallet(tmp_path, monkeypatch, counted):
+    plan = load_plan(Path(PLAN))
+    outdir = tmp_path / "state"
+    _kps, art = _stored(outdir / "wallets", [w.wallet_id for w in plan.wallets if w.role != "SEED"])
+    (outdir / "artifacts.json").write_text(json.dumps({"wallets": art, "mint": {"mint": "So11111111111111111111111111111111111111112"}}))
+    counted.update(kdf=0, get=0)
+
+    class FakeRpc:
+        async def recent_blockhash(self):
+            return "HASH"
+
+        async def simulate(self, tx, *signers):
+            return {"logs": []}
+
+        async def account_exists(self, pubkey):
+            return False
+
+        async def close(self):
+            return None
+
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: FakeRpc())
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=Keypair()))
+    cfg = RunConfig(out_dir=outdir, resume=True, only="buys", plan_hash="H", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True, max_buys=1)
+    orchestrator.execute(plan, cfg)
+    assert counted == {"kdf": 1, "get": 1}
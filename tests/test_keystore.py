@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core import keys, keystore
+from src.core.keystore import Keystore, KEYSTORE_FILE
+from src.exec import orchestrator
+from src.exec.orchestrator import RunConfig
+from src.io.jsonio import load_plan
+from src.util.state import State
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    monkeypatch.setattr(keystore, "SCRYPT_N", 2 ** 10)
+
+
+def test_roundtrip_add_and_reopen(tmp_path):
+    path = tmp_path / KEYSTORE_FILE
+    a, b = Keypair(), Keypair()
+    ks = Keystore.create(path, {"w1": a}, passphrase=b"pw")
+    ks.add({"w2": b})
+    ks.close()
+    ks = Keystore.open(path, passphrase=b"pw")
+    assert ks.ids() == ["w1", "w2"] and "w2" in ks and len(ks) == 2
+    assert bytes(ks.get("w1")) == bytes(a) and bytes(ks.get("w2")) == bytes(b)
+    assert ks.pub("w2") == keys.pubkey_str(b)
+    # replacing an id keeps one entry
+    c = Keypair()
+    ks.add({"w1": c})
+    assert ks.ids() == ["w2", "w1"] and bytes(Keystore.open(path, passphrase=b"pw").get("w1")) == bytes(c)
+    with pytest.raises(KeyError):
+        ks.get("nope")
+
+
+def test_parallel_generation_matches_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(keystore, "PARALLEL_MIN", 10)
+    monkeypatch.setattr(keystore, "CHUNK", 7)
+    ks = Keystore.create(tmp_path / KEYSTORE_FILE, passphrase=b"pw")
+    ids = [f"w{i}" for i in range(40)]
+    kps = ks.generate(ids, workers=2)
+    assert list(kps) == ids and len({bytes(k) for k in kps.values()}) == 40
+    ks = Keystore.open(tmp_path / KEYSTORE_FILE, passphrase=b"pw")
+    assert all(bytes(ks.get(w)) == bytes(kps[w]) and ks.pub(w) == keys.pubkey_str(kps[w]) for w in ids)
+
+
+def test_rejects_non_keystore_file(tmp_path):
+    p = tmp_path / KEYSTORE_FILE
+    p.write_bytes(b"not a keystore at all")
+    with pytest.raises(ValueError):
+        Keystore.open(p)
+
+
+def test_migrate_legacy_enc_files(tmp_path):
+    wallet_dir = tmp_path / "wallets"
+    legacy = {wid: Keypair() for wid in ("w1", "w2", "mint")}
+    for wid, kp in legacy.items():
+        keys.save_encrypted(wallet_dir, wid, kp)
+    ks = keystore.migrate_enc_dir(wallet_dir)
+    assert sorted(ks.ids()) == ["mint", "w1", "w2"]
+    assert all(bytes(ks.get(w)) == bytes(kp) for w, kp in legacy.items())
+    # running it again is a no-op
+    assert len(keystore.migrate_enc_dir(wallet_dir)) == 3
+
+
+def test_resume_reads_migrated_keystore(tmp_path, monkeypatch):
+    plan = load_plan(Path("plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"))
+    outdir = tmp_path / "state"
+    wallets = {}
+    for w in plan.wallets:
+        if w.role != "SEED":
+            kp = Keypair()
+            wallets[w.wallet_id] = {"pub": keys.pubkey_str(kp), "path": keys.save_encrypted(outdir / "wallets", w.wallet_id, kp)}
+    (outdir / "artifacts.json").write_text(json.dumps({"wallets": wallets, "mint": {"mint": "So11111111111111111111111111111111111111112"}}))
+    st = State(outdir)
+    ks = keystore.migrate_enc_dir(outdir / "wallets")
+    st.merge_artifacts(keystore.artifacts_patch(st.artifacts, ks))
+    st.close()
+    for p in (outdir / "wallets").glob("*.enc"):
+        p.unlink()
+
+    captured = {}
+
+    async def fake_run(rpc, plan, wallet_map, **kwargs):
+        captured.update(wallet_map)
+        return {"swaps": []}
+
+    monkeypatch.setattr(orchestrator.swaps, "run", fake_run)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=Keypair()))
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: SimpleNamespace(close=_noop))
+    cfg = RunConfig(out_dir=outdir, resume=True, only="buys", plan_hash="H", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True)
+    orchestrator.execute(plan, cfg)
+    assert {w: v["pub"] for w, v in captured.items()} == {w: v["pub"] for w, v in wallets.items()}
+    assert all(isinstance(v["kp"], Keypair) for v in captured.values())
+
+
+async def _noop():
+    return None
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core import keystore
+from src.core.ata import ata
+from src.core.keys import pubkey_str
+from src.core.ledger import LedgerError, LedgerRpc
+from src.dex.raydium_v4 import quote_exact_in
+from src.exec import metadata, orchestrator
+from src.exec.context import build_context
+from src.exec.orchestrator import RunConfig
+from src.models.plan import Plan
+from src.util import rehearsal
+from src.util.config import load_config, parse_config
+from src.util.preflight import build_transactions
+from src.util.state import State
+
+SAMPLE = Path("plans/sample_plan.json")
+SOL = 1_000_000_000
+
+
+def _plan(buys=2, min_out=1):
+    raw = json.loads(SAMPLE.read_text())
+    buyer = next(w for w in raw["wallets"] if w["role"] == "FOLLOWUP_BUY")
+    raw["wallets"].remove(buyer)
+    raw["schedule"] = ["w1"]
+    for i in range(buys):
+        raw["wallets"].append({
+            "wallet_id": f"b{i}", "role": "FOLLOWUP_BUY",
+            "funding": {"total_lamports": SOL // 10, "base_lamports": SOL // 10},
+            "action": {"type": "SWAP_BUY", "effective_base_sol": 0.05, "min_out_tokens": min_out, "slippage_bps": 50},
+        })
+        raw["schedule"].append(f"b{i}")
+    total = sum(w["funding"]["total_lamports"] for w in raw["wallets"])
+    raw["invariants"]["sum_non_seed_lamports"] = raw["invariants"]["seed_lamports"] = total
+    return Plan.from_dict(raw)
+
+
+def _launch(plan, fuse=False):
+    config = parse_config(load_config(Path("configs/defaults.yaml")))
+    mint, seed = pubkey_str(Keypair()), pubkey_str(Keypair())
+    ctx = build_context(config, mint, cu_limit=200_000, cu_price_micro=0)
+    wallets = {w.wallet_id: seed if w.role == "SEED" else pubkey_str(Keypair()) for w in plan.wallets}
+    return ctx, seed, wallets, build_transactions(plan, ctx, seed, wallets, fuse)
+
+
+def test_rehearsal_applies_the_launch_in_order():
+    plan = _plan(buys=3)
+    ctx, seed, wallets, txs = _launch(plan)
+    ledger = rehearsal.new_ledger(plan, ctx)
+    ledger.fund(seed, 10 * SOL)
+    out = rehearsal.run(ledger, plan, ctx, seed, wallets, txs)
+
+    assert out["ok"], out["steps"]
+    assert [s["step"] for s in out["steps"]] == ["funding", "mint", "metadata", "prewarm", "pool", "buy"]
+    pool_step = out["steps"][4]
+    assert pool_step["reserves"]["base"] == plan.token.lp_tokens and pool_step["reserves"]["quote"] == int(plan.inputs.q_atomic)
+
+    # constant product, one buy after another
+    base, quote = plan.token.lp_tokens, int(plan.inputs.q_atomic)
+    for wid in ("b0", "b1", "b2"):
+        got = quote_exact_in(SOL // 20, quote, base)
+        assert out["final"]["balances"][wid]["base"] == got
+        base, quote = base - got, quote + SOL // 20
+    assert out["final"]["reserves"]["base"] == base and out["final"]["reserves"]["quote"] == quote
+    assert out["final"]["balances"]["b0"]["base"] > out["final"]["balances"]["b2"]["base"]
+    assert out["final"]["reserves"]["price_sol_per_token"] > out["steps"][4]["reserves"]["price_sol_per_token"]
+
+
+def test_failures_roll_back_and_carry_into_later_steps():
+    plan = _plan(buys=4)
+    plan.wallet("b1").action.min_out_tokens = 10 ** 12  # unreachable
+    ctx, seed, wallets, txs = _launch(plan)
+    ledger = rehearsal.new_ledger(plan, ctx)
+    ledger.fund(seed, SOL // 2 + 3 * SOL // 10 + SOL // 20)  # LP creator, b0-b2, rent and fees; not enough for b3
+    out = rehearsal.run(ledger, plan, ctx, seed, wallets, txs)
+
+    steps = {s["step"]: s for s in out["steps"]}
+    assert not out["ok"]
+    assert [f["key"] for f in steps["funding"]["failed"]] == ["b3"]
+    assert "insufficient lamports" in steps["funding"]["failed"][0]["err"]
+    assert [f["key"] for f in steps["prewarm"]["failed"]] == ["b3"]  # b0-b2 share the first batch
+    buys = {f["key"]: f["err"] for f in steps["buy"]["failed"]}
+    assert set(buys) == {"b1", "b3"} and "slippage" in buys["b1"]
+    # b1's failed swap is rolled back: its WSOL is still wrapped, no tokens
+    final = out["final"]["balances"]
+    assert final["b1"] == {**final["b1"], "base": 0, "wsol": SOL // 20}
+    assert final["b0"]["base"] > final["b2"]["base"] > 0
+
+
+def test_pool_and_buys_fail_without_the_mint():
+    plan = _plan(buys=1)
+    ctx, seed, wallets, txs = _launch(plan)
+    ledger = rehearsal.new_ledger(plan, ctx)
+    ledger.fund(seed, 10 * SOL)
+    out = rehearsal.run(ledger, plan, ctx, seed, wallets, [t for t in txs if t[0] != "mint"])
+    failed = {s["step"]: s["failed"] for s in out["steps"]}
+    assert "not found" in failed["metadata"][0]["err"]
+    assert "has no" in failed["pool"][0]["err"]
+    assert "not initialized" in failed["buy"][0]["err"]
+
+
+def test_metadata_must_be_signed_by_the_mint_authority():
+    plan = _plan(buys=1)
+    ctx, seed, wallets, txs = _launch(plan)
+    ledger = rehearsal.new_ledger(plan, ctx)
+    ledger.fund(seed, 10 * SOL)
+    for kind, _key, payer, tx in txs[:3]:
+        ledger.apply(tx, payer)
+    assert [k for k, *_ in txs[:3]] == ["funding", "funding", "mint"]
+    md = metadata.build_tx(ctx.metadata_program, ctx.mint, seed, seed, seed, "N", "S", "", None, None, ctx.metadata_pda)
+    with pytest.raises(LedgerError, match="not the mint authority"):
+        ledger.apply(md, seed)
+    assert ledger.get(ctx.metadata_pda) is None
+
+
+def test_rehearse_snapshots_once_and_is_fast():
+    plan = _plan(buys=500)
+    ctx, seed, wallets, txs = _launch(plan)
+
+    class SnapshotRpc:
+        reads = 0
+
+        async def get_multiple_accounts(self, pubkeys):
+            SnapshotRpc.reads += 1
+            return [SimpleNamespace(lamports=1_000 * SOL, owner="11111111111111111111111111111111", data=b"") if p == seed else None for p in pubkeys]
+
+    t0 = time.perf_counter()
+    out = asyncio.run(rehearsal.rehearse(SnapshotRpc(), plan, ctx, seed, wallets, txs))
+    assert time.perf_counter() - t0 < 5
+    assert SnapshotRpc.reads == 1
+    assert out["ok"], [s["failed"][:1] for s in out["steps"]]
+    assert out["steps"][-1]["txs"] == 500 and len(out["final"]["balances"]) == len(plan.wallets)
+
+
+def test_full_run_against_the_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(keystore, "SCRYPT_N", 2 ** 10)
+    plan = _plan(buys=2)
+    config = parse_config(load_config(Path("configs/defaults.yaml")))
+    ledger = rehearsal.new_ledger(plan, build_context(config, pubkey_str(Keypair())))
+    seed = Keypair()
+    ledger.fund(pubkey_str(seed), 10 * SOL)
+    rpc = LedgerRpc(ledger)
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: rpc)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=seed))
+
+    cfg = RunConfig(out_dir=tmp_path, resume=False, only="all", plan_hash="H", rpc_url="http://", cu_limit=None, cu_price_micro=None)
+    orchestrator.execute(plan, cfg, config=config)
+
+    st = State(tmp_path)
+    mint = st.artifacts["mint"]["mint"]
+    pool = st.artifacts["lp_init"]["pool"]
+    assert st.artifacts["buys_done"] == {"b0": True, "b1": True}
+    reserves = ledger.reserves(pool)
+    assert reserves["quote"] == int(plan.inputs.q_atomic) + 2 * SOL // 20
+    bought = sum(ledger.token_amount(ata(mint, st.artifacts["wallets"][w]["pub"])) for w in ("b0", "b1"))
+    assert reserves["base"] + bought == plan.token.lp_tokens
+    st.close()
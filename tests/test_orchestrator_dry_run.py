@@ -1,9 +1,12 @@
+import asyncio
 from pathlib import Path
 import json
 from types import SimpleNamespace
+import pytest
 from src.io.jsonio import load_plan
 from src.exec import orchestrator
 from src.exec.orchestrator import execute, RunConfig
+from src.util.state import load_artifacts
 
 
 class FakeRpc:
@@ -46,3 +49,45 @@ def test_orchestrator_writes_receipts(tmp_path, monkeypatch):
     execute(plan, cfg)
     rec = outdir / "receipts"
     assert (rec / "buys.json").exists()
+
+
+def test_setup_failure_releases_handles(tmp_path, monkeypatch):
+    plan = load_plan(Path("plans/sample_plan.json"))
+    (tmp_path / "artifacts.json").write_text(json.dumps({"mint": {"mint": "So11111111111111111111111111111111111111112"}}))
+    rpc, closed, telems = FakeRpc(), [], []
+
+    async def close():
+        closed.append("rpc")
+
+    class Telemetry(orchestrator.Telemetry):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            telems.append(self)
+
+    def broken_context(*a, **kw):
+        raise RuntimeError("no pool config")
+
+    rpc.close = close
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: rpc)
+    monkeypatch.setattr(orchestrator, "Telemetry", Telemetry)
+    monkeypatch.setattr(orchestrator, "build_context", broken_context)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=orchestrator.Keypair()))
+    cfg = RunConfig(out_dir=tmp_path, resume=False, only="buys", plan_hash="HASH", rpc_url="http://", cu_limit=None, cu_price_micro=None)
+    with pytest.raises(RuntimeError, match="no pool config"):
+        execute(plan, cfg)
+    # the session, the telemetry writer and the trace summary are all closed out
+    assert closed == ["rpc"] and not telems[0]._thread.is_alive()
+    assert (tmp_path / "metrics.prom").exists()
+
+
+def test_mint_key_is_only_generated_for_the_mint_step(tmp_path, monkeypatch):
+    plan = load_plan(Path("plans/sample_plan.json"))
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: FakeRpc())
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=orchestrator.Keypair()))
+    monkeypatch.setattr(orchestrator, "_STEP_RUNNERS", {**orchestrator._STEP_RUNNERS, "funding": lambda run: asyncio.sleep(0)})
+    cfg = RunConfig(out_dir=tmp_path, resume=False, only="buys", plan_hash="HASH", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True)
+    with pytest.raises(RuntimeError, match="no mint recorded"):
+        execute(plan, cfg)
+    cfg.only = "funding"
+    execute(plan, cfg)
+    assert "mint_keypair" not in load_artifacts(tmp_path)
@@ -0,0 +1,87 @@
+import json
+import pickle
+import shutil
+import struct
+from pathlib import Path
+
+import pytest
+
+from src.io import jsonio, plancache
+from src.io.plancache import cache_path, load_plan_cached
+from src.util.planhash import sha256_file
+
+PLAN = Path("plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json")
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    real = jsonio.load_plan
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(jsonio, "load_plan", counting)
+    return calls
+
+
+def test_second_load_skips_parsing(tmp_path, parses):
+    first = load_plan_cached(PLAN, tmp_path)
+    assert cache_path(tmp_path, sha256_file(PLAN)).exists()
+    second = load_plan_cached(PLAN, tmp_path)
+    assert len(parses) == 1
+    assert second.to_dict() == first.to_dict()
+    buyer = next(w.wallet_id for w in first.wallets if w.action)
+    assert second.wallet(buyer).action.type == first.wallet(buyer).action.type
+
+
+def test_rebuilds_on_new_plan_code_version_or_corruption(tmp_path, monkeypatch, parses):
+    plan_file = tmp_path / "plan.json"
+    shutil.copy(PLAN, plan_file)
+    load_plan_cached(plan_file, tmp_path)
+    # edited plan -> different hash -> different entry
+    plan_file.write_bytes(plan_file.read_bytes() + b"\n")
+    load_plan_cached(plan_file, tmp_path)
+    assert len(parses) == 2
+    # new code
+    monkeypatch.setattr(plancache, "CODE_VERSION", "other")
+    load_plan_cached(plan_file, tmp_path)
+    assert len(parses) == 3
+    # garbage on disk
+    entry = cache_path(tmp_path, sha256_file(plan_file))
+    entry.write_bytes(entry.read_bytes()[:40])
+    assert load_plan_cached(plan_file, tmp_path).plan_id
+    assert len(parses) == 4
+    load_plan_cached(plan_file, tmp_path)
+    assert len(parses) == 4
+
+
+class _Payload:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (Path.touch, (self.marker,))
+
+
+def test_entry_is_data_not_code(tmp_path, parses):
+    raw = json.loads(PLAN.read_text())
+    buyer = next(w for w in raw["wallets"] if w.get("action") and w["role"] != "LP_CREATOR")
+    buyer.update(index=7, name="early")
+    buyer["action"].update(atomic=True, quote_mint="So11111111111111111111111111111111111111112")
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(json.dumps(raw))
+    load_plan_cached(plan_file, tmp_path)
+    plan = load_plan_cached(plan_file, tmp_path)
+    assert len(parses) == 1 and plan.to_dict() == jsonio.load_plan(plan_file).to_dict()
+    assert plan.wallet(buyer["wallet_id"]).name == "early" and plan.wallet(buyer["wallet_id"]).action.atomic
+    # a planted pickle with a valid header is never unpickled
+    plan_hash = sha256_file(plan_file)
+    marker = tmp_path / "pwned"
+    header = json.dumps({"plan_hash": plan_hash, "code_version": plancache.CODE_VERSION, "column_bytes": []}).encode()
+    body = pickle.dumps(_Payload(marker))
+    cache_path(tmp_path, plan_hash).write_bytes(plancache.MAGIC + struct.pack(">I", len(header)) + header + struct.pack(">I", len(body)) + body)
+    assert load_plan_cached(plan_file, tmp_path).plan_id == plan.plan_id
+    assert not marker.exists() and len(parses) == 3
+    assert not hasattr(plancache, "pickle")
@@ -0,0 +1,168 @@
+import json
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core import keystore
+from src.exec import delta, orchestrator
+from src.exec.orchestrator import RunConfig
+from src.io.jsonio import load_plan
+from src.models.plan import Plan
+from src.models.plandiff import diff_plans
+from src.util.state import State
+
+SAMPLE = Path("plans/sample_plan.json")
+
+
+def _revised(mutate):
+    raw = json.loads(SAMPLE.read_text())
+    mutate(raw)
+    return Plan.from_dict(raw)
+
+
+def _add_buyer(raw, wid="w3", lamports=200_000_000):
+    raw["wallets"].append({
+        "wallet_id": wid, "role": "FOLLOWUP_BUY",
+        "funding": {"total_lamports": lamports, "base_lamports": lamports},
+        "action": {"type": "SWAP_BUY", "effective_base_sol": 0.2, "min_out_tokens": 1, "slippage_bps": 50},
+    })
+    raw["schedule"].append(wid)
+    raw["invariants"]["sum_non_seed_lamports"] += lamports
+    raw["invariants"]["seed_lamports"] += lamports
+
+
+def test_diff_sections_and_wallets():
+    old = load_plan(SAMPLE)
+
+    def mutate(raw):
+        _add_buyer(raw)
+        raw["wallets"][2]["action"]["slippage_bps"] = 75
+        raw["tx_defaults"]["compute_unit_price_micro_lamports"] = 5
+
+    d = diff_plans(old, _revised(mutate))
+    assert d.added == ["w3"] and d.removed == [] and d.schedule_added == ["w3"]
+    assert d.changed == {"w2": {"action.slippage_bps": (50, 75)}}
+    assert d.sections["tx_defaults"] == {"compute_unit_price_micro_lamports": (0, 5)}
+    assert set(d.sections["invariants"]) == {"sum_non_seed_lamports", "seed_lamports"}
+    assert d.blocking() == [] and not d.empty
+    assert diff_plans(old, load_plan(SAMPLE)).empty
+
+    d = diff_plans(old, _revised(lambda raw: raw["token"].update(symbol="NEW")))
+    assert d.blocking() == ["token.symbol: 'SAMP' -> 'NEW'"]
+
+
+def test_work_skips_what_already_happened():
+    old = load_plan(SAMPLE)
+
+    def mutate(raw):
+        _add_buyer(raw)
+        w2 = raw["wallets"][2]
+        w2["funding"]["total_lamports"] += 10
+        w2["action"]["slippage_bps"] = 75
+        raw["invariants"]["sum_non_seed_lamports"] += 10
+        raw["invariants"]["seed_lamports"] += 10
+
+    new = _revised(mutate)
+    d = diff_plans(old, new)
+    unbought = delta.plan_work(d, new, {}, "T")
+    assert (unbought.fund, unbought.top_up, unbought.buys) == (["w3"], {"w2": 10}, ["w2", "w3"])
+    bought = delta.plan_work(d, new, {"w2": True}, "T")
+    assert (bought.fund, bought.top_up, bought.buys) == (["w3"], {}, ["w3"])
+    assert "already bought" in bought.notes["w2"]
+
+
+class ChainRpc:
+    """Lands every send; ``forget`` drops a signature from the chain."""
+
+    def __init__(self):
+        self.sent = []
+        self.landed = set()
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def _land(self, tx):
+        sig = f"SIG{len(self.sent)}"
+        self.sent.append(tx)
+        self.landed.add(sig)
+        return sig
+
+    async def send_and_confirm(self, tx, *signers):
+        return await self._land(tx)
+
+    async def send(self, tx, *signers, skip_preflight=False):
+        return await self._land(tx)
+
+    async def confirm(self, sig):
+        return None
+
+    async def get_signature_statuses(self, sigs):
+        return [SimpleNamespace(slot=1, err=None) if s in self.landed else None for s in sigs]
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def get_balance(self, pubkey):
+        return 0
+
+    async def get_multiple_accounts(self, pubkeys):
+        return [None] * len(pubkeys)
+
+    async def close(self):
+        return None
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    monkeypatch.setattr(keystore, "SCRYPT_N", 2 ** 10)
+    rpc = ChainRpc()
+    seed = Keypair()
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: rpc)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=seed))
+    return rpc
+
+
+def _cfg(out, diff=None):
+    return RunConfig(out_dir=out, resume=diff is None, only="all", plan_hash="HNEW" if diff else "HOLD", rpc_url="http://", cu_limit=None, cu_price_micro=None, delta=diff)
+
+
+def test_apply_delta_funds_and_buys_only_new_work(tmp_path, chain):
+    out = tmp_path / "state"
+    old = load_plan(SAMPLE)
+    orchestrator.execute(old, _cfg(out))
+    shutil.copy(SAMPLE, out / "plan.json")
+    before = len(chain.sent)
+
+    new = _revised(_add_buyer)
+    orchestrator.execute(new, _cfg(out, diff_plans(old, new)))
+    # funding + prewarm + buy for w3, nothing for w1/w2
+    assert len(chain.sent) - before == 3
+    st = State(out)
+    assert st.artifacts["buys_done"] == {"w2": True, "w3": True}
+    assert "w3" in st.artifacts["wallets"]
+    rec = st.artifacts["deltas"]["HNEW"]
+    assert rec["work"]["fund"] == ["w3"] and rec["work"]["buys"] == ["w3"]
+    assert [s.get("reason") for s in rec["buys"]["swaps"]] == ["already_swapped", None]
+    st.close()
+
+    # unchanged work that is not on chain stops the delta before anything is sent
+    chain.landed.discard(State(out).txs["buys"]["w2"]["sig"])
+    newer = _revised(lambda raw: (_add_buyer(raw), _add_buyer(raw, "w4")))
+    sent = len(chain.sent)
+    with pytest.raises(RuntimeError, match="buys w2"):
+        orchestrator.execute(newer, _cfg(out, diff_plans(new, newer)))
+    assert len(chain.sent) == sent
+
+
+def test_apply_delta_refuses_blocking_changes(tmp_path, chain):
+    old = load_plan(SAMPLE)
+    new = _revised(lambda raw: raw["dex"].update(pool_type="CLMM"))
+    with pytest.raises(ValueError, match="dex.pool_type"):
+        orchestrator.execute(new, _cfg(tmp_path, diff_plans(old, new)))
+    assert chain.sent == []
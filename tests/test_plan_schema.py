@@ -1,6 +1,11 @@
+import json
 from pathlib import Path
 
+import pytest
+
 from src.io.jsonio import load_plan
+from src.models import plan as plan_mod
+from src.models.plan import PlanError
 
 
 def test_load_sample_plan():
@@ -8,3 +13,24 @@ def test_load_sample_plan():
     assert plan.token.lp_tokens == plan.inputs.T0
     assert len(plan.wallets) == 3
     assert plan.schedule == ['w1', 'w2']
+
+
+def test_reports_every_error_at_once_and_does_not_coerce(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_mod, "WALLET_CHUNK", 2)
+    monkeypatch.setattr("src.io.jsonio.WALLET_CHUNK", 2)
+    raw = json.loads(Path("plans/sample_plan.json").read_text())
+    raw["token"]["decimals"] = "6"
+    raw["wallets"][0]["funding"]["total_lamports"] = 1.5
+    raw["wallets"][2]["action"]["slippage_bps"] = "50"
+    raw["wallets"][2]["action"]["typo"] = 1
+    p = tmp_path / "plan.json"
+    p.write_text(json.dumps(raw))
+    with pytest.raises(PlanError) as e:
+        load_plan(p)
+    assert [path for path, _ in e.value.errors] == [
+        "$.token.decimals",
+        "$.wallets[0].funding.total_lamports",
+        "$.wallets[2].action.slippage_bps",
+        "$.wallets[2].action.typo",
+    ]
+    assert str(e.value).count("\n") == 3
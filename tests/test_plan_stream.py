@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.io.jsonio import load_plan
+from src.models.plan import Plan, PlanError, WalletTable
+
+SAMPLE = Path("plans/sample_plan.json")
+
+
+def _raw():
+    return json.loads(SAMPLE.read_text())
+
+
+def _write(tmp_path, raw):
+    p = tmp_path / "plan.json"
+    p.write_text(json.dumps(raw, indent=2))
+    return p
+
+
+def test_stream_matches_from_dict():
+    streamed = load_plan(SAMPLE)
+    assert streamed.to_dict() == Plan.from_dict(_raw()).to_dict()
+    assert streamed.wallet("w2").funding.total_lamports == streamed.wallets.total_lamports[streamed.wallets._pos["w2"]]
+    assert streamed.lp_creator.role == "LP_CREATOR"
+
+
+def test_row_views_write_through_to_columns():
+    plan = load_plan(SAMPLE)
+    w = plan.wallet("w2")
+    w.action.slippage_bps = 123
+    w.funding.buffer_lamports = 7
+    i = plan.wallets._pos["w2"]
+    assert plan.wallets.slippage_bps[i] == 123 and plan.wallets.buffer_lamports[i] == 7
+    assert plan.to_dict()["wallets"][i]["action"]["slippage_bps"] == 123
+
+
+@pytest.mark.parametrize(
+    "mutate, path",
+    [
+        (lambda r: r["wallets"][1]["funding"].update(total_lamports="lots"), "$.wallets[1].funding.total_lamports"),
+        (lambda r: r["wallets"][2].update(wallet_id=r["wallets"][1]["wallet_id"]), "$.wallets[2].wallet_id"),
+        (lambda r: r["wallets"][1]["action"].update(slipage_bps=1), "$.wallets[1].action.slipage_bps"),
+        (lambda r: r["wallets"][1]["action"].update(min_out_tokens=2 ** 63), "$.wallets[1].action.min_out_tokens"),
+        (lambda r: r["wallets"][0].pop("role"), "$.wallets[0].role"),
+        (lambda r: r["schedule"].append("ghost"), "$.schedule[2]"),
+        (lambda r: r["token"].update(extra=1), "$.token.extra"),
+    ],
+)
+def test_errors_carry_json_path(tmp_path, mutate, path):
+    raw = _raw()
+    mutate(raw)
+    with pytest.raises(PlanError) as e:
+        load_plan(_write(tmp_path, raw))
+    assert e.value.path == path and str(e.value).startswith(path)
+
+
+def test_rejected_row_leaves_every_column_aligned():
+    raw = _raw()
+    raw["wallets"][1]["action"]["min_out_tokens"] = 2 ** 64
+    t = WalletTable()
+    errors = t.extend_raw(raw["wallets"], 0)
+    assert [p for p, _ in errors] == ["$.wallets[1].action.min_out_tokens"]
+    cols = (t.ids, t.roles, t.total_lamports, t.base_lamports, t.buffer_lamports, t.action_type, t.effective_base_sol, t.min_out_tokens, t.slippage_bps)
+    assert {len(c) for c in cols} == {len(raw["wallets"]) - 1}
+    assert [w.wallet_id for w in t] == [raw["wallets"][0]["wallet_id"], raw["wallets"][2]["wallet_id"]]
+
+
+def test_syntax_error_has_path_and_position(tmp_path):
+    text = json.dumps(_raw(), indent=2)
+    p = tmp_path / "plan.json"
+    cut = text.index('"wallet_id": "w2"')
+    p.write_text(text[:cut] + "wallet_id: 'w2'" + text[cut + 17:])
+    with pytest.raises(PlanError, match=r"invalid JSON.*line \d+ column \d+") as e:
+        load_plan(p)
+    assert e.value.path == "$.wallets[2]"
+
+
+def test_large_plan(tmp_path):
+    raw = _raw()
+    template = next(w for w in raw["wallets"] if w["role"] == "FOLLOWUP_BUY")
+    n = 20_000
+    extra = [dict(template, wallet_id=f"x{i}", funding={"total_lamports": 1, "base_lamports": 1, "buffer_lamports": 0}) for i in range(n)]
+    raw["wallets"] += extra
+    raw["schedule"] += [w["wallet_id"] for w in extra]
+    raw["invariants"]["sum_non_seed_lamports"] += n
+    raw["invariants"]["seed_lamports"] += n
+    plan = load_plan(_write(tmp_path, raw))
+    assert len(plan.wallets) == 3 + n and plan.wallet(f"x{n - 1}").action.type == template["action"]["type"]
+    assert plan.wallets.total_lamports.itemsize == 8 and len(plan.wallets.action_extra) <= 3
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from solders.pubkey import Pubkey
+
+from src.core.tx import PACKET_DATA_SIZE
+from src.io.jsonio import load_plan
+from src.util import preflight
+from src.util.config import load_config
+from src.util.state import State
+
+SAMPLE = Path("plans/sample_plan.json")
+
+
+def _plan(tmp_path, buys):
+    raw = json.loads(SAMPLE.read_text())
+    template = next(w for w in raw["wallets"] if w["role"] == "FOLLOWUP_BUY")
+    extra = [dict(template, wallet_id=f"x{i}", funding={"total_lamports": 1, "base_lamports": 1, "buffer_lamports": 0}) for i in range(buys)]
+    raw["wallets"] += extra
+    raw["schedule"] += [w["wallet_id"] for w in extra]
+    raw["invariants"]["sum_non_seed_lamports"] += buys
+    raw["invariants"]["seed_lamports"] += buys
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(raw))
+    return path, load_plan(path)
+
+
+class SlowRpc:
+    """Each simulation takes ``delay`` seconds; tracks how many overlap."""
+
+    def __init__(self, delay=0.005, fail=()):
+        self.delay = delay
+        self.fail = {str(Pubkey.from_string(pub)) for pub in fail}  # fee payers whose transactions fail
+        self.in_flight = 0
+        self.peak = 0
+        self.simulated = []
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def get_multiple_accounts(self, pubkeys):
+        return [object()] * len(pubkeys)
+
+    async def simulate(self, tx, *signers):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.simulated.append(tx)
+        if str(tx.fee_payer) in self.fail:
+            return {"err": "InstructionError(2, Custom(30))", "logs": ["Program log: Error: exceeds desired slippage limit", "Program xyz failed: custom program error: 0x1e"], "units_consumed": 41_000}
+        return {"err": None, "logs": [], "units_consumed": 12_000}
+
+
+def test_simulates_every_transaction_concurrently(tmp_path):
+    path, plan = _plan(tmp_path, 500)
+    cfg = load_config(Path("configs/defaults.yaml"))
+    rpc = SlowRpc()
+    t0 = time.perf_counter()
+    res = asyncio.run(preflight.preflight(rpc, path, cfg, plan, out_dir=tmp_path, concurrency=32))
+    elapsed = time.perf_counter() - t0
+
+    s = res["summary"]
+    buyers = 501  # sample plan's own buyer + 500
+    assert s["funding"]["count"] == len(plan.wallets) - 1
+    assert s["buy"]["count"] == buyers and s["prewarm"]["count"] == -(-buyers // 3)
+    assert s["mint"]["count"] == s["metadata"]["count"] == s["pool"]["count"] == 1
+    assert len(rpc.simulated) == len(res["transactions"])
+    assert rpc.peak == 32
+    assert elapsed < len(rpc.simulated) * rpc.delay / 4
+    assert res["ok"] and res["simulate_metadata_ok"] and res["simulate_init_ok"]
+    assert set(res["preview_keys"]) == {"mint", "seed", f"wallets ({len(plan.wallets) - 1})"}
+
+    row = res["transactions"][0]
+    assert row["units_consumed"] == 12_000 and 0 < row["size_bytes"] <= PACKET_DATA_SIZE and not row["too_large"]
+    assert row["fee_lamports"] >= 5000
+    assert res["fees_total_lamports"] == sum(r["fee_lamports"] for r in res["transactions"])
+
+
+def test_reads_out_dir_artifacts_and_reports_failures(tmp_path):
+    path, plan = _plan(tmp_path, 2)
+    out = tmp_path / "run-a"
+    out.mkdir()
+    wallets = {w.wallet_id: {"pub": f"PUB{w.wallet_id}"} for w in plan.wallets}
+    (out / "artifacts.json").write_text(json.dumps({"mint": {"mint": "MINTA"}, "wallets": wallets}))
+    cfg = load_config(Path("configs/defaults.yaml"))
+    rpc = SlowRpc(delay=0, fail={"PUBx1"})
+    res = asyncio.run(preflight.preflight(rpc, path, cfg, plan, out_dir=out, seed_pub="SEED"))
+
+    assert res["preview_keys"] == []
+    rows = {(r["kind"], r["key"]): r for r in res["transactions"]}
+    assert rows[("mint", "MINTA")]["ok"]
+    bad = rows[("buy", "x1")]
+    assert not bad["ok"] and bad["err"].startswith("InstructionError")
+    assert bad["log_errors"] == ["Program log: Error: exceeds desired slippage limit", "Program xyz failed: custom program error: 0x1e"]
+    assert res["summary"]["buy"]["failed"] == 1 and not res["ok"]
+
+
+def test_reads_artifacts_left_in_the_journal(tmp_path):
+    path, plan = _plan(tmp_path, 1)
+    out = tmp_path / "run-b"
+    wallets = {w.wallet_id: {"pub": f"PUB{w.wallet_id}"} for w in plan.wallets}
+    st = State(out)
+    st.merge_artifacts({"mint": {"mint": "MINTB"}, "wallets": wallets})
+    st.flush()  # on disk in journal.ndjson only, as after an unclean exit
+    assert not (out / "artifacts.json").exists()
+    cfg = load_config(Path("configs/defaults.yaml"))
+    res = asyncio.run(preflight.preflight(SlowRpc(delay=0), path, cfg, plan, out_dir=out, seed_pub="SEED"))
+    st.close()
+    assert res["preview_keys"] == [] and ("mint", "MINTB") in {(r["kind"], r["key"]) for r in res["transactions"]}
+
+    (out / "artifacts.json").write_text("{not json")
+    with pytest.raises(ValueError):
+        asyncio.run(preflight.preflight(SlowRpc(delay=0), path, cfg, plan, out_dir=out, seed_pub="SEED"))
@@ -10,8 +10,11 @@ class DummyRpc:
     async def simulate(self, tx, *signers):
         return {"err": None}
 
-    async def account_exists(self, pubkey):
-        return True
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def get_multiple_accounts(self, pubkeys):
+        return [object()] * len(pubkeys)
 
 
 def test_preflight_shapes():
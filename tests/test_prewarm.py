@@ -0,0 +1,66 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+
+from src.io.jsonio import load_plan
+from src.core.ata import ata
+from src.exec import prewarm
+
+WSOL = "So11111111111111111111111111111111111111112"
+MINT = "Mint111111111111111111111111111111111111111"
+
+
+class BulkRpc:
+    def __init__(self, existing=None):
+        self.existing = existing or {}
+        self.reads = 0
+        self.sent = []
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def get_multiple_accounts(self, pubkeys):
+        self.reads += 1
+        return [self.existing.get(p) for p in pubkeys]
+
+    async def send_and_confirm(self, tx, *signers):
+        self.sent.append((tx, signers))
+        return "SIG"
+
+
+def _wallets(plan):
+    return {w.wallet_id: {"kp": kp, "pub": str(kp.pubkey())} for w in plan.wallets if w.role != "SEED" for kp in [Keypair()]}
+
+
+def _wsol_account(amount):
+    return SimpleNamespace(data=bytes(64) + amount.to_bytes(8, "little") + bytes(93))
+
+
+def test_prewarm_creates_and_wraps_in_batches():
+    plan = load_plan(Path("plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"))
+    wallets = _wallets(plan)
+    rpc = BulkRpc()
+    out = asyncio.run(prewarm.run(rpc, Keypair(), plan, wallets, MINT, WSOL, None, None))
+    assert rpc.reads == 1
+    assert len(rpc.sent) == 1  # three buyers fit in one batch
+    tx, signers = rpc.sent[0]
+    # per buyer: base ATA + WSOL ATA + transfer + syncNative
+    assert len(tx.instructions) == 12 and len(signers) == 4
+    assert [r["wrapped_lamports"] for r in out["wallets"]] == [500_000_000, 300_000_000, 200_000_000]
+
+
+def test_prewarm_resume_skips_existing_accounts():
+    plan = load_plan(Path("plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"))
+    wallets = _wallets(plan)
+    existing = {}
+    for wid, need in (("w1", 500_000_000), ("w2", 300_000_000)):
+        pub = wallets[wid]["pub"]
+        existing[ata(MINT, pub)] = _wsol_account(0)
+        existing[ata(WSOL, pub)] = _wsol_account(need)
+    rpc = BulkRpc(existing)
+    out = asyncio.run(prewarm.run(rpc, Keypair(), plan, wallets, MINT, WSOL, None, None))
+    assert [r.get("skipped", False) for r in out["wallets"]] == [True, True, False]
+    tx, _signers = rpc.sent[0]
+    assert len(tx.instructions) == 4
@@ -0,0 +1,54 @@
+import asyncio
+import hashlib
+import json
+import time
+
+from src.util.profiling import IO_WAIT, profiled, step_frame
+
+
+def _burn(sec):
+    end = time.perf_counter() + sec
+    while time.perf_counter() < end:
+        hashlib.sha256(b"x" * 1024).digest()
+
+
+@step_frame
+async def _step(name, sec):
+    _burn(sec)
+    await asyncio.sleep(0)
+
+
+async def _workload():
+    await _step("mint", 0.15)
+    await asyncio.sleep(0.15)
+    return "ok"
+
+
+def test_profile_splits_steps_from_io_wait(tmp_path):
+    result, summary = asyncio.run(profiled(_workload(), tmp_path, "run", interval_sec=0.002))
+    assert result == "ok"
+    assert summary["steps_busy_ms"]["mint"] > 50
+    assert summary["io_wait_ms"] > 50
+    assert summary["busy_ms"] + summary["io_wait_ms"] <= summary["wall_ms"] * 1.01
+    # the CPU burner dominates self time
+    assert any("_burn" in row["function"] for row in summary["top_self"][:3])
+    assert summary["loop_lag"]["max_ms"] > 50
+    assert json.loads((tmp_path / "profile-run.json").read_text())["command"] == "run"
+    lines = (tmp_path / "profile-run.collapsed").read_text().splitlines()
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    assert any(k.startswith("[step:mint];") and "_burn" in k for k in stacks)
+    assert any(k.startswith(IO_WAIT + ";") for k in stacks)
+    assert all(int(c) > 0 for c in stacks.values())
+
+
+def test_profile_files_written_when_run_fails(tmp_path):
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("rpc down")
+
+    try:
+        asyncio.run(profiled(boom(), tmp_path, "verify"))
+    except RuntimeError:
+        pass
+    assert (tmp_path / "profile-verify.collapsed").exists()
+    assert (tmp_path / "profile-verify.json").exists()
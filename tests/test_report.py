@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from src.util import report
+
+
+def _span(name, start_ms, dur_ms, **attrs):
+    return {"event": "span", "name": name, "span_id": 1, "parent_id": None, "start_ms": start_ms, "dur_ms": dur_ms, **attrs}
+
+
+def _write(path, events, tail=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(e) + "\n" for e in events) + tail)
+
+
+def _run(pool_end, buy_ends, rpc_ms=(10,)):
+    ev = [_span("rpc.sendTransaction", 0, ms, step="buys") for ms in rpc_ms]
+    ev.append(_span("tx.land", pool_end - 400, 400, step="lp_init"))
+    ev += [_span("tx.land", end - 300, 300, step="buys", key=f"w{i}") for i, end in enumerate(buy_ends)]
+    ev.append(_span("step.buys", 0, buy_ends[-1], step="buys"))
+    ev.append({"event": "latency_histograms", "spans": {}})
+    return ev
+
+
+def test_report_latency_and_buy_landing(tmp_path):
+    f = tmp_path / "a" / "telemetry.ndjson"
+    # two runs appended to one file (a resume), plus a torn last line
+    _write(f, _run(1000, [1100, 1150, 1300], rpc_ms=range(1, 101)) + _run(500, [900], rpc_ms=()), tail='{"event": "sp')
+    r = report.analyze([tmp_path])
+    assert (r.files, r.runs, r.bad_lines) == (1, 2, 1)
+    m = r.to_dict()["metrics"]
+    assert m["rpc.sendTransaction"]["count"] == 100
+    assert m["rpc.sendTransaction"]["p50_ms"] == pytest.approx(50.0, rel=0.04)
+    assert m["rpc.sendTransaction"]["p99_ms"] == pytest.approx(99.0, rel=0.04)
+    assert m["send_to_confirm.buys"]["count"] == 4 and m["send_to_confirm.lp_init"]["count"] == 2
+    # first buy 100ms after the pool in run 1, 400ms in run 2
+    assert m["time_to_first_buy"]["count"] == 2
+    assert m["time_to_first_buy"]["max_ms"] == pytest.approx(400, rel=0.04)
+    assert m["buy_interarrival"]["count"] == 2
+    assert m["buy_interarrival"]["max_ms"] == pytest.approx(150, rel=0.04)
+    assert [row[0] for row in r.rows()] == ["rpc", "step", "send_to_confirm", "send_to_confirm", "buys", "buys"]
+
+
+def test_compare_aligns_metrics_from_both_runs(tmp_path):
+    _write(tmp_path / "a.ndjson", _run(1000, [1100], rpc_ms=[5]))
+    b_events = _run(1000, [1050], rpc_ms=[7])
+    b_events.insert(0, _span("rpc.getSlot", 0, 2))
+    _write(tmp_path / "b.ndjson", b_events)
+    rows = report.compare(report.analyze([tmp_path / "a.ndjson"]), report.analyze([tmp_path / "b.ndjson"]))
+    by_key = {key: (sa, sb) for _section, key, sa, sb in rows}
+    assert by_key["rpc.getSlot"][0] is None and by_key["rpc.getSlot"][1]["count"] == 1
+    sa, sb = by_key["time_to_first_buy"]
+    assert sa["p50_ms"] > sb["p50_ms"]
+
+
+def test_missing_path_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        report.analyze([tmp_path / "nope"])
+    with pytest.raises(ValueError):
+        report.analyze([tmp_path])
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from src.util.config import load_config, parse_config
+from src.exec.context import build_context
+from src.core.metaplex import find_metadata_pda
+from src.dex.raydium_v4 import derive_pool_accounts
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+def test_context_derives_once_from_typed_config():
+    config = parse_config(load_config(Path("configs/defaults.yaml")))
+    ctx = build_context(config, MINT)
+    assert ctx.metadata_pda == find_metadata_pda(MINT, config.program_ids.metaplex_token_metadata)
+    assert ctx.pool == derive_pool_accounts(MINT, config.wrapped_sol, config.program_ids.raydium_v4_amm)
+    assert ctx.cu_limit == config.fees.compute_unit_limit
+    assert build_context(config, MINT, cu_limit=5, cu_price_micro=7).cu_price_micro == 7
+    with pytest.raises(Exception):
+        ctx.mint = "other"  # frozen
+
+
+def test_parse_config_rejects_bad_types():
+    raw = load_config(Path("configs/defaults.yaml"))
+    raw["fees"]["compute_unit_limit"] = "lots"
+    with pytest.raises(ValueError, match="fees.compute_unit_limit"):
+        parse_config(raw)
+    with pytest.raises(ValueError, match="raydium_v4_amm"):
+        parse_config({"program_ids": {"metaplex_token_metadata": "x"}, "mints": {"wrapped_sol": MINT}})
+
+
+def test_parse_config_reports_all_errors():
+    raw = load_config(Path("configs/defaults.yaml"))
+    raw["fees"]["jito_tip_lamports"] = 1.5
+    raw["telemetry"]["overflow"] = "spill"
+    raw["execution"]["retries"] = 3
+    with pytest.raises(ValueError) as e:
+        parse_config(raw)
+    assert [line.split(":")[0] for line in str(e.value).splitlines()] == [
+        "config.fees.jito_tip_lamports", "config.execution.retries", "config.telemetry.overflow",
+    ]
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.exec.scheduler import run_graph, critical_path, topo_order
+from src.exec.orchestrator import STEP_GRAPH, selected_steps
+
+
+def _runners(log, delays, fail=None):
+    def make(name):
+        async def run():
+            log.append(("start", name))
+            await asyncio.sleep(delays.get(name, 0))
+            if name == fail:
+                raise RuntimeError(name)
+            log.append(("end", name))
+        return run
+    return {n: make(n) for n in STEP_GRAPH}
+
+
+def test_independent_steps_overlap_and_deps_hold():
+    log = []
+    delays = {"funding": 0.05, "mint": 0.01, "metadata": 0.08}
+    timings = asyncio.run(run_graph(STEP_GRAPH, _runners(log, delays), set(STEP_GRAPH)))
+    # funding and mint start before either finishes
+    assert log[:2] == [("start", "funding"), ("start", "mint")]
+    for step, deps in STEP_GRAPH.items():
+        for d in deps:
+            assert log.index(("end", d)) < log.index(("start", step))
+    # metadata overlaps lp_init/buys; the buys chain is gated by funding
+    assert timings["lp_init"].gated_by == "funding"
+    assert critical_path(timings, target="buys") == ["funding", "lp_init", "buys"]
+
+
+def test_only_runs_single_node():
+    log = []
+    timings = asyncio.run(run_graph(STEP_GRAPH, _runners(log, {}), selected_steps("buys")))
+    assert list(timings) == ["buys"] and timings["buys"].gated_by is None
+    assert selected_steps("lp") == {"lp_init"} and selected_steps("fund") == {"funding"}
+
+
+def test_failure_cancels_dependents():
+    log = []
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_graph(STEP_GRAPH, _runners(log, {"funding": 0.05}, fail="mint"), set(STEP_GRAPH)))
+    assert ("start", "metadata") not in log and ("end", "funding") not in log
+
+
+def test_topo_order_rejects_cycles():
+    assert topo_order(STEP_GRAPH)[-1] == "buys"
+    with pytest.raises(ValueError):
+        topo_order({"a": ("b",), "b": ("a",)})
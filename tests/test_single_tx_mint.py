@@ -0,0 +1,83 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+
+from src.io.jsonio import load_plan
+from src.exec import minting, orchestrator
+from src.exec.orchestrator import RunConfig
+from src.core.metaplex import build_create_metadata_v3
+
+
+class RecordingRpc:
+    def __init__(self):
+        self.sent = []
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def send_and_confirm(self, tx, *signers):
+        self.sent.append((tx, signers))
+        return "SIG"
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def get_balance(self, pubkey):
+        return 0
+
+    async def close(self):
+        return None
+
+
+def test_mint_is_one_transaction():
+    rpc = RecordingRpc()
+    payer, mint_kp, auth = Keypair(), Keypair(), Keypair()
+    out = asyncio.run(minting.run(rpc, payer, mint_kp, auth, 6, 1_000))
+    assert len(rpc.sent) == 1
+    tx, signers = rpc.sent[0]
+    # createAccount + initializeMint2 + createIdempotentATA + mintTo
+    assert len(tx.instructions) == 4
+    assert [bytes(ix.data)[0] for ix in tx.instructions[1:]] == [20, 1, 7]
+    assert len(signers) == 3
+    assert out["tx_sig"] == "SIG" and not out["metadata_fused"]
+
+
+def test_mint_fuses_metadata_and_dedupes_signers():
+    rpc = RecordingRpc()
+    payer, mint_kp = Keypair(), Keypair()
+    md_ix = build_create_metadata_v3(
+        metadata_program="metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s",
+        mint=str(mint_kp.pubkey()),
+        mint_authority=str(payer.pubkey()),
+        payer=str(payer.pubkey()),
+        update_authority=str(payer.pubkey()),
+        name="N",
+        symbol="S",
+        uri="",
+    )
+    out = asyncio.run(minting.run(rpc, payer, mint_kp, payer, 6, 1_000, metadata_ix=md_ix))
+    tx, signers = rpc.sent[0]
+    assert len(tx.instructions) == 5 and tx.instructions[-1] is md_ix
+    assert len(signers) == 2
+    assert out["metadata_fused"]
+
+
+def test_orchestrator_fused_mint_marks_metadata(tmp_path, monkeypatch):
+    plan = load_plan(Path("plans/sample_plan.json"))
+    outdir = tmp_path / "state"
+    rpc = RecordingRpc()
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: rpc)
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=Keypair()))
+    cfg = RunConfig(out_dir=outdir, resume=False, only="mint", plan_hash="HASH", rpc_url="http://", cu_limit=None, cu_price_micro=None, fuse_metadata=True)
+    orchestrator.execute(plan, cfg)
+
+    art = json.loads((outdir / "artifacts.json").read_text())
+    assert len(rpc.sent) == 1
+    assert art["metadata"]["fused_with_mint"] == art["mint"]["mint"] == art["mint_keypair"]["pub"]
+    assert (outdir / "receipts" / "metadata.json").exists()
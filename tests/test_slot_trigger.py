@@ -0,0 +1,116 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from solana.transaction import Transaction
+from solders.keypair import Keypair
+
+from src.exec import trigger
+from src.util.slotclock import SlotClock, LandingLatency
+
+
+def _clock(now, slot_sec=0.1, n=8):
+    c = SlotClock(slot_sec=slot_sec)
+    for i in range(n):
+        c.add(now - (n - 1 - i) * slot_sec, 1000 + i)
+    return c
+
+
+class TriggerRpc:
+    def __init__(self, clock, recent_sends, land_after_slots=2):
+        self.clock = clock
+        self.recent_sends = recent_sends
+        self.land_after = land_after_slots
+        self.sent = []
+        self.landed = {}
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def send(self, tx, *signers, skip_preflight=False):
+        sig = f"SIG{len(self.sent)}"
+        self.sent.append((sig, tx, skip_preflight))
+        self.landed[sig] = round(self.clock.slot_at()) + self.land_after
+        return sig
+
+    async def confirm(self, sig):
+        return None
+
+    async def get_signature_statuses(self, sigs):
+        return [SimpleNamespace(slot=self.landed[s], err=None) for s in sigs]
+
+
+def test_slot_clock_fits_rate_and_inverts():
+    now = time.monotonic()
+    c = _clock(now)
+    assert c.slot_at(now) == pytest.approx(1007)
+    assert c.time_of(1017) == pytest.approx(now + 1.0)
+    lone = SlotClock(slot_sec=0.4)
+    lone.add(now, 50)
+    assert lone.time_of(55) == pytest.approx(now + 2.0)
+
+
+def test_landing_latency_ignores_failed_and_unknown():
+    now = time.monotonic()
+    c = _clock(now)
+    sends = [(now - 0.5, "a"), (now - 0.4, "b"), (now - 0.3, "c")]
+    statuses = [SimpleNamespace(slot=1005, err=None), None, SimpleNamespace(slot=1006, err="boom")]
+    lat = LandingLatency.from_sends(sends, statuses, c)
+    assert lat.n == 1 and lat.value == pytest.approx(0.3)
+
+
+def test_trigger_fires_presigned_pool_then_buys_at_target():
+    now = time.monotonic()
+    clock = _clock(now)
+    # earlier sends landed two slots (0.2s) after submission
+    rpc = TriggerRpc(clock, [(now - 0.5, "prep")])
+    rpc.landed["prep"] = round(clock.slot_at(now - 0.5)) + 2
+    target = trigger.Target(slot=1010)
+    pool_tx, buy_tx = Transaction(), Transaction()
+    out = asyncio.run(trigger.run(rpc, clock, target, pool_tx, Keypair(), [("w1", buy_tx, Keypair())], sign_lead_sec=0.05))
+    assert [s[1] for s in rpc.sent] == [pool_tx, buy_tx]
+    assert all(skip for _sig, _tx, skip in rpc.sent)
+    assert pool_tx.recent_blockhash == "HASH" and buy_tx.recent_blockhash == "HASH"
+    assert out["latency_samples"] == 1 and out["latency_comp_ms"] == pytest.approx(200, abs=1)
+    assert out["target_slot"] == 1010 and abs(out["slot_error"]) <= 1
+    assert out["swaps"] == [{"wallet_id": "w1", "sig": "SIG1"}]
+
+
+def test_target_requires_exactly_one_of_slot_or_time():
+    with pytest.raises(ValueError):
+        trigger.Target()
+    with pytest.raises(ValueError):
+        trigger.Target(slot=1, unix_time=2.0)
+
+
+def test_timed_runs_use_trigger_graph():
+    from src.exec.orchestrator import TRIGGER_GRAPH, selected_steps
+    from src.exec.scheduler import topo_order
+
+    assert topo_order(TRIGGER_GRAPH)[-1] == "fire"
+    assert selected_steps("all", timed=True) == set(TRIGGER_GRAPH)
+    with pytest.raises(ValueError):
+        selected_steps("buys", timed=True)
+
+
+def test_fire_time_is_recomputed_after_the_long_wait(monkeypatch):
+    now = time.monotonic()
+    clock = _clock(now)
+    rpc = TriggerRpc(clock, [])
+    stale = clock.time_of(1020)
+    waits = []
+
+    async def sleep_until(t):
+        waits.append(t)
+        if len(waits) == 1:
+            # slots ran slower than fitted while we waited: slot 1007 is only now
+            clock.samples.clear()
+            for i in range(8):
+                clock.add(now + 1.0 - (7 - i) * 0.12, 1000 + i)
+
+    monkeypatch.setattr(trigger, "_sleep_until", sleep_until)
+    out = asyncio.run(trigger.run(rpc, clock, trigger.Target(slot=1020), Transaction(), Keypair(), [], sign_lead_sec=0.5))
+    lead = out["latency_comp_ms"] / 1000
+    assert waits[0] == pytest.approx(stale - lead - 0.5)
+    assert waits[1] == pytest.approx(clock.time_of(1020) - lead) and waits[1] > stale
@@ -0,0 +1,54 @@
+import json
+import time
+
+from src.util.state import State, StepReceipt, load_artifacts, JOURNAL, COMPACTING
+
+
+def _receipt(step):
+    return StepReceipt(step=step, ok=True, inputs={}, outputs={"n": 1}, plan_hash="H")
+
+
+def test_changes_append_to_journal_until_close(tmp_path):
+    st = State(tmp_path)
+    st.merge_artifacts({"mint": {"mint": "M"}})
+    st.mark("mint", _receipt("mint"))
+    assert not (tmp_path / "artifacts.json").exists()
+    lines = (tmp_path / JOURNAL).read_bytes().splitlines()
+    assert [json.loads(l)["op"] for l in lines] == ["merge", "mark"]
+    assert st.load_receipt("mint")["outputs"] == {"n": 1}
+    st.close()
+    assert not (tmp_path / JOURNAL).exists()
+    assert json.loads((tmp_path / "artifacts.json").read_text()) == {"mint": {"mint": "M"}}
+    assert (tmp_path / "receipts" / "mint.json").exists()
+    reopened = State(tmp_path)
+    assert reopened.done("mint") and reopened.artifacts["mint"]["mint"] == "M"
+
+
+def test_replay_after_crash_ignores_torn_tail(tmp_path):
+    st = State(tmp_path)
+    st.merge_artifacts({"a": 1})
+    st.mark("funding", _receipt("funding"))
+    st.merge_artifacts({"b": 2})
+    # simulate a crash mid-append: no close(), partial last record
+    with open(tmp_path / JOURNAL, "ab") as f:
+        f.write(b'{"seq": 4, "op": "merge", "patch": {"c"')
+    assert load_artifacts(tmp_path) == {"a": 1, "b": 2}
+    st2 = State(tmp_path)
+    assert st2.artifacts == {"a": 1, "b": 2} and st2.done("funding")
+    assert not (tmp_path / JOURNAL).exists()
+    st2.merge_artifacts({"c": 3})
+    st2.close()
+    assert State(tmp_path).artifacts == {"a": 1, "b": 2, "c": 3}
+
+
+def test_background_compaction_folds_journal(tmp_path):
+    st = State(tmp_path, compact_bytes=256)
+    for i in range(20):
+        st.merge_artifacts({f"k{i}": i})
+    deadline = time.monotonic() + 2
+    while (tmp_path / COMPACTING).exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    snap = json.loads((tmp_path / "checkpoints.json").read_text())
+    assert snap["journal_seq"] > 0
+    assert load_artifacts(tmp_path) == {f"k{i}": i for i in range(20)}
+    st.close()
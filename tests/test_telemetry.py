@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from src.util.telemetry import Telemetry
+
+
+def _events(path):
+    return [json.loads(l) for l in path.read_bytes().splitlines()]
+
+
+def test_emit_buffers_until_threshold_and_close_drains(tmp_path):
+    batches = []
+    t = Telemetry(tmp_path / "t.ndjson", mirror=batches.append, flush_events=1000, flush_interval_sec=60)
+    for i in range(5):
+        t.emit({"event": "x", "i": i})
+    assert not (tmp_path / "t.ndjson").exists()
+    t.close()
+    assert [e["i"] for e in _events(tmp_path / "t.ndjson")] == list(range(5))
+    assert len(batches) == 1 and len(batches[0]) == 5
+
+
+def test_drop_policy_counts_overflow(tmp_path):
+    t = Telemetry(tmp_path / "t.ndjson", capacity=2, overflow="drop", flush_events=1000, flush_interval_sec=60)
+    for i in range(5):
+        t.emit({"event": "x", "i": i})
+    t.close()
+    ev = _events(tmp_path / "t.ndjson")
+    assert [e.get("i") for e in ev[:2]] == [0, 1]
+    assert ev[-1] == {"event": "telemetry_dropped", "count": 3, "ts_ms": ev[-1]["ts_ms"]}
+
+
+def test_block_policy_loses_nothing(tmp_path):
+    t = Telemetry(tmp_path / "t.ndjson", capacity=2, overflow="block", flush_events=2, flush_interval_sec=60)
+    for i in range(50):
+        t.emit({"event": "x", "i": i})
+    t.close()
+    assert [e["i"] for e in _events(tmp_path / "t.ndjson")] == list(range(50))
+
+
+def test_rejects_unknown_overflow_policy(tmp_path):
+    with pytest.raises(ValueError):
+        Telemetry(tmp_path / "t.ndjson", overflow="spill")
+
+
+def test_mirror_failure_is_reported_and_writer_survives(tmp_path):
+    seen = []
+
+    def mirror(batch):
+        seen.append(len(batch))
+        if len(seen) == 1:
+            raise RuntimeError("database is locked")
+
+    t = Telemetry(tmp_path / "t.ndjson", mirror=mirror, flush_events=2, flush_interval_sec=60)
+    t.emit({"event": "a"})
+    t.flush()
+    t.emit({"event": "b"})
+    t.flush()
+    assert t._thread.is_alive() and t.mirror_errors == 1 and seen == [1, 1]
+    t.close()
+    events = _events(tmp_path / "t.ndjson")
+    assert [e["event"] for e in events] == ["a", "b", "telemetry_mirror_failed"]
+    assert events[-1]["error"] == "RuntimeError: database is locked"
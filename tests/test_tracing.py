@@ -0,0 +1,104 @@
+import asyncio
+import json
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.io.jsonio import load_plan
+from src.exec import orchestrator
+from src.exec.orchestrator import execute, RunConfig
+from src.util.histogram import LatencyHistogram
+from src.util.tracing import Tracer, activate, deactivate, span
+
+PLAN = "plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = random.Random(7)
+    values = [rng.randint(50, 2_000_000) for _ in range(5000)]
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    values.sort()
+    for p in (50, 90, 99):
+        exact = values[int(len(values) * p / 100) - 1]
+        assert abs(h.percentile(p) - exact) <= exact * 0.04
+    assert h.percentile(100) == values[-1]
+    merged = LatencyHistogram.from_dict(json.loads(json.dumps(h.to_dict())))
+    merged.merge(h)
+    assert merged.count == 10000 and merged.percentile(50) == h.percentile(50)
+
+
+def test_spans_nest_across_gathered_tasks():
+    events = []
+    tracer = Tracer(emit=events.append)
+
+    async def call(i):
+        with span("rpc.getSlot", i=i):
+            await asyncio.sleep(0)
+
+    async def main():
+        token = activate(tracer)
+        try:
+            with span("step.buys"):
+                await asyncio.gather(call(1), call(2))
+        finally:
+            deactivate(token)
+
+    asyncio.run(main())
+    step = next(e for e in events if e["name"] == "step.buys")
+    rpcs = [e for e in events if e["name"] == "rpc.getSlot"]
+    assert step["parent_id"] is None
+    assert [e["parent_id"] for e in rpcs] == [step["span_id"]] * 2
+    assert tracer.histograms["rpc.getSlot"].count == 2
+    # no tracer active: spans are a no-op
+    with span("rpc.getSlot"):
+        pass
+    assert tracer.histograms["rpc.getSlot"].count == 2
+
+
+def test_span_records_error_and_prometheus_text():
+    tracer = Tracer()
+    token = activate(tracer)
+    try:
+        try:
+            with span("rpc.sendTransaction"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+    finally:
+        deactivate(token)
+    text = tracer.prometheus_text()
+    assert "# TYPE launcher_span_seconds histogram" in text
+    assert 'launcher_span_seconds_bucket{span="rpc.sendTransaction",le="+Inf"} 1' in text
+    assert 'launcher_span_seconds_count{span="rpc.sendTransaction"} 1' in text
+
+
+class FakeRpc:
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def simulate(self, tx, *signers):
+        return {"logs": []}
+
+    async def account_exists(self, pubkey):
+        return False
+
+    async def close(self):
+        return None
+
+
+def test_run_writes_step_spans_and_metrics(tmp_path, monkeypatch):
+    plan = load_plan(Path(PLAN))
+    monkeypatch.setattr(orchestrator, "Rpc", lambda cfg: FakeRpc())
+    monkeypatch.setattr(orchestrator, "load_seed_from_file", lambda path: SimpleNamespace(kp=orchestrator.Keypair()))
+    (tmp_path / "artifacts.json").write_text(json.dumps({"mint": {"mint": "So11111111111111111111111111111111111111112"}}))
+    cfg = RunConfig(out_dir=tmp_path, resume=False, only="buys", plan_hash="PH", rpc_url="http://", cu_limit=None, cu_price_micro=None, simulate=True)
+    execute(plan, cfg)
+    events = [json.loads(l) for l in (tmp_path / "telemetry.ndjson").read_text().splitlines()]
+    spans = {e["name"]: e for e in events if e["event"] == "span"}
+    assert "step.buys" in spans
+    assert spans["tx.build"]["parent_id"] == spans["step.buys"]["span_id"]
+    hist = next(e for e in events if e["event"] == "latency_histograms")
+    assert hist["spans"]["step.buys"]["count"] == 1
+    assert 'span="step.buys"' in (tmp_path / "metrics.prom").read_text()
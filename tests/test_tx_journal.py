@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from solana.transaction import Transaction
+from solders.keypair import Keypair
+
+from src.io.jsonio import load_plan
+from src.exec import funding, swaps
+from src.exec.txlog import TxLog, send_journaled
+from src.util.state import State, JOURNAL
+
+PLAN = "plans/downstream_plan_mainnet-beta_10000000mint_16.00pctLP_1.0SOL_99pct_3buys.json"
+WSOL = "So11111111111111111111111111111111111111112"
+
+
+class JournalRpc:
+    def __init__(self, landed=()):
+        self.landed = set(landed)
+        self.status_calls = []
+        self.sent = []
+        self.balance_probes = 0
+
+    async def recent_blockhash(self):
+        return "HASH"
+
+    async def send(self, tx, *signers, skip_preflight=False):
+        self.sent.append(tx)
+        return f"SIG{len(self.sent)}"
+
+    async def confirm(self, sig):
+        return None
+
+    async def get_signature_statuses(self, sigs):
+        self.status_calls.append(list(sigs))
+        return [SimpleNamespace(slot=1, err=None) if s in self.landed else None for s in sigs]
+
+    async def get_balance(self, pubkey):
+        self.balance_probes += 1
+        return 0
+
+
+def _wallets(plan):
+    return {w.wallet_id: {"kp": kp, "pub": str(kp.pubkey())} for w in plan.wallets if w.role != "SEED" for kp in [Keypair()]}
+
+
+def test_resume_reconciles_inflight_buy_in_one_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transaction, "signature", lambda self: "PRESIGNED", raising=False)
+    plan = load_plan(Path(PLAN))
+    st = State(tmp_path)
+    st.record_tx("buys", "w1", status="confirmed", sig="S1")
+    st.record_tx("buys", "w2", status="sent", sig="S2", sent_ms=0)
+    rpc = JournalRpc(landed={"S2"})
+    buys_done = {}
+    out = asyncio.run(swaps.run(rpc, plan, _wallets(plan), "MINT", WSOL, "AMM", None, None, buys_done=buys_done, log=TxLog(st, "buys")))
+    assert rpc.status_calls == [["S2"]]
+    assert len(rpc.sent) == 1 and buys_done == {"w1": True, "w2": True, "w3": True}
+    assert [s.get("reason") for s in out["swaps"]] == ["already_swapped", "already_swapped", None]
+    st.close()
+    assert {k: v["status"] for k, v in State(tmp_path).txs["buys"].items()} == {"w1": "confirmed", "w2": "confirmed", "w3": "confirmed"}
+
+
+def test_send_is_journaled_before_and_after(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transaction, "signature", lambda self: "PRESIGNED", raising=False)
+    plan = load_plan(Path("plans/sample_plan.json"))
+    st = State(tmp_path)
+    rpc = JournalRpc()
+    out = asyncio.run(funding.run(rpc, Keypair(), _wallets(plan), plan, None, None, log=TxLog(st, "funding")))
+    assert len(rpc.sent) == len(out["funded"]) == 2
+    recs = [json.loads(l) for l in (tmp_path / JOURNAL).read_bytes().splitlines()]
+    assert [r["fields"]["status"] for r in recs if r["key"] == "w1"] == ["sent", "confirmed"]
+    assert recs[0]["fields"]["sig"] == "PRESIGNED"
+    # a second run trusts the journal: no balance probes, no sends
+    probes = rpc.balance_probes
+    again = asyncio.run(funding.run(rpc, Keypair(), _wallets(plan), plan, None, None, log=TxLog(st, "funding")))
+    assert rpc.balance_probes == probes and len(rpc.sent) == len(out["funded"])
+    assert {r["reason"] for r in again["funded"]} == {"journaled"}
+    st.close()
+
+
+def test_unseen_signature_expires_after_blockhash_lifetime(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.exec.txlog.BLOCKHASH_LIFETIME_SEC", 0.0)
+    st = State(tmp_path)
+    st.record_tx("buys", "w1", status="sent", sig="GONE", sent_ms=0)
+    rpc = JournalRpc()
+    assert asyncio.run(TxLog(st, "buys").reconcile(rpc)) == {"w1": "expired"}
+    assert len(rpc.status_calls) == 2
+    st.close()
+
+
+class SignCounter(Transaction):
+    signs = 0
+
+    def sign(self, *signers):
+        SignCounter.signs += 1
+
+
+def test_retry_resends_the_signed_transfer(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transaction, "signature", lambda self: "PRESIGNED", raising=False)
+    st = State(tmp_path)
+    log = TxLog(st, "funding")
+    rpc = JournalRpc()
+
+    async def flaky_land(rpc, tx):
+        # the first confirm times out; the retry resends the very same transaction
+        await rpc.send(tx)
+        return await rpc.send(tx)
+
+    tx = SignCounter()
+    SignCounter.signs = 0
+    asyncio.run(send_journaled(rpc, log, "w1", tx, Keypair(), land=flaky_land))
+    assert SignCounter.signs == 1 and rpc.sent == [tx, tx]
+    recs = [json.loads(l)["fields"] for l in (tmp_path / JOURNAL).read_bytes().splitlines()]
+    assert [r["sig"] for r in recs if r["status"] == "sent"] == ["PRESIGNED"]
+    st.close()
+
+
+def test_unresolved_sent_is_not_replaced_before_its_blockhash_expires(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transaction, "signature", lambda self: "NEW", raising=False)
+    slept = []
+
+    async def sleep(sec):
+        slept.append(sec)
+        rpc.landed.add("OLD")  # the old transfer lands while we wait
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    st = State(tmp_path)
+    st.record_tx("funding", "w1", status="sent", sig="OLD", sent_ms=int(time.time() * 1000))
+    rpc = JournalRpc()
+    sig = asyncio.run(send_journaled(rpc, TxLog(st, "funding"), "w1", Transaction(), Keypair()))
+    assert sig == "OLD" and rpc.sent == [] and len(slept) == 1 and slept[0] > 60
+    assert st.txs["funding"]["w1"]["status"] == "confirmed"
+    st.close()
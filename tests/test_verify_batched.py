@@ -0,0 +1,87 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+
+from src.core.keys import pubkey_str
+from src.core.solana import Rpc, RpcConfig
+from scripts.verify import verify
+
+CONFIG = Path("configs/defaults.yaml")
+
+
+class BatchClient:
+    """Answers the batched reads after a short delay; counts calls and overlap."""
+
+    def __init__(self, missing=(), failed=(), old=()):
+        self.missing, self.failed, self.old = set(missing), set(failed), set(old)
+        self.calls = {"getMultipleAccounts": 0, "getSignatureStatuses": 0, "getTransaction": 0}
+        self.sizes = []
+        self.in_flight = self.peak = 0
+
+    async def _enter(self, method):
+        self.calls[method] += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+    async def get_multiple_accounts(self, pubkeys):
+        await self._enter("getMultipleAccounts")
+        return SimpleNamespace(value=[SimpleNamespace(lamports=1, data=b"") for _ in pubkeys])
+
+    async def get_signature_statuses(self, sigs, search_transaction_history=False):
+        await self._enter("getSignatureStatuses")
+        self.sizes.append(len(sigs))
+        out = []
+        for s in sigs:
+            if s in self.missing or s in self.old:
+                out.append(None)
+            else:
+                out.append(SimpleNamespace(slot=7, err="InstructionError(1, Custom(30))" if s in self.failed else None, confirmation_status="finalized"))
+        return SimpleNamespace(value=out)
+
+    async def get_transaction(self, sig, max_supported_transaction_version=None):
+        await self._enter("getTransaction")
+        if sig in self.missing:
+            return SimpleNamespace(value=None)
+        meta = SimpleNamespace(err="InstructionError(1, Custom(30))" if sig in self.failed else None, log_messages=["Program log: Error: slippage", "Program x success"])
+        return SimpleNamespace(value=SimpleNamespace(slot=3, transaction=SimpleNamespace(meta=meta)))
+
+    async def close(self):
+        return None
+
+
+def _state(tmp_path, n):
+    swaps = [{"order": i + 1, "wallet_id": f"w{i}", "sig": f"S{i}"} for i in range(n)]
+    art = {"mint": {"mint": pubkey_str(Keypair())}, "buys": {"swaps": swaps}}
+    (tmp_path / "artifacts.json").write_text(json.dumps(art))
+
+
+def test_verify_uses_batched_reads(tmp_path):
+    _state(tmp_path, 1000)
+    rpc = Rpc(RpcConfig(url="http://"))
+    rpc.client = client = BatchClient(missing={"S5"}, failed={"S7", "S900"}, old={"S11"})
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+
+    assert ok and result["checks"] == {"mint_exists": True, "metadata_exists": True, "pool_exists": True}
+    assert client.calls == {"getMultipleAccounts": 1, "getSignatureStatuses": 4, "getTransaction": 4}
+    assert sorted(client.sizes) == [232, 256, 256, 256]
+    assert client.peak >= 5  # status chunks and the account read in flight together
+
+    rows = {s["wallet_id"]: s for s in result["swaps"]}
+    assert len(rows) == 1000 and rows["w0"]["status"] == "finalized" and rows["w0"]["slot"] == 7
+    assert rows["w5"]["status"] == "missing" and not rows["w5"]["tx_present"]
+    assert rows["w7"]["status"] == "failed" and rows["w7"]["log_errors"] == ["Program log: Error: slippage"]
+    # outside the status cache but found by getTransaction
+    assert rows["w11"]["status"] == "confirmed" and rows["w11"]["tx_present"] and rows["w11"]["slot"] == 3
+    assert json.loads((tmp_path / "verify.json").read_text())["swaps"][900]["status"] == "failed"
+
+
+def test_verify_without_artifacts(tmp_path):
+    rpc = Rpc(RpcConfig(url="http://"))
+    rpc.client = client = BatchClient()
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+    assert not ok and result["swaps"] == [] and sum(client.calls.values()) == 0
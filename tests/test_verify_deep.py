@@ -0,0 +1,208 @@
+import asyncio
+import json
+import struct
+from pathlib import Path
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from src.core.ata import ata
+from src.core.keys import pubkey_str
+from src.core.metaplex import MetadataView
+from src.core.solana import Rpc, RpcConfig
+from src.core.spl_token import MintView, TokenAccountView
+from src.dex.raydium_v4 import AmmInfoView, quote_exact_in
+from src.exec.context import build_context
+from src.util.config import load_config, parse_config
+from scripts.verify import verify
+
+CONFIG = Path("configs/defaults.yaml")
+SAMPLE = Path("plans/sample_plan.json")
+SOL = 1_000_000_000
+
+
+def _b(pub):
+    return Pubkey.from_string(pub).to_bytes()
+
+
+def mint_data(supply, decimals, authority=None, freeze=None):
+    auth = struct.pack("<I", 1) + _b(authority) if authority else bytes(36)
+    frz = struct.pack("<I", 1) + _b(freeze) if freeze else bytes(36)
+    return auth + struct.pack("<QBB", supply, decimals, 1) + frz
+
+
+def token_data(mint, owner, amount):
+    return _b(mint) + _b(owner) + struct.pack("<Q", amount) + bytes(36) + b"\x01" + bytes(56)
+
+
+def metadata_data(update_authority, mint, name, symbol, uri):
+    def s(v, n):
+        raw = v.encode().ljust(n, b"\0")
+        return struct.pack("<I", len(raw)) + raw
+    return b"\x04" + _b(update_authority) + _b(mint) + s(name, 32) + s(symbol, 10) + s(uri, 200) + struct.pack("<H", 0) + bytes(200)
+
+
+def pool_data(base_mint, quote_mint, vault_base, vault_quote, pnl_base=0, pnl_quote=0):
+    data = bytearray(752)
+    struct.pack_into("<QQQQQQ", data, 0, 6, 0, 0, 0, 6, 9)
+    struct.pack_into("<QQQQ", data, 144, 25, 10_000, 0, 0)
+    struct.pack_into("<QQ", data, 176, 25, 10_000)
+    struct.pack_into("<QQ", data, 192, pnl_base, pnl_quote)
+    for at, pub in ((336, vault_base), (368, vault_quote), (400, base_mint), (432, quote_mint)):
+        data[at:at + 32] = _b(pub)
+    return bytes(data)
+
+
+def test_views_decode_fields_in_place():
+    a, m = pubkey_str(Keypair()), pubkey_str(Keypair())
+    v = MintView(mint_data(500_000, 6, authority=a))
+    assert (v.supply, v.decimals, v.is_initialized, v.freeze_authority) == (500_000, 6, True, None)
+    assert v.mint_authority == Pubkey.from_string(a)
+    t = TokenAccountView(bytearray(token_data(m, a, 42)))
+    assert (t.mint, t.owner, t.amount, t.state) == (Pubkey.from_string(m), Pubkey.from_string(a), 42, 1)
+    md = MetadataView(metadata_data(a, m, "SampleToken", "SAMP", "https://x"))
+    assert (md.key, md.name, md.symbol, md.uri, md.seller_fee_basis_points) == (4, "SampleToken", "SAMP", "https://x", 0)
+    p = AmmInfoView(pool_data(m, a, a, m, pnl_base=5, pnl_quote=7))
+    assert (p.base_decimals, p.quote_decimals, p.swap_fee_bps, p.base_mint) == (6, 9, 25, Pubkey.from_string(m))
+    assert p.reserves(100, 200) == (95, 193)
+    assert MintView.of(None) is None and MintView.of(SimpleNamespace(data=b"\0" * 10)) is None
+    assert AmmInfoView.of(SimpleNamespace(data=token_data(m, a, 1))) is None
+
+
+def _launch(tmp_path, buys=3):
+    raw = json.loads(SAMPLE.read_text())
+    buyer = next(w for w in raw["wallets"] if w["role"] == "FOLLOWUP_BUY")
+    raw["wallets"].remove(buyer)
+    raw["schedule"] = ["w1"]
+    for i in range(buys):
+        raw["wallets"].append({
+            "wallet_id": f"b{i}", "role": "FOLLOWUP_BUY",
+            "funding": {"total_lamports": SOL // 10, "base_lamports": SOL // 10},
+            "action": {"type": "SWAP_BUY", "effective_base_sol": 0.05, "min_out_tokens": 1, "slippage_bps": 50},
+        })
+        raw["schedule"].append(f"b{i}")
+    total = sum(w["funding"]["total_lamports"] for w in raw["wallets"])
+    raw["invariants"]["sum_non_seed_lamports"] = raw["invariants"]["seed_lamports"] = total
+    (tmp_path / "plan.json").write_text(json.dumps(raw))
+
+    mint = pubkey_str(Keypair())
+    wallets = {w["wallet_id"]: {"pub": pubkey_str(Keypair())} for w in raw["wallets"]}
+    swaps = [{"order": i + 1, "wallet_id": f"b{i}", "sig": f"S{i}"} for i in range(buys)]
+    (tmp_path / "artifacts.json").write_text(json.dumps({"mint": {"mint": mint}, "wallets": wallets, "buys": {"swaps": swaps}}))
+    ctx = build_context(parse_config(load_config(CONFIG)), mint)
+    return raw, mint, wallets, ctx
+
+
+class ChainClient:
+    """Serves packed account data by address and fixed signature statuses."""
+
+    def __init__(self, accounts, statuses):
+        self.accounts = {str(Pubkey.from_string(k)): v for k, v in accounts.items()}
+        self.statuses = statuses
+        self.calls = []
+
+    async def get_multiple_accounts(self, pubkeys):
+        self.calls.append(len(pubkeys))
+        return SimpleNamespace(value=[self.accounts.get(str(p)) for p in pubkeys])
+
+    async def get_signature_statuses(self, sigs, search_transaction_history=False):
+        return SimpleNamespace(value=[self.statuses.get(s) for s in sigs])
+
+    async def get_transaction(self, sig, max_supported_transaction_version=None):
+        return SimpleNamespace(value=None)
+
+    async def close(self):
+        return None
+
+
+def _chain(raw, mint, wallets, ctx, balances, name="SampleToken", landed=("S0", "S1"), failed=("S2",)):
+    """On-chain state after b0 and b1 bought ``balances`` and b2's buy failed."""
+    lp = wallets["w1"]["pub"]
+    bought = sum(balances.values())
+    acct = lambda data: SimpleNamespace(lamports=1, data=data)
+    accounts = {
+        mint: acct(mint_data(raw["token"]["lp_tokens"], 6, authority=lp)),
+        ctx.metadata_pda: acct(metadata_data(pubkey_str(Keypair()), mint, name, "SAMP", raw["token"]["uri"])),
+        ctx.pool.pool: acct(pool_data(mint, ctx.pool.quote_mint, ctx.pool.vault_base, ctx.pool.vault_quote)),
+        ctx.pool.vault_base: acct(token_data(mint, ctx.pool.authority, raw["token"]["lp_tokens"] - bought)),
+        ctx.pool.vault_quote: acct(token_data(ctx.pool.quote_mint, ctx.pool.authority, int(raw["inputs"]["q_atomic"]) + len(landed) * SOL // 20)),
+    }
+    for wid, amount in balances.items():
+        accounts[ata(mint, wallets[wid]["pub"])] = acct(token_data(mint, wallets[wid]["pub"], amount))
+    statuses = {s: SimpleNamespace(slot=10 + i, err=None, confirmation_status="finalized") for i, s in enumerate(landed)}
+    for s in failed:
+        statuses[s] = SimpleNamespace(slot=12, err="InstructionError(0, Custom(30))", confirmation_status="finalized")
+    return ChainClient(accounts, statuses)
+
+
+def _fills(raw, n=2):
+    base, quote = raw["token"]["lp_tokens"], int(raw["inputs"]["q_atomic"])
+    out = []
+    for _ in range(n):
+        got = quote_exact_in(SOL // 20, quote, base)
+        out.append(got)
+        base, quote = base - got, quote + SOL // 20
+    return out
+
+
+def test_deep_verify_compares_state_with_the_plan_and_quotes(tmp_path):
+    raw, mint, wallets, ctx = _launch(tmp_path)
+    f0, f1 = _fills(raw)
+    rpc = Rpc(RpcConfig(url="http://"))
+    rpc.client = client = _chain(raw, mint, wallets, ctx, {"b0": f0, "b1": f1 - f1 // 200})  # b1 0.5% short
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+
+    assert client.calls == [5 + 3]  # one read: mint, metadata, pool, vaults and the buyer ATAs
+    state = result["state"]
+    assert state["mint"]["pass"] and state["mint"]["supply"] == raw["token"]["lp_tokens"]
+    assert state["metadata"]["pass"] and state["metadata"]["name"] == "SampleToken"
+    assert state["pool"]["pass"], state["pool"]["mismatches"]
+    assert state["pool"]["reserve_base"] == raw["token"]["lp_tokens"] - f0 - (f1 - f1 // 200)
+
+    rows = {r["wallet_id"]: r for r in result["wallets"]}
+    assert rows["b0"]["pass"] and rows["b0"]["expected_tokens"] == rows["b0"]["actual_tokens"] == f0
+    assert rows["b1"]["pass"] and 0 < rows["b1"]["deviation_bps"] <= 100
+    assert not rows["b2"]["pass"] and rows["b2"]["reasons"] == ["buy failed"] and not rows["b2"]["ata_exists"]
+    assert not ok  # b2's buy failed
+    assert json.loads((tmp_path / "verify.json").read_text())["wallets"][1]["wallet_id"] == "b1"
+
+    # a tighter tolerance fails b1
+    rpc.client = _chain(raw, mint, wallets, ctx, {"b0": f0, "b1": f1 - f1 // 200})
+    result, _ = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc, tolerance_bps=10))
+    b1 = next(r for r in result["wallets"] if r["wallet_id"] == "b1")
+    assert not b1["pass"] and "deviates" in b1["reasons"][0]
+
+
+def test_deep_verify_reports_state_mismatches(tmp_path):
+    raw, mint, wallets, ctx = _launch(tmp_path, buys=2)
+    f0, f1 = _fills(raw)
+    rpc = Rpc(RpcConfig(url="http://"))
+    rpc.client = _chain(raw, mint, wallets, ctx, {"b0": f0, "b1": f1}, name="OtherToken")
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+    assert all(r["pass"] for r in result["wallets"])
+    assert not ok and not result["state"]["metadata"]["pass"]
+    assert result["state"]["metadata"]["mismatches"] == [{"field": "name", "expected": "SampleToken", "actual": "OtherToken"}]
+
+    rpc.client = _chain(raw, mint, wallets, ctx, {"b0": f0, "b1": f1})
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+    assert ok and result["checks"] == {"mint_exists": True, "metadata_exists": True, "pool_exists": True}
+
+
+def test_deep_verify_counts_buys_of_an_applied_delta(tmp_path):
+    raw, mint, wallets, ctx = _launch(tmp_path)
+    # the launch bought b0 and b1; a later --apply-delta added b2 and bought it
+    art = json.loads((tmp_path / "artifacts.json").read_text())
+    art["buys"]["swaps"] = art["buys"]["swaps"][:2]
+    art["deltas"] = {"d1": {"buys": {"swaps": [{"order": 1, "wallet_id": "b0", "skipped": True, "reason": "not_in_delta"}, {"order": 3, "wallet_id": "b2", "sig": "S2"}]}}}
+    (tmp_path / "artifacts.json").write_text(json.dumps(art))
+    f0, f1, f2 = _fills(raw, 3)
+    rpc = Rpc(RpcConfig(url="http://"))
+    rpc.client = _chain(raw, mint, wallets, ctx, {"b0": f0, "b1": f1, "b2": f2}, landed=("S0", "S1", "S2"), failed=())
+    result, ok = asyncio.run(verify(tmp_path, "http://", CONFIG, rpc=rpc))
+
+    assert [s["sig"] for s in result["swaps"]] == ["S0", "S1", "S2"]
+    rows = {r["wallet_id"]: r for r in result["wallets"]}
+    assert rows["b2"]["status"] == "finalized" and rows["b2"]["expected_tokens"] == f2 and rows["b2"]["pass"]
+    assert result["state"]["pool"]["pass"], result["state"]["pool"]["mismatches"]
+    assert ok
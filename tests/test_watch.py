@@ -0,0 +1,134 @@
+import asyncio
+import struct
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+
+from src.core.keys import pubkey_str
+from src.dex.raydium_v4 import derive_pool_accounts, quote_exact_in
+from src.util.config import WatchConfig, load_config, parse_config
+from src.util.watch import BASE, QUOTE, Reserves, watch, ws_url
+
+SOL = 1_000_000_000
+WSOL = "So11111111111111111111111111111111111111112"
+AMM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+
+
+def token(amount):
+    return bytes(64) + struct.pack("<Q", amount) + bytes(93)
+
+
+class ChainRpc:
+    def __init__(self, mint, pool, base, quote, supply=1_000_000_000_000):
+        mint_data = bytes(36) + struct.pack("<QBB", supply, 6, 1) + bytes(36)
+        self.accounts = {mint: mint_data, pool.pool: bytes(752), pool.vault_base: token(base), pool.vault_quote: token(quote)}
+        self.reads = 0
+
+    async def get_multiple_accounts(self, pubkeys):
+        self.reads += 1
+        return [SimpleNamespace(data=self.accounts[p]) if p in self.accounts else None for p in pubkeys]
+
+    async def get_slot(self):
+        return 100
+
+
+def _pool():
+    mint = pubkey_str(Keypair())
+    return mint, derive_pool_accounts(mint, WSOL, AMM)
+
+
+def _swaps(base, quote, n, start_slot=101, lamports=SOL // 10):
+    """Vault updates of ``n`` buys, one per slot, each moving quote then base."""
+    out = []
+    for i in range(n):
+        got = quote_exact_in(lamports, quote, base)
+        base, quote = base - got, quote + lamports
+        out += [(QUOTE, start_slot + i, token(quote)), (BASE, start_slot + i, token(base))]
+    return out
+
+
+async def _stream(updates, pause=0.0):
+    for u in updates:
+        yield u
+    await asyncio.sleep(pause)
+
+
+def _config(actions=(), idle_ms=50):
+    raw = load_config(Path("configs/defaults.yaml"))
+    raw["watch"] = {"idle_ms": idle_ms, "actions": list(actions)}
+    return parse_config(raw).watch
+
+
+def test_ticks_once_per_slot_with_price_and_market_cap():
+    mint, pool = _pool()
+    base, quote = 500_000_000_000, 100 * SOL
+    rpc = ChainRpc(mint, pool, base, quote)
+    ticks, events = [], []
+    res = asyncio.run(watch(rpc, mint, pool, _config(), _stream(_swaps(base, quote, 3)), ticks.append, events.append))
+
+    assert rpc.reads == 1
+    assert res["updates"] == 6 and res["ticks"] == 4  # the snapshot, then one per slot
+    assert [t.slot for t in ticks] == [100, 101, 102, 103]
+    first = ticks[0]
+    assert first.price_sol_per_token == pytest.approx(100 / 500_000) and first.change_bps == 0
+    assert first.market_cap_sol == pytest.approx(first.price_sol_per_token * 1_000_000)
+    assert all(a.price_sol_per_token < b.price_sol_per_token for a, b in zip(ticks, ticks[1:]))
+    assert ticks[-1].quote == quote + 3 * SOL // 10 and ticks[-1].change_bps > 0
+    assert [e["event"] for e in events] == ["pool_tick"] * 4 and events[-1]["slot"] == 103
+
+
+def test_idle_flush_and_duration():
+    mint, pool = _pool()
+    base, quote = 500_000_000_000, 100 * SOL
+    rpc = ChainRpc(mint, pool, base, quote)
+    ticks = []
+    # one swap, then the stream goes quiet: the slot is emitted after idle_ms, the run ends at the duration
+    res = asyncio.run(watch(rpc, mint, pool, _config(idle_ms=20), _stream(_swaps(base, quote, 1), pause=5), ticks.append, duration_sec=0.3))
+    assert [t.slot for t in ticks] == [100, 101] and res["elapsed_ms"] < 2000
+
+
+def test_actions_fire_once_and_exit(tmp_path):
+    mint, pool = _pool()
+    base, quote = 500_000_000_000, 100 * SOL
+    rpc = ChainRpc(mint, pool, base, quote)
+    out = tmp_path / "cmd.txt"
+    rules = [
+        {"when": "change_bps > 0", "do": "command", "command": f"echo $WATCH_SLOT $WATCH_CHANGE_BPS > {out}"},
+        {"when": "slot >= 101", "do": "log", "repeat": True},
+        {"when": "change_bps >= 200", "do": "exit"},
+    ]
+    ticks, events = [], []
+    res = asyncio.run(watch(rpc, mint, pool, _config(rules), _stream(_swaps(base, quote, 20)), ticks.append, events.append))
+
+    fired = [(a["do"], a["slot"]) for a in res["actions"]]
+    exit_slot = ticks[-1].slot
+    assert fired[0] == ("command", 101) and [d for d, _ in fired].count("command") == 1
+    assert [s for d, s in fired if d == "log"] == list(range(101, exit_slot + 1))
+    assert fired[-1] == ("exit", exit_slot) and exit_slot < 120
+    assert ticks[-2].change_bps < 200 <= ticks[-1].change_bps
+    assert out.read_text().split()[0] == "101"
+    assert sum(e["event"] == "watch_action" for e in events) == len(fired)
+
+
+def test_reserves_subtract_pnl_and_skip_unchanged():
+    r = Reserves(decimals=6, supply=10 ** 12, pnl_base=10, pnl_quote=20)
+    r.set(BASE, 1_000_010, 5)
+    assert r.set(QUOTE, SOL + 20, 5) is None
+    t = r.set(QUOTE, SOL + 20, 6)
+    assert (t.slot, t.base, t.quote) == (5, 1_000_000, SOL)
+    assert r.flush() is None  # slot 6 changed nothing
+
+
+def test_watch_config_and_ws_url():
+    raw = load_config(Path("configs/defaults.yaml"))
+    assert parse_config(raw).watch == WatchConfig()
+    raw["watch"] = {"actions": [{"when": "price > 1"}]}
+    with pytest.raises(ValueError, match="unknown field 'price'"):
+        parse_config(raw)
+    raw["watch"] = {"actions": [{"when": "slot > 1", "do": "command"}]}
+    with pytest.raises(ValueError, match="command: required"):
+        parse_config(raw)
+    assert ws_url("https://api.mainnet-beta.solana.com") == "wss://api.mainnet-beta.solana.com"
+    assert ws_url("http://127.0.0.1:8899") == "ws://127.0.0.1:8899"